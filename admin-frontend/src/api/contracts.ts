@@ -73,6 +73,11 @@ export interface ContractFile {
   file: string;
   file_url: string;
   title: string;
+  sha256: string;
+  size: number | null;
+  preview_url: string | null;
+  page_count: number | null;
+  preview_status: 'pending' | 'ready' | 'unavailable' | 'failed';
   created_at: string;
 }
 
@@ -87,6 +92,15 @@ export async function uploadContractFile(
   fileType: 'contract' | 'supplement' | 'other' = 'contract',
   title?: string
 ): Promise<ContractFile> {
+  if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+    const uploadId = await uploadInChunks(file);
+    const response = await client.post<ContractFile>(`/contracts/${contractId}/files/`, {
+      upload_id: uploadId,
+      file_type: fileType,
+      title: title || file.name,
+    });
+    return response.data;
+  }
   const formData = new FormData();
   formData.append('file', file);
   formData.append('file_type', fileType);
@@ -95,6 +109,40 @@ export async function uploadContractFile(
   return response.data;
 }
 
+/** Файлы больше порога загружаются частями (/uploads/), при обрыве связи — с места остановки */
+const CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
+const CHUNK_RETRIES = 3;
+
+interface UploadSession {
+  id: string;
+  offset: number;
+  size: number;
+  status: 'uploading' | 'complete';
+  chunk_size: number;
+}
+
+async function uploadInChunks(file: File): Promise<string> {
+  const created = await client.post<UploadSession>('/uploads/', { filename: file.name, size: file.size });
+  let session = created.data;
+  let failures = 0;
+  while (session.status !== 'complete') {
+    const chunk = file.slice(session.offset, session.offset + session.chunk_size);
+    try {
+      const response = await client.patch<UploadSession>(`/uploads/${session.id}/`, chunk, {
+        headers: { 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': String(session.offset) },
+      });
+      session = response.data;
+      failures = 0;
+    } catch (error) {
+      failures += 1;
+      if (failures > CHUNK_RETRIES) throw error;
+      // Сервер сообщает, сколько байт уже получено, — продолжаем с этого места
+      session = (await client.get<UploadSession>(`/uploads/${session.id}/`)).data;
+    }
+  }
+  return session.id;
+}
+
 export async function deleteContractFile(contractId: number, fileId: number): Promise<void> {
   await client.delete(`/contracts/${contractId}/files/`, { data: { file_id: fileId } });
 }
@@ -110,3 +158,11 @@ export async function downloadContractFile(
   );
   return response.data;
 }
+
+/** Превью первой страницы (JPEG, десятки КБ) — вместо скачивания всего PDF */
+export async function fetchContractFilePreview(contractId: number, fileId: number): Promise<Blob> {
+  const response = await client.get(`/contracts/${contractId}/files/${fileId}/preview/`, {
+    responseType: 'blob',
+  });
+  return response.data;
+}
@@ -0,0 +1,57 @@
+/**
+ * Массовый импорт контрагентов, объектов и договоров из CSV/XLSX (/imports/).
+ * Файл обрабатывается в фоне: статус — getImportRun, ошибки по строкам — importReportUrl (CSV).
+ */
+import client from './client';
+
+export type ImportKind = 'counterparties' | 'properties' | 'contracts';
+export type ImportStatus = 'pending' | 'running' | 'validated' | 'succeeded' | 'failed';
+
+export interface ImportRun {
+  id: number;
+  kind: ImportKind;
+  kind_display: string;
+  original_name: string;
+  dry_run: boolean;
+  strict: boolean;
+  status: ImportStatus;
+  status_display: string;
+  stats: Record<string, number>;
+  error_count: number;
+  message: string;
+  report_url: string | null;
+  job: number | null;
+  job_status: string | null;
+  progress_percent: number | null;
+  created_at: string;
+  finished_at: string | null;
+}
+
+export interface ImportAccepted {
+  job_id: number;
+  import_id: number;
+  status: string;
+}
+
+export async function startImport(
+  kind: ImportKind,
+  file: File,
+  options: { dryRun?: boolean; strict?: boolean } = {}
+): Promise<ImportAccepted> {
+  const form = new FormData();
+  form.append('kind', kind);
+  form.append('file', file);
+  form.append('dry_run', String(Boolean(options.dryRun)));
+  form.append('strict', String(Boolean(options.strict)));
+  const response = await client.post<ImportAccepted>('/imports/', form);
+  return response.data;
+}
+
+export async function getImportRun(id: number): Promise<ImportRun> {
+  const response = await client.get<ImportRun>(`/imports/${id}/`);
+  return response.data;
+}
+
+export function importReportUrl(id: number): string {
+  return `/imports/${id}/report/`;
+}
@@ -4,3 +4,5 @@ export { default as client } from './client';
 export * from './contracts';
 export * from './accruals';
 export * from './payments';
+export * from './search';
+export * from './imports';
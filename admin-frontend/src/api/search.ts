@@ -0,0 +1,32 @@
+/**
+ * Единый поиск по договорам, контрагентам и объектам (/search/), результаты по релевантности.
+ */
+import client from './client';
+
+export type SearchResultType = 'contract' | 'tenant' | 'property';
+
+export interface SearchResult {
+  type: SearchResultType;
+  id: number;
+  title: string;
+  subtitle: string;
+  status: string;
+  rank: number;
+}
+
+export interface SearchResponse {
+  query: string;
+  count: number;
+  results: SearchResult[];
+}
+
+export async function searchAll(
+  query: string,
+  types?: Array<'contracts' | 'tenants' | 'properties'>,
+  limit = 10
+): Promise<SearchResponse> {
+  const params: Record<string, string | number> = { q: query, limit };
+  if (types && types.length) params.types = types.join(',');
+  const response = await client.get<SearchResponse>('/search/', { params });
+  return response.data;
+}
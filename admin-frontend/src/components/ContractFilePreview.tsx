@@ -0,0 +1,39 @@
+import { useEffect, useState } from 'react';
+import { FileText } from 'lucide-react';
+import { fetchContractFilePreview, type ContractFile } from '../api/contracts';
+
+interface ContractFilePreviewProps {
+  contractId: number;
+  file: ContractFile;
+}
+
+/** Миниатюра первой страницы файла договора; пока превью нет — иконка */
+export default function ContractFilePreview({ contractId, file }: ContractFilePreviewProps) {
+  const [src, setSrc] = useState<string | null>(null);
+
+  useEffect(() => {
+    if (file.preview_status !== 'ready') return undefined;
+    let objectUrl: string | null = null;
+    let cancelled = false;
+    fetchContractFilePreview(contractId, file.id)
+      .then((blob) => {
+        if (cancelled) return;
+        objectUrl = URL.createObjectURL(blob);
+        setSrc(objectUrl);
+      })
+      .catch(() => setSrc(null));
+    return () => {
+      cancelled = true;
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [contractId, file.id, file.preview_status]);
+
+  if (!src) return <FileText className="w-4 h-4 flex-shrink-0" />;
+  return (
+    <img
+      src={src}
+      alt=""
+      className="w-10 h-14 object-cover object-top flex-shrink-0 rounded border border-slate-200"
+    />
+  );
+}
@@ -9,7 +9,8 @@ import {
   downloadContractFile,
   type ContractFile,
 } from '../api/contracts';
-import { FileText, Plus, Trash2 } from 'lucide-react';
+import { Plus, Trash2 } from 'lucide-react';
+import ContractFilePreview from '../components/ContractFilePreview';
 
 interface Contract {
   id: number;
@@ -283,9 +284,10 @@ export default function ContractDetailPage() {
                     disabled={fileDownloadingId === f.id}
                     className="flex items-center gap-2 text-indigo-600 hover:text-indigo-800 text-left disabled:opacity-50"
                   >
-                    <FileText className="w-4 h-4 flex-shrink-0" />
+                    <ContractFilePreview contractId={Number(id)} file={f} />
                     <span className="text-sm font-medium">{f.title || f.file?.split('/').pop() || 'Файл'}</span>
                     <span className="text-xs text-gray-400">({getFileTypeLabel(f.file_type)})</span>
+                    {f.page_count ? <span className="text-xs text-gray-400">{f.page_count} стр.</span> : null}
                     {fileDownloadingId === f.id ? ' …' : ''}
                   </button>
                   <button
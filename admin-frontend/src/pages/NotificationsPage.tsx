@@ -110,7 +110,7 @@ export default function NotificationsPage() {
 
   const fetchOverdueTenants = async () => {
     try {
-      const response = await client.get('/reports/overdue_payments/');
+      const response = await client.get('/reports/overdue_payments/?include_accruals=true');
       setOverdueTenants(response.data.data || []);
     } catch (error) {
       console.error('Error fetching overdue tenants:', error);
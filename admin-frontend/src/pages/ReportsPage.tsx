@@ -49,6 +49,10 @@ export default function ReportsPage() {
     profit: false,
   });
 
+  // Детализация просрочки по контрагентам загружается по требованию
+  const [overdueDetails, setOverdueDetails] = useState<Record<number, any[]>>({});
+  const [expandedTenants, setExpandedTenants] = useState<Set<number>>(new Set());
+
   useEffect(() => {
     fetchProperties();
     fetchTenants();
@@ -157,6 +161,8 @@ export default function ReportsPage() {
       
       const response = await client.get(url);
       setReportData(response.data);
+      setOverdueDetails({});
+      setExpandedTenants(new Set());
       setLoading(false);
     } catch (error) {
       console.error('Error fetching report:', error);
@@ -683,11 +689,33 @@ export default function ReportsPage() {
     );
   };
 
+  const toggleOverdueTenant = async (tenantId: number) => {
+    const next = new Set(expandedTenants);
+    if (next.has(tenantId)) {
+      next.delete(tenantId);
+      setExpandedTenants(next);
+      return;
+    }
+    next.add(tenantId);
+    setExpandedTenants(next);
+    if (overdueDetails[tenantId]) return;
+    try {
+      const params = new URLSearchParams({ tenant_id: tenantId.toString() });
+      if (reportData?.as_of_date) params.append('as_of_date', reportData.as_of_date);
+      if (selectedProperty) params.append('property_id', selectedProperty.toString());
+      const response = await client.get(`/reports/overdue_accruals/?${params.toString()}`);
+      setOverdueDetails((prev) => ({ ...prev, [tenantId]: response.data.accruals || [] }));
+    } catch (error) {
+      console.error('Error fetching overdue accruals:', error);
+    }
+  };
+
   const renderOverdueReport = () => {
     if (!reportData) return null;
 
     const summary = reportData.summary || {};
     const tenants = Array.isArray(reportData.data) ? reportData.data : [];
+    const buckets: string[] = Array.isArray(reportData.buckets) ? reportData.buckets : [];
 
     return (
       <div className="bg-white rounded-lg shadow overflow-hidden">
@@ -712,14 +740,32 @@ export default function ReportsPage() {
               <p className="text-lg font-bold text-gray-900">{summary.accruals_count ?? 0}</p>
             </div>
           </div>
+          {buckets.length > 0 && (
+            <div className="mt-3 flex flex-wrap gap-4">
+              {buckets.map((bucket) => (
+                <div key={bucket}>
+                  <p className="text-xs text-gray-500">{bucket} дн.</p>
+                  <p className="text-sm font-semibold text-gray-900">
+                    {formatCurrency(summary.buckets?.[bucket] ?? '0', summary.currency || 'KGS')}
+                  </p>
+                </div>
+              ))}
+            </div>
+          )}
         </div>
         <div className="overflow-x-auto no-scrollbar w-full">
           {tenants.length === 0 && (
             <div className="px-6 py-6 text-sm text-gray-500">Нет просроченных начислений</div>
           )}
-          {tenants.map((tenantData: any, idx: number) => (
+          {tenants.map((tenantData: any, idx: number) => {
+            const isExpanded = expandedTenants.has(tenantData?.tenant_id);
+            const accruals = tenantData?.accruals || overdueDetails[tenantData?.tenant_id] || [];
+            return (
             <div key={tenantData?.tenant_id ?? idx} className="border-b border-gray-200 last:border-0">
-              <div className="px-6 py-4 bg-gray-50">
+              <div
+                className="px-6 py-4 bg-gray-50 cursor-pointer"
+                onClick={() => toggleOverdueTenant(tenantData?.tenant_id)}
+              >
                 <div className="flex justify-between items-center">
                   <div>
                     <h3 className="font-semibold text-gray-900">{tenantData?.tenant_name || '-'}</h3>
@@ -731,9 +777,15 @@ export default function ReportsPage() {
                     <p className="text-sm font-medium text-red-600">
                       Макс. просрочка: {tenantData?.oldest_overdue_days ?? 0} дн.
                     </p>
+                    {buckets.length > 0 && (
+                      <p className="text-xs text-gray-500">
+                        {buckets.map((bucket) => `${bucket}: ${tenantData?.buckets?.[bucket] ?? '0'}`).join(' · ')}
+                      </p>
+                    )}
                   </div>
                 </div>
               </div>
+              {isExpanded && (
               <table className="min-w-full divide-y divide-gray-200">
                 <thead className="bg-gray-50">
                   <tr>
@@ -745,7 +797,7 @@ export default function ReportsPage() {
                   </tr>
                 </thead>
                 <tbody className="bg-white divide-y divide-gray-200">
-                  {(tenantData?.accruals || []).map((accrual: any, j: number) => (
+                  {accruals.map((accrual: any, j: number) => (
                     <tr key={accrual?.id ?? j}>
                       <td className="px-4 py-2 text-sm">
                         <div className="font-medium text-gray-900">{accrual?.property_name || '-'}</div>
@@ -765,8 +817,10 @@ export default function ReportsPage() {
                   ))}
                 </tbody>
               </table>
+              )}
             </div>
-          ))}
+            );
+          })}
         </div>
       </div>
     );
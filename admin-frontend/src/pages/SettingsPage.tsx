@@ -235,10 +235,14 @@ export default function SettingsPage() {
     }
     setPasswordLoading(true);
     try {
-      await client.post('/auth/change-password/', {
+      const { data } = await client.post('/auth/change-password/', {
         current_password: passwordForm.current_password,
         new_password: passwordForm.new_password,
       });
+      // После смены пароля старый токен отзывается — сохраняем новый
+      if (data?.token) {
+        localStorage.setItem('auth_token', data.token);
+      }
       setPasswordForm({ current_password: '', new_password: '', confirm: '' });
       alert('Пароль изменён. При следующем входе используйте новый пароль.');
     } catch (err: any) {
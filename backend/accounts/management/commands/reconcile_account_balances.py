@@ -0,0 +1,58 @@
+"""
+Сверка балансов счетов с операциями по счетам.
+Пересчитывает Account.balance из AccountTransaction одним сгруппированным запросом
+и выводит расхождения. С --fix выставляет balance по сумме операций.
+
+Использование:
+  python manage.py reconcile_account_balances
+  python manage.py reconcile_account_balances --fix
+  python manage.py reconcile_account_balances --account-id 3 --account-id 5
+"""
+from django.core.management.base import BaseCommand
+
+from accounts.services import AccountService
+
+
+class Command(BaseCommand):
+    help = 'Сверяет балансы счетов с суммой операций по счетам (опционально исправляет)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Исправить расхождения: выставить баланс по сумме операций',
+        )
+        parser.add_argument(
+            '--account-id',
+            type=int,
+            action='append',
+            dest='account_ids',
+            help='Проверить только указанный счет (можно указать несколько раз)',
+        )
+
+    def handle(self, *args, **options):
+        account_ids = options.get('account_ids')
+        if options['fix']:
+            drift = AccountService.reconcile_balances(account_ids)
+        else:
+            drift = AccountService.get_balance_drift(account_ids)
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('✓ Расхождений нет: балансы совпадают с операциями'))
+            return
+
+        for row in drift:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'⚠ Счет #{row["account_id"]} «{row["name"]}» ({row["currency"]}): '
+                    f'баланс {row["balance"]}, по операциям {row["ledger_balance"]}, '
+                    f'расхождение {row["drift"]}'
+                )
+            )
+
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'\n✓ Исправлено счетов: {len(drift)}'))
+        else:
+            self.stdout.write(
+                self.style.WARNING(f'\nСчетов с расхождением: {len(drift)}. Для исправления запустите с --fix')
+            )
@@ -0,0 +1,43 @@
+"""
+Депозиты по договорам раньше зачислялись на счет арендатора без операции по счету,
+и сверка (reconcile_account_balances) видела их как расхождение. Для уже зачисленных
+депозитов добавляются операции «Поступление»; баланс счетов не меняется.
+"""
+from django.db import migrations
+
+
+def backfill_deposit_transactions(apps, schema_editor):
+    Account = apps.get_model('accounts', 'Account')
+    AccountTransaction = apps.get_model('accounts', 'AccountTransaction')
+    Deposit = apps.get_model('deposits', 'Deposit')
+
+    for deposit in Deposit.objects.select_related('contract').filter(amount__gt=0).order_by('pk'):
+        contract = deposit.contract
+        account = Account.objects.filter(
+            owner_id=contract.tenant_id, currency=contract.currency, is_active=True,
+        ).first()
+        if account is None:
+            continue
+        comment = f'Депозит по договору {contract.number}'
+        if AccountTransaction.objects.filter(account=account, transaction_type='income', comment=comment).exists():
+            continue
+        AccountTransaction.objects.create(
+            account=account,
+            transaction_type='income',
+            amount=deposit.amount,
+            transaction_date=contract.signed_at,
+            comment=comment,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('contracts', '0008_contractfile_preview'),
+        ('deposits', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_deposit_transactions, migrations.RunPython.noop),
+    ]
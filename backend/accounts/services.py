@@ -1,11 +1,39 @@
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, RowRange, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from .models import Account, AccountTransaction
 
+# Типы операций, увеличивающие и уменьшающие баланс счета
+CREDIT_TRANSACTION_TYPES = ('income', 'transfer_in', 'adjustment')
+DEBIT_TRANSACTION_TYPES = ('expense', 'transfer_out')
+
+MONEY_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
 
 class AccountService:
     """Сервис для работы со счетами"""
-    
+
+    @staticmethod
+    def _apply_balance_delta(account: Account, delta: Decimal, require_funds: bool = False) -> Decimal:
+        """
+        Атомарно изменить баланс счета на delta одним UPDATE (F-выражение).
+        Пишется только колонка balance (и updated_at). При require_funds списание
+        выполняется только если на счете достаточно средств — проверка и запись
+        происходят в одном операторе, поэтому параллельные списания не уводят баланс в минус.
+        Возвращает новый баланс и обновляет его в переданном экземпляре.
+        """
+        queryset = Account.objects.filter(pk=account.pk)
+        if require_funds:
+            queryset = queryset.filter(balance__gte=-delta)
+        updated = queryset.update(balance=F('balance') + delta, updated_at=timezone.now())
+        new_balance = Account.objects.values_list('balance', flat=True).get(pk=account.pk)
+        if not updated:
+            raise ValueError(f"Недостаточно средств на счете. Баланс: {new_balance}, требуется: {-delta}")
+        account.balance = new_balance
+        return new_balance
+
     @staticmethod
     @transaction.atomic
     def add_transaction(
@@ -22,16 +50,22 @@ class AccountService:
         """
         Добавить операцию по счету и обновить баланс
         """
+        is_transfer = transaction_type == 'transfer_out' and related_account is not None
+        if is_transfer:
+            # Блокируем оба счета в порядке pk, чтобы встречные переводы не давали дедлок
+            list(
+                Account.objects.select_for_update()
+                .filter(pk__in=[account.pk, related_account.pk])
+                .order_by('pk')
+                .values_list('pk', flat=True)
+            )
+
         # Определяем, увеличивает или уменьшает операция баланс
-        if transaction_type in ['income', 'transfer_in', 'adjustment']:
-            account.balance += amount
-        elif transaction_type in ['expense', 'transfer_out']:
-            if account.balance < amount:
-                raise ValueError(f"Недостаточно средств на счете. Баланс: {account.balance}, требуется: {amount}")
-            account.balance -= amount
-        
-        account.save()
-        
+        if transaction_type in CREDIT_TRANSACTION_TYPES:
+            AccountService._apply_balance_delta(account, amount)
+        elif transaction_type in DEBIT_TRANSACTION_TYPES:
+            AccountService._apply_balance_delta(account, -amount, require_funds=True)
+
         # Создаем транзакцию
         account_transaction = AccountTransaction.objects.create(
             account=account,
@@ -44,21 +78,192 @@ class AccountService:
             comment=comment,
             created_by=created_by
         )
-        
+
         # Если это перевод, создаем обратную транзакцию на связанном счете
-        if transaction_type == 'transfer_out' and related_account:
-            AccountService.add_transaction(
+        if is_transfer:
+            AccountService._apply_balance_delta(related_account, amount)
+            AccountTransaction.objects.create(
                 account=related_account,
                 transaction_type='transfer_in',
                 amount=amount,
                 transaction_date=transaction_date,
-                comment=f'Перевод со счета {account.name}',
                 related_account=account,
+                comment=f'Перевод со счета {account.name}',
                 created_by=created_by
             )
-        
+
         return account_transaction
-    
+
+    @staticmethod
+    @transaction.atomic
+    def revert_transaction(account_transaction: AccountTransaction) -> None:
+        """
+        Откатить операцию по счету: вернуть её сумму в баланс и удалить операцию.
+        """
+        amount = account_transaction.amount
+        if account_transaction.transaction_type in CREDIT_TRANSACTION_TYPES:
+            AccountService._apply_balance_delta(account_transaction.account, -amount)
+        elif account_transaction.transaction_type in DEBIT_TRANSACTION_TYPES:
+            AccountService._apply_balance_delta(account_transaction.account, amount)
+        account_transaction.delete()
+
+    @staticmethod
+    @transaction.atomic
+    def add_income_batch(account: Account, items) -> Decimal:
+        """
+        Несколько поступлений на один счет: операции одним bulk_create, баланс — одним UPDATE.
+        items — список (сумма, дата, комментарий). Возвращает новый баланс.
+        """
+        transactions = [
+            AccountTransaction(
+                account=account, transaction_type='income', amount=amount,
+                transaction_date=transaction_date, comment=comment,
+            )
+            for amount, transaction_date, comment in items
+            if amount > 0
+        ]
+        AccountTransaction.objects.bulk_create(transactions)
+        return AccountService._apply_balance_delta(account, sum((t.amount for t in transactions), Decimal('0')))
+
+    @staticmethod
+    def signed_amount(prefix: str = ''):
+        """
+        SQL-выражение суммы операции со знаком: поступления с плюсом, списания с минусом.
+        prefix — путь до AccountTransaction (например, 'transactions__').
+        """
+        return Case(
+            When(**{f'{prefix}transaction_type__in': CREDIT_TRANSACTION_TYPES}, then=F(f'{prefix}amount')),
+            When(**{f'{prefix}transaction_type__in': DEBIT_TRANSACTION_TYPES}, then=-F(f'{prefix}amount')),
+            default=Value(Decimal('0')),
+            output_field=MONEY_FIELD,
+        )
+
+    @staticmethod
+    def ledger_balances():
+        """
+        Queryset счетов с аннотацией ledger_balance — баланс, пересчитанный из
+        AccountTransaction одним сгруппированным запросом.
+        """
+        return Account.objects.annotate(
+            ledger_balance=Coalesce(
+                Sum(AccountService.signed_amount('transactions__')),
+                Value(Decimal('0')),
+                output_field=MONEY_FIELD,
+            )
+        ).order_by('pk')
+
+    @staticmethod
+    def get_statement(account: Account, date_from=None, date_to=None, cursor=None, limit: int = 100) -> dict:
+        """
+        Выписка по счету за период: входящий остаток, операции с нарастающим остатком
+        и исходящий остаток.
+
+        Нарастающий остаток считается в PostgreSQL оконной функцией
+        SUM() OVER (ORDER BY transaction_date, id). Страницы — по ключу
+        (transaction_date, id): cursor — пара последней операции предыдущей страницы.
+        Все запросы фильтруются по (account, transaction_date) и используют индекс.
+        """
+        period = Q()
+        if date_from:
+            period &= Q(transaction_date__gte=date_from)
+        if date_to:
+            period &= Q(transaction_date__lte=date_to)
+        after_cursor = Q()
+        if cursor:
+            cursor_date, cursor_id = cursor
+            after_cursor = Q(transaction_date__gt=cursor_date) | Q(transaction_date=cursor_date, id__gt=cursor_id)
+
+        signed = AccountService.signed_amount()
+        ledger = AccountTransaction.objects.filter(account=account)
+        if date_to:
+            ledger = ledger.filter(transaction_date__lte=date_to)
+        # Входящий, исходящий остатки и остаток до курсора — одним агрегирующим запросом
+        aggregates = {'period_total': Sum(signed, filter=period)}
+        if date_from:
+            aggregates['opening'] = Sum(signed, filter=Q(transaction_date__lt=date_from))
+        if cursor:
+            aggregates['carried'] = Sum(signed, filter=period & ~after_cursor)
+        totals = ledger.aggregate(**aggregates)
+        opening_balance = totals.get('opening') or Decimal('0')
+        closing_balance = opening_balance + (totals['period_total'] or Decimal('0'))
+        # Остаток на начало страницы: входящий остаток + операции периода до курсора
+        page_opening = opening_balance + (totals.get('carried') or Decimal('0'))
+
+        rows = list(
+            ledger.filter(period & after_cursor)
+            .annotate(
+                signed_amount=signed,
+                running_total=Window(
+                    expression=Sum(signed),
+                    order_by=[F('transaction_date').asc(), F('id').asc()],
+                    frame=RowRange(start=None, end=0),
+                ),
+            )
+            .order_by('transaction_date', 'id')
+            .values(
+                'id', 'transaction_date', 'transaction_type', 'amount',
+                'signed_amount', 'running_total', 'comment', 'related_account_id',
+                'related_payment_id', 'related_expense_id',
+            )[:limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        for row in rows:
+            row['running_balance'] = page_opening + row.pop('running_total')
+
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = (rows[-1]['transaction_date'], rows[-1]['id'])
+
+        return {
+            'opening_balance': opening_balance,
+            'closing_balance': closing_balance,
+            'transactions': rows,
+            'next_cursor': next_cursor,
+        }
+
+    @staticmethod
+    def get_balance_drift(account_ids=None) -> list:
+        """
+        Сверка балансов: список счетов, у которых сохраненный balance
+        не совпадает с суммой операций по счету.
+        """
+        accounts = AccountService.ledger_balances()
+        if account_ids:
+            accounts = accounts.filter(pk__in=account_ids)
+        drift = []
+        for row in accounts.values('id', 'name', 'currency', 'balance', 'ledger_balance'):
+            if row['balance'] != row['ledger_balance']:
+                drift.append({
+                    'account_id': row['id'],
+                    'name': row['name'],
+                    'currency': row['currency'],
+                    'balance': row['balance'],
+                    'ledger_balance': row['ledger_balance'],
+                    'drift': row['balance'] - row['ledger_balance'],
+                })
+        return drift
+
+    @staticmethod
+    @transaction.atomic
+    def reconcile_balances(account_ids=None) -> list:
+        """
+        Исправить расхождения: выставить balance = сумма операций.
+        Счета блокируются на время пересчета. Возвращает список исправленных расхождений.
+        """
+        locked = Account.objects.select_for_update().order_by('pk')
+        if account_ids:
+            locked = locked.filter(pk__in=account_ids)
+        list(locked.values_list('pk', flat=True))
+
+        drift = AccountService.get_balance_drift(account_ids)
+        now = timezone.now()
+        for row in drift:
+            Account.objects.filter(pk=row['account_id']).update(
+                balance=row['ledger_balance'], updated_at=now
+            )
+        return drift
+
     @staticmethod
     def get_total_balance(currency: str = 'KGS') -> Decimal:
         """Получить общий баланс по всем счетам в указанной валюте"""
@@ -0,0 +1,194 @@
+"""
+Тесты атомарного обновления балансов счетов и сверки с операциями
+"""
+import threading
+from io import StringIO
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+from accounts.models import Account, AccountTransaction
+from accounts.services import AccountService
+
+
+def run_concurrently(func, count):
+    """Запускает func в count потоках одновременно, возвращает список исключений."""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker():
+        try:
+            barrier.wait()
+            func()
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+class AccountLedgerConcurrencyTests(TransactionTestCase):
+    """Параллельные операции не теряют обновления баланса"""
+
+    def setUp(self):
+        self.account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+
+    def test_concurrent_income_does_not_lose_updates(self):
+        def post_income():
+            account = Account.objects.get(pk=self.account.pk)
+            AccountService.add_transaction(
+                account=account,
+                transaction_type='income',
+                amount=Decimal('100.00'),
+                transaction_date=date(2026, 1, 1),
+            )
+
+        errors = run_concurrently(post_income, 10)
+
+        self.assertEqual(errors, [])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1000.00'))
+        self.assertEqual(AccountTransaction.objects.filter(account=self.account).count(), 10)
+
+    def test_concurrent_expenses_never_overdraw(self):
+        AccountService.add_transaction(
+            account=self.account,
+            transaction_type='income',
+            amount=Decimal('100.00'),
+            transaction_date=date(2026, 1, 1),
+        )
+
+        def post_expense():
+            account = Account.objects.get(pk=self.account.pk)
+            AccountService.add_transaction(
+                account=account,
+                transaction_type='expense',
+                amount=Decimal('30.00'),
+                transaction_date=date(2026, 1, 2),
+            )
+
+        errors = run_concurrently(post_expense, 8)
+
+        self.assertEqual(len(errors), 5)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('10.00'))
+        self.assertEqual(AccountService.get_balance_drift(), [])
+
+    def test_concurrent_opposite_transfers_keep_total(self):
+        other = Account.objects.create(name='Банк', account_type='bank', currency='KGS')
+        for acc in (self.account, other):
+            AccountService.add_transaction(
+                account=acc,
+                transaction_type='income',
+                amount=Decimal('500.00'),
+                transaction_date=date(2026, 1, 1),
+            )
+
+        def transfer_pair():
+            source = Account.objects.get(pk=self.account.pk)
+            target = Account.objects.get(pk=other.pk)
+            AccountService.add_transaction(
+                account=source,
+                transaction_type='transfer_out',
+                amount=Decimal('10.00'),
+                transaction_date=date(2026, 1, 2),
+                related_account=target,
+            )
+            AccountService.add_transaction(
+                account=target,
+                transaction_type='transfer_out',
+                amount=Decimal('5.00'),
+                transaction_date=date(2026, 1, 2),
+                related_account=source,
+            )
+
+        errors = run_concurrently(transfer_pair, 6)
+
+        self.assertEqual(errors, [])
+        self.account.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('470.00'))
+        self.assertEqual(other.balance, Decimal('530.00'))
+        self.assertEqual(AccountService.get_balance_drift(), [])
+
+
+class AccountReconciliationTests(TransactionTestCase):
+    """Сверка balance с суммой операций"""
+
+    def setUp(self):
+        self.account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+        AccountService.add_transaction(
+            account=self.account,
+            transaction_type='income',
+            amount=Decimal('250.00'),
+            transaction_date=date(2026, 1, 1),
+        )
+        AccountService.add_transaction(
+            account=self.account,
+            transaction_type='expense',
+            amount=Decimal('50.00'),
+            transaction_date=date(2026, 1, 2),
+        )
+
+    def test_revert_transaction_restores_balance(self):
+        income = AccountTransaction.objects.get(account=self.account, transaction_type='income')
+        AccountService.add_transaction(
+            account=self.account,
+            transaction_type='income',
+            amount=Decimal('100.00'),
+            transaction_date=date(2026, 1, 3),
+        )
+        AccountService.revert_transaction(income)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('50.00'))
+        self.assertEqual(AccountService.get_balance_drift(), [])
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        Account.objects.filter(pk=self.account.pk).update(balance=Decimal('999.00'))
+
+        drift = AccountService.get_balance_drift()
+        self.assertEqual(len(drift), 1)
+        self.assertEqual(drift[0]['ledger_balance'], Decimal('200.00'))
+        self.assertEqual(drift[0]['drift'], Decimal('799.00'))
+
+        call_command('reconcile_account_balances', '--fix', stdout=StringIO())
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('200.00'))
+        self.assertEqual(AccountService.get_balance_drift(), [])
+
+    def test_contract_deposit_is_journaled(self):
+        from contracts.models import Contract
+        from contracts.services import ContractService
+        from core.models import Tenant
+        from properties.models import Property
+
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555700100')
+        prop = Property.objects.create(name='Офис', address='Адрес', property_type='office', area=Decimal('30'))
+        contract = Contract.objects.create(
+            number='DEP-1', signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'),
+            currency='KGS', status='active', deposit_enabled=True, deposit_amount=Decimal('500.00'),
+        )
+        ContractService.create_contract_with_accruals_and_deposit(contract)
+
+        deposit_account = Account.objects.get(owner=tenant)
+        self.assertEqual(deposit_account.balance, Decimal('500.00'))
+        self.assertTrue(deposit_account.transactions.filter(
+            transaction_type='income', amount=Decimal('500.00'), comment='Депозит по договору DEP-1',
+        ).exists())
+
+        call_command('reconcile_account_balances', '--fix', stdout=StringIO())
+        deposit_account.refresh_from_db()
+        self.assertEqual(deposit_account.balance, Decimal('500.00'))
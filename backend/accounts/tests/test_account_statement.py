@@ -0,0 +1,74 @@
+"""
+Тесты выписки по счету с нарастающим остатком
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from accounts.services import AccountService
+from core.models import User
+
+
+class AccountStatementTests(TestCase):
+    """Входящий/исходящий остатки, нарастающий остаток и постраничный вывод по ключу"""
+
+    def setUp(self):
+        self.account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+        operations = [
+            ('income', '1000.00', date(2026, 1, 5)),
+            ('expense', '200.00', date(2026, 1, 20)),
+            ('income', '500.00', date(2026, 2, 1)),
+            ('expense', '100.00', date(2026, 2, 1)),
+            ('income', '300.00', date(2026, 2, 15)),
+            ('expense', '50.00', date(2026, 3, 1)),
+        ]
+        for transaction_type, amount, transaction_date in operations:
+            AccountService.add_transaction(
+                account=self.account,
+                transaction_type=transaction_type,
+                amount=Decimal(amount),
+                transaction_date=transaction_date,
+            )
+        self.admin = User.objects.create_user(username='admin_statement', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_statement_for_period(self):
+        statement = AccountService.get_statement(self.account, date(2026, 2, 1), date(2026, 2, 28))
+
+        self.assertEqual(statement['opening_balance'], Decimal('800.00'))
+        self.assertEqual(statement['closing_balance'], Decimal('1500.00'))
+        self.assertEqual(
+            [row['running_balance'] for row in statement['transactions']],
+            [Decimal('1300.00'), Decimal('1200.00'), Decimal('1500.00')],
+        )
+        self.assertIsNone(statement['next_cursor'])
+
+    def test_keyset_pages_continue_running_balance(self):
+        url = f'/api/accounts/{self.account.id}/statement/'
+        balances = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {'from': '2026-01-10', 'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            balances += [row['running_balance'] for row in response.data['transactions']]
+            pages += 1
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(response.data['opening_balance'], '1000.00')
+        self.assertEqual(response.data['closing_balance'], '1450.00')
+        self.assertEqual(balances, ['800.00', '1300.00', '1200.00', '1500.00', '1450.00'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'/api/accounts/{self.account.id}/statement/', {'cursor': 'bad'})
+        self.assertEqual(response.status_code, 400)
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
+from datetime import datetime
 from decimal import Decimal
 from .models import Account, AccountTransaction
 from .serializers import (
@@ -13,6 +14,10 @@ from .services import AccountService
 from core.mixins import DataScopingMixin
 from core.permissions import ReadOnlyForClients, CanReadResource, CanWriteResource
 
+# Размер страницы выписки по счету (по умолчанию и максимальный)
+STATEMENT_PAGE_SIZE = 100
+STATEMENT_MAX_PAGE_SIZE = 500
+
 
 class AccountViewSet(DataScopingMixin, viewsets.ModelViewSet):
     """
@@ -132,6 +137,62 @@ class AccountViewSet(DataScopingMixin, viewsets.ModelViewSet):
         serializer = AccountTransactionListSerializer(transactions, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def statement(self, request, pk=None):
+        """
+        Выписка по счету за период с нарастающим остатком.
+        Параметры: from, to (YYYY-MM-DD), cursor (из next_cursor предыдущей страницы), limit.
+        """
+        account = self.get_object()
+        try:
+            date_from = request.query_params.get('from')
+            date_to = request.query_params.get('to')
+            date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+        except ValueError:
+            return Response({'error': 'Неверный формат даты. Используйте YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                cursor_date, cursor_id = cursor.split('_', 1)
+                cursor = (datetime.strptime(cursor_date, '%Y-%m-%d').date(), int(cursor_id))
+            except ValueError:
+                return Response({'error': 'Неверный курсор'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', STATEMENT_PAGE_SIZE)), 1), STATEMENT_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': 'limit должен быть числом'}, status=status.HTTP_400_BAD_REQUEST)
+
+        statement = AccountService.get_statement(account, date_from, date_to, cursor, limit)
+        next_cursor = statement['next_cursor']
+        return Response({
+            'account_id': account.id,
+            'account_name': account.name,
+            'currency': account.currency,
+            'from': date_from.isoformat() if date_from else None,
+            'to': date_to.isoformat() if date_to else None,
+            'opening_balance': str(statement['opening_balance']),
+            'closing_balance': str(statement['closing_balance']),
+            'transactions': [
+                {
+                    'id': row['id'],
+                    'transaction_date': row['transaction_date'].isoformat(),
+                    'transaction_type': row['transaction_type'],
+                    'amount': str(row['amount']),
+                    'signed_amount': str(row['signed_amount']),
+                    'running_balance': str(row['running_balance']),
+                    'comment': row['comment'],
+                    'related_account': row['related_account_id'],
+                    'related_payment': row['related_payment_id'],
+                    'related_expense': row['related_expense_id'],
+                }
+                for row in statement['transactions']
+            ],
+            'next_cursor': f'{next_cursor[0].isoformat()}_{next_cursor[1]}' if next_cursor else None,
+        })
+
     @action(detail=False, methods=['get'])
     def total_balance(self, request):
         """Получить общий баланс по валютам"""
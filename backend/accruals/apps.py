@@ -5,3 +5,11 @@ class AccrualsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accruals'
     verbose_name = 'Начисления'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+
+        from .journal import sync_on_save
+        from .models import Accrual
+
+        post_save.connect(sync_on_save, sender=Accrual, dispatch_uid='accruals.journal.accrual_saved')
@@ -0,0 +1,159 @@
+"""
+Журнал расчетов (LedgerEntry): запись и остатки на дату.
+
+Журнал не пересобирается, а досчитывается: sync сравнивает сумму записей по начислению
+с текущими данными (final_amount и распределения платежей) и добавляет записи на разницу.
+Поэтому любой путь изменения — сервис распределения, действия во views, скрипты — приводит
+журнал в соответствие одним вызовом sync, а история прошлых дат не переписывается.
+
+Вызовы:
+- сохранение Accrual с изменившейся суммой или оплатой — сигнал post_save (accruals/apps.py);
+- bulk_create начислений — record_charges;
+- удаление распределений (возврат, удаление, перераспределение платежа) — sync после удаления.
+"""
+from decimal import Decimal
+
+from django.db.models import OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Least
+
+from .models import Accrual, LedgerEntry
+
+SYNC_BATCH_SIZE = 1000
+CREDIT_TYPES = ('payment', 'reversal')
+
+
+def _batches(ids):
+    for start in range(0, len(ids), SYNC_BATCH_SIZE):
+        yield ids[start:start + SYNC_BATCH_SIZE]
+
+
+def sync_on_save(sender, instance, raw=False, **kwargs):
+    """post_save Accrual: изменились сумма или оплата — дописать журнал"""
+    if raw or not instance.amounts_changed():
+        return
+    LedgerJournalService.sync([instance.pk])
+    instance._loaded_amounts = (instance.final_amount, instance.paid_amount)
+
+
+class LedgerJournalService:
+    """Журнал расчетов: добавление записей и остатки начислений на дату"""
+
+    @staticmethod
+    def record_charges(accruals) -> int:
+        """Записи начислений для только что созданных (bulk_create) начислений без оплат"""
+        entries = [
+            LedgerEntry(
+                accrual_id=accrual.pk,
+                contract_id=accrual.contract_id,
+                entry_type='charge',
+                amount=accrual.final_amount,
+                effective_date=min(accrual.period_start, accrual.due_date),
+            )
+            for accrual in accruals
+            if accrual.final_amount
+        ]
+        LedgerEntry.objects.bulk_create(entries, batch_size=SYNC_BATCH_SIZE)
+        return len(entries)
+
+    @staticmethod
+    def sync(accrual_ids, reversal_date=None) -> int:
+        """
+        Дописать в журнал разницу между записями и текущими данными начислений.
+        reversal_date — дата сторно для снятых распределений (возврат платежа); по умолчанию
+        дата платежа: ошибочная оплата снимается задним числом. Возвращает число новых записей.
+        """
+        created = 0
+        for ids in _batches(sorted(set(accrual_ids))):
+            entries = LedgerJournalService._charge_entries(ids) + LedgerJournalService._credit_entries(ids, reversal_date)
+            LedgerEntry.objects.bulk_create(entries)
+            created += len(entries)
+        return created
+
+    @staticmethod
+    def _charge_entries(ids) -> list:
+        accruals = Accrual.objects.filter(pk__in=ids).annotate(
+            journaled=Coalesce(
+                Sum('ledger_entries__amount', filter=Q(ledger_entries__entry_type='charge')), Value(Decimal('0')),
+                output_field=Accrual._meta.get_field('final_amount'),
+            ),
+            effective_date=Least('period_start', 'due_date'),
+        ).order_by().values('id', 'contract_id', 'final_amount', 'journaled', 'effective_date')
+        return [
+            LedgerEntry(
+                accrual_id=row['id'],
+                contract_id=row['contract_id'],
+                entry_type='charge',
+                amount=row['final_amount'] - row['journaled'],
+                effective_date=row['effective_date'],
+            )
+            for row in accruals
+            if row['final_amount'] != row['journaled']
+        ]
+
+    @staticmethod
+    def _credit_entries(ids, reversal_date=None) -> list:
+        from payments.models import Payment, PaymentAllocation
+
+        journaled = {
+            (row['accrual_id'], row['payment_id']): row['total']
+            for row in LedgerEntry.objects.filter(
+                accrual_id__in=ids, entry_type__in=CREDIT_TYPES, payment__isnull=False,
+            ).order_by().values('accrual_id', 'payment_id').annotate(total=Sum('amount'))
+        }
+        allocated = {
+            (row['accrual_id'], row['payment_id']): row
+            for row in PaymentAllocation.objects.filter(accrual_id__in=ids).values(
+                'accrual_id', 'payment_id', 'amount', 'payment__payment_date', 'accrual__contract_id',
+            )
+        }
+        # Распределение снято — дата платежа и договор берутся отдельно
+        removed = {key for key in journaled if key not in allocated}
+        payment_dates = dict(
+            Payment.objects.filter(pk__in={payment_id for _, payment_id in removed}).values_list('id', 'payment_date')
+        )
+        contracts = dict(
+            Accrual.objects.filter(pk__in={accrual_id for accrual_id, _ in removed}).values_list('id', 'contract_id')
+        )
+
+        entries = []
+        for key in allocated.keys() | journaled.keys():
+            accrual_id, payment_id = key
+            row = allocated.get(key)
+            difference = (-row['amount'] if row else 0) - journaled.get(key, 0)
+            if not difference:
+                continue
+            payment_date = row['payment__payment_date'] if row else payment_dates[payment_id]
+            if difference < 0:
+                entry_type, effective_date = 'payment', payment_date
+            else:
+                entry_type = 'reversal'
+                effective_date = max(reversal_date, payment_date) if reversal_date else payment_date
+            entries.append(LedgerEntry(
+                accrual_id=accrual_id,
+                contract_id=row['accrual__contract_id'] if row else contracts[accrual_id],
+                payment_id=payment_id,
+                entry_type=entry_type,
+                amount=difference,
+                effective_date=effective_date,
+            ))
+        return entries
+
+    @staticmethod
+    def balance_expression(as_of):
+        """Остаток начисления на дату: сумма записей журнала по диапазону дат (индекс accrual, effective_date)"""
+        totals = (
+            LedgerEntry.objects.filter(accrual=OuterRef('pk'), effective_date__lte=as_of)
+            .order_by()
+            .values('accrual')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        )
+        money = Accrual._meta.get_field('balance')
+        return Coalesce(Subquery(totals, output_field=money), Value(Decimal('0')), output_field=money)
+
+    @staticmethod
+    def accruals_as_of(queryset, as_of):
+        """Начисления с остатком на дату balance_as_of; только с ненулевым долгом"""
+        return queryset.annotate(balance_as_of=LedgerJournalService.balance_expression(as_of)).filter(
+            balance_as_of__gt=0
+        )
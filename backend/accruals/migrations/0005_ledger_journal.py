@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Начальное заполнение журнала из текущих данных: начисления — на min(period_start, due_date),
+# оплаты — на дату платежа. Прошлые возвраты и исправления восстановить нельзя — журнал
+# начинается с текущего состояния.
+BACKFILL_SQL = """
+INSERT INTO ledger_entries (accrual_id, contract_id, payment_id, entry_type, amount, effective_date, created_at)
+SELECT a.id, a.contract_id, NULL, 'charge', a.final_amount, LEAST(a.period_start, a.due_date), NOW()
+FROM accruals a
+WHERE a.final_amount <> 0;
+
+INSERT INTO ledger_entries (accrual_id, contract_id, payment_id, entry_type, amount, effective_date, created_at)
+SELECT pa.accrual_id, a.contract_id, pa.payment_id, 'payment', -pa.amount, p.payment_date, NOW()
+FROM payment_allocations pa
+JOIN accruals a ON a.id = pa.accrual_id
+JOIN payments p ON p.id = pa.payment_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0008_contractfile_preview'),
+        ('payments', '0003_add_is_returned'),
+        ('accruals', '0004_add_admin_type_to_tenant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(choices=[('charge', 'Начисление'), ('payment', 'Оплата'), ('reversal', 'Сторно оплаты')], max_length=20, verbose_name='Тип записи')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Сумма')),
+                ('effective_date', models.DateField(verbose_name='Дата')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('accrual', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='accruals.accrual', verbose_name='Начисление')),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contracts.contract', verbose_name='Договор')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='payments.payment', verbose_name='Платеж')),
+            ],
+            options={
+                'verbose_name': 'Запись журнала расчетов',
+                'verbose_name_plural': 'Журнал расчетов',
+                'db_table': 'ledger_entries',
+                'ordering': ['effective_date', 'id'],
+                'indexes': [models.Index(fields=['accrual', 'effective_date'], include=('amount',), name='ledger_accrual_date_idx'), models.Index(fields=['contract', 'effective_date'], include=('amount',), name='ledger_contract_date_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
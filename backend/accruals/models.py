@@ -101,15 +101,30 @@ class Accrual(models.Model):
     
     def __str__(self):
         return f"{self.contract.number} - {self.period_start} / {self.final_amount}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Суммы на момент загрузки: журнал (LedgerEntry) досчитывается, только если они изменились
+        instance._loaded_amounts = (instance.__dict__.get('final_amount'), instance.__dict__.get('paid_amount'))
+        return instance
+
+    def amounts_changed(self):
+        return getattr(self, '_loaded_amounts', None) != (self.final_amount, self.paid_amount)
     
     def recalculate(self):
         """Пересчет итоговой суммы и остатка"""
+        self.apply_totals()
+        self.save()
+
+    def apply_totals(self, today=None):
+        """Итоговая сумма, остаток и статус без сохранения (для bulk_create)"""
         from django.utils import timezone
         
         self.final_amount = self.base_amount + self.adjustments + self.utilities_amount
         self.balance = self.final_amount - self.paid_amount
         
-        today = timezone.now().date()
+        today = today or timezone.now().date()
         
         # Обновление статуса
         if self.balance <= 0:
@@ -132,5 +147,67 @@ class Accrual(models.Model):
                     self.status = 'partial'
                 else:
                     self.status = 'planned'
-        
-        self.save()
+
+
+class LedgerEntry(models.Model):
+    """
+    Журнал расчетов по начислениям: только добавление, записи не изменяются.
+    amount со знаком: + увеличивает долг (начисление), − уменьшает (оплата), сторно оплаты — с плюсом.
+    Остаток начисления на дату D — сумма записей с effective_date <= D.
+
+    effective_date: начисление — min(period_start, due_date), его изменение — той же датой
+    (пересчет суммы исправляет начисление задним числом); оплата — дата платежа; сторно — дата
+    платежа (исправление ошибки) или дата возврата платежа.
+    Пишется LedgerJournalService (accruals/journal.py).
+    """
+    ENTRY_TYPE_CHOICES = [
+        ('charge', 'Начисление'),
+        ('payment', 'Оплата'),
+        ('reversal', 'Сторно оплаты'),
+    ]
+
+    accrual = models.ForeignKey(
+        Accrual,
+        on_delete=models.CASCADE,
+        related_name='ledger_entries',
+        verbose_name='Начисление'
+    )
+    # Дублирует accrual.contract: выписки по договору — диапазон по одному индексу
+    contract = models.ForeignKey(
+        Contract,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Договор'
+    )
+    # После удаления платежа его оплаты и сторно остаются в журнале (в сумме — ноль)
+    payment = models.ForeignKey(
+        'payments.Payment',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Платеж'
+    )
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPE_CHOICES, verbose_name='Тип записи')
+    amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Сумма')
+    effective_date = models.DateField(verbose_name='Дата')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'ledger_entries'
+        verbose_name = 'Запись журнала расчетов'
+        verbose_name_plural = 'Журнал расчетов'
+        ordering = ['effective_date', 'id']
+        indexes = [
+            # Остаток на дату: сумма по диапазону дат без чтения таблицы (amount в индексе)
+            models.Index(fields=['accrual', 'effective_date'], include=['amount'], name='ledger_accrual_date_idx'),
+            models.Index(fields=['contract', 'effective_date'], include=['amount'], name='ledger_contract_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entry_type_display()} {self.amount} ({self.effective_date})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Записи журнала расчетов не изменяются — добавьте корректирующую запись')
+        super().save(*args, **kwargs)
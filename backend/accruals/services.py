@@ -1,8 +1,11 @@
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal
+from django.db.models import Count
+from .journal import LedgerJournalService
 from .models import Accrual
 from contracts.models import Contract
+from core.metrics import track_job
 
 
 class AccrualService:
@@ -18,7 +21,6 @@ class AccrualService:
             return
         
         current_date = contract.start_date
-        end_date = contract.end_date
         
         # Удаляем только незапланированные начисления (planned), если пересоздаем
         # Но не трогаем уже оплаченные или частично оплаченные
@@ -34,7 +36,19 @@ class AccrualService:
         
         # Обновляем объект из базы для получения актуального значения rent_amount
         contract.refresh_from_db()
+        AccrualService._insert_accruals(AccrualService.build_schedule(contract, current_date), batch_size=1000)
+
+    @staticmethod
+    def build_schedule(contract: Contract, start: date = None, today: date = None) -> list:
+        """
+        График начислений договора от start (по умолчанию start_date) до end_date — несохраненные
+        Accrual со статусами на today, для bulk_create.
+        Берет ТОЧНОЕ значение ставки аренды из договора без изменений
+        """
+        current_date = start or contract.start_date
+        end_date = contract.end_date
         rent_amount = contract.rent_amount
+        accruals = []
         
         while current_date < end_date:
             # Определяем период начисления (обычно месяц)
@@ -50,23 +64,48 @@ class AccrualService:
                 min(contract.due_day, 28)  # Защита от 31-го числа
             )
             
-            # Создаем начисление с ТОЧНЫМ значением из договора
-            accrual = Accrual.objects.create(
+            accrual = Accrual(
                 contract=contract,
                 period_start=current_date,
                 period_end=period_end,
                 due_date=due_date,
                 base_amount=rent_amount,
-                final_amount=rent_amount,
-                balance=rent_amount,
-                status='planned'  # Временный статус, будет пересчитан ниже
             )
-            
-            # Пересчитываем статус на основе due_date (overdue, due, planned)
-            accrual.recalculate()
+            # Статус на основе due_date (overdue, due, planned)
+            accrual.apply_totals(today)
+            accruals.append(accrual)
             
             # Переходим к следующему периоду
             current_date = period_end + timedelta(days=1)
+        return accruals
+
+    @staticmethod
+    def bulk_generate_accruals(contracts, batch_size: int = 1000) -> int:
+        """
+        Начисления для новых договоров (без начислений) пакетами bulk_create — для импорта.
+        Возвращает количество созданных начислений.
+        """
+        from django.utils import timezone
+        today = timezone.now().date()
+        accruals = []
+        created = 0
+        for contract in contracts:
+            if contract.status not in ['active', 'draft']:
+                continue
+            accruals.extend(AccrualService.build_schedule(contract, today=today))
+            if len(accruals) >= batch_size:
+                created += AccrualService._insert_accruals(accruals, batch_size)
+                accruals = []
+        if accruals:
+            created += AccrualService._insert_accruals(accruals, batch_size)
+        return created
+
+    @staticmethod
+    def _insert_accruals(accruals: list, batch_size: int) -> int:
+        """bulk_create начислений и их записей в журнале расчетов (сигналы при bulk_create не срабатывают)"""
+        accruals = Accrual.objects.bulk_create(accruals, batch_size=batch_size)
+        LedgerJournalService.record_charges(accruals)
+        return len(accruals)
     
     @staticmethod
     def recalculate_accrual(accrual: Accrual):
@@ -98,10 +137,33 @@ class AccrualService:
             accrual.recalculate()
     
     @staticmethod
-    def update_all_accrual_statuses():
+    def fix_all_planned_accruals(progress=None) -> int:
+        """
+        Исправляет planned начисления всех договоров по ставке договора (fix_accruals_for_contract).
+        progress(done, total) — отчет о ходе выполнения для фоновой задачи.
+        Возвращает количество исправленных начислений.
+        """
+        contracts = list(
+            Contract.objects.filter(accruals__status='planned')
+            .annotate(planned_count=Count('accruals'))
+            .order_by('id')
+        )
+        fixed = 0
+        with track_job('fix_all_accruals') as job:
+            for index, contract in enumerate(contracts, start=1):
+                AccrualService.fix_accruals_for_contract(contract)
+                fixed += contract.planned_count
+                if progress:
+                    progress(index, len(contracts))
+            job.rows = fixed
+        return fixed
+
+    @staticmethod
+    def update_all_accrual_statuses(progress=None) -> int:
         """
         Обновляет статусы всех начислений на основе текущей даты
         Полезно для периодического обновления (например, через cron)
+        progress(done, total) — отчет о ходе выполнения для фоновой задачи.
         """
         from django.utils import timezone
         today = timezone.now().date()
@@ -112,6 +174,12 @@ class AccrualService:
             status__in=['planned', 'due', 'overdue'],
             balance__gt=0
         )
+        total = accruals_to_update.count() if progress else None
         
-        for accrual in accruals_to_update:
-            accrual.recalculate()
\ No newline at end of file
+        with track_job('update_accrual_statuses') as job:
+            for accrual in accruals_to_update:
+                accrual.recalculate()
+                job.rows += 1
+                if progress:
+                    progress(job.rows, total)
+        return job.rows
\ No newline at end of file
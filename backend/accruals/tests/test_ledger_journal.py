@@ -0,0 +1,114 @@
+"""
+Тесты журнала расчетов: остаток на дату, сторно при возврате и удалении платежа,
+просрочка на прошлую дату в отчете aging
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from accruals.journal import LedgerJournalService
+from accruals.models import Accrual, LedgerEntry
+from accruals.services import AccrualService
+from contracts.models import Contract
+from core.models import Tenant, User
+from payments.models import Payment
+from payments.services import PaymentAllocationService
+from properties.models import Property
+
+PAID_ON = date(2026, 3, 10)
+
+
+class LedgerJournalTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_journal', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        prop = Property.objects.create(name='Офис', address='Адрес', property_type='office', area=Decimal('30'))
+        self.tenant = Tenant.objects.create(name='Арендатор', phone='+996555600700')
+        self.contract = Contract.objects.create(
+            number='LJ-1', signed_at=date(2026, 1, 1), property=prop, tenant=self.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        self.accrual = Accrual.objects.create(
+            contract=self.contract, period_start=date(2026, 1, 1), period_end=date(2026, 1, 31),
+            due_date=date(2026, 2, 1), base_amount=Decimal('1000.00'),
+            final_amount=Decimal('1000.00'), balance=Decimal('1000.00'),
+        )
+        self.account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+        self.payment = Payment.objects.create(
+            contract=self.contract, account=self.account, amount=Decimal('1000.00'), payment_date=PAID_ON,
+        )
+        PaymentAllocationService.allocate_payment_fifo(self.payment)
+
+    def balance_on(self, day):
+        return Accrual.objects.annotate(
+            balance_as_of=LedgerJournalService.balance_expression(day)
+        ).get(pk=self.accrual.pk).balance_as_of
+
+    def overdue_on(self, day):
+        response = self.client.get('/api/reports/overdue_payments/', {'as_of_date': day.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return response.data['summary']['total_overdue']
+
+    def test_balance_as_of_date(self):
+        self.assertEqual(
+            list(LedgerEntry.objects.filter(accrual=self.accrual).values_list('entry_type', 'amount', 'effective_date')),
+            [('charge', Decimal('1000.00'), date(2026, 1, 1)), ('payment', Decimal('-1000.00'), PAID_ON)],
+        )
+        self.assertEqual(self.balance_on(date(2025, 12, 31)), Decimal('0'))
+        self.assertEqual(self.balance_on(date(2026, 3, 1)), Decimal('1000.00'))
+        self.assertEqual(self.balance_on(PAID_ON), Decimal('0.00'))
+
+        # На 1 марта начисление было просрочено, хотя сейчас оплачено
+        self.assertEqual(self.overdue_on(date(2026, 3, 1)), '1000.00')
+        self.assertEqual(self.overdue_on(date(2026, 3, 15)), '0')
+
+        # Изменение суммы — корректирующая запись той же датой, старые записи не меняются
+        self.accrual.refresh_from_db()
+        self.accrual.adjustments = Decimal('150.00')
+        AccrualService.recalculate_accrual(self.accrual)
+        self.assertEqual(LedgerEntry.objects.filter(accrual=self.accrual).count(), 3)
+        self.assertEqual(self.balance_on(date(2026, 3, 15)), Decimal('150.00'))
+
+    def test_returned_payment_reversed_on_return_date(self):
+        response = self.client.post(f'/api/payments/{self.payment.pk}/return_payment/')
+        self.assertEqual(response.status_code, 200)
+        today = timezone.localdate()
+
+        reversal = LedgerEntry.objects.get(accrual=self.accrual, entry_type='reversal')
+        self.assertEqual((reversal.amount, reversal.effective_date), (Decimal('1000.00'), today))
+        # До возврата начисление было оплачено
+        self.assertEqual(self.balance_on(today - timedelta(days=1)), Decimal('0.00'))
+        self.assertEqual(self.balance_on(today), Decimal('1000.00'))
+
+    def test_deleted_payment_reversed_on_payment_date(self):
+        response = self.client.delete(f'/api/payments/{self.payment.pk}/')
+        self.assertEqual(response.status_code, 204)
+
+        entries = LedgerEntry.objects.filter(accrual=self.accrual, entry_type__in=['payment', 'reversal'])
+        self.assertEqual(entries.count(), 2)
+        self.assertFalse(entries.exclude(payment=None).exists())
+        self.assertEqual(self.balance_on(date(2026, 3, 15)), Decimal('1000.00'))
+        self.assertEqual(self.overdue_on(date(2026, 3, 15)), '1000.00')
+
+    def test_generated_schedule_journaled_and_entries_immutable(self):
+        contract = Contract.objects.create(
+            number='LJ-2', signed_at=date(2026, 1, 1), property=self.contract.property, tenant=self.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2026, 4, 1), rent_amount=Decimal('500.00'), status='active',
+        )
+        AccrualService.generate_accruals_for_contract(contract)
+        self.assertEqual(
+            LedgerEntry.objects.filter(contract=contract, entry_type='charge').count(),
+            Accrual.objects.filter(contract=contract).count(),
+        )
+
+        entry = LedgerEntry.objects.filter(accrual=self.accrual).first()
+        entry.amount = Decimal('1.00')
+        with self.assertRaises(ValueError):
+            entry.save()
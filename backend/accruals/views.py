@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import F
 from django.db import transaction
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -15,34 +15,31 @@ from payments.models import Payment, PaymentAllocation
 from payments.services import PaymentAllocationService
 from accounts.models import Account, AccountTransaction
 from accounts.services import AccountService
-from core.mixins import DataScopingMixin
+from core.mixins import ConditionalListMixin, DataScopingMixin, ValuesListMixin
+from core.search import IndexedSearchFilter
 from core.permissions import ReadOnlyForClients, CanReadResource, CanWriteResource
+from jobs.services import JobService
+from jobs.views import job_accepted
 
 
-class AccrualViewSet(DataScopingMixin, viewsets.ModelViewSet):
+class AccrualViewSet(DataScopingMixin, ConditionalListMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления начислениями с RBAC и data scoping.
+    Список отдается через .values() в формате AccrualListSerializer, с ETag / Last-Modified.
     """
     queryset = Accrual.objects.select_related('contract', 'contract__property', 'contract__tenant', 'contract__landlord').all()
     permission_classes = [IsAuthenticated, CanReadResource, ReadOnlyForClients]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'utility_type', 'contract__tenant']
     search_fields = ['contract__number', 'contract__property__name', 'contract__property__address', 'contract__tenant__name']
+    search_contract_lookup = 'contract_id'
     ordering_fields = ['due_date', 'final_amount', 'balance', 'period_start', 'contract__tenant__name']
     ordering = ['due_date', 'id']  # Сортировка по сроку оплаты (по возрастанию - сначала ближайшие), затем по ID для стабильности
     pagination_class = None  # Отключаем пагинацию для начислений
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        # Дополнительная фильтрация по поиску
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(contract__number__icontains=search) |
-                Q(contract__property__name__icontains=search) |
-                Q(contract__property__address__icontains=search) |
-                Q(contract__tenant__name__icontains=search)
-            )
+        # Поиск (search) — IndexedSearchFilter через id подходящих договоров
         
         # Фильтрация по датам (due_date)
         due_date_from = self.request.query_params.get('due_date_from', None)
@@ -64,10 +61,38 @@ class AccrualViewSet(DataScopingMixin, viewsets.ModelViewSet):
         
         return queryset
     
+    list_values = (
+        'id', 'period_start', 'period_end', 'due_date',
+        'base_amount', 'final_amount', 'paid_amount', 'balance', 'status', 'utility_type',
+    )
+    list_value_expressions = {
+        'contract_number': F('contract__number'),
+        'property_id': F('contract__property_id'),
+        'property_name': F('contract__property__name'),
+        'property_address': F('contract__property__address'),
+        'tenant_name': F('contract__tenant__name'),
+        'currency': F('contract__currency'),
+    }
+    utility_type_labels = dict(Accrual.UTILITY_TYPE_CHOICES)
+    # В строках списка есть поля договора, объекта и арендатора
+    conditional_fields = (
+        'updated_at', 'contract__updated_at', 'contract__property__updated_at', 'contract__tenant__updated_at',
+    )
+
     def get_serializer_class(self):
         if self.action == 'list':
             return AccrualListSerializer
         return AccrualSerializer
+
+    def transform_list_rows(self, rows):
+        today = timezone.now().date()
+        labels = self.utility_type_labels
+        for row in rows:
+            row['utility_type_display'] = labels.get(row['utility_type'], row['utility_type'])
+            # Как AccrualListSerializer.get_overdue_days: просрочка по дате, независимо от статуса
+            due_date = row['due_date']
+            row['overdue_days'] = (today - due_date).days if due_date < today and row['balance'] > 0 else 0
+        return rows
     
     @action(detail=True, methods=['post'])
     def recalculate(self, request, pk=None):
@@ -267,9 +292,8 @@ class AccrualViewSet(DataScopingMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def update_statuses(self, request):
-        """Обновить статусы всех начислений на основе текущей даты"""
-        AccrualService.update_all_accrual_statuses()
-        return Response({'status': 'Статусы всех начислений обновлены'})
+        """Обновить статусы всех начислений на основе текущей даты (фоновая задача)"""
+        return job_accepted(JobService.enqueue('accruals.update_statuses', user=request.user))
     
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
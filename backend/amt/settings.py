@@ -49,9 +49,12 @@ INSTALLED_APPS = [
     'dashboard',
     'reports',
     'notifications',
+    'jobs',
+    'imports',
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -126,8 +129,18 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Media files (загруженные документы)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
-# Разрешить загрузку PDF до 50 MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024
+# Загружаемые файлы сразу пишутся во временный файл на диске (не в память), с подсчетом SHA-256
+FILE_UPLOAD_HANDLERS = ['core.uploads.HashingTemporaryFileUploadHandler']
+# Загрузка частями с докачкой (core.upload_views): максимальный размер файла и одной части
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', str(500 * 1024 * 1024)))
+UPLOAD_CHUNK_MAX_SIZE = int(os.environ.get('UPLOAD_CHUNK_MAX_SIZE', str(8 * 1024 * 1024)))
+# Незавершенные загрузки удаляются через столько часов без новых частей
+UPLOAD_SESSION_TTL_HOURS = int(os.environ.get('UPLOAD_SESSION_TTL_HOURS', '48'))
+# Превью файлов договоров (contracts.previews): длинная сторона в пикселях, качество JPEG,
+# ограничение времени на растрирование первой страницы PDF
+CONTRACT_PREVIEW_SIZE = int(os.environ.get('CONTRACT_PREVIEW_SIZE', '480'))
+CONTRACT_PREVIEW_QUALITY = int(os.environ.get('CONTRACT_PREVIEW_QUALITY', '80'))
+CONTRACT_PREVIEW_TIMEOUT = int(os.environ.get('CONTRACT_PREVIEW_TIMEOUT', '60'))
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -141,12 +154,98 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON через orjson (core.renderers), формат ответа как у стандартного JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+FAST_JSON_ENABLED = os.environ.get('FAST_JSON_ENABLED', '1') == '1'
+
+# Токены API (core.authentication): срок жизни (0 — бессрочно) и время кэша token → пользователь
+AUTH_TOKEN_TTL_DAYS = int(os.environ.get('AUTH_TOKEN_TTL_DAYS', '30'))
+AUTH_TOKEN_CACHE_SECONDS = int(os.environ.get('AUTH_TOKEN_CACHE_SECONDS', '300'))
+
+# Очередь фоновых задач (jobs): повтор через base * 2^(попытка-1) секунд,
+# задача без сигнала от воркера дольше JOB_STALE_SECONDS возвращается в очередь;
+# сигнал (heartbeat) воркер пишет раз в JOB_HEARTBEAT_SECONDS, пока задача выполняется
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_BASE_SECONDS = int(os.environ.get('JOB_RETRY_BASE_SECONDS', '30'))
+JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', '600'))
+JOB_HEARTBEAT_SECONDS = int(os.environ.get('JOB_HEARTBEAT_SECONDS', '60'))
+# Планировщик (jobs.scheduler): имена расписаний через запятую, которые не запускать
+SCHEDULER_DISABLED = [name.strip() for name in os.environ.get('SCHEDULER_DISABLED', '').split(',') if name.strip()]
+# Отдача защищенных файлов через nginx: internal-location, указывающий на MEDIA_ROOT
+# (пусто — файл отдает Django, например при разработке без nginx)
+PROTECTED_MEDIA_ACCEL_PREFIX = os.environ.get('PROTECTED_MEDIA_ACCEL_PREFIX', '')
+
+# Фоновые отчеты (reports.ReportArtifact): удаляются, если не запрашивались столько дней
+REPORT_ARTIFACT_TTL_DAYS = int(os.environ.get('REPORT_ARTIFACT_TTL_DAYS', '7'))
+# Акт сверки (reports.statements): срок хранения в кэше и TTF-шрифт с кириллицей для PDF
+STATEMENT_CACHE_SECONDS = int(os.environ.get('STATEMENT_CACHE_SECONDS', '86400'))
+STATEMENT_PDF_FONT = os.environ.get('STATEMENT_PDF_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+# Портфель инвестора (reports.portfolio): срок хранения месяца в кэше; прогрев — задача reports.investor_portfolio
+PORTFOLIO_CACHE_SECONDS = int(os.environ.get('PORTFOLIO_CACHE_SECONDS', '86400'))
+# Сколько дней хранить истекшие попытки входа через WhatsApp
+LOGIN_ATTEMPT_RETENTION_DAYS = int(os.environ.get('LOGIN_ATTEMPT_RETENTION_DAYS', '7'))
+
+# Инструментирование запросов (core.instrumentation): медленные запросы пишутся в лог amt.requests
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', '1') == '1'
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', '1000'))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', '100'))
+REQUEST_METRICS_WINDOW = int(os.environ.get('REQUEST_METRICS_WINDOW', '500'))
+
+# Логирование
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+        },
+        'json': {
+            '()': 'core.log_formatters.JsonFormatter',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'verbose',
+        },
+        'structured': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'amt.requests': {
+            'handlers': ['structured'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 # CORS
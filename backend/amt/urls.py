@@ -25,6 +25,10 @@ urlpatterns = [
     path('api/forecast/', include('forecast.urls')),
     path('api/reports/', include('reports.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/jobs/', include('jobs.urls')),
+    path('api/imports/', include('imports.urls')),
 ]
-# Раздаём media в любом режиме (nginx проксирует /media/ на Django)
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# /media/ открыто только при разработке (DEBUG). В продакшене файлы договоров и отчетов
+# отдаются через API с проверкой прав, а передачу выполняет nginx (core.downloads, X-Accel-Redirect)
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
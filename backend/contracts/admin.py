@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Contract, ContractFile
+from .models import Contract, ContractFile, ContractNumberCounter
 
 
 class ContractFileInline(admin.TabularInline):
@@ -19,3 +19,9 @@ class ContractAdmin(admin.ModelAdmin):
 @admin.register(ContractFile)
 class ContractFileAdmin(admin.ModelAdmin):
     list_display = ['id', 'contract', 'file_type', 'title', 'created_at']
+
+
+@admin.register(ContractNumberCounter)
+class ContractNumberCounterAdmin(admin.ModelAdmin):
+    list_display = ['prefix', 'last_value', 'updated_at']
+    search_fields = ['prefix']
@@ -0,0 +1,41 @@
+"""
+Превью для файлов договоров, загруженных до появления превью (или с ошибкой построения).
+По умолчанию ставит задачи contracts.render_preview в очередь jobs; с --sync строит сразу.
+
+Использование:
+  python manage.py render_contract_previews
+  python manage.py render_contract_previews --failed
+  python manage.py render_contract_previews --sync
+"""
+from django.core.management.base import BaseCommand
+
+from contracts.models import ContractFile
+from contracts.previews import render_preview
+from jobs.services import JobService
+
+
+class Command(BaseCommand):
+    help = 'Строит превью первой страницы для файлов договоров без превью'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help='Повторить и файлы с ошибкой построения')
+        parser.add_argument('--sync', action='store_true', help='Строить в этом процессе, не через очередь')
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['failed'] else ['pending']
+        files = ContractFile.objects.filter(preview_status__in=statuses).order_by('id')
+        total = files.count()
+        if not total:
+            self.stdout.write(self.style.SUCCESS('✓ Все превью построены'))
+            return
+
+        for contract_file in files.iterator():
+            if options['sync']:
+                render_preview(contract_file)
+                self.stdout.write(f'  #{contract_file.pk}: {contract_file.get_preview_status_display()}')
+            else:
+                JobService.enqueue(
+                    'contracts.render_preview', payload={'file_id': contract_file.pk}, priority=200,
+                )
+        action = 'Обработано' if options['sync'] else 'Поставлено в очередь'
+        self.stdout.write(self.style.SUCCESS(f'✓ {action} файлов: {total}'))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0005_contractfile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractNumberCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=32, unique=True, verbose_name='Префикс номера')),
+                ('last_value', models.PositiveIntegerField(default=0, verbose_name='Последний выданный номер')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Счетчик номеров договоров',
+                'verbose_name_plural': 'Счетчики номеров договоров',
+                'db_table': 'contract_number_counters',
+            },
+        ),
+    ]
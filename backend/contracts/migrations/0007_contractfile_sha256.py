@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0006_contractnumbercounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractfile',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='contractfile',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Размер, байт'),
+        ),
+    ]
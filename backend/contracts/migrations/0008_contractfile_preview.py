@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0007_contractfile_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractfile',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Страниц'),
+        ),
+        migrations.AddField(
+            model_name='contractfile',
+            name='preview',
+            field=models.FileField(blank=True, upload_to='previews/', verbose_name='Превью'),
+        ),
+        migrations.AddField(
+            model_name='contractfile',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Строится'), ('ready', 'Готово'), ('unavailable', 'Нет превью'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус превью'),
+        ),
+    ]
@@ -12,6 +12,12 @@ class ContractFile(models.Model):
         ('supplement', 'Дополнительное соглашение'),
         ('other', 'Прочее'),
     ]
+    PREVIEW_STATUS_CHOICES = [
+        ('pending', 'Строится'),
+        ('ready', 'Готово'),
+        ('unavailable', 'Нет превью'),
+        ('failed', 'Ошибка'),
+    ]
     contract = models.ForeignKey(
         'Contract',
         on_delete=models.CASCADE,
@@ -26,6 +32,18 @@ class ContractFile(models.Model):
     )
     file = models.FileField(upload_to='contracts/%Y/%m/', verbose_name='Файл')
     title = models.CharField(max_length=255, blank=True, verbose_name='Название')
+    # Новые файлы хранятся по содержимому (core.uploads): одинаковые PDF — один файл на диске
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, verbose_name='SHA-256')
+    size = models.BigIntegerField(null=True, blank=True, verbose_name='Размер, байт')
+    # Превью первой страницы и число страниц строятся в фоне (contracts.previews)
+    preview = models.FileField(upload_to='previews/', blank=True, verbose_name='Превью')
+    page_count = models.PositiveIntegerField(null=True, blank=True, verbose_name='Страниц')
+    preview_status = models.CharField(
+        max_length=20,
+        choices=PREVIEW_STATUS_CHOICES,
+        default='pending',
+        verbose_name='Статус превью',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -119,3 +137,21 @@ class Contract(models.Model):
     
     def __str__(self):
         return f"{self.number} - {self.property.name} / {self.tenant.name}"
+
+
+class ContractNumberCounter(models.Model):
+    """
+    Счетчик порядковых номеров договоров за день (префикс AMT-YYYY-DDMM-).
+    Строка блокируется при выдаче номеров, поэтому параллельное создание договоров не дает дублей.
+    """
+    prefix = models.CharField(max_length=32, unique=True, verbose_name='Префикс номера')
+    last_value = models.PositiveIntegerField(default=0, verbose_name='Последний выданный номер')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'contract_number_counters'
+        verbose_name = 'Счетчик номеров договоров'
+        verbose_name_plural = 'Счетчики номеров договоров'
+
+    def __str__(self):
+        return f"{self.prefix}{self.last_value:03d}"
@@ -0,0 +1,137 @@
+"""
+Превью файлов договоров: уменьшенная первая страница (JPEG) и число страниц.
+
+Строится в фоне (задача contracts.render_preview) после загрузки файла, чтобы в списке
+документов не приходилось скачивать PDF целиком. Превью хранится, как и сами файлы,
+по содержимому — previews/<aa>/<bb>/<sha256>.jpg: у одинаковых файлов оно одно и повторно
+не рисуется.
+
+Первую страницу PDF растрирует pdftoppm (пакет poppler-utils), уменьшает и кодирует Pillow;
+сканы (JPEG, PNG, TIFF) открываются Pillow напрямую. Если pdftoppm не установлен, у PDF
+сохраняется только число страниц (preview_status='unavailable').
+"""
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, UnidentifiedImageError
+
+from core.uploads import file_sha256
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_PREFIX = 'previews'
+PDF_SCAN_CHUNK = 1024 * 1024
+# Запас на стыке частей при поиске по PDF: длиннее любого искомого фрагмента
+PDF_SCAN_OVERLAP = 64
+PDF_PAGE_RE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+PDF_COUNT_RE = re.compile(rb'/Count\s+(\d+)')
+
+
+def preview_name(sha256):
+    return f'{PREVIEW_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}.jpg'
+
+
+def is_pdf(path):
+    with open(path, 'rb') as f:
+        return f.read(1024).lstrip().startswith(b'%PDF')
+
+
+def pdf_page_count(path):
+    """
+    Число страниц PDF без сторонних библиотек: объекты /Type /Page, читая файл частями.
+    Если страницы упакованы в сжатые потоки объектов (PDF 1.5+), берется наибольший /Count дерева страниц.
+    """
+    pages = 0
+    max_count = 0
+    data = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(PDF_SCAN_CHUNK)
+            final = not chunk
+            data += chunk
+            # Совпадения, начинающиеся в последних PDF_SCAN_OVERLAP байтах, проверяются со следующей частью
+            limit = len(data) if final else len(data) - PDF_SCAN_OVERLAP
+            pages += sum(1 for match in PDF_PAGE_RE.finditer(data) if match.start() < limit)
+            for match in PDF_COUNT_RE.finditer(data):
+                if match.start() < limit:
+                    max_count = max(max_count, int(match.group(1)))
+            if final:
+                break
+            data = data[max(limit, 0):]
+    return pages or max_count or None
+
+
+def _encode_jpeg(image, size):
+    if image.format == 'JPEG':
+        # Большие сканы декодируются сразу в уменьшенном масштабе
+        image.draft('RGB', (size, size))
+    image = image.convert('RGB')
+    image.thumbnail((size, size))
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=settings.CONTRACT_PREVIEW_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _render_pdf_first_page(path, size):
+    pdftoppm = shutil.which('pdftoppm')
+    if pdftoppm is None:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'page')
+        subprocess.run(
+            [pdftoppm, '-f', '1', '-l', '1', '-singlefile', '-png', '-scale-to', str(size), path, output],
+            check=True, capture_output=True, timeout=settings.CONTRACT_PREVIEW_TIMEOUT,
+        )
+        with Image.open(output + '.png') as image:
+            return _encode_jpeg(image, size)
+
+
+def render_preview(contract_file):
+    """
+    Посчитать страницы и построить превью файла договора (если его еще нет в хранилище).
+    Поврежденный или неподдерживаемый файл — не ошибка задачи: статус failed/unavailable.
+    """
+    size = settings.CONTRACT_PREVIEW_SIZE
+    path = contract_file.file.path
+    update_fields = ['preview', 'page_count', 'preview_status']
+    if not contract_file.sha256:
+        # Файлы, загруженные до хранения по содержимому
+        with contract_file.file.open('rb') as f:
+            contract_file.sha256 = file_sha256(f)
+        update_fields.append('sha256')
+    name = preview_name(contract_file.sha256)
+
+    try:
+        if is_pdf(path):
+            contract_file.page_count = pdf_page_count(path)
+            data = None if default_storage.exists(name) else _render_pdf_first_page(path, size)
+        else:
+            with Image.open(path) as image:
+                contract_file.page_count = getattr(image, 'n_frames', 1)
+                data = None if default_storage.exists(name) else _encode_jpeg(image, size)
+    except UnidentifiedImageError:
+        # Не PDF и не картинка (например, .docx) — превью не бывает
+        data = None
+    except (OSError, ValueError, subprocess.SubprocessError) as e:
+        logger.warning('Превью файла договора #%s не построено: %s', contract_file.pk, e)
+        contract_file.preview_status = 'failed'
+        contract_file.save(update_fields=update_fields)
+        return contract_file
+
+    if data is not None and not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    if default_storage.exists(name):
+        contract_file.preview.name = name
+        contract_file.preview_status = 'ready'
+    else:
+        contract_file.preview_status = 'unavailable'
+    contract_file.save(update_fields=update_fields)
+    return contract_file
@@ -1,31 +1,63 @@
 from rest_framework import serializers
 from decimal import Decimal
 from .models import Contract, ContractFile
+from .services import ContractFileService
 from properties.serializers import PropertyListSerializer
-from core.models import Tenant
+from core.models import Tenant, UploadSession
 
 
 class ContractFileSerializer(serializers.ModelSerializer):
+    """
+    Файл договора. Загружается либо самим файлом (file), либо ссылкой на завершенную
+    загрузку частями (upload_id, см. core.upload_views) — для больших PDF.
+    """
     file_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
+    upload_id = serializers.UUIDField(write_only=True, required=False)
 
     class Meta:
         model = ContractFile
-        fields = ['id', 'file_type', 'file', 'file_url', 'title', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'file_type', 'file', 'file_url', 'title', 'sha256', 'size',
+            'preview_url', 'page_count', 'preview_status', 'upload_id', 'created_at',
+        ]
+        read_only_fields = ['id', 'sha256', 'size', 'page_count', 'preview_status', 'created_at']
+        extra_kwargs = {'file': {'required': False}}
+
+    def validate(self, attrs):
+        upload_id = attrs.pop('upload_id', None)
+        if upload_id is not None:
+            request = self.context.get('request')
+            session = UploadSession.objects.filter(pk=upload_id, user=getattr(request, 'user', None)).first()
+            if session is None or session.status != 'complete':
+                raise serializers.ValidationError({'upload_id': 'Загрузка не найдена или еще не завершена'})
+            attrs['upload_session'] = session
+        elif not attrs.get('file'):
+            raise serializers.ValidationError({'file': 'Приложите файл или укажите upload_id'})
+        return attrs
+
+    def create(self, validated_data):
+        return ContractFileService.create(
+            upload=validated_data.pop('file', None),
+            session=validated_data.pop('upload_session', None),
+            **validated_data,
+        )
 
     def get_file_url(self, obj):
-        if not obj.file:
+        """Ссылка на скачивание с проверкой прав (/media/ в продакшене не раздается)"""
+        if not obj.file or not obj.contract_id:
             return None
-        request = self.context.get('request')
-        if request:
-            try:
-                return request.build_absolute_uri(obj.file.url)
-            except Exception:
-                pass
-        try:
-            return obj.file.url if obj.file else None
-        except Exception:
+        return self._absolute(f'/api/contracts/{obj.contract_id}/files/{obj.pk}/download/')
+
+    def get_preview_url(self, obj):
+        """Картинка первой страницы (несколько десятков КБ) — пока превью не готово, None"""
+        if obj.preview_status != 'ready' or not obj.preview:
             return None
+        return self._absolute(f'/api/contracts/{obj.contract_id}/files/{obj.pk}/preview/')
+
+    def _absolute(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
 
 
 class TenantSerializer(serializers.ModelSerializer):
@@ -2,16 +2,20 @@
 Бизнес-логика договоров аренды.
 Вся логика создания/обновления/удаления договоров — только здесь.
 """
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
-from .models import Contract
+from .models import Contract, ContractFile, ContractNumberCounter
 from accruals.models import Accrual
 from accruals.services import AccrualService
 from deposits.models import Deposit
 from payments.models import Payment, PaymentAllocation
 from payments.services import PaymentAllocationService
+from core.models import UploadSession
+from core.uploads import delete_if_unreferenced, discard_session_file, store_content_addressed
 
 SERVICE_PREFIX = "AMT"
 
@@ -20,28 +24,51 @@ class ContractService:
     """Сервис договоров аренды."""
 
     @staticmethod
-    def generate_contract_number() -> str:
+    def contract_number_prefix(on_date: date = None) -> str:
+        """Префикс номеров договоров за день: AMT-YYYY-DDMM-"""
+        on_date = on_date or date.today()
+        day_month = f"{on_date.day:02d}{on_date.month:02d}"  # DDMM, напр. 3101, 2502
+        return f"{SERVICE_PREFIX}-{on_date.year}-{day_month}-"
+
+    @staticmethod
+    @transaction.atomic
+    def reserve_contract_numbers(count: int = 1, on_date: date = None) -> list:
         """
-        Генерация номера договора: AMT-YYYY-DDMM-XXX.
-        AMT — название сервиса, YYYY — год создания, DDMM — дата (день+месяц, напр. 31 января = 3101, 25 февраля = 2502), XXX — порядковый номер за день (001, 002, …).
+        Зарезервировать count номеров договоров подряд за один вызов (для массового импорта).
+        Номера выдаются из счетчика за день под блокировкой строки (SELECT ... FOR UPDATE),
+        поэтому параллельные вызовы никогда не получают одинаковые номера.
+        Неиспользованные номера не возвращаются — в нумерации возможны пропуски.
         """
-        today = date.today()
-        year = today.year
-        day_month = f"{today.day:02d}{today.month:02d}"  # DDMM, напр. 3101, 2502
-        prefix = f"{SERVICE_PREFIX}-{year}-{day_month}-"
-        last = (
-            Contract.objects.filter(number__startswith=prefix)
-            .order_by("-number")
-            .first()
+        if count < 1:
+            return []
+        prefix = ContractService.contract_number_prefix(on_date)
+        counter, created = ContractNumberCounter.objects.select_for_update().get_or_create(
+            prefix=prefix,
+            defaults={"last_value": ContractService._last_used_sequence(prefix)},
         )
-        if last:
+        first = counter.last_value + 1
+        counter.last_value += count
+        counter.save(update_fields=["last_value", "updated_at"])
+        return [f"{prefix}{seq:03d}" for seq in range(first, counter.last_value + 1)]
+
+    @staticmethod
+    def _last_used_sequence(prefix: str) -> int:
+        """Наибольший порядковый номер среди уже существующих договоров с префиксом (для нового счетчика)."""
+        last = 0
+        for number in Contract.objects.filter(number__startswith=prefix).values_list("number", flat=True):
             try:
-                seq = int(last.number.split("-")[-1]) + 1
+                last = max(last, int(number.split("-")[-1]))
             except (ValueError, IndexError):
-                seq = 1
-        else:
-            seq = 1
-        return f"{prefix}{seq:03d}"
+                continue
+        return last
+
+    @staticmethod
+    def generate_contract_number() -> str:
+        """
+        Генерация номера договора: AMT-YYYY-DDMM-XXX.
+        AMT — название сервиса, YYYY — год создания, DDMM — дата (день+месяц, напр. 31 января = 3101, 25 февраля = 2502), XXX — порядковый номер за день (001, 002, …).
+        """
+        return ContractService.reserve_contract_numbers(1)[0]
 
     @staticmethod
     @transaction.atomic
@@ -53,28 +80,7 @@ class ContractService:
         AccrualService.generate_accruals_for_contract(contract)
 
         if contract.deposit_enabled:
-            from accounts.models import Account
-
-            account = Account.objects.filter(
-                owner=contract.tenant,
-                currency=contract.currency,
-                is_active=True,
-            ).first()
-            if not account:
-                account = Account.objects.create(
-                    name=f"{contract.tenant.name} ({contract.get_currency_display()})",
-                    account_type="bank",
-                    currency=contract.currency,
-                    owner=contract.tenant,
-                    is_active=True,
-                )
-            Deposit.objects.create(
-                contract=contract,
-                amount=contract.deposit_amount,
-                balance=Decimal("0"),
-            )
-            account.balance += contract.deposit_amount
-            account.save()
+            ContractService.create_deposits([contract])
 
         if contract.advance_enabled:
             advance_amount = contract.rent_amount * contract.advance_months
@@ -86,6 +92,73 @@ class ContractService:
             )
             PaymentAllocationService.allocate_payment_fifo(payment)
 
+    @staticmethod
+    def create_deposits(contracts) -> int:
+        """
+        Депозиты по договорам с deposit_enabled: записи Deposit одним запросом, депозит каждого
+        договора — операцией «Поступление» на счет арендатора в валюте договора (счет создается,
+        если его нет), чтобы баланс счета сходился с операциями.
+        """
+        from accounts.models import Account
+        from accounts.services import AccountService
+
+        contracts = [c for c in contracts if c.deposit_enabled]
+        Deposit.objects.bulk_create([
+            Deposit(contract=contract, amount=contract.deposit_amount, balance=Decimal("0"))
+            for contract in contracts
+        ])
+        credits = {}
+        for contract in contracts:
+            credits.setdefault((contract.tenant, contract.currency), []).append(
+                (contract.deposit_amount, contract.signed_at, f"Депозит по договору {contract.number}")
+            )
+        for (tenant, currency), items in credits.items():
+            account = Account.objects.filter(owner=tenant, currency=currency, is_active=True).first()
+            if not account:
+                account = Account.objects.create(
+                    name=f"{tenant.name} ({dict(Contract.CURRENCY_CHOICES)[currency]})",
+                    account_type="bank",
+                    currency=currency,
+                    owner=tenant,
+                    is_active=True,
+                )
+            AccountService.add_income_batch(account, items)
+        return len(contracts)
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_create_contracts(contracts: list, batch_size: int = 1000) -> dict:
+        """
+        Массовое создание договоров (импорт): номера резервируются одним вызовом, договоры
+        и начисления вставляются пакетами bulk_create, депозиты — одним запросом.
+        Аванс при импорте не создается.
+        """
+        without_number = [c for c in contracts if not c.number]
+        for contract, number in zip(without_number, ContractService.reserve_contract_numbers(len(without_number))):
+            contract.number = number
+        Contract.objects.bulk_create(contracts, batch_size=batch_size)
+        return {
+            "contracts": len(contracts),
+            "accruals": AccrualService.bulk_generate_accruals(contracts, batch_size=batch_size),
+            "deposits": ContractService.create_deposits(contracts),
+        }
+
+    @staticmethod
+    def generate_missing_accruals(progress=None) -> int:
+        """
+        Генерирует начисления для активных договоров, у которых их еще нет.
+        Каждый договор — в своей транзакции, чтобы длинный прогон не держал блокировки.
+        progress(done, total) — отчет о ходе выполнения для фоновой задачи.
+        Возвращает количество договоров.
+        """
+        contracts = list(Contract.objects.filter(status="active", accruals__isnull=True).order_by("id"))
+        for index, contract in enumerate(contracts, start=1):
+            with transaction.atomic():
+                AccrualService.generate_accruals_for_contract(contract)
+            if progress:
+                progress(index, len(contracts))
+        return len(contracts)
+
     @staticmethod
     @transaction.atomic
     def update_contract_accruals(
@@ -132,3 +205,59 @@ class ContractService:
         contract.status = "ended"
         contract.save(update_fields=["status"])
         return contract
+
+
+class ContractFileService:
+    """Файлы договоров в хранилище по содержимому (core.uploads)."""
+
+    @staticmethod
+    def _references(name):
+        """Записи, которые держат файл хранилища: файлы договоров и завершенные, но еще не привязанные загрузки"""
+        return (
+            ContractFile.objects.filter(file=name),
+            UploadSession.objects.filter(stored_name=name, status='complete'),
+        )
+
+    @staticmethod
+    def create(contract: Contract, upload=None, session: UploadSession = None, **fields) -> ContractFile:
+        """
+        Добавить файл к договору: из обычной загрузки (upload) или из завершенной загрузки
+        частями (session). Одинаковое содержимое не записывается на диск повторно.
+        """
+        if session is not None:
+            name, sha256, size = session.stored_name, session.sha256, session.size
+            fields.setdefault('title', session.filename)
+        else:
+            name, sha256, size = store_content_addressed(upload)
+        contract_file = ContractFile(contract=contract, sha256=sha256, size=size, **fields)
+        contract_file.file.name = name
+        with transaction.atomic():
+            contract_file.save()
+            if session is not None:
+                session.delete()
+        return contract_file
+
+    @staticmethod
+    def delete(contract_file: ContractFile) -> None:
+        """Удалить файл договора; сам файл — только если он больше нигде не используется"""
+        name = contract_file.file.name
+        preview = contract_file.preview.name
+        contract_file.delete()
+        delete_if_unreferenced(name, *ContractFileService._references(name))
+        delete_if_unreferenced(preview, ContractFile.objects.filter(preview=preview))
+
+    @staticmethod
+    def cleanup_upload_sessions(ttl_hours: int = None) -> int:
+        """Удалить загрузки без активности дольше ttl_hours вместе с частями и непривязанными файлами"""
+        if ttl_hours is None:
+            ttl_hours = getattr(settings, 'UPLOAD_SESSION_TTL_HOURS', 48)
+        threshold = timezone.now() - timedelta(hours=ttl_hours)
+        deleted = 0
+        for session in UploadSession.objects.filter(updated_at__lt=threshold):
+            discard_session_file(session)
+            name = session.stored_name
+            session.delete()
+            if name:
+                delete_if_unreferenced(name, *ContractFileService._references(name))
+            deleted += 1
+        return deleted
@@ -0,0 +1,181 @@
+"""
+Тесты загрузки файлов договора: хэширование при записи на диск, хранение по содержимому,
+загрузка частями с докачкой
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from contracts.models import Contract, ContractFile
+from contracts.services import ContractFileService
+from core.models import Tenant, UploadSession, User
+from core.uploads import HashingTemporaryFileUploadHandler, part_path
+from properties.models import Property
+
+CONTENT = b'%PDF-1.4 ' + bytes(range(256)) * 100  # 25 609 байт
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+class ChunkedUploadTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, UPLOAD_CHUNK_MAX_SIZE=10000)
+        self.override.enable()
+
+        self.admin = User.objects.create_user(username='admin_uploads', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        prop = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('30'))
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555200700')
+        self.contract = Contract.objects.create(
+            number='UP-1', signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        self.files_url = f'/api/contracts/{self.contract.pk}/files/'
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _patch(self, upload_id, offset, data):
+        return self.client.patch(
+            f'/api/uploads/{upload_id}/', data=data,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def _upload(self, content=CONTENT, **extra):
+        upload_id = self.client.post('/api/uploads/', {'filename': 'Договор.PDF', 'size': len(content), **extra}).data['id']
+        for offset in range(0, len(content), 10000):
+            response = self._patch(upload_id, offset, content[offset:offset + 10000])
+        return upload_id, response
+
+    def test_handler_hashes_while_writing_to_disk(self):
+        handler = HashingTemporaryFileUploadHandler()
+        handler.new_file('file', 'a.pdf', 'application/pdf', len(CONTENT))
+        handler.receive_data_chunk(CONTENT[:100], 0)
+        handler.receive_data_chunk(CONTENT[100:], 100)
+        uploaded = handler.file_complete(len(CONTENT))
+        self.assertEqual(uploaded.sha256, SHA256)
+        self.assertTrue(os.path.exists(uploaded.temporary_file_path()))
+        uploaded.close()
+
+    def test_same_content_stored_once(self):
+        first = self.client.post(self.files_url, {'file': SimpleUploadedFile('a.pdf', CONTENT), 'title': 'A'})
+        second = self.client.post(self.files_url, {'file': SimpleUploadedFile('b.pdf', CONTENT), 'title': 'B'})
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data['sha256'], SHA256)
+        self.assertEqual(first.data['size'], len(CONTENT))
+
+        names = set(ContractFile.objects.values_list('file', flat=True))
+        self.assertEqual(names, {f'cas/{SHA256[:2]}/{SHA256[2:4]}/{SHA256}.pdf'})
+
+        # Удаление одной записи не трогает файл второй
+        self.client.delete(self.files_url, {'file_id': first.data['id']}, format='json')
+        remaining = ContractFile.objects.get()
+        self.assertTrue(remaining.file.storage.exists(remaining.file.name))
+        self.client.delete(self.files_url, {'file_id': second.data['id']}, format='json')
+        self.assertFalse(remaining.file.storage.exists(remaining.file.name))
+
+    def test_chunked_upload_attached_to_contract(self):
+        upload_id, response = self._upload(sha256=SHA256)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'complete')
+        self.assertEqual(response.data['sha256'], SHA256)
+
+        created = self.client.post(self.files_url, {'upload_id': upload_id, 'file_type': 'contract'}, format='json')
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(created.data['title'], 'Договор.PDF')
+        self.assertFalse(UploadSession.objects.exists())
+
+        download = self.client.get(created.data['file_url'])
+        self.assertEqual(b''.join(download.streaming_content), CONTENT)
+
+    def test_resume_after_interrupted_chunk(self):
+        upload_id = self.client.post('/api/uploads/', {'filename': 'big.pdf', 'size': len(CONTENT)}).data['id']
+        self.assertEqual(self._patch(upload_id, 0, CONTENT[:10000]).data['offset'], 10000)
+
+        # Повтор уже принятой части — 409 и текущее смещение
+        conflict = self._patch(upload_id, 0, CONTENT[:10000])
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(conflict.data['offset'], 10000)
+
+        self.assertEqual(self.client.get(f'/api/uploads/{upload_id}/').data['offset'], 10000)
+        self._patch(upload_id, 10000, CONTENT[10000:20000])
+        done = self._patch(upload_id, 20000, CONTENT[20000:])
+        self.assertEqual(done.data['status'], 'complete')
+        self.assertFalse(os.path.exists(part_path(UploadSession.objects.get(pk=upload_id))))
+
+    def test_resume_after_partial_write(self):
+        upload_id = self.client.post('/api/uploads/', {'filename': 'big.pdf', 'size': len(CONTENT)}).data['id']
+        # Прерванный запрос успел записать 100 байт, но смещение сессии не сдвинулось
+        path = part_path(UploadSession.objects.get(pk=upload_id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as part:
+            part.write(b'x' * 100)
+
+        response = self._patch(upload_id, 0, CONTENT[:40])
+        self.assertEqual(response.data['offset'], 40)
+        self.assertEqual(os.path.getsize(path), 40)
+
+        self._patch(upload_id, 40, CONTENT[40:10000])
+        self._patch(upload_id, 10000, CONTENT[10000:20000])
+        done = self._patch(upload_id, 20000, CONTENT[20000:])
+        self.assertEqual((done.data['status'], done.data['sha256']), ('complete', SHA256))
+
+    def test_chunk_limits(self):
+        upload_id = self.client.post('/api/uploads/', {'filename': 'big.pdf', 'size': len(CONTENT)}).data['id']
+        self.assertEqual(self._patch(upload_id, 0, CONTENT[:10001]).status_code, 413)
+        self.assertEqual(self.client.patch(f'/api/uploads/{upload_id}/', data=b'x',
+                                           content_type='application/offset+octet-stream').status_code, 400)
+
+        other = User.objects.create_user(username='staff_uploads', password='x', role='staff')
+        client = APIClient()
+        client.force_authenticate(other)
+        self.assertEqual(client.get(f'/api/uploads/{upload_id}/').status_code, 404)
+
+    def test_checksum_mismatch_restarts_upload(self):
+        upload_id, response = self._upload(sha256='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['offset'], 0)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).status, 'uploading')
+        self.assertEqual(self.client.post(self.files_url, {'upload_id': upload_id}, format='json').status_code, 400)
+
+    def test_known_content_completes_without_upload(self):
+        self._upload()
+        response = self.client.post('/api/uploads/', {'filename': 'copy.pdf', 'size': len(CONTENT), 'sha256': SHA256})
+        self.assertEqual(response.data['status'], 'complete')
+        self.assertEqual(response.data['offset'], len(CONTENT))
+
+    def test_known_content_requires_bytes_from_other_users(self):
+        self.client.post(self.files_url, {'file': SimpleUploadedFile('a.pdf', CONTENT), 'title': 'A'})
+        outsider = User.objects.create_user(username='tenant_uploads', password='x', role='tenant')
+        client = APIClient()
+        client.force_authenticate(outsider)
+        # Хэш чужого файла не дает его получить: загрузка начинается с нуля
+        response = client.post('/api/uploads/', {'filename': 'a.pdf', 'size': len(CONTENT), 'sha256': SHA256})
+        self.assertEqual((response.data['status'], response.data['offset']), ('uploading', 0))
+
+        # Файл договора, видимого пользователю, повторно загружать не нужно
+        response = self.client.post('/api/uploads/', {'filename': 'b.pdf', 'size': len(CONTENT), 'sha256': SHA256})
+        self.assertEqual(response.data['status'], 'complete')
+
+    def test_cleanup_stale_sessions(self):
+        stale_id = self.client.post('/api/uploads/', {'filename': 'big.pdf', 'size': len(CONTENT)}).data['id']
+        self._patch(stale_id, 0, CONTENT[:10000])
+        fresh_id = self.client.post('/api/uploads/', {'filename': 'new.pdf', 'size': len(CONTENT)}).data['id']
+        stale = UploadSession.objects.get(pk=stale_id)
+        UploadSession.objects.filter(pk=stale_id).update(updated_at=stale.updated_at - timedelta(days=3))
+
+        self.assertEqual(ContractFileService.cleanup_upload_sessions(ttl_hours=48), 1)
+        self.assertFalse(os.path.exists(part_path(stale)))
+        self.assertEqual(UploadSession.objects.count(), 1)
+        self.assertTrue(UploadSession.objects.filter(pk=fresh_id).exists())
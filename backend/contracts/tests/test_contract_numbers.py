@@ -0,0 +1,63 @@
+"""
+Тесты выдачи номеров договоров из счетчика за день
+"""
+import threading
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from contracts.models import Contract, ContractNumberCounter
+from contracts.services import ContractService
+from core.models import Tenant
+from properties.models import Property
+
+
+class ContractNumberTests(TestCase):
+
+    def test_numbers_continue_after_existing_contracts(self):
+        prefix = ContractService.contract_number_prefix(date(2026, 2, 25))
+        self.assertEqual(prefix, 'AMT-2026-2502-')
+        prop = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('30'))
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555200001')
+        Contract.objects.create(
+            number=f'{prefix}007', signed_at=date(2026, 2, 25), property=prop, tenant=tenant,
+            start_date=date(2026, 3, 1), end_date=date(2027, 3, 1), rent_amount=Decimal('100.00'),
+        )
+
+        numbers = ContractService.reserve_contract_numbers(3, on_date=date(2026, 2, 25))
+
+        self.assertEqual(numbers, [f'{prefix}008', f'{prefix}009', f'{prefix}010'])
+        self.assertEqual(ContractService.reserve_contract_numbers(1, on_date=date(2026, 2, 25)), [f'{prefix}011'])
+        self.assertEqual(ContractNumberCounter.objects.get(prefix=prefix).last_value, 11)
+
+
+class ContractNumberConcurrencyTests(TransactionTestCase):
+
+    def test_parallel_reservations_never_collide(self):
+        numbers = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(8)
+
+        def worker():
+            try:
+                barrier.wait()
+                reserved = ContractService.reserve_contract_numbers(5)
+                with lock:
+                    numbers.extend(reserved)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(numbers), 40)
+        self.assertEqual(len(set(numbers)), 40)
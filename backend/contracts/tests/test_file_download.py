@@ -0,0 +1,95 @@
+"""
+Тесты скачивания файлов договора: проверка прав, Range-запросы, X-Accel-Redirect
+"""
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from contracts.models import Contract, ContractFile
+from core.models import Tenant, User
+from properties.models import Property
+
+CONTENT = bytes(range(256)) * 40  # 10 240 байт
+
+
+class ContractFileDownloadTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, PROTECTED_MEDIA_ACCEL_PREFIX='')
+        self.override.enable()
+
+        self.admin = User.objects.create_user(username='admin_files', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        prop = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('30'))
+        self.tenant = Tenant.objects.create(name='Арендатор', phone='+996555200600')
+        self.contract = Contract.objects.create(
+            number='FD-1', signed_at=date(2026, 1, 1), property=prop, tenant=self.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        self.contract_file = ContractFile(contract=self.contract, title='Договор аренды.pdf')
+        self.contract_file.file.save('contract.pdf', ContentFile(CONTENT))
+        self.url = f'/api/contracts/{self.contract.pk}/files/{self.contract_file.pk}/download/'
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(int(response['Content-Length']), len(CONTENT))
+        self.assertIn("filename*=utf-8''", response['Content-Disposition'])
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(CONTENT)}')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[100:200])
+
+        tail = self.client.get(self.url, HTTP_RANGE='bytes=-40')
+        self.assertEqual(b''.join(tail.streaming_content), CONTENT[-40:])
+
+        open_ended = self.client.get(self.url, HTTP_RANGE='bytes=10000-')
+        self.assertEqual(b''.join(open_ended.streaming_content), CONTENT[10000:])
+
+        invalid = self.client.get(self.url, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(invalid.status_code, 416)
+        self.assertEqual(invalid['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_if_range_mismatch_returns_full_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='Wed, 01 Jan 2020 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PROTECTED_MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_accel_redirect(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.contract_file.file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertIn('attachment', response['Content-Disposition'])
+
+    def test_scope_checked(self):
+        other_tenant = Tenant.objects.create(name='Другой', phone='+996555200601')
+        outsider = User.objects.create_user(username='tenant_files', password='x', role='tenant', counterparty=other_tenant)
+        client = APIClient()
+        client.force_authenticate(outsider)
+        self.assertEqual(client.get(self.url).status_code, 404)
+
+        owner = User.objects.create_user(username='tenant_owner', password='x', role='tenant', counterparty=self.tenant)
+        client.force_authenticate(owner)
+        self.assertEqual(client.get(self.url).status_code, 200)
+
+    def test_file_url_points_to_download_endpoint(self):
+        files = self.client.get(f'/api/contracts/{self.contract.pk}/files/').data
+        self.assertTrue(files[0]['file_url'].endswith(self.url))
@@ -0,0 +1,142 @@
+"""
+Тесты превью файлов договоров: фоновое построение, общее превью у одинаковых файлов, число страниц PDF
+"""
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+from unittest import skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from contracts.models import Contract, ContractFile
+from contracts.previews import pdf_page_count
+from core.models import Tenant, User
+from jobs.models import Job
+from jobs.services import JobService
+from properties.models import Property
+
+
+def make_png(width=1200, height=1700):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def make_pdf(pages):
+    """Минимальный PDF с пустыми страницами (для pdftoppm и подсчета страниц)"""
+    kids = ' '.join(f'{3 + i} 0 R' for i in range(pages))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {pages} >>'.encode(),
+    ] + [b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>'] * pages
+    body = b'%PDF-1.4\n'
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f'{number} 0 obj\n'.encode() + obj + b'\nendobj\n'
+    xref = len(body)
+    body += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    body += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    body += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return body
+
+
+class ContractFilePreviewTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, CONTRACT_PREVIEW_SIZE=200)
+        self.override.enable()
+
+        self.admin = User.objects.create_user(username='admin_previews', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        prop = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('30'))
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555200800')
+        self.contract = Contract.objects.create(
+            number='PV-1', signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        self.files_url = f'/api/contracts/{self.contract.pk}/files/'
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _upload(self, name, content):
+        response = self.client.post(self.files_url, {'file': SimpleUploadedFile(name, content)})
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def _run_jobs(self):
+        while JobService.run_next('w1'):
+            pass
+
+    def test_scan_preview_built_in_background(self):
+        created = self._upload('scan.png', make_png())
+        self.assertEqual(created['preview_status'], 'pending')
+        self.assertIsNone(created['preview_url'])
+        self.assertEqual(Job.objects.get().name, 'contracts.render_preview')
+
+        self._run_jobs()
+        listed = self.client.get(self.files_url).data[0]
+        self.assertEqual(listed['preview_status'], 'ready')
+        self.assertEqual(listed['page_count'], 1)
+
+        response = self.client.get(listed['preview_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('max-age', response['Cache-Control'])
+        with Image.open(BytesIO(b''.join(response.streaming_content))) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertLessEqual(max(image.size), 200)
+
+    def test_identical_files_share_preview(self):
+        content = make_png()
+        first = self._upload('a.png', content)
+        self._run_jobs()
+        second = self._upload('b.png', content)
+        self._run_jobs()
+
+        previews = set(ContractFile.objects.values_list('preview', flat=True))
+        self.assertEqual(len(previews), 1)
+        storage = ContractFile.objects.get(pk=first['id']).preview.storage
+        preview = previews.pop()
+
+        self.client.delete(self.files_url, {'file_id': first['id']}, format='json')
+        self.assertTrue(storage.exists(preview))
+        self.client.delete(self.files_url, {'file_id': second['id']}, format='json')
+        self.assertFalse(storage.exists(preview))
+
+    def test_unsupported_file(self):
+        self._upload('notes.docx', b'PK\x03\x04 not really a document')
+        self._run_jobs()
+        contract_file = ContractFile.objects.get()
+        self.assertEqual(contract_file.preview_status, 'unavailable')
+        self.assertEqual(Job.objects.get().status, 'succeeded')
+        self.assertEqual(self.client.get(f'{self.files_url}{contract_file.pk}/preview/').status_code, 404)
+
+    def test_pdf_page_count(self):
+        self._upload('contract.pdf', make_pdf(3))
+        self._run_jobs()
+        contract_file = ContractFile.objects.get()
+        self.assertEqual(contract_file.page_count, 3)
+        self.assertIn(contract_file.preview_status, ('ready', 'unavailable'))
+
+    def test_pdf_page_count_across_chunk_boundary(self):
+        path = f'{self.media_root}/long.pdf'
+        with open(path, 'wb') as f:
+            f.write(make_pdf(2).replace(b'%PDF-1.4\n', b'%PDF-1.4\n%' + b'x' * (1024 * 1024 - 20) + b'\n'))
+        self.assertEqual(pdf_page_count(path), 2)
+
+    @skipUnless(shutil.which('pdftoppm'), 'pdftoppm (poppler-utils) не установлен')
+    def test_pdf_first_page_rendered(self):
+        self._upload('contract.pdf', make_pdf(2))
+        self._run_jobs()
+        self.assertEqual(ContractFile.objects.get().preview_status, 'ready')
@@ -5,31 +5,46 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from django.db import transaction
-from django.http import FileResponse
+from django.db.models import F
 
 from .models import Contract, ContractFile
 from .serializers import ContractSerializer, ContractListSerializer, ContractFileSerializer
-from .services import ContractService
+from .services import ContractService, ContractFileService
 from accruals.models import Accrual
-from core.mixins import DataScopingMixin
+from core.downloads import protected_file_response
+from core.mixins import DataScopingMixin, ValuesListMixin
+from core.search import IndexedSearchFilter
+from jobs.services import JobService
+from jobs.views import job_accepted
 from core.permissions import ReadOnlyForClients, CanReadResource, CanWriteResource, CanReadResource, CanWriteResource
 
 
-class ContractViewSet(DataScopingMixin, viewsets.ModelViewSet):
+class ContractViewSet(DataScopingMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления договорами с RBAC и data scoping.
     При создании автоматически генерирует начисления.
+    Список отдается через .values() в формате ContractListSerializer.
     """
     queryset = Contract.objects.select_related(
         'property', 'tenant', 'landlord'
     ).prefetch_related('files').all()
     permission_classes = [IsAuthenticated, CanReadResource, ReadOnlyForClients]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'property', 'tenant']
     search_fields = ['number', 'property__name', 'tenant__name']
+    search_contract_lookup = 'id'
     ordering_fields = ['created_at', 'start_date', 'end_date']
     ordering = ['-created_at']
     
+    list_values = (
+        'id', 'number', 'signed_at', 'start_date', 'end_date', 'rent_amount', 'currency',
+        'deposit_enabled', 'advance_enabled', 'status',
+    )
+    list_value_expressions = {
+        'property_name': F('property__name'),
+        'tenant_name': F('tenant__name'),
+    }
+
     def get_serializer_class(self):
         if self.action == 'list':
             return ContractListSerializer
@@ -104,7 +119,9 @@ class ContractViewSet(DataScopingMixin, viewsets.ModelViewSet):
         if request.method == 'POST':
             serializer = ContractFileSerializer(data=request.data, context={'request': request})
             serializer.is_valid(raise_exception=True)
-            serializer.save(contract=contract)
+            contract_file = serializer.save(contract=contract)
+            # Превью первой страницы строит воркер, ответ не ждет растрирования PDF
+            JobService.enqueue('contracts.render_preview', payload={'file_id': contract_file.pk}, user=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         # DELETE — передать file_id в теле: {"file_id": 123}
         file_id = request.data.get('file_id') or request.query_params.get('file_id')
@@ -112,8 +129,8 @@ class ContractViewSet(DataScopingMixin, viewsets.ModelViewSet):
             return Response({'error': 'Укажите file_id'}, status=status.HTTP_400_BAD_REQUEST)
         try:
             f = ContractFile.objects.get(contract=contract, id=file_id)
-            f.file.delete(save=False)
-            f.delete()
+            # Один файл на диске может принадлежать нескольким записям (хранение по содержимому)
+            ContractFileService.delete(f)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except ContractFile.DoesNotExist:
             return Response({'error': 'Файл не найден'}, status=status.HTTP_404_NOT_FOUND)
@@ -128,43 +145,35 @@ class ContractViewSet(DataScopingMixin, viewsets.ModelViewSet):
             return Response({'error': 'Файл не найден'}, status=status.HTTP_404_NOT_FOUND)
         if not cf.file:
             return Response({'error': 'Файл отсутствует'}, status=status.HTTP_404_NOT_FOUND)
+        filename = cf.title or (cf.file.name.split('/')[-1] if cf.file.name else 'document.pdf')
         try:
-            fh = cf.file.open('rb')
+            # Права проверены get_object(); в продакшене файл отдает nginx (X-Accel-Redirect)
+            return protected_file_response(request, cf.file, filename=filename)
         except (ValueError, OSError):
             return Response({'error': 'Файл недоступен'}, status=status.HTTP_404_NOT_FOUND)
-        filename = cf.title or (cf.file.name.split('/')[-1] if cf.file.name else 'document.pdf')
-        return FileResponse(fh, as_attachment=True, filename=filename)
+
+    @action(detail=True, methods=['get'], url_path=r'files/(?P<file_id>\d+)/preview')
+    def file_preview(self, request, pk=None, file_id=None):
+        """Превью первой страницы файла договора (JPEG)"""
+        contract = self.get_object()
+        cf = ContractFile.objects.filter(contract=contract, id=file_id, preview_status='ready').first()
+        if cf is None or not cf.preview:
+            return Response({'error': 'Превью нет'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            # Превью по содержимому не меняется — браузер может не перезапрашивать его
+            return protected_file_response(
+                request, cf.preview, filename=f'preview-{cf.pk}.jpg', content_type='image/jpeg',
+                as_attachment=False, cache_control='private, max-age=86400',
+            )
+        except (ValueError, OSError):
+            return Response({'error': 'Превью недоступно'}, status=status.HTTP_404_NOT_FOUND)
 
     @action(detail=False, methods=['post'])
     def generate_all_accruals(self, request):
-        """Сгенерировать начисления для всех активных договоров без начислений"""
-        active_contracts = Contract.objects.filter(status='active')
-        generated = 0
-        
-        for contract in active_contracts:
-            accruals_count = Accrual.objects.filter(contract=contract).count()
-            if accruals_count == 0:
-                AccrualService.generate_accruals_for_contract(contract)
-                generated += 1
-        
-        return Response({
-            'status': f'Начисления сгенерированы для {generated} договоров',
-            'generated': generated
-        })
+        """Сгенерировать начисления для всех активных договоров без начислений (фоновая задача)"""
+        return job_accepted(JobService.enqueue('contracts.generate_all_accruals', user=request.user))
     
     @action(detail=False, methods=['post'])
     def fix_all_accruals(self, request):
-        """Исправить все planned начисления для всех договоров, используя точные значения из договоров"""
-        contracts = Contract.objects.all()
-        fixed = 0
-        
-        for contract in contracts:
-            planned_count = Accrual.objects.filter(contract=contract, status='planned').count()
-            if planned_count > 0:
-                AccrualService.fix_accruals_for_contract(contract)
-                fixed += planned_count
-        
-        return Response({
-            'status': f'Исправлено {fixed} начислений для всех договоров',
-            'fixed': fixed
-        })
\ No newline at end of file
+        """Исправить все planned начисления для всех договоров, используя точные значения из договоров (фоновая задача)"""
+        return job_accepted(JobService.enqueue('contracts.fix_all_accruals', user=request.user))
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Tenant, Request, InvestorLink, StaffAssignment, AuditLog, PROTECTED_ADMIN_USERNAMES
+from .models import User, Tenant, Request, InvestorLink, StaffAssignment, AuditLog, UploadSession, PROTECTED_ADMIN_USERNAMES
 
 
 @admin.register(User)
@@ -53,3 +53,10 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_filter = ['action', 'target_model', 'created_at']
     search_fields = ['target_repr', 'user__username']
     readonly_fields = ['user', 'action', 'target_model', 'target_id', 'target_repr', 'old_data', 'new_data', 'reason', 'created_at']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'filename', 'size', 'offset', 'status', 'updated_at']
+    list_filter = ['status']
+    search_fields = ['filename', 'sha256', 'user__username']
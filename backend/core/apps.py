@@ -5,3 +5,19 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Основное'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from rest_framework.authtoken.models import Token
+
+        from . import authentication
+        from .metrics import on_connection_created
+        from .models import Tenant, User
+
+        connection_created.connect(on_connection_created, dispatch_uid='core.metrics.connection_created')
+
+        # Сброс кэша токенов (core.authentication)
+        post_save.connect(authentication.invalidate_user_on_save, sender=User, dispatch_uid='core.auth.user_saved')
+        post_save.connect(authentication.invalidate_counterparty_users, sender=Tenant, dispatch_uid='core.auth.tenant_saved')
+        post_delete.connect(authentication.invalidate_deleted_token, sender=Token, dispatch_uid='core.auth.token_deleted')
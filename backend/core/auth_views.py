@@ -6,7 +6,6 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
-from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model, authenticate
 from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
@@ -14,6 +13,7 @@ from django.utils.decorators import method_decorator
 from .models import Tenant, PROTECTED_ADMIN_USERNAMES, ensure_protected_admin
 from .permissions import get_user_type, get_user_permissions
 from .audit import log_audit
+from .authentication import issue_token, revoke_tokens, rotate_token
 
 User = get_user_model()
 
@@ -43,7 +43,7 @@ class LoginView(APIView):
                 {'error': 'Учётная запись отключена'},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        token, _ = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         return Response({
             'token': token.key,
             'user': {
@@ -58,11 +58,11 @@ class LoginView(APIView):
 
 
 class LogoutView(APIView):
-    """Выход: удаление токена."""
+    """Выход: удаление токена и сброс его кэша."""
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        Token.objects.filter(user=request.user).delete()
+        revoke_tokens(request.user)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -226,6 +226,8 @@ def change_password(request):
     # Если пароль не задан (вход через WhatsApp) — текущий не проверяем
     user.set_password(new_pass)
     user.save()
+    # Старый токен (и другие сессии с ним) перестает действовать
+    token = rotate_token(user)
     log_audit(
         user=user,
         action='password_changed',
@@ -234,7 +236,15 @@ def change_password(request):
         target_repr=user.username,
         new_data={},
     )
-    return Response({'success': True}, status=status.HTTP_200_OK)
+    return Response({'success': True, 'token': token.key}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def refresh_token(request):
+    """Endpoint /api/auth/token/refresh/ — выпустить новый токен взамен текущего (ротация)."""
+    token = rotate_token(request.user)
+    return Response({'token': token.key}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
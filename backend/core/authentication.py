@@ -0,0 +1,156 @@
+"""
+Аутентификация по токену с кэшем token → пользователь.
+
+Стандартный TokenAuthentication на каждый запрос делает SELECT из authtoken_token с JOIN users.
+Здесь пользователь (вместе с контрагентом) кладется в кэш на AUTH_TOKEN_CACHE_SECONDS, так что
+повторные запросы фронта (/auth/me/, дашборд, списки) проходят без обращения к БД.
+
+Кэш сбрасывается при выходе, смене пароля, изменении пользователя (роль, is_active,
+ensure_protected_admin) и изменении его контрагента — см. CoreConfig.ready.
+Токен старше AUTH_TOKEN_TTL_DAYS считается истекшим и удаляется; выдать новый можно
+повторным входом или через /api/auth/token/refresh/ (rotate_token).
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .metrics import record_cache_lookup
+
+CACHE_NAME = 'auth_token'
+CACHE_KEY_PREFIX = 'auth:token:'
+
+
+def _cache_key(key):
+    # В ключе кэша не храним сам токен
+    return CACHE_KEY_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+def token_lifetime():
+    """Срок жизни токена (None — бессрочно)"""
+    days = getattr(settings, 'AUTH_TOKEN_TTL_DAYS', 30)
+    return timedelta(days=days) if days else None
+
+
+def token_expires_at(token_created):
+    lifetime = token_lifetime()
+    return token_created + lifetime if lifetime else None
+
+
+def is_token_expired(token_created, now=None):
+    expires_at = token_expires_at(token_created)
+    return expires_at is not None and expires_at <= (now or timezone.now())
+
+
+def invalidate_token_cache(*keys):
+    """Удалить из кэша записи для указанных ключей токенов"""
+    keys = [key for key in keys if key]
+    if keys:
+        cache.delete_many([_cache_key(key) for key in keys])
+
+
+def invalidate_user_tokens(user_ids):
+    """Сбросить кэш токенов пользователей (роль, пароль, контрагент изменились)"""
+    if not isinstance(user_ids, (list, tuple, set)):
+        user_ids = [user_ids]
+    keys = Token.objects.filter(user_id__in=list(user_ids)).values_list('key', flat=True)
+    invalidate_token_cache(*keys)
+
+
+def issue_token(user):
+    """
+    Токен для входа: существующий, если он не истек, иначе новый.
+    Используется LoginView и входом через WhatsApp.
+    """
+    token = Token.objects.filter(user=user).first()
+    if token is not None and not is_token_expired(token.created):
+        return token
+    return rotate_token(user)
+
+
+def rotate_token(user):
+    """Выпустить новый токен пользователя, старый перестает действовать сразу"""
+    old_keys = list(Token.objects.filter(user=user).values_list('key', flat=True))
+    Token.objects.filter(user=user).delete()
+    invalidate_token_cache(*old_keys)
+    return Token.objects.create(user=user)
+
+
+def revoke_tokens(user):
+    """Удалить токены пользователя (выход)"""
+    keys = list(Token.objects.filter(user=user).values_list('key', flat=True))
+    Token.objects.filter(user=user).delete()
+    invalidate_token_cache(*keys)
+
+
+def delete_expired_tokens():
+    """Удалить истекшие токены (периодическая очистка). Возвращает количество"""
+    lifetime = token_lifetime()
+    if lifetime is None:
+        return 0
+    expired = Token.objects.filter(created__lte=timezone.now() - lifetime)
+    keys = list(expired.values_list('key', flat=True))
+    if not keys:
+        return 0
+    Token.objects.filter(key__in=keys).delete()
+    invalidate_token_cache(*keys)
+    return len(keys)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication с кэшем пользователя и сроком жизни токена.
+    request.auth — ключ токена (объект Token из БД при попадании в кэш не поднимается).
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+        cached = cache.get(cache_key)
+        record_cache_lookup(CACHE_NAME, cached is not None)
+        now = timezone.now()
+
+        if cached is None:
+            try:
+                token = Token.objects.select_related('user', 'user__counterparty').get(key=key)
+            except Token.DoesNotExist:
+                raise AuthenticationFailed('Недействительный токен.')
+            user, created = token.user, token.created
+            if not user.is_active:
+                raise AuthenticationFailed('Пользователь отключен или удален.')
+            if is_token_expired(created, now):
+                token.delete()
+                raise AuthenticationFailed('Срок действия токена истек.')
+            timeout = getattr(settings, 'AUTH_TOKEN_CACHE_SECONDS', 300)
+            expires_at = token_expires_at(created)
+            if expires_at is not None:
+                timeout = min(timeout, max(int((expires_at - now).total_seconds()), 1))
+            cache.set(cache_key, (user, created), timeout)
+            return user, key
+
+        user, created = cached
+        if is_token_expired(created, now):
+            invalidate_token_cache(key)
+            Token.objects.filter(key=key).delete()
+            raise AuthenticationFailed('Срок действия токена истек.')
+        return user, key
+
+
+def invalidate_user_on_save(sender, instance, **kwargs):
+    """post_save User: роль, пароль, is_active и т.п. могли измениться"""
+    invalidate_user_tokens(instance.pk)
+
+
+def invalidate_counterparty_users(sender, instance, **kwargs):
+    """post_save Tenant: в кэше пользователя лежит его контрагент"""
+    keys = Token.objects.filter(user__counterparty_id=instance.pk).values_list('key', flat=True)
+    invalidate_token_cache(*keys)
+
+
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """post_delete Token"""
+    invalidate_token_cache(instance.key)
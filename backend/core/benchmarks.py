@@ -0,0 +1,163 @@
+"""
+Замеры времени ответа и количества SQL-запросов ключевых эндпоинтов по ролям.
+Используется командой benchmark_endpoints на синтетическом портфеле (generate_synthetic_portfolio).
+"""
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+
+from rest_framework.renderers import JSONRenderer
+
+from core.instrumentation import percentile
+from core.renderers import FastJSONRenderer
+
+# (имя, путь, параметры запроса)
+ENDPOINTS = [
+    ('dashboard.stats', '/api/dashboard/stats/', {}),
+    ('reports.profit_and_loss', '/api/reports/profit_and_loss/', {'all_time': 'true'}),
+    ('reports.overdue_payments', '/api/reports/overdue_payments/', {}),
+    ('forecast.calculate', '/api/forecast/calculate/', {'days': 90}),
+    ('forecast.by_contract', '/api/forecast/by_contract/', {'days': 90}),
+    ('accruals.list', '/api/accruals/', {}),
+    ('payments.list', '/api/payments/', {}),
+    ('contracts.list', '/api/contracts/', {}),
+]
+
+# Ответы для сравнения JSON renderer'ов
+RENDER_PAYLOADS = [
+    ('reports.profit_and_loss', '/api/reports/profit_and_loss/', {'all_time': 'true'}),
+    ('accruals.list', '/api/accruals/', {}),
+]
+
+# ViewSet'ы со списком через .values() (core.mixins.ValuesListMixin)
+LIST_VIEWSETS = [
+    ('accruals', 'accruals.views.AccrualViewSet'),
+    ('payments', 'payments.views.PaymentViewSet'),
+    ('contracts', 'contracts.views.ContractViewSet'),
+]
+
+
+def benchmark_endpoint(user, path, params=None, repeat=5, warmup=1):
+    """
+    Выполнить GET-запрос от имени пользователя warmup + repeat раз.
+    Возвращает статус, перцентили времени (мс) и число SQL-запросов последнего прогона.
+    """
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(user)
+    for _ in range(warmup):
+        client.get(path, params or {})
+
+    timings = []
+    queries = 0
+    status_code = None
+    for _ in range(max(repeat, 1)):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(path, params or {})
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = len(captured)
+        status_code = response.status_code
+
+    return {
+        'status': status_code,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': queries,
+    }
+
+
+def run_benchmarks(users_by_role, endpoints=None, repeat=5, warmup=1):
+    """Замеры всех эндпоинтов для каждой роли. Возвращает список строк результата."""
+    results = []
+    for role, user in users_by_role.items():
+        for name, path, params in endpoints or ENDPOINTS:
+            row = {'endpoint': name, 'role': role}
+            row.update(benchmark_endpoint(user, path, params, repeat=repeat, warmup=warmup))
+            results.append(row)
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance=0.25):
+    """
+    Сравнить результаты с сохраненным прогоном. Регрессия — рост p50 больше чем на tolerance
+    или рост числа SQL-запросов. Возвращает список описаний регрессий.
+    """
+    previous = {(row['endpoint'], row['role']): row for row in baseline}
+    regressions = []
+    for row in results:
+        before = previous.get((row['endpoint'], row['role']))
+        if not before:
+            continue
+        if row['queries'] > before['queries']:
+            regressions.append(
+                f"{row['endpoint']} [{row['role']}]: запросов {before['queries']} → {row['queries']}"
+            )
+        if before['p50_ms'] and row['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+            regressions.append(
+                f"{row['endpoint']} [{row['role']}]: p50 {before['p50_ms']} мс → {row['p50_ms']} мс"
+            )
+    return regressions
+
+
+def _best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_list_modes(viewset_path, repeat=3, limit=None):
+    """
+    Сравнить список через list-сериализатор и через .values() на всех строках (без scoping).
+    Время — лучшее из repeat прогонов, включая SQL. Возвращает строк/с для обоих режимов.
+    """
+    viewset_class = import_string(viewset_path)
+    view = viewset_class()
+    view.action = 'list'
+    queryset = viewset_class.queryset.all().order_by(*viewset_class.ordering)
+    if limit:
+        queryset = queryset[:limit]
+    serializer_class = view.get_serializer_class()
+
+    serializer_s, data = _best_of(lambda: serializer_class(queryset.all(), many=True).data, repeat)
+    values_s, _ = _best_of(lambda: view.list_data(list(view.list_rows(queryset.all()))), repeat)
+    rows = len(data)
+    return {
+        'rows': rows,
+        'serializer_ms': round(serializer_s * 1000, 2),
+        'values_ms': round(values_s * 1000, 2),
+        'serializer_rows_per_s': round(rows / serializer_s) if serializer_s else 0,
+        'values_rows_per_s': round(rows / values_s) if values_s else 0,
+        'speedup': round(serializer_s / values_s, 1) if values_s else 0,
+    }
+
+
+def benchmark_renderers(user, endpoints=None, repeat=5):
+    """
+    Сравнить стандартный JSONRenderer и FastJSONRenderer на данных ответов эндпоинтов.
+    Время рендеринга — лучшее из repeat прогонов, без запроса к БД.
+    """
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(user)
+    standard, fast = JSONRenderer(), FastJSONRenderer()
+    results = []
+    for name, path, params in endpoints or RENDER_PAYLOADS:
+        data = client.get(path, params).data
+        standard_s, content = _best_of(lambda: standard.render(data), repeat)
+        fast_s, _ = _best_of(lambda: fast.render(data), repeat)
+        results.append({
+            'endpoint': name,
+            'bytes': len(content),
+            'standard_ms': round(standard_s * 1000, 2),
+            'fast_ms': round(fast_s * 1000, 2),
+            'speedup': round(standard_s / fast_s, 1) if fast_s else 0,
+        })
+    return results
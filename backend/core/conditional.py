@@ -0,0 +1,80 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для списков и сводок.
+
+Валидаторы считаются одним агрегатом по тому же (уже ограниченному по роли) queryset:
+Count строк и Max('updated_at') — в том числе у связанных таблиц, поля которых попадают в ответ.
+Если клиент прислал совпадающий If-None-Match / If-Modified-Since, отдается 304 без сериализации.
+
+ETag включает пользователя, полный путь с параметрами и текущую дату (просрочка в ответах
+считается от сегодняшнего дня), поэтому разные роли и фильтры не делят один валидатор.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+
+def queryset_validators(queryset, fields=('updated_at',)):
+    """
+    Один запрос: число строк и максимум каждого поля-даты.
+    Возвращает (count, last_modified) — last_modified = None для пустого queryset.
+    """
+    aggregates = {'_count': Count('pk')}
+    aggregates.update({f'_max_{index}': Max(field) for index, field in enumerate(fields)})
+    result = queryset.order_by().aggregate(**aggregates)
+    stamps = [value for key, value in result.items() if key.startswith('_max_') and value is not None]
+    return result['_count'], max(stamps) if stamps else None
+
+
+class ConditionalGet:
+    """
+    Валидаторы ответа для запроса: add() накапливает части (queryset или произвольные значения),
+    respond() возвращает 304 либо ответ build() с заголовками ETag / Last-Modified.
+        conditional = ConditionalGet(request)
+        conditional.add_queryset(accruals, ('updated_at', 'contract__updated_at'))
+        return conditional.respond(lambda: Response(...))
+    """
+
+    def __init__(self, request):
+        self.request = request
+        user = getattr(request, 'user', None)
+        self.parts = [
+            request.get_full_path(),
+            getattr(user, 'pk', None),
+            getattr(user, 'role', None),
+            timezone.now().date().isoformat(),
+        ]
+        self.last_modified = None
+
+    def add(self, *values):
+        self.parts.extend(values)
+        return self
+
+    def add_queryset(self, queryset, fields=('updated_at',)):
+        count, last_modified = queryset_validators(queryset, fields)
+        self.parts.extend([count, last_modified.isoformat() if last_modified else None])
+        if last_modified and (self.last_modified is None or last_modified > self.last_modified):
+            self.last_modified = last_modified
+        return self
+
+    @property
+    def etag(self):
+        digest = hashlib.sha1('|'.join(str(part) for part in self.parts).encode()).hexdigest()
+        return quote_etag(digest)
+
+    def respond(self, build):
+        etag = self.etag
+        last_modified = int(self.last_modified.timestamp()) if self.last_modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = build()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Браузер хранит копию, но всегда перепроверяет ее у сервера
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
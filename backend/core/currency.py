@@ -0,0 +1,109 @@
+"""
+Пересчет сумм в базовую валюту внутри SQL-запроса (сводные отчеты по договорам в разных валютах).
+
+Курсы в ExchangeRate хранятся к сому. Курс строки — коррелированный подзапрос по уникальному
+индексу (currency, source, date): последний известный курс на дату строки; если история курсов
+начинается позже — самый ранний известный; если курсов нет совсем — справочный DEFAULT_RATES
+(как в ExchangeRateService.get_rate). Для базовой валюты, отличной от сома, сумма делится
+на курс базовой валюты на ту же дату и из того же источника.
+
+    Accrual.objects.aggregate(total=money_sum('final_amount', *ACCRUAL_RATE, base='USD'))
+
+Сводная сумма — один агрегатный запрос вместо convert_to_kgs для каждой строки в Python.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import ExchangeRate
+
+BASE_CURRENCY = 'KGS'
+CURRENCIES = ('KGS', 'USD', 'RUB', 'EUR')
+DEFAULT_RATE_SOURCE = 'nbkr'
+# Справочные курсы к сому, если загруженных курсов нет
+DEFAULT_RATES = {
+    'USD': Decimal('87.50'),
+    'EUR': Decimal('101.60'),
+    'RUB': Decimal('1.120'),
+}
+
+# (поле валюты, дата курса, поле источника курса) для сумм по договорам
+ACCRUAL_RATE = ('contract__currency', 'due_date', 'contract__exchange_rate_source')
+PAYMENT_RATE = ('contract__currency', 'payment_date', 'contract__exchange_rate_source')
+
+RATE_FIELD = DecimalField(max_digits=12, decimal_places=4)
+CONVERTED_FIELD = DecimalField(max_digits=24, decimal_places=8)
+CENT = Decimal('0.01')
+
+
+def parse_base_currency(value):
+    """Базовая валюта из параметра запроса: None — без пересчета, неизвестная — ValueError"""
+    if not value:
+        return None
+    code = value.upper()
+    if code not in CURRENCIES:
+        raise ValueError(f'base_currency: одна из {", ".join(CURRENCIES)}')
+    return code
+
+
+def _outer(value):
+    """Путь к полю внешнего запроса → OuterRef; дата или выражение — как есть"""
+    return OuterRef(value) if isinstance(value, str) else value
+
+
+def _rate_lookup(rates, on_date, default):
+    known = rates.filter(date__lte=_outer(on_date)).order_by('-date').values('rate')[:1]
+    earliest = rates.order_by('date').values('rate')[:1]
+    return Coalesce(
+        Subquery(known, output_field=RATE_FIELD), Subquery(earliest, output_field=RATE_FIELD), default,
+        output_field=RATE_FIELD,
+    )
+
+
+def rate_expression(currency_field, on_date, source_field=None):
+    """Курс к сому валюты из поля currency_field на дату on_date (поле или дата)"""
+    source = OuterRef(source_field) if source_field else DEFAULT_RATE_SOURCE
+    rates = ExchangeRate.objects.filter(currency=OuterRef(currency_field), source=source)
+    default = Case(
+        *[When(**{currency_field: code}, then=Value(rate)) for code, rate in DEFAULT_RATES.items()],
+        default=Value(Decimal('1')),
+        output_field=RATE_FIELD,
+    )
+    return _rate_lookup(rates, on_date, default)
+
+
+def base_rate_expression(base, on_date, source_field=None):
+    """Курс к сому базовой валюты base на дату on_date"""
+    source = OuterRef(source_field) if source_field else DEFAULT_RATE_SOURCE
+    rates = ExchangeRate.objects.filter(currency=base, source=source)
+    return _rate_lookup(rates, on_date, Value(DEFAULT_RATES.get(base, Decimal('1'))))
+
+
+def converted(amount, currency_field, on_date, source_field=None, base=BASE_CURRENCY):
+    """Выражение: сумма amount (поле или выражение) в базовой валюте base по курсу на дату"""
+    amount = F(amount) if isinstance(amount, str) else amount
+    in_kgs = Case(
+        When(**{currency_field: BASE_CURRENCY}, then=amount),
+        default=amount * rate_expression(currency_field, on_date, source_field),
+        output_field=CONVERTED_FIELD,
+    )
+    if base == BASE_CURRENCY:
+        return in_kgs
+    return Case(
+        When(**{currency_field: base}, then=amount),
+        default=in_kgs / base_rate_expression(base, on_date, source_field),
+        output_field=CONVERTED_FIELD,
+    )
+
+
+def money_sum(amount, currency_field, on_date, source_field=None, base=None, filter=None):
+    """Sum(amount) как есть (base=None) или с пересчетом каждой строки в базовую валюту"""
+    if base is None:
+        return Sum(amount, filter=filter)
+    return Sum(converted(amount, currency_field, on_date, source_field, base), filter=filter)
+
+
+def round_money(value) -> Decimal:
+    """Сумма после пересчета — до копеек"""
+    return Decimal(value or 0).quantize(CENT)
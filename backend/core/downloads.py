@@ -0,0 +1,112 @@
+"""
+Отдача файлов из MEDIA_ROOT после проверки прав.
+
+Если задан PROTECTED_MEDIA_ACCEL_PREFIX (в продакшене — '/protected-media/'), Django только
+проверяет доступ и отвечает заголовком X-Accel-Redirect: сам файл, включая Range-запросы,
+отдает nginx из internal-location, и воркер приложения не занят на время скачивания.
+Без nginx (разработка, тесты) файл отдает Django, тоже с поддержкой Range (один диапазон).
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _parse_range(header, size):
+    """
+    Заголовок Range → (start, end) включительно; None — отдать файл целиком
+    (нет заголовка, несколько диапазонов, синтаксическая ошибка); 'invalid' — 416.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or (last and int(last) < start):
+            return 'invalid'
+    else:
+        # bytes=-N — последние N байт
+        suffix = int(last)
+        if suffix == 0:
+            return 'invalid'
+        start, end = max(size - suffix, 0), size - 1
+    return start, end
+
+
+def _iter_range(handle, start, length):
+    try:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def protected_file_response(request, field_file, filename=None, content_type=None,
+                            as_attachment=True, content_encoding=None, cache_control='private, no-cache'):
+    """
+    Ответ с файлом FileField. Права проверяет вызывающий view (get_object с DataScopingMixin).
+    Бросает OSError, если файла нет в хранилище.
+    """
+    storage = field_file.storage
+    name = field_file.name
+    filename = filename or name.rsplit('/', 1)[-1]
+    if content_type is None:
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    size = storage.size(name)
+    last_modified = int(storage.get_modified_time(name).timestamp())
+    accel_prefix = getattr(settings, 'PROTECTED_MEDIA_ACCEL_PREFIX', '')
+
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(name)
+    else:
+        response = _django_file_response(request, field_file, size, last_modified, content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['Cache-Control'] = cache_control
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    return response
+
+
+def _django_file_response(request, field_file, size, last_modified, content_type):
+    byte_range = _parse_range(request.META.get('HTTP_RANGE'), size)
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if byte_range and if_range and parse_http_date_safe(if_range) != last_modified:
+        # Файл изменился с момента первой части — отдаем целиком
+        byte_range = None
+
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    handle = field_file.open('rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+        response['Content-Length'] = size
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_iter_range(handle, start, length), status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    return response
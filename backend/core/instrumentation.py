@@ -0,0 +1,194 @@
+"""
+Инструментирование HTTP-запросов: число SQL-запросов, время в БД, время обработки и размер ответа.
+
+Замеры группируются по view и action (например, ForecastViewSet.by_contract) и хранятся
+в скользящем окне в памяти процесса — перцентили отдает /api/metrics/requests/ (только admin),
+счетчики и гистограммы для сборщика метрик — /api/metrics/ (core.metrics).
+Медленные запросы пишутся в лог amt.requests в структурированном виде вместе с самыми
+повторяющимися SQL — так в логах видны N+1.
+"""
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import connection
+
+from . import metrics
+
+logger = logging.getLogger('amt.requests')
+
+# Сколько повторяющихся SQL выводить в лог медленного запроса
+TOP_SQL_LIMIT = 5
+SQL_PREVIEW_LENGTH = 500
+
+
+def percentile(values, pct):
+    """Перцентиль по методу ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class RequestMetricsStore:
+    """
+    Последние замеры по каждому эндпоинту (скользящее окно).
+    Данные свои у каждого процесса воркера.
+    """
+
+    def __init__(self, window=500):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, tag, sample):
+        with self._lock:
+            self._samples[tag].append(sample)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def snapshot(self):
+        """Перцентили по эндпоинтам, самые медленные (по p95) — первыми"""
+        with self._lock:
+            samples = {tag: list(values) for tag, values in self._samples.items()}
+
+        result = []
+        for tag, values in samples.items():
+            total_ms = [s['total_ms'] for s in values]
+            db_ms = [s['db_ms'] for s in values]
+            queries = [s['queries'] for s in values]
+            sizes = [s['response_bytes'] for s in values if s['response_bytes'] is not None]
+            result.append({
+                'endpoint': tag,
+                'count': len(values),
+                'total_ms': {
+                    'p50': round(percentile(total_ms, 50), 2),
+                    'p95': round(percentile(total_ms, 95), 2),
+                    'p99': round(percentile(total_ms, 99), 2),
+                    'max': round(max(total_ms), 2),
+                },
+                'db_ms': {
+                    'p50': round(percentile(db_ms, 50), 2),
+                    'p95': round(percentile(db_ms, 95), 2),
+                },
+                'queries': {
+                    'p50': percentile(queries, 50),
+                    'p95': percentile(queries, 95),
+                    'max': max(queries),
+                },
+                'response_bytes_avg': round(sum(sizes) / len(sizes)) if sizes else None,
+                'slow_count': sum(1 for s in values if s['slow']),
+            })
+        result.sort(key=lambda row: row['total_ms']['p95'], reverse=True)
+        return result
+
+
+request_metrics = RequestMetricsStore(getattr(settings, 'REQUEST_METRICS_WINDOW', 500))
+
+
+class QueryRecorder:
+    """execute_wrapper: считает SQL-запросы, их время и повторы одинаковых операторов"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            stats = self.statements[sql]
+            stats[0] += 1
+            stats[1] += elapsed
+
+    def top_repeated(self, limit=TOP_SQL_LIMIT):
+        """Самые повторяющиеся SQL (повторы — признак N+1)"""
+        repeated = [(sql, count, elapsed) for sql, (count, elapsed) in self.statements.items() if count > 1]
+        repeated.sort(key=lambda item: (item[1], item[2]), reverse=True)
+        return [
+            {'sql': sql[:SQL_PREVIEW_LENGTH], 'count': count, 'total_ms': round(elapsed * 1000, 2)}
+            for sql, count, elapsed in repeated[:limit]
+        ]
+
+
+def resolve_view_tag(request, view_func):
+    """Имя эндпоинта для группировки: <ViewSet>.<action> или имя функции-view"""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is not None:
+        actions = getattr(view_func, 'actions', None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view_class.__name__}.{action}'
+    return getattr(view_func, '__name__', 'unknown')
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеряет каждый запрос и пишет медленные (дольше SLOW_REQUEST_MS или больше
+    SLOW_REQUEST_QUERIES SQL-запросов) в лог amt.requests.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        if response.streaming:
+            response_bytes = int(response['Content-Length']) if response.has_header('Content-Length') else None
+        else:
+            response_bytes = len(response.content)
+
+        slow = (
+            total_ms >= getattr(settings, 'SLOW_REQUEST_MS', 1000)
+            or recorder.count >= getattr(settings, 'SLOW_REQUEST_QUERIES', 100)
+        )
+        tag = getattr(request, '_metrics_tag', 'unresolved')
+        metrics.http_requests_total.inc(endpoint=tag, method=request.method, status=response.status_code)
+        metrics.http_request_duration_seconds.observe(total_ms / 1000, endpoint=tag)
+        metrics.db_queries_total.inc(recorder.count, endpoint=tag)
+        metrics.db_query_seconds_total.inc(recorder.duration, endpoint=tag)
+        request_metrics.record(tag, {
+            'total_ms': total_ms,
+            'db_ms': recorder.duration * 1000,
+            'queries': recorder.count,
+            'response_bytes': response_bytes,
+            'slow': slow,
+        })
+
+        if slow:
+            user = getattr(request, 'user', None)
+            logger.warning('slow_request', extra={
+                'endpoint': tag,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'user_id': user.pk if user is not None and user.is_authenticated else None,
+                'total_ms': round(total_ms, 2),
+                'db_ms': round(recorder.duration * 1000, 2),
+                'queries': recorder.count,
+                'response_bytes': response_bytes,
+                'top_sql': recorder.top_repeated(),
+            })
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_tag = resolve_view_tag(request, view_func)
+        return None
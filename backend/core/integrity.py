@@ -0,0 +1,223 @@
+"""
+Сверка денормализованных сумм с первичными записями.
+
+Производное значение                  Источник
+  Accrual.paid_amount                  Σ PaymentAllocation.amount по начислению
+  Accrual.final_amount                 base_amount + adjustments + utilities_amount
+  Accrual.balance                      final_amount − paid_amount; статус 'paid' ⇔ остаток ≤ 0
+  Payment.allocated_amount             Σ PaymentAllocation.amount по платежу
+  Deposit.balance                      Σ внесений − Σ списаний и возвратов (DepositMovement)
+  Account.balance                      Σ операций со знаком (AccountTransaction, депозиты договоров — тоже)
+  журнал расчетов (LedgerEntry)        Σ записей по начислению = final_amount − Σ распределений
+
+Каждая проверка — один запрос: ожидаемое значение считается коррелированным подзапросом
+с агрегатом, расхождения отбираются в SQL, в Python выгружаются только строки с расхождением.
+Исправление — UPDATE ... SET поле = (подзапрос) пакетами по id, без чтения-изменения-записи.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.services import MONEY_FIELD, AccountService
+from accruals.journal import LedgerJournalService
+from accruals.models import Accrual, LedgerEntry
+from deposits.models import Deposit, DepositMovement
+from payments.models import Payment, PaymentAllocation
+
+CHECKS = ('accruals', 'payments', 'deposits', 'accounts', 'journal')
+REPAIR_BATCH_SIZE = 1000
+
+ZERO = Value(Decimal('0'), output_field=MONEY_FIELD)
+
+
+def _sum_by(queryset, outer_field, amount):
+    """Коррелированный подзапрос: сумма amount по строкам queryset, где outer_field = pk внешней строки"""
+    totals = (
+        queryset.filter(**{outer_field: OuterRef('pk')})
+        .order_by()
+        .values(outer_field)
+        .annotate(total=Sum(amount))
+        .values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=MONEY_FIELD), ZERO, output_field=MONEY_FIELD)
+
+
+def accrual_paid_expression():
+    return _sum_by(PaymentAllocation.objects.all(), 'accrual', 'amount')
+
+
+def accrual_final_expression():
+    return ExpressionWrapper(F('base_amount') + F('adjustments') + F('utilities_amount'), output_field=MONEY_FIELD)
+
+
+def payment_allocated_expression():
+    return _sum_by(PaymentAllocation.objects.all(), 'payment', 'amount')
+
+
+def deposit_balance_expression():
+    signed = Case(
+        When(movement_type='in', then=F('amount')),
+        default=-F('amount'),
+        output_field=MONEY_FIELD,
+    )
+    return _sum_by(DepositMovement.objects.all(), 'deposit', signed)
+
+
+def journal_balance_expression():
+    return _sum_by(LedgerEntry.objects.all(), 'accrual', 'amount')
+
+
+def _drift_row(check, obj_id, label, field, stored, expected):
+    return {
+        'check': check,
+        'id': obj_id,
+        'label': label,
+        'field': field,
+        'stored': stored,
+        'expected': expected,
+        'drift': stored - expected if isinstance(stored, Decimal) else None,
+    }
+
+
+def _batches(ids):
+    for start in range(0, len(ids), REPAIR_BATCH_SIZE):
+        yield ids[start:start + REPAIR_BATCH_SIZE]
+
+
+class LedgerIntegrityService:
+    """Поиск и исправление расхождений производных сумм (manage.py check_ledger_integrity)"""
+
+    @staticmethod
+    def accrual_drift():
+        accruals = Accrual.objects.annotate(
+            expected_paid=accrual_paid_expression(),
+            expected_final=accrual_final_expression(),
+        ).annotate(
+            expected_balance=ExpressionWrapper(F('expected_final') - F('expected_paid'), output_field=MONEY_FIELD),
+        ).filter(
+            ~Q(paid_amount=F('expected_paid'))
+            | ~Q(final_amount=F('expected_final'))
+            | ~Q(balance=F('expected_balance'))
+            | Q(status='paid', expected_balance__gt=0)
+            | (~Q(status='paid') & Q(expected_balance__lte=0))
+        ).order_by('pk')
+        rows = []
+        for row in accruals.values(
+            'id', 'contract__number', 'period_start', 'paid_amount', 'final_amount', 'balance', 'status',
+            'expected_paid', 'expected_final', 'expected_balance',
+        ):
+            label = f'{row["contract__number"]} {row["period_start"]:%m.%Y}'
+            for field, expected in (
+                ('paid_amount', 'expected_paid'), ('final_amount', 'expected_final'), ('balance', 'expected_balance'),
+            ):
+                if row[field] != row[expected]:
+                    rows.append(_drift_row('accruals', row['id'], label, field, row[field], row[expected]))
+            if (row['status'] == 'paid') != (row['expected_balance'] <= 0):
+                expected_status = 'paid' if row['expected_balance'] <= 0 else 'не оплачено'
+                rows.append(_drift_row('accruals', row['id'], label, 'status', row['status'], expected_status))
+        return rows
+
+    @staticmethod
+    def payment_drift():
+        payments = Payment.objects.annotate(expected=payment_allocated_expression()).filter(
+            ~Q(allocated_amount=F('expected'))
+        ).order_by('pk')
+        return [
+            _drift_row(
+                'payments', row['id'], f'{row["contract__number"]} {row["payment_date"]:%d.%m.%Y}',
+                'allocated_amount', row['allocated_amount'], row['expected'],
+            )
+            for row in payments.values('id', 'contract__number', 'payment_date', 'allocated_amount', 'expected')
+        ]
+
+    @staticmethod
+    def deposit_drift():
+        deposits = Deposit.objects.annotate(expected=deposit_balance_expression()).filter(
+            ~Q(balance=F('expected'))
+        ).order_by('pk')
+        return [
+            _drift_row('deposits', row['id'], row['contract__number'], 'balance', row['balance'], row['expected'])
+            for row in deposits.values('id', 'contract__number', 'balance', 'expected')
+        ]
+
+    @staticmethod
+    def account_drift():
+        return [
+            _drift_row(
+                'accounts', row['account_id'], f'{row["name"]} ({row["currency"]})', 'balance',
+                row['balance'], row['ledger_balance'],
+            )
+            for row in AccountService.get_balance_drift()
+        ]
+
+    @staticmethod
+    def journal_drift():
+        """Журнал расчетов отстал от начислений или распределений (изменения в обход сервисов)"""
+        accruals = Accrual.objects.annotate(
+            journaled=journal_balance_expression(),
+            expected=ExpressionWrapper(accrual_final_expression() - accrual_paid_expression(), output_field=MONEY_FIELD),
+        ).filter(~Q(journaled=F('expected'))).order_by('pk')
+        return [
+            _drift_row(
+                'journal', row['id'], f'{row["contract__number"]} {row["period_start"]:%m.%Y}', 'ledger_entries',
+                row['journaled'], row['expected'],
+            )
+            for row in accruals.values('id', 'contract__number', 'period_start', 'journaled', 'expected')
+        ]
+
+    @staticmethod
+    def check(checks=None) -> dict:
+        """Расхождения по проверкам: {'accruals': [...], 'payments': [...], ...}"""
+        finders = {
+            'accruals': LedgerIntegrityService.accrual_drift,
+            'payments': LedgerIntegrityService.payment_drift,
+            'deposits': LedgerIntegrityService.deposit_drift,
+            'accounts': LedgerIntegrityService.account_drift,
+            'journal': LedgerIntegrityService.journal_drift,
+        }
+        return {name: finders[name]() for name in (checks or CHECKS)}
+
+    @staticmethod
+    @transaction.atomic
+    def repair(checks=None) -> dict:
+        """
+        Исправить расхождения: выставить производные значения по первичным записям.
+        Возвращает {'accruals': [...], ...} — исправленные расхождения (как в check).
+        """
+        drift = LedgerIntegrityService.check(checks)
+        now = timezone.now()
+        today = timezone.localdate()
+
+        accrual_ids = sorted({row['id'] for row in drift.get('accruals', [])})
+        for ids in _batches(accrual_ids):
+            paid = accrual_paid_expression()
+            final = accrual_final_expression()
+            Accrual.objects.filter(pk__in=ids).update(
+                paid_amount=paid, final_amount=final,
+                balance=ExpressionWrapper(final - paid, output_field=MONEY_FIELD), updated_at=now,
+            )
+            # Статус зависит и от даты — считается той же логикой, что при сохранении
+            accruals = list(Accrual.objects.filter(pk__in=ids))
+            for accrual in accruals:
+                accrual.apply_totals(today)
+            Accrual.objects.bulk_update(accruals, ['status'])
+
+        payment_ids = sorted({row['id'] for row in drift.get('payments', [])})
+        for ids in _batches(payment_ids):
+            Payment.objects.filter(pk__in=ids).update(allocated_amount=payment_allocated_expression(), updated_at=now)
+
+        deposit_ids = sorted({row['id'] for row in drift.get('deposits', [])})
+        for ids in _batches(deposit_ids):
+            Deposit.objects.filter(pk__in=ids).update(balance=deposit_balance_expression(), updated_at=now)
+
+        # Исправленные начисления и отставший журнал — дописать записи на разницу
+        journal_ids = accrual_ids + [row['id'] for row in drift.get('journal', [])]
+        LedgerJournalService.sync(journal_ids)
+
+        account_ids = sorted({row['id'] for row in drift.get('accounts', [])})
+        if account_ids:
+            AccountService.reconcile_balances(account_ids)
+        return drift
@@ -0,0 +1,27 @@
+"""
+Форматтеры логов. JsonFormatter пишет запись одной JSON-строкой вместе с полями из extra.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+
+# Стандартные атрибуты LogRecord — все остальные поля записи пришли из extra
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Структурированный лог: одна запись — одна строка JSON"""
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
@@ -0,0 +1,92 @@
+"""
+Бенчмарк эндпоинтов: время ответа (p50/p95/max) и число SQL-запросов по ролям.
+Запускается на синтетическом портфеле (generate_synthetic_portfolio) с пользователями syn_<роль>;
+если их нет — берется первый активный пользователь с ролью.
+
+Использование:
+  python manage.py benchmark_endpoints
+  python manage.py benchmark_endpoints --role admin --role tenant --repeat 10
+  python manage.py benchmark_endpoints --json bench.json
+  python manage.py benchmark_endpoints --baseline bench.json --fail-on-regression
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import ENDPOINTS, compare_with_baseline, run_benchmarks
+from core.management.commands.generate_synthetic_portfolio import SYNTHETIC_ROLES, synthetic_username
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время ответа и число SQL-запросов эндпоинтов для каждой роли'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--role', action='append', dest='roles', choices=SYNTHETIC_ROLES,
+            help='Роль для замера (можно указать несколько раз, по умолчанию все)',
+        )
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            help='Имя эндпоинта, например forecast.calculate (можно указать несколько раз)',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Количество замеров на эндпоинт')
+        parser.add_argument('--warmup', type=int, default=1, help='Количество прогревочных запросов')
+        parser.add_argument('--json', dest='json_path', help='Сохранить результаты в JSON-файл')
+        parser.add_argument('--baseline', help='JSON-файл прошлого прогона для сравнения')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Допустимый рост p50 (0.25 = 25%%)')
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Завершиться с ошибкой, если найдены регрессии',
+        )
+
+    def handle(self, *args, **options):
+        endpoints = ENDPOINTS
+        if options['endpoints']:
+            endpoints = [e for e in ENDPOINTS if e[0] in options['endpoints']]
+            if not endpoints:
+                raise CommandError(f'Неизвестные эндпоинты. Доступны: {", ".join(e[0] for e in ENDPOINTS)}')
+
+        users_by_role = {}
+        for role in options['roles'] or SYNTHETIC_ROLES:
+            user = (
+                User.objects.filter(username=synthetic_username(role)).first()
+                or User.objects.filter(role=role, is_active=True).order_by('id').first()
+            )
+            if user:
+                users_by_role[role] = user
+            else:
+                self.stdout.write(self.style.WARNING(f'⚠ Нет пользователя с ролью {role} — пропущено'))
+        if not users_by_role:
+            raise CommandError('Нет пользователей для замера. Запустите generate_synthetic_portfolio')
+
+        results = run_benchmarks(users_by_role, endpoints, repeat=options['repeat'], warmup=options['warmup'])
+
+        self.stdout.write(f'{"Эндпоинт":<28}{"Роль":<10}{"Статус":>7}{"p50 мс":>10}{"p95 мс":>10}{"max мс":>10}{"SQL":>6}')
+        for row in results:
+            self.stdout.write(
+                f'{row["endpoint"]:<28}{row["role"]:<10}{row["status"]:>7}'
+                f'{row["p50_ms"]:>10}{row["p95_ms"]:>10}{row["max_ms"]:>10}{row["queries"]:>6}'
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'✓ Результаты сохранены в {options["json_path"]}'))
+
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Не удалось прочитать baseline: {e}')
+            regressions = compare_with_baseline(results, baseline, options['tolerance'])
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS('✓ Регрессий относительно baseline нет'))
+                return
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(f'⚠ {line}'))
+            if options['fail_on_regression']:
+                raise CommandError(f'Найдено регрессий: {len(regressions)}')
@@ -0,0 +1,42 @@
+"""
+Сравнение скорости списков: list-сериализатор (как было) и выборка через .values()
+(core.mixins.ValuesListMixin). Показывает строк в секунду для начислений, поступлений и договоров.
+Удобно запускать на синтетическом портфеле (generate_synthetic_portfolio).
+
+Использование:
+  python manage.py benchmark_list_modes
+  python manage.py benchmark_list_modes --list accruals --repeat 5
+  python manage.py benchmark_list_modes --limit 5000
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import LIST_VIEWSETS, benchmark_list_modes
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает list-сериализаторы и выборку через .values() (строк в секунду)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--list', action='append', dest='lists', choices=[name for name, _ in LIST_VIEWSETS],
+            help='Список для замера (можно указать несколько раз, по умолчанию все)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Количество прогонов (берется лучший)')
+        parser.add_argument('--limit', type=int, help='Ограничить число строк')
+
+    def handle(self, *args, **options):
+        selected = [(name, path) for name, path in LIST_VIEWSETS if not options['lists'] or name in options['lists']]
+        if not selected:
+            raise CommandError('Нечего замерять')
+
+        self.stdout.write(
+            f'{"Список":<12}{"Строк":>8}{"Сериализатор мс":>18}{"values() мс":>14}'
+            f'{"строк/с (было)":>17}{"строк/с (values)":>19}{"Ускорение":>11}'
+        )
+        for name, path in selected:
+            row = benchmark_list_modes(path, repeat=options['repeat'], limit=options['limit'])
+            self.stdout.write(
+                f'{name:<12}{row["rows"]:>8}{row["serializer_ms"]:>18}{row["values_ms"]:>14}'
+                f'{row["serializer_rows_per_s"]:>17}{row["values_rows_per_s"]:>19}{"x" + str(row["speedup"]):>11}'
+            )
+        self.stdout.write(self.style.SUCCESS('✓ Замер завершен'))
@@ -0,0 +1,38 @@
+"""
+Сравнение JSON renderer'ов: стандартный JSONRenderer DRF и FastJSONRenderer (core.renderers)
+на данных отчета P&L и списка начислений. Удобно запускать на синтетическом портфеле.
+
+Использование:
+  python manage.py benchmark_renderers
+  python manage.py benchmark_renderers --repeat 20
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import benchmark_renderers
+from core.management.commands.generate_synthetic_portfolio import synthetic_username
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость стандартного и быстрого JSON renderer на больших ответах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Количество прогонов (берется лучший)')
+
+    def handle(self, *args, **options):
+        user = (
+            User.objects.filter(username=synthetic_username('admin')).first()
+            or User.objects.filter(role='admin', is_active=True).order_by('id').first()
+        )
+        if not user:
+            raise CommandError('Нет пользователя с ролью admin. Запустите generate_synthetic_portfolio')
+
+        self.stdout.write(f'{"Эндпоинт":<28}{"Байт":>10}{"JSONRenderer мс":>18}{"FastJSON мс":>14}{"Ускорение":>11}')
+        for row in benchmark_renderers(user, repeat=options['repeat']):
+            self.stdout.write(
+                f'{row["endpoint"]:<28}{row["bytes"]:>10}{row["standard_ms"]:>18}'
+                f'{row["fast_ms"]:>14}{"x" + str(row["speedup"]):>11}'
+            )
+        self.stdout.write(self.style.SUCCESS('✓ Замер завершен'))
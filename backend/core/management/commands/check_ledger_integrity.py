@@ -0,0 +1,66 @@
+"""
+Сверка денормализованных сумм с первичными записями: оплачено и остаток начислений
+(PaymentAllocation), распределено по платежам, балансы депозитов (DepositMovement)
+и счетов (AccountTransaction), журнал расчетов (LedgerEntry).
+Каждая проверка — один запрос, исправление — пакетные UPDATE.
+
+Использование:
+  python manage.py check_ledger_integrity
+  python manage.py check_ledger_integrity --check accruals --check payments
+  python manage.py check_ledger_integrity --fix
+"""
+from django.core.management.base import BaseCommand
+
+from core.integrity import CHECKS, LedgerIntegrityService
+
+CHECK_TITLES = {
+    'accruals': 'Начисления',
+    'payments': 'Платежи',
+    'deposits': 'Депозиты',
+    'accounts': 'Счета',
+    'journal': 'Журнал расчетов',
+}
+
+
+class Command(BaseCommand):
+    help = 'Сверяет производные суммы (оплачено, остатки, балансы) с первичными записями'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='append',
+            dest='checks',
+            choices=CHECKS,
+            help='Выполнить только указанную проверку (можно указать несколько раз)',
+        )
+        parser.add_argument('--fix', action='store_true', help='Исправить расхождения по первичным записям')
+        parser.add_argument('--limit', type=int, default=20, help='Сколько расхождений выводить по каждой проверке')
+
+    def handle(self, *args, **options):
+        if options['fix']:
+            drift = LedgerIntegrityService.repair(options['checks'])
+        else:
+            drift = LedgerIntegrityService.check(options['checks'])
+
+        total = 0
+        for name, rows in drift.items():
+            objects = len({row['id'] for row in rows})
+            total += objects
+            if not rows:
+                self.stdout.write(self.style.SUCCESS(f'✓ {CHECK_TITLES[name]}: расхождений нет'))
+                continue
+            self.stdout.write(self.style.WARNING(f'⚠ {CHECK_TITLES[name]}: записей с расхождением {objects}'))
+            for row in rows[:options['limit']]:
+                self.stdout.write(
+                    f'  #{row["id"]} {row["label"]}: {row["field"]} = {row["stored"]}, '
+                    f'должно быть {row["expected"]}'
+                )
+            if len(rows) > options['limit']:
+                self.stdout.write(f'  ... и еще {len(rows) - options["limit"]}')
+
+        if not total:
+            return
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'\n✓ Исправлено записей: {total}'))
+        else:
+            self.stdout.write(self.style.WARNING(f'\nЗаписей с расхождением: {total}. Для исправления запустите с --fix'))
@@ -0,0 +1,22 @@
+"""
+Создание индексов поиска (pg_trgm), если при миграции расширение было недоступно —
+например, пакет postgresql-contrib поставили позже.
+
+Использование:
+  python manage.py ensure_search_indexes
+"""
+from django.core.management.base import BaseCommand
+
+from core.search import TRIGRAM_INDEXES, create_trigram_indexes
+
+
+class Command(BaseCommand):
+    help = 'Включает pg_trgm и создает GIN-индексы для поиска по контрагентам, объектам и договорам'
+
+    def handle(self, *args, **options):
+        if not create_trigram_indexes():
+            self.stdout.write(self.style.WARNING(
+                '⚠ Расширение pg_trgm недоступно: установите postgresql-contrib и повторите'
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(f'✓ Индексов поиска: {len(TRIGRAM_INDEXES)}'))
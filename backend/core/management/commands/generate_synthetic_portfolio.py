@@ -0,0 +1,320 @@
+"""
+Генерация синтетического портфеля для нагрузочных проверок и бенчмарков.
+Создает объекты, контрагентов, договоры за несколько лет с начислениями, платежами,
+расходами, назначениями сотрудников и связями инвесторов. При одинаковых параметрах
+(--seed, --start) данные получаются одинаковыми.
+
+Все записи помечаются префиксом SYN, пользователи — syn_<роль> (пароль synthetic),
+поэтому их можно удалить через --clear, не затрагивая реальные данные.
+
+Использование:
+  python manage.py generate_synthetic_portfolio
+  python manage.py generate_synthetic_portfolio --properties 2000 --tenants 1500 --contracts 3000 --years 5
+  python manage.py generate_synthetic_portfolio --clear --only-clear
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import Account, AccountTransaction
+from accounts.services import AccountService
+from account.models import Expense
+from accruals.journal import LedgerJournalService
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import InvestorLink, StaffAssignment, Tenant
+from payments.models import Payment, PaymentAllocation
+from properties.models import Property
+
+User = get_user_model()
+
+MARKER = 'SYN'
+BATCH_SIZE = 1000
+SYNTHETIC_PASSWORD = 'synthetic'
+SYNTHETIC_ROLES = ('admin', 'staff', 'tenant', 'landlord', 'investor')
+
+
+def synthetic_username(role):
+    """Имя пользователя синтетического портфеля для роли"""
+    return f'syn_{role}'
+
+
+class Command(BaseCommand):
+    help = 'Генерирует детерминированный синтетический портфель (объекты, договоры, начисления, платежи)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=200, help='Количество объектов')
+        parser.add_argument('--tenants', type=int, default=150, help='Количество арендаторов')
+        parser.add_argument('--contracts', type=int, default=300, help='Количество договоров')
+        parser.add_argument('--years', type=int, default=3, help='Глубина истории в годах')
+        parser.add_argument('--seed', type=int, default=42, help='Seed генератора случайных чисел')
+        parser.add_argument(
+            '--start',
+            help='Дата начала истории YYYY-MM-DD (по умолчанию 1 января, years-1 лет назад)',
+        )
+        parser.add_argument('--clear', action='store_true', help='Удалить ранее сгенерированные данные')
+        parser.add_argument('--only-clear', action='store_true', help='Только удалить, не генерировать')
+
+    def handle(self, *args, **options):
+        today = date.today()
+        years = max(options['years'], 1)
+        if options['start']:
+            try:
+                start = date.fromisoformat(options['start'])
+            except ValueError:
+                raise CommandError('Неверный формат --start. Используйте YYYY-MM-DD')
+        else:
+            start = date(today.year - years + 1, 1, 1)
+
+        if options['clear'] or options['only_clear']:
+            self._clear()
+            self.stdout.write(self.style.SUCCESS('✓ Синтетические данные удалены'))
+            if options['only_clear']:
+                return
+
+        if Property.objects.filter(name__startswith=f'{MARKER} ').exists():
+            raise CommandError('Синтетический портфель уже есть. Запустите с --clear, чтобы пересоздать')
+
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            counts = self._generate(
+                rng,
+                properties_count=max(options['properties'], 1),
+                tenants_count=max(options['tenants'], 1),
+                contracts_count=max(options['contracts'], 1),
+                start=start,
+                end=start + relativedelta(years=years) - timedelta(days=1),
+                today=today,
+            )
+
+        for label, value in counts.items():
+            self.stdout.write(f'  {label}: {value}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Синтетический портфель создан. Пользователи: '
+            f'{", ".join(synthetic_username(r) for r in SYNTHETIC_ROLES)} (пароль {SYNTHETIC_PASSWORD})'
+        ))
+
+    @transaction.atomic
+    def _clear(self):
+        contracts = Contract.objects.filter(number__startswith=f'{MARKER}-')
+        AccountTransaction.objects.filter(account__name__startswith=f'{MARKER} ').delete()
+        Payment.objects.filter(contract__in=contracts).delete()
+        Expense.objects.filter(comment__startswith=MARKER).delete()
+        contracts.delete()
+        Account.objects.filter(name__startswith=f'{MARKER} ').delete()
+        User.objects.filter(username__in=[synthetic_username(r) for r in SYNTHETIC_ROLES]).delete()
+        Property.objects.filter(name__startswith=f'{MARKER} ').delete()
+        Tenant.objects.filter(name__startswith=f'{MARKER} ').delete()
+
+    def _generate(self, rng, properties_count, tenants_count, contracts_count, start, end, today):
+        # Объекты
+        property_types = [choice for choice, _ in Property.PROPERTY_TYPE_CHOICES]
+        properties = Property.objects.bulk_create([
+            Property(
+                name=f'{MARKER} Объект {i:05d}',
+                property_type=rng.choice(property_types),
+                address=f'{MARKER} ул. Синтетическая, {i // 20 + 1}',
+                area=Decimal(rng.randint(15, 400)),
+                block_floor_room=f'каб {i % 20 + 1}',
+                owner=f'{MARKER} Владелец {i % 10}',
+            )
+            for i in range(properties_count)
+        ], batch_size=BATCH_SIZE)
+
+        # Контрагенты: арендаторы, арендодатели и инвесторы
+        def counterparties(kind, label, count, code):
+            return Tenant.objects.bulk_create([
+                Tenant(
+                    name=f'{MARKER} {label} {i:05d}',
+                    type=kind,
+                    phone=f'+99{code}{i:07d}',
+                    email=f'syn.{kind}.{i}@example.com',
+                )
+                for i in range(count)
+            ], batch_size=BATCH_SIZE)
+
+        tenants = counterparties('tenant', 'Арендатор', tenants_count, 1)
+        landlords = counterparties('landlord', 'Арендодатель', max(tenants_count // 20, 1), 2)
+        investors = counterparties('investor', 'Инвестор', max(tenants_count // 50, 1), 3)
+
+        accounts = {
+            currency: Account.objects.create(
+                name=f'{MARKER} Счет {currency}', account_type='bank', currency=currency,
+            )
+            for currency in ('KGS', 'USD')
+        }
+
+        # Договоры: объекты назначаются по кругу, чтобы договоры по одному объекту не пересекались
+        contracts = []
+        months_total = (end.year - start.year) * 12 + end.month - start.month + 1
+        for i in range(contracts_count):
+            contract_start = start + relativedelta(months=rng.randrange(months_total))
+            contract_end = min(contract_start + relativedelta(months=rng.randint(6, 24)) - timedelta(days=1), end)
+            currency = 'USD' if rng.random() < 0.2 else 'KGS'
+            rent = Decimal(rng.randint(1, 60) * (50 if currency == 'USD' else 5000))
+            contracts.append(Contract(
+                number=f'{MARKER}-{i:06d}',
+                signed_at=contract_start - timedelta(days=rng.randint(1, 20)),
+                property=properties[i % properties_count],
+                tenant=rng.choice(tenants),
+                landlord=rng.choice(landlords),
+                start_date=contract_start,
+                end_date=contract_end,
+                rent_amount=rent,
+                currency=currency,
+                due_day=rng.choice((1, 5, 10, 25)),
+                status='active' if contract_end >= today else 'ended',
+            ))
+        contracts = Contract.objects.bulk_create(contracts, batch_size=BATCH_SIZE)
+
+        # Начисления помесячно; прошедшие в основном оплачены
+        accruals = []
+        paid_parts = []
+        for contract in contracts:
+            period_start = contract.start_date
+            while period_start <= contract.end_date:
+                period_end = min(period_start + relativedelta(months=1) - timedelta(days=1), contract.end_date)
+                due_date = period_start.replace(day=min(contract.due_day, 28))
+                amount = contract.rent_amount
+                paid = Decimal('0')
+                if due_date < today:
+                    roll = rng.random()
+                    if roll < 0.8:
+                        paid = amount
+                    elif roll < 0.9:
+                        paid = (amount / 2).quantize(Decimal('0.01'))
+                balance = amount - paid
+                if balance <= 0:
+                    status = 'paid'
+                elif due_date < today:
+                    status = 'overdue'
+                elif paid > 0:
+                    status = 'partial'
+                else:
+                    status = 'planned'
+                accruals.append(Accrual(
+                    contract=contract,
+                    period_start=period_start,
+                    period_end=period_end,
+                    due_date=due_date,
+                    base_amount=amount,
+                    final_amount=amount,
+                    paid_amount=paid,
+                    balance=balance,
+                    status=status,
+                ))
+                paid_parts.append(paid)
+                period_start += relativedelta(months=1)
+        accruals = Accrual.objects.bulk_create(accruals, batch_size=BATCH_SIZE)
+
+        # Платежи с распределением на оплаченные начисления
+        payments = []
+        paid_accruals = []
+        for accrual, paid in zip(accruals, paid_parts):
+            if paid <= 0:
+                continue
+            payments.append(Payment(
+                contract=accrual.contract,
+                account=accounts[accrual.contract.currency],
+                amount=paid,
+                payment_date=min(accrual.due_date + timedelta(days=rng.randint(-5, 10)), today),
+                allocated_amount=paid,
+                comment=MARKER,
+            ))
+            paid_accruals.append(accrual)
+        payments = Payment.objects.bulk_create(payments, batch_size=BATCH_SIZE)
+        PaymentAllocation.objects.bulk_create([
+            PaymentAllocation(payment=payment, accrual=accrual, amount=payment.amount)
+            for payment, accrual in zip(payments, paid_accruals)
+        ], batch_size=BATCH_SIZE)
+        # Журнал расчетов: начисления и оплаты (bulk_create обходит сигналы)
+        LedgerJournalService.sync([accrual.pk for accrual in accruals])
+
+        # Расходы по объектам
+        expense_categories = ['utilities', 'repair', 'service', 'salary', 'transport']
+        expenses = []
+        for month in range(months_total):
+            month_start = start + relativedelta(months=month)
+            if month_start > today:
+                break
+            for prop in rng.sample(properties, max(len(properties) // 10, 1)):
+                expenses.append(Expense(
+                    date=month_start + timedelta(days=rng.randint(0, 27)),
+                    category=rng.choice(expense_categories),
+                    amount=Decimal(rng.randint(1, 50) * 500),
+                    recipient=f'{MARKER} Подрядчик',
+                    property=prop,
+                    comment=MARKER,
+                ))
+        expenses = Expense.objects.bulk_create(expenses, batch_size=BATCH_SIZE)
+
+        # Движения по счетам: поступления по платежам и расходы; баланс пересчитывается из операций
+        transactions = [
+            AccountTransaction(
+                account=payment.account,
+                transaction_type='income',
+                amount=payment.amount,
+                transaction_date=payment.payment_date,
+                related_payment=payment,
+                comment=MARKER,
+            )
+            for payment in payments
+        ]
+        transactions += [
+            AccountTransaction(
+                account=accounts['KGS'],
+                transaction_type='expense',
+                amount=expense.amount,
+                transaction_date=expense.date,
+                related_expense=expense,
+                comment=MARKER,
+            )
+            for expense in expenses
+        ]
+        AccountTransaction.objects.bulk_create(transactions, batch_size=BATCH_SIZE)
+        AccountService.reconcile_balances([account.pk for account in accounts.values()])
+
+        # Пользователи по ролям с назначениями и связями инвесторов
+        counterparty_by_role = {'tenant': tenants[0], 'landlord': landlords[0], 'investor': investors[0]}
+        users = {}
+        for role in SYNTHETIC_ROLES:
+            user = User(
+                username=synthetic_username(role),
+                role=role,
+                counterparty=counterparty_by_role.get(role),
+                is_staff=role == 'admin',
+            )
+            user.set_password(SYNTHETIC_PASSWORD)
+            user.save()
+            users[role] = user
+
+        assigned = rng.sample(properties, max(len(properties) // 10, 1))
+        StaffAssignment.objects.bulk_create(
+            [StaffAssignment(staff=users['staff'], property=prop) for prop in assigned],
+            batch_size=BATCH_SIZE,
+        )
+        links = []
+        for investor in investors:
+            for prop in rng.sample(properties, max(len(properties) // 20, 1)):
+                links.append(InvestorLink(
+                    investor=investor,
+                    property=prop,
+                    share=Decimal(rng.choice((10, 25, 50, 100))),
+                ))
+        InvestorLink.objects.bulk_create(links, batch_size=BATCH_SIZE)
+
+        return {
+            'Объекты': len(properties),
+            'Контрагенты': len(tenants) + len(landlords) + len(investors),
+            'Договоры': len(contracts),
+            'Начисления': len(accruals),
+            'Платежи': len(payments),
+            'Расходы': len(expenses),
+            'Назначения сотрудника': len(assigned),
+            'Связи инвесторов': len(links),
+        }
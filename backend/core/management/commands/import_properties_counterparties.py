@@ -237,6 +237,8 @@ class Command(BaseCommand):
             m = re.search(r'каб\s*(\d+)', block, re.I)
             if m:
                 room_to_prop[int(m.group(1))] = props_by_key.get((p["address"], block))
+        # Сначала отбираем новые договоры, затем резервируем номера для всех одним вызовом
+        pending = []
         for c in CONTRACTS_SHEVCHENKO4:
             room = c.get("room")
             prop = room_to_prop.get(room) if room else None
@@ -250,28 +252,30 @@ class Command(BaseCommand):
             end = parse_date(c.get("end"))
             if not signed or not start or not end:
                 continue
+            if Contract.objects.filter(property=prop, tenant=tenant, start_date=start).exists():
+                continue
             deposit_amount = parse_decimal(c.get("deposit"), Decimal("0"))
             due_day = c.get("due_day") or 5
-            number = ContractService.generate_contract_number()
-            _, created = Contract.objects.get_or_create(
+            pending.append(Contract(
                 property=prop,
                 tenant=tenant,
                 start_date=start,
-                defaults={
-                    "number": number,
-                    "signed_at": signed,
-                    "end_date": end,
-                    "rent_amount": parse_decimal(PROPERTIES_DATA[room - 1].get("rent"), Decimal("0")) if room <= len(PROPERTIES_DATA) else Decimal("0"),
-                    "currency": "USD",
-                    "due_day": due_day,
-                    "deposit_enabled": deposit_amount > 0,
-                    "deposit_amount": deposit_amount,
-                    "status": "active",
-                    "landlord": landlord_ob,
-                }
-            )
-            if created:
-                self.stdout.write(f'  Договор: {number} — {prop.name} / {tenant.name}')
+                signed_at=signed,
+                end_date=end,
+                rent_amount=parse_decimal(PROPERTIES_DATA[room - 1].get("rent"), Decimal("0")) if room <= len(PROPERTIES_DATA) else Decimal("0"),
+                currency="USD",
+                due_day=due_day,
+                deposit_enabled=deposit_amount > 0,
+                deposit_amount=deposit_amount,
+                status="active",
+                landlord=landlord_ob,
+            ))
+
+        numbers = ContractService.reserve_contract_numbers(len(pending))
+        for contract, number in zip(pending, numbers):
+            contract.number = number
+            contract.save()
+            self.stdout.write(f'  Договор: {number} — {contract.property.name} / {contract.tenant.name}')
 
         # Итог
         from core.models import EMPLOYEE_TYPES
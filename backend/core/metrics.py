@@ -0,0 +1,264 @@
+"""
+Счетчики и гистограммы в памяти процесса с выводом в текстовом формате экспозиции
+(Prometheus text format 0.0.4).
+
+Значения обновляются в момент события (запрос, задача, OTP), поэтому отдача /api/metrics/
+не делает запросов к БД. Данные свои у каждого процесса.
+"""
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+# Границы гистограммы времени ответа (секунды)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name}: ожидаются метки {self.labelnames}, получены {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state['count'] if state else 0
+
+    def _render_samples(self, items):
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state['buckets']):
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(round(state["sum"], 6))}')
+            lines.append(f'{self.name}_count{labels} {state["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Набор метрик процесса"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+# HTTP-запросы (пишет core.instrumentation.RequestMetricsMiddleware)
+http_requests_total = registry.register(Counter(
+    'amt_http_requests_total', 'Количество HTTP-запросов', ('endpoint', 'method', 'status'),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    'amt_http_request_duration_seconds', 'Время обработки HTTP-запроса', ('endpoint',),
+))
+
+# База данных
+db_queries_total = registry.register(Counter(
+    'amt_db_queries_total', 'Количество SQL-запросов', ('endpoint',),
+))
+db_query_seconds_total = registry.register(Counter(
+    'amt_db_query_seconds_total', 'Суммарное время SQL-запросов', ('endpoint',),
+))
+db_connections_opened_total = registry.register(Counter(
+    'amt_db_connections_opened_total', 'Количество открытых соединений с БД', ('alias',),
+))
+db_connections_open = registry.register(Gauge(
+    'amt_db_connections_open', 'Открытые соединения с БД в процессе', ('alias',),
+))
+
+# Кэш
+cache_requests_total = registry.register(Counter(
+    'amt_cache_requests_total', 'Обращения к кэшу (hit/miss)', ('cache', 'result'),
+))
+
+# Фоновые задачи
+job_runs_total = registry.register(Counter(
+    'amt_job_runs_total', 'Запуски задач', ('job', 'status'),
+))
+job_rows_total = registry.register(Counter(
+    'amt_job_rows_total', 'Строки, обработанные задачами', ('job',),
+))
+job_duration_seconds = registry.register(Histogram(
+    'amt_job_duration_seconds', 'Длительность задач', ('job',),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+))
+job_last_run_timestamp_seconds = registry.register(Gauge(
+    'amt_job_last_run_timestamp_seconds', 'Время последнего запуска задачи (unix)', ('job',),
+))
+
+# Вход по OTP через WhatsApp
+otp_sent_total = registry.register(Counter(
+    'amt_otp_sent_total', 'Отправка OTP-кодов', ('result',),
+))
+otp_verify_total = registry.register(Counter(
+    'amt_otp_verify_total', 'Проверка OTP-кодов', ('result',),
+))
+
+
+# Обертки соединений БД, открытых процессом (без обращения к БД при отдаче метрик)
+_connections = weakref.WeakSet()
+
+
+def on_connection_created(sender, connection, **kwargs):
+    """Обработчик сигнала connection_created"""
+    db_connections_opened_total.inc(alias=connection.alias)
+    _connections.add(connection)
+
+
+def refresh_connection_gauge():
+    """Пересчитать число открытых соединений по всем потокам процесса"""
+    counts = {}
+    for wrapper in list(_connections):
+        if wrapper.connection is not None:
+            counts[wrapper.alias] = counts.get(wrapper.alias, 0) + 1
+    db_connections_open.reset()
+    for alias, count in counts.items():
+        db_connections_open.set(count, alias=alias)
+
+
+def record_cache_lookup(cache_name, hit):
+    """Учесть обращение к кэшу"""
+    cache_requests_total.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+
+class JobRun:
+    """Результат запуска задачи: rows — сколько строк обработано"""
+
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def track_job(name):
+    """
+    Учет запуска задачи: количество запусков по статусу, обработанные строки и длительность.
+        with track_job('update_accrual_statuses') as job:
+            job.rows = updated
+    """
+    job = JobRun()
+    started = time.perf_counter()
+    status = 'success'
+    try:
+        yield job
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        job_runs_total.inc(job=name, status=status)
+        job_rows_total.inc(job.rows, job=name)
+        job_duration_seconds.observe(time.perf_counter() - started, job=name)
+        job_last_run_timestamp_seconds.set(time.time(), job=name)
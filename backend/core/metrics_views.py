@@ -0,0 +1,38 @@
+"""
+Метрики производительности API (только для администратора).
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .instrumentation import request_metrics
+from .metrics import refresh_connection_gauge, registry
+from .permissions import IsAdmin
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def request_metrics_view(request):
+    """
+    Перцентили времени ответа, времени в БД и числа SQL-запросов по эндпоинтам
+    за последние REQUEST_METRICS_WINDOW запросов (данные текущего процесса).
+    """
+    return Response({
+        'window': request_metrics.window,
+        'slow_request_ms': getattr(settings, 'SLOW_REQUEST_MS', 1000),
+        'slow_request_queries': getattr(settings, 'SLOW_REQUEST_QUERIES', 100),
+        'endpoints': request_metrics.snapshot(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def metrics_view(request):
+    """
+    Метрики в текстовом формате экспозиции (Prometheus): запросы и их длительность по
+    эндпоинтам, SQL и соединения с БД, кэш, фоновые задачи, OTP. Без запросов к БД.
+    """
+    refresh_connection_gauge()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,27 @@
+# Generated manually: GIN-индексы pg_trgm для поиска (core.search)
+
+from django.db import migrations
+
+
+def create_indexes(apps, schema_editor):
+    """Без расширения pg_trgm на сервере — пропускается, индексы можно создать позже ensure_search_indexes"""
+    from core.search import create_trigram_indexes
+    create_trigram_indexes(schema_editor)
+
+
+def drop_indexes(apps, schema_editor):
+    from core.search import drop_trigram_indexes
+    drop_trigram_indexes(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_uploadsession'),
+        ('contracts', '0008_contractfile_preview'),
+        ('properties', '0002_property_in_collateral'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
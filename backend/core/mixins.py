@@ -1,8 +1,12 @@
 """
 Mixin классы для data scoping и RBAC
 """
+from decimal import Decimal
+
 from django.db.models import Q
 from rest_framework.exceptions import PermissionDenied, NotFound
+from rest_framework.response import Response
+from core.conditional import ConditionalGet
 from core.models import InvestorLink, StaffAssignment
 from contracts.models import Contract
 
@@ -430,3 +434,54 @@ class DataScopingMixin:
         return obj
 
         return obj
+
+
+class ValuesListMixin:
+    """
+    Быстрый list(): строки выбираются через .values() только с нужными колонками
+    (поля связанных моделей — через выражения F('contract__number')) и отдаются
+    плоскими словарями без экземпляров моделей и сериализатора.
+    Формат ответа совпадает с list-сериализатором ViewSet (суммы — строками, как DecimalField).
+
+    list_values — поля модели, list_value_expressions — {имя в ответе: выражение},
+    вычисляемые поля дополняются в transform_list_rows.
+    """
+    list_values = ()
+    list_value_expressions = {}
+
+    def list_rows(self, queryset):
+        """Словари строк для queryset (после фильтров, до пагинации)"""
+        return queryset.prefetch_related(None).values(*self.list_values, **self.list_value_expressions)
+
+    def transform_list_rows(self, rows):
+        return rows
+
+    def list_data(self, rows):
+        """Готовые для ответа строки: вычисляемые поля и Decimal → str"""
+        rows = self.transform_list_rows(rows)
+        for row in rows:
+            for key, value in row.items():
+                if type(value) is Decimal:
+                    row[key] = str(value)
+        return rows
+
+    def list(self, request, *args, **kwargs):
+        rows = self.list_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.list_data(list(page)))
+        return Response(self.list_data(list(rows)))
+
+
+class ConditionalListMixin:
+    """
+    list() с ETag / Last-Modified (core.conditional): если строки списка (и связанные
+    таблицы из conditional_fields) не менялись — 304 без сериализации.
+    """
+    conditional_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        conditional = ConditionalGet(request).add_queryset(
+            self.filter_queryset(self.get_queryset()), self.conditional_fields,
+        )
+        return conditional.respond(lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs))
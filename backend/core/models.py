@@ -159,6 +159,7 @@ class ExchangeRate(models.Model):
     source = models.CharField(max_length=20, choices=RATE_SOURCE_CHOICES, default='nbkr', verbose_name='Источник')
     date = models.DateField(verbose_name='Дата')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'exchange_rates'
@@ -468,3 +469,40 @@ class AuditLog(models.Model):
 
     def __str__(self):
         return f"{self.get_action_display()} — {self.target_repr or self.target_id} ({self.created_at})"
+
+
+class UploadSession(models.Model):
+    """
+    Загрузка файла частями с докачкой (core.uploads): клиент отправляет части по смещению,
+    после последней файл попадает в хранилище по содержимому (stored_name).
+    """
+    STATUS_CHOICES = [
+        ('uploading', 'Загружается'),
+        ('complete', 'Загружен'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name='Пользователь'
+    )
+    filename = models.CharField(max_length=255, verbose_name='Имя файла')
+    size = models.BigIntegerField(verbose_name='Размер, байт')
+    expected_sha256 = models.CharField(max_length=64, blank=True, verbose_name='Ожидаемый SHA-256')
+    offset = models.BigIntegerField(default=0, verbose_name='Получено, байт')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading', verbose_name='Статус')
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name='SHA-256')
+    stored_name = models.CharField(max_length=255, blank=True, verbose_name='Файл в хранилище')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Обновлено')
+
+    class Meta:
+        db_table = 'upload_sessions'
+        verbose_name = 'Загрузка файла'
+        verbose_name_plural = 'Загрузки файлов'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
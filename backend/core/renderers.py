@@ -0,0 +1,57 @@
+"""
+Быстрые JSON renderer и parser для DRF на orjson.
+
+Формат ответа тот же, что у стандартного JSONRenderer: UTF-8 без экранирования, компактно,
+даты и datetime в ISO 8601 (UTC — с суффиксом Z), UUID строкой. Остальные типы (Decimal — числом,
+как у JSONRenderer; ленивые строки, QuerySet, timedelta и т.п.) — через JSONEncoder DRF.
+Если orjson не установлен, используется стандартная реализация DRF.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson в requirements.txt
+    orjson = None
+
+_drf_encoder = JSONEncoder()
+
+
+def dumps(data):
+    """Данные → JSON (bytes) в формате FastJSONRenderer"""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    return orjson.dumps(data, default=_drf_encoder.default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson; с отступами (browsable API) или UNICODE_JSON=False — стандартный путь DRF"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not getattr(settings, 'FAST_JSON_ENABLED', True):
+            return super().render(data, accepted_media_type, renderer_context)
+        indent = self.get_indent(accepted_media_type or '', renderer_context or {})
+        if indent or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson не экранирует U+2028/U+2029 — как и JSONRenderer при ensure_ascii=False, заменяем вручную
+        content = dumps(data)
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,140 @@
+"""
+Поиск по контрагентам, объектам и договорам.
+
+Поиск строится на тех же icontains, что и раньше (UPPER(поле) LIKE UPPER('%запрос%')), но под
+ними GIN-индексы pg_trgm по UPPER(поле) — PostgreSQL находит строки по индексу, а не перебором
+таблицы. Индексы (TRIGRAM_INDEXES) создает миграция core 0015 или команда ensure_search_indexes.
+Поиск начислений и платежей идет не через OR по трем JOIN, а через id подходящих договоров
+(contract_id IN (...)), которые находятся по индексам договоров, контрагентов и объектов.
+
+Единый поиск (/api/search/) ранжирует результаты: с pg_trgm — по word_similarity, без
+расширения (локальный PostgreSQL без contrib) — точное совпадение / начало / вхождение.
+"""
+import functools
+import logging
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+logger = logging.getLogger(__name__)
+
+# (таблица, колонка): GIN (UPPER(колонка::text) gin_trgm_ops)
+TRIGRAM_INDEXES = [
+    ('tenants', 'name'),
+    ('tenants', 'email'),
+    ('tenants', 'phone'),
+    ('tenants', 'contact_person'),
+    ('properties', 'name'),
+    ('properties', 'address'),
+    ('properties', 'block_floor_room'),
+    ('contracts', 'number'),
+]
+
+TENANT_SEARCH_FIELDS = ['name', 'email', 'phone', 'contact_person']
+PROPERTY_SEARCH_FIELDS = ['name', 'address', 'block_floor_room']
+CONTRACT_SEARCH_FIELDS = ['number']
+
+
+def trigram_index_name(table, column):
+    return f'{table}_{column}_trgm'
+
+
+def create_trigram_indexes(schema_editor=None):
+    """
+    Включить pg_trgm и создать индексы. Если расширение не установлено на сервере
+    (нет пакета postgresql-contrib), ничего не делает и возвращает False — поиск работает без индексов.
+    """
+    conn = schema_editor.connection if schema_editor is not None else connection
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning('Расширение pg_trgm недоступно: индексы поиска не созданы')
+            return False
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in TRIGRAM_INDEXES:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {trigram_index_name(table, column)} '
+                f'ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)'
+            )
+    _extension_installed.cache_clear()
+    return True
+
+
+def drop_trigram_indexes(schema_editor=None):
+    conn = schema_editor.connection if schema_editor is not None else connection
+    with conn.cursor() as cursor:
+        for table, column in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {trigram_index_name(table, column)}')
+
+
+@functools.lru_cache(maxsize=None)
+def _extension_installed(database):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def trigram_enabled():
+    """Установлено ли pg_trgm в текущей БД (проверяется один раз на процесс)"""
+    return _extension_installed(connection.settings_dict['NAME'])
+
+
+def search_q(fields, term, prefix=''):
+    query = Q()
+    for field in fields:
+        query |= Q(**{f'{prefix}{field}__icontains': term})
+    return query
+
+
+def matching_property_ids(term):
+    from properties.models import Property
+    return Property.objects.filter(search_q(PROPERTY_SEARCH_FIELDS, term)).values('id')
+
+
+def matching_contract_ids(term):
+    """Договоры по номеру, названию контрагента или названию/адресу объекта — каждый по своему индексу"""
+    from contracts.models import Contract
+    from core.models import Tenant
+    return Contract.objects.filter(
+        Q(number__icontains=term)
+        | Q(tenant_id__in=Tenant.objects.filter(name__icontains=term).values('id'))
+        | Q(property_id__in=matching_property_ids(term))
+    ).values('id')
+
+
+def rank_expression(fields, term):
+    """Релевантность 0..1 по лучшему из полей"""
+    if trigram_enabled():
+        parts = [TrigramWordSimilarity(term, field) for field in fields]
+    else:
+        parts = [
+            Case(
+                When(**{f'{field}__iexact': term}, then=Value(1.0)),
+                When(**{f'{field}__istartswith': term}, then=Value(0.7)),
+                When(**{f'{field}__icontains': term}, then=Value(0.4)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+            for field in fields
+        ]
+    return parts[0] if len(parts) == 1 else Greatest(*parts)
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter для списков, связанных с договором (начисления, платежи, сами договоры):
+    каждое слово запроса ищется через matching_contract_ids, а не OR по JOIN.
+    Поле, по которому фильтровать, — search_contract_lookup у view ('contract_id' или 'id').
+    Без search_contract_lookup — обычный SearchFilter по search_fields.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        lookup = getattr(view, 'search_contract_lookup', None)
+        if lookup is None:
+            return super().filter_queryset(request, queryset, view)
+        for term in self.get_search_terms(request):
+            queryset = queryset.filter(**{f'{lookup}__in': matching_contract_ids(term)})
+        return queryset
@@ -0,0 +1,99 @@
+"""
+Единый поиск: GET /api/search/?q=...&types=contracts,tenants,properties&limit=10
+
+Ответ — общий список, отсортированный по релевантности (rank 0..1), с учетом прав:
+каждый тип ограничивается так же, как в своем списке (DataScopingMixin).
+"""
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from contracts.models import Contract
+from properties.models import Property
+from .mixins import DataScopingMixin
+from .models import Tenant, EMPLOYEE_TYPES
+from .search import (
+    PROPERTY_SEARCH_FIELDS, TENANT_SEARCH_FIELDS, matching_contract_ids, rank_expression, search_q,
+)
+
+SEARCH_TYPES = ('contracts', 'tenants', 'properties')
+MIN_QUERY_LENGTH = 2
+MAX_LIMIT = 50
+
+
+class GlobalSearchView(DataScopingMixin, APIView):
+    """Поиск договоров, контрагентов и объектов одной строкой"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = (request.query_params.get('q') or '').strip()
+        if len(query) < MIN_QUERY_LENGTH:
+            return Response(
+                {'error': f'Введите не меньше {MIN_QUERY_LENGTH} символов'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        types = [t for t in (request.query_params.get('types') or '').split(',') if t in SEARCH_TYPES]
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), MAX_LIMIT)
+        except ValueError:
+            limit = 10
+
+        results = []
+        for search_type in types or SEARCH_TYPES:
+            results.extend(getattr(self, f'_search_{search_type}')(request.user, query, limit))
+        results.sort(key=lambda item: -item['rank'])
+        return Response({'query': query, 'count': len(results), 'results': results[:limit]})
+
+    def _search_contracts(self, user, query, limit):
+        contracts = self._scope_for_user(Contract.objects.all(), user, 'Contract').filter(
+            id__in=matching_contract_ids(query)
+        ).annotate(rank=rank_expression(['number', 'tenant__name', 'property__name'], query))
+        rows = contracts.order_by('-rank', '-start_date').values(
+            'id', 'number', 'status', 'tenant__name', 'property__name', 'rank',
+        )[:limit]
+        return [
+            {
+                'type': 'contract',
+                'id': row['id'],
+                'title': row['number'],
+                'subtitle': ' · '.join(filter(None, [row['tenant__name'], row['property__name']])),
+                'status': row['status'],
+                'rank': round(row['rank'], 3),
+            }
+            for row in rows
+        ]
+
+    def _search_tenants(self, user, query, limit):
+        tenants = self._scope_for_user(Tenant.objects.exclude(type__in=EMPLOYEE_TYPES), user, 'Tenant').filter(
+            search_q(TENANT_SEARCH_FIELDS, query)
+        ).annotate(rank=rank_expression(TENANT_SEARCH_FIELDS, query))
+        rows = tenants.order_by('-rank', 'name').values('id', 'name', 'type', 'phone', 'contact_person', 'rank')[:limit]
+        return [
+            {
+                'type': 'tenant',
+                'id': row['id'],
+                'title': row['name'],
+                'subtitle': ' · '.join(filter(None, [row['contact_person'], row['phone']])),
+                'status': row['type'],
+                'rank': round(row['rank'], 3),
+            }
+            for row in rows
+        ]
+
+    def _search_properties(self, user, query, limit):
+        properties = self._scope_for_user(Property.objects.all(), user, 'Property').filter(
+            search_q(PROPERTY_SEARCH_FIELDS, query)
+        ).annotate(rank=rank_expression(PROPERTY_SEARCH_FIELDS, query))
+        rows = properties.order_by('-rank', 'name').values('id', 'name', 'address', 'status', 'rank')[:limit]
+        return [
+            {
+                'type': 'property',
+                'id': row['id'],
+                'title': row['name'],
+                'subtitle': row['address'],
+                'status': row['status'],
+                'rank': round(row['rank'], 3),
+            }
+            for row in rows
+        ]
@@ -1,9 +1,14 @@
+import logging
 import requests
 from bs4 import BeautifulSoup
 from decimal import Decimal
 from datetime import date
+from .currency import DEFAULT_RATES
+from .metrics import track_job
 from .models import ExchangeRate
 
+logger = logging.getLogger(__name__)
+
 
 class ExchangeRateService:
     """Сервис для получения курсов валют с valuta.kg"""
@@ -77,23 +82,25 @@ class ExchangeRateService:
             return rates
             
         except Exception as e:
-            print(f"Error fetching rates from valuta.kg: {e}")
+            logger.error("Error fetching rates from valuta.kg: %s", e)
             return {}
     
     @staticmethod
     def update_rates():
         """Обновляет курсы валют в базе данных"""
-        rates = ExchangeRateService.fetch_rates_from_valuta_kg()
-        today = date.today()
-        
-        for currency, rate_data in rates.items():
-            for source, rate_value in rate_data.items():
-                ExchangeRate.objects.update_or_create(
-                    currency=currency,
-                    source=source,
-                    date=today,
-                    defaults={'rate': rate_value}
-                )
+        with track_job('update_exchange_rates') as job:
+            rates = ExchangeRateService.fetch_rates_from_valuta_kg()
+            today = date.today()
+            
+            for currency, rate_data in rates.items():
+                for source, rate_value in rate_data.items():
+                    ExchangeRate.objects.update_or_create(
+                        currency=currency,
+                        source=source,
+                        date=today,
+                        defaults={'rate': rate_value}
+                    )
+                    job.rows += 1
         
         return rates
     
@@ -120,12 +127,7 @@ class ExchangeRateService:
                 return rate_obj.rate
             except ExchangeRate.DoesNotExist:
                 # Возвращаем примерный курс, если не удалось получить
-                default_rates = {
-                    'USD': Decimal('87.50'),
-                    'EUR': Decimal('101.60'),
-                    'RUB': Decimal('1.120'),
-                }
-                return default_rates.get(currency, Decimal('1'))
+                return DEFAULT_RATES.get(currency, Decimal('1'))
     
     @staticmethod
     def convert_to_kgs(amount: Decimal, currency: str, source: str = 'nbkr') -> Decimal:
@@ -0,0 +1,104 @@
+"""
+Тесты аутентификации по токену с кэшем
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import issue_token
+from core.models import Tenant, User
+
+
+class CachedTokenAuthTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.counterparty = Tenant.objects.create(name='Арендатор Кэш', type='tenant', phone='+996555100200')
+        self.user = User.objects.create_user(
+            username='cached_user', password='secret1', role='tenant', counterparty=self.counterparty,
+        )
+        self.token = issue_token(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def _auth_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in queries if 'authtoken_token' in q['sql']]
+
+    def test_second_request_served_from_cache(self):
+        _, first = self._auth_queries()
+        response, second = self._auth_queries()
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+        self.assertEqual(response.data['counterparty']['name'], 'Арендатор Кэш')
+
+    def test_role_change_invalidates_cache(self):
+        self._auth_queries()
+        self.user.role = 'investor'
+        self.user.save()
+
+        response, queries = self._auth_queries()
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data['role'], 'investor')
+
+    def test_counterparty_change_invalidates_cache(self):
+        self._auth_queries()
+        self.counterparty.name = 'Арендатор Новый'
+        self.counterparty.save()
+
+        response, _ = self._auth_queries()
+
+        self.assertEqual(response.data['counterparty']['name'], 'Арендатор Новый')
+
+    def test_logout_revokes_cached_token(self):
+        self._auth_queries()
+        self.assertEqual(self.client.post('/api/auth/logout/').status_code, 204)
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+
+    def test_deactivated_user_rejected(self):
+        self._auth_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+
+    def test_change_password_rotates_token(self):
+        self._auth_queries()
+        response = self.client.post(
+            '/api/auth/change-password/', {'current_password': 'secret1', 'new_password': 'secret2'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        new_key = response.data['token']
+        self.assertNotEqual(new_key, self.token.key)
+
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {new_key}')
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 200)
+
+    def test_refresh_rotates_token(self):
+        response = self.client.post('/api/auth/token/refresh/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertTrue(Token.objects.filter(key=response.data['token'], user=self.user).exists())
+
+    @override_settings(AUTH_TOKEN_TTL_DAYS=30)
+    def test_expired_token_rejected_and_reissued_on_login(self):
+        self._auth_queries()
+        Token.objects.filter(key=self.token.key).update(created=timezone.now() - timedelta(days=31))
+        cache.clear()
+
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+
+        response = APIClient().post('/api/auth/login/', {'username': 'cached_user', 'password': 'secret1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['token'], self.token.key)
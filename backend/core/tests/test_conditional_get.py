@@ -0,0 +1,103 @@
+"""
+Тесты условных GET (ETag / Last-Modified) для списков и дашборда
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import ExchangeRate, Tenant, User
+from properties.models import Property
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_etag', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.property = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('30'))
+        self.tenant = Tenant.objects.create(name='Арендатор', phone='+996555200300')
+        contract = Contract.objects.create(
+            number='ET-1', signed_at=date(2026, 1, 1), property=self.property, tenant=self.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        self.accrual = Accrual.objects.create(
+            contract=contract, period_start=date(2026, 3, 1), period_end=date(2026, 3, 31), due_date=date(2026, 3, 5),
+            base_amount=Decimal('1000.00'), final_amount=Decimal('1000.00'), balance=Decimal('1000.00'),
+        )
+
+    def _revalidate(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+        return first['ETag']
+
+    def test_unchanged_list_returns_304_without_serializing(self):
+        etag = self._revalidate('/api/properties/')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/properties/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(len(queries), 1)
+
+    def test_if_modified_since_returns_304(self):
+        first = self.client.get('/api/accruals/')
+        response = self.client.get('/api/accruals/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_change_invalidates_accrual_list(self):
+        etag = self._revalidate('/api/accruals/')
+        self.tenant.name = 'Арендатор (переименован)'
+        self.tenant.save()
+
+        response = self.client.get('/api/accruals/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['tenant_name'], 'Арендатор (переименован)')
+
+    def test_delete_and_filters_change_etag(self):
+        etag = self._revalidate('/api/properties/')
+        self.assertEqual(self.client.get('/api/properties/?search=нет', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        Property.objects.create(name='Второй', address='Адрес', property_type='office', area=Decimal('10'))
+        etag = self._revalidate('/api/properties/')
+        Property.objects.filter(name='Второй').delete()
+        self.assertEqual(self.client.get('/api/properties/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_differs_between_users(self):
+        etag = self._revalidate('/api/dashboard/stats/')
+        self.assertEqual(self.client.get('/api/dashboard/stats/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        other = User.objects.create_user(username='admin_etag_2', password='x', role='admin')
+        client = APIClient()
+        client.force_authenticate(other)
+        self.assertEqual(client.get('/api/dashboard/stats/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_dashboard_payment_invalidates(self):
+        etag = self._revalidate('/api/dashboard/stats/')
+        self.accrual.paid_amount = Decimal('400.00')
+        self.accrual.balance = Decimal('600.00')
+        self.accrual.save()
+        response = self.client.get('/api/dashboard/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['accruals']['paid'], '400.00')
+
+    def test_exchange_rates_current(self):
+        ExchangeRate.objects.create(currency='USD', rate=Decimal('87.5'), source='nbkr', date=date.today())
+        etag = self._revalidate('/api/exchange-rates/current/')
+        self.assertEqual(self.client.get('/api/exchange-rates/current/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ExchangeRate.objects.update_or_create(
+            currency='USD', source='nbkr', date=date.today(), defaults={'rate': Decimal('88.0')},
+        )
+        self.assertEqual(self.client.get('/api/exchange-rates/current/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
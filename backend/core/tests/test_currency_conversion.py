@@ -0,0 +1,102 @@
+"""
+Тесты пересчета в базовую валюту внутри агрегата: курс на дату, последний известный курс,
+самый ранний курс и справочный курс как запасные варианты, сводные суммы в отчетах
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.currency import ACCRUAL_RATE, converted, money_sum, round_money
+from core.models import ExchangeRate, Tenant, User
+from payments.models import Payment
+from properties.models import Property
+
+
+class CurrencyConversionTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_currency', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.prop = Property.objects.create(name='Офис', address='Адрес', property_type='office', area=Decimal('30'))
+        self.tenant = Tenant.objects.create(name='Арендатор', phone='+996555900200')
+        for rate, on_date in (('86', date(2026, 1, 1)), ('87', date(2026, 3, 1)), ('88', date(2026, 3, 10))):
+            ExchangeRate.objects.create(currency='USD', rate=Decimal(rate), source='nbkr', date=on_date)
+        ExchangeRate.objects.create(currency='EUR', rate=Decimal('100'), source='average', date=date(2026, 2, 1))
+
+        self.kgs = self._accrual('CC-KGS', 'KGS', Decimal('1000.00'), date(2026, 3, 5))
+        # 05.03 — последний известный курс USD от 01.03 (87), курс от 10.03 не применяется
+        self.usd = self._accrual('CC-USD', 'USD', Decimal('100.00'), date(2026, 3, 5))
+        # EUR: курсов на 10.01 еще нет — самый ранний известный (100) из источника договора
+        self.eur = self._accrual('CC-EUR', 'EUR', Decimal('10.00'), date(2026, 1, 10), source='average')
+        # RUB: курсов нет вовсе — справочный 1.12
+        self.rub = self._accrual('CC-RUB', 'RUB', Decimal('1000.00'), date(2026, 3, 5))
+
+    def _accrual(self, number, currency, amount, due_date, source='nbkr'):
+        contract = Contract.objects.create(
+            number=number, signed_at=date(2026, 1, 1), property=self.prop, tenant=self.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=amount,
+            currency=currency, exchange_rate_source=source, status='active',
+        )
+        return Accrual.objects.create(
+            contract=contract, period_start=due_date.replace(day=1), period_end=due_date.replace(day=28),
+            due_date=due_date, base_amount=amount, final_amount=amount, balance=amount,
+        )
+
+    def test_rate_fallbacks_in_one_query(self):
+        rows = dict(Accrual.objects.annotate(
+            kgs=converted('final_amount', *ACCRUAL_RATE),
+        ).values_list('contract__currency', 'kgs'))
+        self.assertEqual(
+            {currency: round_money(value) for currency, value in rows.items()},
+            {'KGS': Decimal('1000.00'), 'USD': Decimal('8700.00'), 'EUR': Decimal('1000.00'), 'RUB': Decimal('1120.00')},
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            totals = Accrual.objects.aggregate(
+                kgs=money_sum('final_amount', *ACCRUAL_RATE, base='KGS'),
+                usd=money_sum('final_amount', *ACCRUAL_RATE, base='USD'),
+                raw=money_sum('final_amount', *ACCRUAL_RATE),
+            )
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(round_money(totals['kgs']), Decimal('11820.00'))
+        self.assertEqual(totals['raw'], Decimal('2110.00'))
+        # В долларах: сумма USD без пересчета, остальное — через курс USD на ту же дату и из того же источника
+        expected_usd = (
+            Decimal('100') + Decimal('1000') / Decimal('87') + Decimal('1120') / Decimal('87')
+            + Decimal('1000') / Decimal('87.50')
+        )
+        self.assertEqual(round_money(totals['usd']), round_money(expected_usd))
+
+    def test_consolidated_report_totals(self):
+        account = Account.objects.create(name='Касса USD', account_type='cash', currency='USD')
+        Payment.objects.create(
+            contract=self.usd.contract, account=account, amount=Decimal('50.00'), payment_date=date(2026, 3, 10),
+        )
+        period = {'from': '2026-01-01', 'to': '2026-03-31'}
+
+        forecast = self.client.get('/api/forecast/calculate/', {**period, 'base_currency': 'kgs'})
+        self.assertEqual(forecast.status_code, 200)
+        self.assertEqual(forecast.data['base_currency'], 'KGS')
+        self.assertEqual(forecast.data['summary']['accrued'], '11820.00')
+        self.assertEqual(forecast.data['monthly']['2026-03']['received'], '4400.00')
+
+        pnl = self.client.get('/api/reports/profit_and_loss/', {**period, 'base_currency': 'KGS'})
+        self.assertEqual(pnl.status_code, 200)
+        self.assertEqual((pnl.data['summary']['revenue'], pnl.data['summary']['received']), ('11820.00', '4400.00'))
+
+        stats = self.client.get('/api/dashboard/stats/', {'base_currency': 'KGS'})
+        self.assertEqual(stats.status_code, 200)
+        self.assertEqual(stats.data['accruals']['total'], '11820.00')
+
+        # Без base_currency — прежние суммы без пересчета
+        self.assertEqual(self.client.get('/api/dashboard/stats/').data['accruals']['total'], '2110.00')
+        self.assertEqual(self.client.get('/api/forecast/calculate/', {'base_currency': 'GBP'}).status_code, 400)
@@ -0,0 +1,126 @@
+"""
+Тесты сверки производных сумм: расхождения находятся по первичным записям и исправляются пакетно
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import Account
+from accounts.services import AccountService
+from accruals.models import Accrual
+from contracts.models import Contract
+from contracts.services import ContractService
+from core.integrity import LedgerIntegrityService
+from core.models import Tenant
+from deposits.models import Deposit
+from deposits.services import DepositService
+from payments.models import Payment
+from payments.services import PaymentAllocationService
+from properties.models import Property
+
+
+class LedgerIntegrityTests(TestCase):
+
+    def setUp(self):
+        prop = Property.objects.create(name='Офис', address='Адрес', property_type='office', area=Decimal('30'))
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555400500')
+        self.contract = Contract.objects.create(
+            number='LI-1', signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        self.first = self._accrual(date(2026, 1, 1))
+        self.second = self._accrual(date(2026, 2, 1))
+        self.account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+        self.payment = Payment.objects.create(
+            contract=self.contract, account=self.account, amount=Decimal('1500.00'), payment_date=date(2026, 1, 10),
+        )
+        PaymentAllocationService.allocate_payment_fifo(self.payment)
+        AccountService.add_transaction(
+            account=self.account, transaction_type='income', amount=Decimal('1500.00'),
+            transaction_date=date(2026, 1, 10), related_payment=self.payment,
+        )
+        self.deposit = Deposit.objects.create(contract=self.contract, amount=Decimal('1000.00'))
+        DepositService.accept_deposit(self.deposit, Decimal('1000.00'))
+        DepositService.withdraw_deposit(self.deposit, Decimal('300.00'))
+
+    def _accrual(self, period_start):
+        return Accrual.objects.create(
+            contract=self.contract, period_start=period_start, period_end=period_start.replace(day=28),
+            due_date=period_start.replace(day=5), base_amount=Decimal('1000.00'),
+            final_amount=Decimal('1000.00'), balance=Decimal('1000.00'),
+        )
+
+    def test_consistent_ledger_has_no_drift(self):
+        drift = LedgerIntegrityService.check()
+        self.assertEqual(drift, {'accruals': [], 'payments': [], 'deposits': [], 'accounts': [], 'journal': []})
+
+    def test_drift_found_and_repaired(self):
+        # Расхождения, которые оставляют ручные правки полей в обход сервисов
+        Accrual.objects.filter(pk=self.first.pk).update(
+            paid_amount=Decimal('0'), balance=Decimal('1000.00'), status='overdue',
+        )
+        Accrual.objects.filter(pk=self.second.pk).update(utilities_amount=Decimal('200.00'))
+        Payment.objects.filter(pk=self.payment.pk).update(allocated_amount=Decimal('0'))
+        Deposit.objects.filter(pk=self.deposit.pk).update(balance=Decimal('1000.00'))
+        Account.objects.filter(pk=self.account.pk).update(balance=Decimal('99.00'))
+
+        drift = LedgerIntegrityService.check()
+        self.assertEqual(
+            sorted((row['id'], row['field']) for row in drift['accruals']),
+            sorted([
+                (self.first.pk, 'paid_amount'), (self.first.pk, 'balance'), (self.first.pk, 'status'),
+                (self.second.pk, 'final_amount'), (self.second.pk, 'balance'),
+            ]),
+        )
+        self.assertEqual(drift['payments'][0]['expected'], Decimal('1500.00'))
+        self.assertEqual(drift['deposits'][0]['expected'], Decimal('700.00'))
+        self.assertEqual(drift['accounts'][0]['drift'], Decimal('-1401.00'))
+        # Утилиты добавлены в обход сервисов — журнал отстал на 200
+        self.assertEqual(
+            [(row['id'], row['stored'], row['expected']) for row in drift['journal']],
+            [(self.second.pk, Decimal('500.00'), Decimal('700.00'))],
+        )
+
+        out = StringIO()
+        call_command('check_ledger_integrity', '--fix', stdout=out)
+        self.assertIn('Исправлено записей: 6', out.getvalue())
+
+        self.first.refresh_from_db()
+        self.assertEqual((self.first.paid_amount, self.first.balance, self.first.status),
+                         (Decimal('1000.00'), Decimal('0.00'), 'paid'))
+        self.second.refresh_from_db()
+        self.assertEqual((self.second.final_amount, self.second.balance),
+                         (Decimal('1200.00'), Decimal('700.00')))
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.allocated_amount, Decimal('1500.00'))
+        self.deposit.refresh_from_db()
+        self.assertEqual(self.deposit.balance, Decimal('700.00'))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1500.00'))
+        self.assertFalse(any(LedgerIntegrityService.check().values()))
+
+    def test_command_reports_without_fixing(self):
+        Payment.objects.filter(pk=self.payment.pk).update(allocated_amount=Decimal('10.00'))
+        out = StringIO()
+        call_command('check_ledger_integrity', '--check', 'payments', stdout=out)
+        self.assertIn('Платежи: записей с расхождением 1', out.getvalue())
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.allocated_amount, Decimal('10.00'))
+
+    def test_contract_deposit_account_is_not_drift(self):
+        # Депозит договора зачисляется на счет арендатора операцией — ночная проверка его не трогает
+        contract = Contract.objects.create(
+            number='LI-2', signed_at=date(2026, 1, 1), property=self.contract.property, tenant=self.contract.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+            deposit_enabled=True, deposit_amount=Decimal('500.00'),
+        )
+        ContractService.create_contract_with_accruals_and_deposit(contract)
+        deposit_account = Account.objects.get(owner=contract.tenant)
+
+        self.assertEqual(LedgerIntegrityService.check(['accounts']), {'accounts': []})
+        call_command('check_ledger_integrity', '--fix', stdout=StringIO())
+        deposit_account.refresh_from_db()
+        self.assertEqual(deposit_account.balance, Decimal('500.00'))
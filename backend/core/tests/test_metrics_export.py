@@ -0,0 +1,76 @@
+"""
+Тесты экспорта метрик в текстовом формате
+"""
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accruals.services import AccrualService
+from core import metrics
+from core.models import User
+
+
+class MetricsRegistryTests(TestCase):
+
+    def test_render_counter_and_histogram(self):
+        counter = metrics.Counter('test_events_total', 'События', ('kind',))
+        counter.inc(kind='a')
+        counter.inc(2, kind='a')
+        histogram = metrics.Histogram('test_duration_seconds', 'Длительность', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        lines = counter.render() + histogram.render()
+
+        self.assertIn('# TYPE test_events_total counter', lines)
+        self.assertIn('test_events_total{kind="a"} 3', lines)
+        self.assertIn('test_duration_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('test_duration_seconds_bucket{le="1"} 2', lines)
+        self.assertIn('test_duration_seconds_bucket{le="+Inf"} 2', lines)
+        self.assertIn('test_duration_seconds_count 2', lines)
+
+    def test_track_job_counts_rows_and_errors(self):
+        before = metrics.job_runs_total.value(job='test_job', status='error')
+        with self.assertRaises(RuntimeError):
+            with metrics.track_job('test_job') as job:
+                job.rows = 5
+                raise RuntimeError('boom')
+
+        self.assertEqual(metrics.job_runs_total.value(job='test_job', status='error'), before + 1)
+        self.assertGreaterEqual(metrics.job_rows_total.value(job='test_job'), 5)
+
+
+class MetricsEndpointTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_prom', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_exposition_without_db_queries(self):
+        self.client.get('/api/tenants/')
+        AccrualService.update_all_accrual_statuses()
+        with mock.patch('core.whatsapp_auth_views.send_whatsapp_message', return_value=(False, 'off')):
+            self.client.post('/api/auth/whatsapp/verify-code/', {'attemptId': 'missing', 'code': '123456'}, format='json')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertEqual(len(queries), 0)
+        body = response.content.decode()
+        self.assertIn('amt_http_requests_total{endpoint="TenantViewSet.list",method="GET",status="200"}', body)
+        self.assertIn('amt_http_request_duration_seconds_bucket{endpoint="TenantViewSet.list",le="+Inf"}', body)
+        self.assertIn('amt_job_runs_total{job="update_accrual_statuses",status="success"}', body)
+        self.assertIn('amt_otp_verify_total{result="not_found"}', body)
+        self.assertIn('amt_db_connections_open{alias="default"}', body)
+
+    def test_admin_only(self):
+        investor = User.objects.create_user(username='investor_prom', password='x', role='investor')
+        client = APIClient()
+        client.force_authenticate(investor)
+        self.assertEqual(client.get('/api/metrics/').status_code, 403)
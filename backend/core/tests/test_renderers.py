@@ -0,0 +1,61 @@
+"""
+Тесты быстрого JSON renderer/parser: формат ответа совпадает со стандартным JSONRenderer
+"""
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import User
+from core.renderers import FastJSONParser, FastJSONRenderer
+
+
+class FastJSONRendererTests(TestCase):
+
+    def test_same_bytes_as_drf_renderer(self):
+        data = {
+            'name': 'Арендатор «Ромашка»',
+            'date': date(2026, 3, 1),
+            'created_at': datetime(2026, 3, 1, 10, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'label': gettext_lazy('Оплачено'),
+            'duration': timedelta(minutes=2),
+            'rows': [{'amount': '1000.00', 'nested': (1, 2)}],
+            'separator': 'a\u2028b',
+            'empty': None,
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_decimal_same_as_drf_renderer(self):
+        # Сырые Decimal в ответах (total_balance, balance депозита, суммы прогноза) — числом, как у DRF
+        data = {'total_balance': Decimal('1500.50'), 'items': [Decimal('0.00'), Decimal('-12.345')]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_drf(self):
+        content = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(content, b'{\n  "a": 1\n}')
+
+    def test_parser(self):
+        parsed = FastJSONParser().parse(io.BytesIO('{"name": "Объект", "area": 12.5}'.encode()))
+        self.assertEqual(parsed, {'name': 'Объект', 'area': 12.5})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"broken": '))
+
+    def test_api_uses_fast_renderer(self):
+        user = User.objects.create_user(username='admin_json', password='x', role='admin')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.json()['username'], 'admin_json')
+
+        bad = client.patch('/api/auth/profile/', data='{"email": ', content_type='application/json')
+        self.assertEqual(bad.status_code, 400)
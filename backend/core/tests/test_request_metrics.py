@@ -0,0 +1,64 @@
+"""
+Тесты инструментирования запросов и эндпоинта метрик
+"""
+import json
+import logging
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.instrumentation import request_metrics
+from core.log_formatters import JsonFormatter
+from core.models import Tenant, User
+
+
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+        request_metrics.reset()
+        self.admin = User.objects.create_user(username='admin_metrics', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_metrics_grouped_by_view_and_action(self):
+        self.client.get('/api/forecast/by_contract/')
+        self.client.get('/api/forecast/by_contract/')
+        self.client.get('/api/tenants/')
+
+        response = self.client.get('/api/metrics/requests/')
+
+        self.assertEqual(response.status_code, 200)
+        endpoints = {row['endpoint']: row for row in response.data['endpoints']}
+        self.assertEqual(endpoints['ForecastViewSet.by_contract']['count'], 2)
+        self.assertIn('TenantViewSet.list', endpoints)
+        self.assertGreaterEqual(endpoints['TenantViewSet.list']['queries']['max'], 1)
+        self.assertGreater(endpoints['TenantViewSet.list']['response_bytes_avg'], 0)
+
+    def test_metrics_admin_only(self):
+        tenant_user = User.objects.create_user(username='tenant_metrics', password='x', role='tenant')
+        client = APIClient()
+        client.force_authenticate(tenant_user)
+        self.assertEqual(client.get('/api/metrics/requests/').status_code, 403)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_logged_with_repeated_sql(self):
+        for i in range(3):
+            Tenant.objects.create(name=f'Контрагент {i}', phone=f'+99655530000{i}')
+
+        with self.assertLogs('amt.requests', level='WARNING') as logs:
+            self.client.get('/api/tenants/')
+
+        record = logs.records[0]
+        self.assertEqual(record.endpoint, 'TenantViewSet.list')
+        self.assertGreaterEqual(record.queries, 1)
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual(payload['message'], 'slow_request')
+        self.assertEqual(payload['status'], 200)
+        self.assertIsInstance(payload['top_sql'], list)
+
+    def test_json_formatter_keeps_extra_fields(self):
+        record = logging.LogRecord('amt.requests', logging.WARNING, __file__, 1, 'slow_request', (), None)
+        record.queries = 42
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual(payload['queries'], 42)
+        self.assertEqual(payload['level'], 'WARNING')
@@ -0,0 +1,108 @@
+"""
+Тесты поиска: единый поиск с ранжированием и правами, поиск в списках через id договоров,
+GIN-индексы pg_trgm (если расширение установлено)
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import Tenant, User
+from core.search import create_trigram_indexes, trigram_enabled, trigram_index_name
+from properties.models import Property
+
+
+def pg_trgm_available():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_search', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.office = Property.objects.create(
+            name='Бизнес-центр Орион', address='ул. Киевская, 95', property_type='office', area=Decimal('40'),
+        )
+        self.shop = Property.objects.create(
+            name='Магазин', address='пр. Чуй, 12', property_type='retail', area=Decimal('80'),
+        )
+        self.romashka = Tenant.objects.create(name='ОсОО Ромашка', phone='+996555300100', contact_person='Асель')
+        self.orion = Tenant.objects.create(name='Орион Трейд', phone='+996555300101')
+        self.first = self._contract('SR-100', self.office, self.romashka)
+        self.second = self._contract('SR-200', self.shop, self.orion)
+
+    def _contract(self, number, prop, tenant):
+        contract = Contract.objects.create(
+            number=number, signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        Accrual.objects.create(
+            contract=contract, period_start=date(2026, 2, 1), period_end=date(2026, 2, 28),
+            due_date=date(2026, 2, 5), base_amount=Decimal('1000.00'),
+            final_amount=Decimal('1000.00'), balance=Decimal('1000.00'),
+        )
+        return contract
+
+    def test_global_search_ranked_across_types(self):
+        response = self.client.get('/api/search/', {'q': 'Орион'})
+        self.assertEqual(response.status_code, 200)
+        found = {(item['type'], item['id']) for item in response.data['results']}
+        self.assertEqual(found, {
+            ('property', self.office.pk), ('tenant', self.orion.pk),
+            ('contract', self.first.pk), ('contract', self.second.pk),
+        })
+        ranks = [item['rank'] for item in response.data['results']]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+        exact = self.client.get('/api/search/', {'q': 'SR-100', 'types': 'contracts,tenants'}).data['results']
+        self.assertEqual(exact[0]['type'], 'contract')
+        self.assertEqual(exact[0]['id'], self.first.pk)
+        self.assertEqual(exact[0]['subtitle'], 'ОсОО Ромашка · Бизнес-центр Орион')
+
+    def test_global_search_validation_and_scope(self):
+        self.assertEqual(self.client.get('/api/search/', {'q': 'О'}).status_code, 400)
+
+        tenant_user = User.objects.create_user(
+            username='tenant_search', password='x', role='tenant', counterparty=self.romashka,
+        )
+        client = APIClient()
+        client.force_authenticate(tenant_user)
+        results = client.get('/api/search/', {'q': 'SR-'}).data['results']
+        self.assertEqual([(item['type'], item['id']) for item in results], [('contract', self.first.pk)])
+
+    def test_list_search_goes_through_contracts(self):
+        by_tenant = self.client.get('/api/accruals/', {'search': 'Ромашка'}).data
+        self.assertEqual([row['contract_number'] for row in by_tenant], ['SR-100'])
+
+        by_address = self.client.get('/api/accruals/', {'search': 'Чуй'}).data
+        self.assertEqual([row['contract_number'] for row in by_address], ['SR-200'])
+
+        # Слова запроса — через И, каждое по своему полю
+        both = self.client.get('/api/accruals/', {'search': 'Орион SR-200'}).data
+        self.assertEqual([row['contract_number'] for row in both], ['SR-200'])
+
+        contracts = self.client.get('/api/contracts/', {'search': 'Ромашка'}).data
+        self.assertEqual([row['id'] for row in contracts['results']], [self.first.pk])
+
+        tenants = self.client.get('/api/tenants/', {'search': 'Асель'}).data
+        self.assertEqual([row['id'] for row in tenants['results']], [self.romashka.pk])
+
+    def test_trigram_index_used(self):
+        if not pg_trgm_available():
+            self.skipTest('расширение pg_trgm не установлено')
+        self.assertTrue(create_trigram_indexes())
+        self.assertTrue(trigram_enabled())
+        with connection.cursor() as cursor:
+            # На нескольких строках планировщик и так выбрал бы перебор таблицы
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = Tenant.objects.filter(name__icontains='ромаш').explain()
+        self.assertIn(trigram_index_name('tenants', 'name'), plan)
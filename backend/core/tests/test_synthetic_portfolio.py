@@ -0,0 +1,60 @@
+"""
+Тесты генератора синтетического портфеля и бенчмарка эндпоинтов
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.services import AccountService
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.benchmarks import compare_with_baseline, percentile
+from core.models import User
+from payments.models import Payment
+
+GENERATOR_ARGS = ['--properties', '12', '--tenants', '10', '--contracts', '15', '--years', '2', '--start', '2024-01-01']
+
+
+class SyntheticPortfolioTests(TestCase):
+
+    def _snapshot(self):
+        return (
+            list(Contract.objects.order_by('number').values_list('number', 'rent_amount', 'start_date', 'end_date')),
+            list(Accrual.objects.order_by('contract__number', 'period_start').values_list('paid_amount', flat=True)),
+        )
+
+    def test_generation_is_deterministic_and_consistent(self):
+        call_command('generate_synthetic_portfolio', *GENERATOR_ARGS, stdout=StringIO())
+        first = self._snapshot()
+        self.assertEqual(len(first[0]), 15)
+        self.assertTrue(Payment.objects.exists())
+        self.assertEqual(AccountService.get_balance_drift(), [])
+        self.assertEqual(
+            set(User.objects.filter(username__startswith='syn_').values_list('role', flat=True)),
+            {'admin', 'staff', 'tenant', 'landlord', 'investor'},
+        )
+
+        call_command('generate_synthetic_portfolio', *GENERATOR_ARGS, '--clear', stdout=StringIO())
+        self.assertEqual(self._snapshot(), first)
+
+    def test_benchmark_reports_every_role(self):
+        call_command('generate_synthetic_portfolio', *GENERATOR_ARGS, stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_endpoints', '--repeat', '1', '--warmup', '0', '--endpoint', 'forecast.by_contract', stdout=out)
+
+        lines = [line for line in out.getvalue().splitlines() if line.startswith('forecast.by_contract')]
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(all(' 200 ' in line for line in lines))
+
+
+class BenchmarkHelpersTests(TestCase):
+
+    def test_percentile_and_regressions(self):
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 50), 3)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 95), 5)
+
+        baseline = [{'endpoint': 'a', 'role': 'admin', 'p50_ms': 10.0, 'queries': 3}]
+        current = [{'endpoint': 'a', 'role': 'admin', 'p50_ms': 20.0, 'queries': 4}]
+        self.assertEqual(len(compare_with_baseline(current, baseline)), 2)
+        self.assertEqual(compare_with_baseline(baseline, baseline), [])
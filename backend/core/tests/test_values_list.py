@@ -0,0 +1,103 @@
+"""
+Тесты списков через .values(): ответ совпадает с list-сериализаторами и не зависит от числа строк по запросам
+"""
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.utils.encoders import JSONEncoder
+
+from accounts.models import Account
+from accruals.models import Accrual
+from accruals.serializers import AccrualListSerializer
+from contracts.models import Contract
+from contracts.serializers import ContractListSerializer
+from core.benchmarks import benchmark_list_modes
+from core.models import Tenant, User
+from payments.models import Payment
+from payments.serializers import PaymentListSerializer
+from properties.models import Property
+
+
+def _normalize(rows):
+    # Сериализатор пропускает поля через пустую связь (account_name без счета), .values() отдает null
+    rows = json.loads(json.dumps(list(rows), cls=JSONEncoder))
+    return sorted(({k: v for k, v in row.items() if v is not None} for row in rows), key=lambda row: row['id'])
+
+
+class ValuesListTests(TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_values', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        today = timezone.now().date()
+        account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+        for i in range(3):
+            prop = Property.objects.create(name=f'Объект {i}', address=f'Адрес {i}', property_type='office', area=Decimal('40'))
+            tenant = Tenant.objects.create(name=f'Арендатор {i}', phone=f'+99655510000{i}')
+            contract = Contract.objects.create(
+                number=f'VL-{i}', signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+                start_date=date(2026, 1, 1), end_date=date(2027, 1, 1),
+                rent_amount=Decimal('1500.00'), currency='USD', status='active',
+            )
+            for offset, utility_type in ((-10, 'rent'), (20, 'water')):
+                Accrual.objects.create(
+                    contract=contract, period_start=today, period_end=today + timedelta(days=30),
+                    due_date=today + timedelta(days=offset), base_amount=Decimal('1500.00'),
+                    final_amount=Decimal('1500.00'), paid_amount=Decimal('500.00'), balance=Decimal('1000.00'),
+                    utility_type=utility_type,
+                )
+            Payment.objects.create(
+                contract=contract, account=account if i else None,
+                amount=Decimal('500.00'), payment_date=today, comment=f'Платеж {i}',
+            )
+
+    def _assert_matches_serializer(self, url, serializer_class, queryset):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results'] if isinstance(response.data, dict) else response.data
+        expected = serializer_class(queryset, many=True).data
+        self.assertEqual(_normalize(rows), _normalize(expected))
+        return len(queries)
+
+    def test_accruals_list_matches_serializer(self):
+        queryset = Accrual.objects.select_related('contract__property', 'contract__tenant')
+        queries = self._assert_matches_serializer('/api/accruals/', AccrualListSerializer, queryset)
+        self.assertLessEqual(queries, 3)
+
+        overdue = [row for row in self.client.get('/api/accruals/').data if row['overdue_days']]
+        self.assertEqual(len(overdue), 3)
+        self.assertEqual(overdue[0]['overdue_days'], 10)
+
+    def test_payments_list_matches_serializer(self):
+        queryset = Payment.objects.select_related('contract__property', 'contract__tenant', 'account')
+        self._assert_matches_serializer('/api/payments/', PaymentListSerializer, queryset)
+
+    def test_contracts_list_matches_serializer(self):
+        queryset = Contract.objects.select_related('property', 'tenant')
+        self._assert_matches_serializer('/api/contracts/', ContractListSerializer, queryset)
+
+    def test_filters_and_scoping_apply(self):
+        tenant = Tenant.objects.get(name='Арендатор 1')
+        response = self.client.get('/api/accruals/', {'search': 'VL-1'})
+        self.assertEqual({row['contract_number'] for row in response.data}, {'VL-1'})
+
+        client_user = User.objects.create_user(username='tenant_values', password='x', role='tenant', counterparty=tenant)
+        client = APIClient()
+        client.force_authenticate(client_user)
+        rows = client.get('/api/payments/').data['results']
+        self.assertEqual([row['tenant_name'] for row in rows], ['Арендатор 1'])
+
+    def test_benchmark_reports_rows_per_second(self):
+        result = benchmark_list_modes('accruals.views.AccrualViewSet', repeat=1)
+        self.assertEqual(result['rows'], 6)
+        self.assertGreater(result['values_rows_per_s'], 0)
@@ -0,0 +1,133 @@
+"""
+Загрузка больших файлов частями с докачкой.
+
+POST   /api/uploads/            {filename, size, sha256?} → сессия загрузки
+GET    /api/uploads/<id>/       → сколько байт уже получено (offset) — с этого места продолжать
+PATCH  /api/uploads/<id>/       тело — очередная часть, заголовок Upload-Offset — ее смещение
+DELETE /api/uploads/<id>/       отменить загрузку
+
+Часть пишется из потока запроса прямо на диск, в память файл не читается. После последней
+части файл проверяется по SHA-256 и попадает в хранилище по содержимому (core.uploads);
+завершенную загрузку прикрепляют к договору: POST /api/contracts/<id>/files/ {upload_id}.
+"""
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from contracts.models import Contract, ContractFile
+
+from .mixins import DataScopingMixin
+from .models import UploadSession
+from .uploads import append_chunk, content_addressed_name, discard_session_file, finish_session
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def _session_data(session):
+    return {
+        'id': str(session.pk),
+        'filename': session.filename,
+        'size': session.size,
+        'offset': session.offset,
+        'status': session.status,
+        'sha256': session.sha256 or None,
+        'chunk_size': settings.UPLOAD_CHUNK_MAX_SIZE,
+    }
+
+
+def _has_content(user, sha256):
+    """
+    Файл с этим SHA-256 пользователю уже доступен: он сам его загружал или файл приложен
+    к видимому ему договору. Иначе по одному хэшу чужой файл не выдается — нужны сами байты.
+    """
+    if UploadSession.objects.filter(user=user, sha256=sha256, status='complete').exists():
+        return True
+    contracts = DataScopingMixin()._scope_for_user(Contract.objects.all(), user, 'Contract')
+    return ContractFile.objects.filter(sha256=sha256, contract__in=contracts).exists()
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_create(request):
+    """
+    Начать загрузку. Если файл с таким SHA-256 уже есть в хранилище и доступен пользователю —
+    загружать ничего не нужно
+    """
+    filename = (request.data.get('filename') or '').strip()
+    sha256 = (request.data.get('sha256') or '').strip().lower()
+    try:
+        size = int(request.data.get('size'))
+    except (TypeError, ValueError):
+        size = -1
+    if not filename or size <= 0:
+        return Response({'error': 'Укажите filename и size'}, status=status.HTTP_400_BAD_REQUEST)
+    if size > settings.UPLOAD_MAX_SIZE:
+        return Response({'error': 'Файл слишком большой'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    if sha256 and not SHA256_RE.match(sha256):
+        return Response({'error': 'Некорректный sha256'}, status=status.HTTP_400_BAD_REQUEST)
+
+    session = UploadSession(user=request.user, filename=filename[:255], size=size, expected_sha256=sha256)
+    if sha256 and _has_content(request.user, sha256):
+        name = content_addressed_name(sha256, filename)
+        if default_storage.exists(name):
+            session.offset = size
+            session.status = 'complete'
+            session.sha256 = sha256
+            session.stored_name = name
+    session.save()
+    return Response(_session_data(session), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_detail(request, upload_id):
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    if request.method == 'GET':
+        return Response(_session_data(session))
+    if request.method == 'DELETE':
+        discard_session_file(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return _upload_chunk(request, session.pk)
+
+
+def _upload_chunk(request, upload_id):
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        length = int(request.headers.get('Content-Length') or 0)
+    except ValueError:
+        return Response({'error': 'Укажите заголовок Upload-Offset'}, status=status.HTTP_400_BAD_REQUEST)
+    if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+        return Response({'error': 'Слишком большая часть', 'chunk_size': settings.UPLOAD_CHUNK_MAX_SIZE},
+                        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    with transaction.atomic():
+        # Параллельные запросы к одной загрузке выполняются по очереди
+        session = UploadSession.objects.select_for_update().get(pk=upload_id)
+        if session.status == 'complete' or offset != session.offset:
+            # Клиент должен продолжить с offset из ответа
+            return Response({'error': 'Смещение не совпадает', **_session_data(session)},
+                            status=status.HTTP_409_CONFLICT)
+        if length <= 0 or offset + length > session.size:
+            return Response({'error': 'Часть выходит за размер файла'}, status=status.HTTP_400_BAD_REQUEST)
+
+        session.offset = append_chunk(session, request.stream, length)
+        if session.offset == session.size:
+            try:
+                session.stored_name, session.sha256 = finish_session(session)
+            except ValueError as e:
+                # Файл собран с ошибкой — загружать заново
+                discard_session_file(session)
+                session.offset = 0
+                session.save(update_fields=['offset', 'updated_at'])
+                return Response({'error': str(e), **_session_data(session)}, status=status.HTTP_400_BAD_REQUEST)
+            session.status = 'complete'
+        session.save()
+    return Response(_session_data(session))
@@ -0,0 +1,123 @@
+"""
+Загрузка файлов без буферизации в памяти и хранение по содержимому.
+
+- HashingTemporaryFileUploadHandler пишет загружаемый файл частями во временный файл на диске
+  и по ходу считает SHA-256 (uploaded_file.sha256).
+- store_content_addressed кладет файл в MEDIA_ROOT/cas/<aa>/<bb>/<sha256>.<ext>: одинаковые
+  файлы хранятся один раз, временный файл переносится (rename), а не копируется.
+- Докачка (UploadSession): части дописываются в MEDIA_ROOT/uploads/<id>.part по смещению,
+  после последней части файл хэшируется потоком и переносится в то же хранилище.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+CAS_PREFIX = 'cas'
+PARTS_DIR = 'uploads'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Любой загружаемый файл — сразу во временный файл на диске, с SHA-256 по ходу записи"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.hasher.hexdigest()
+        return uploaded
+
+
+def file_sha256(fileobj):
+    """SHA-256 файла чтением по частям"""
+    hasher = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b''):
+        hasher.update(chunk)
+    fileobj.seek(0)
+    return hasher.hexdigest()
+
+
+def content_addressed_name(sha256, filename):
+    ext = os.path.splitext(filename or '')[1].lower()[:10]
+    return f'{CAS_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}'
+
+
+def store_content_addressed(uploaded, filename=None):
+    """
+    Сохранить загруженный файл по хэшу содержимого. Возвращает (имя в хранилище, sha256, размер).
+    Если такой файл уже есть, новый не записывается.
+    """
+    sha256 = getattr(uploaded, 'sha256', None) or file_sha256(uploaded)
+    name = content_addressed_name(sha256, filename or uploaded.name)
+    if not default_storage.exists(name):
+        name = default_storage.save(name, uploaded)
+    return name, sha256, uploaded.size
+
+
+def delete_if_unreferenced(name, *querysets):
+    """Удалить файл хранилища, если на него больше не ссылается ни одна запись"""
+    if not name or any(queryset.exists() for queryset in querysets):
+        return False
+    default_storage.delete(name)
+    return True
+
+
+def part_path(session):
+    return os.path.join(settings.MEDIA_ROOT, PARTS_DIR, f'{session.pk}.part')
+
+
+def append_chunk(session, stream, length):
+    """
+    Записать часть из потока запроса в .part-файл сессии с session.offset (по 64 КБ, без чтения
+    в память). Хвост, оставшийся от прерванного запроса, отбрасывается. Возвращает новое смещение.
+    """
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 'ab' не подходит: запись всегда в конец файла, а хвост после offset нужно перезаписать
+    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as part:
+        part.seek(session.offset)
+        part.truncate()
+        written = 0
+        while written < length:
+            chunk = stream.read(min(64 * 1024, length - written))
+            if not chunk:
+                break
+            part.write(chunk)
+            written += len(chunk)
+    return session.offset + written
+
+
+def finish_session(session):
+    """Последняя часть получена: проверить хэш и перенести файл в хранилище по содержимому"""
+    path = part_path(session)
+    with open(path, 'rb') as part:
+        sha256 = file_sha256(part)
+        if session.expected_sha256 and session.expected_sha256 != sha256:
+            raise ValueError('Контрольная сумма файла не совпадает')
+    name = content_addressed_name(sha256, session.filename)
+    if default_storage.exists(name):
+        os.remove(path)
+    else:
+        # Переносим собранный файл на место, без копирования
+        target = default_storage.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        os.chmod(target, 0o644)
+    return name, sha256
+
+
+def discard_session_file(session):
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
@@ -2,7 +2,10 @@ from django.urls import path, include
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.routers import DefaultRouter
 from .views import TenantViewSet, ExchangeRateViewSet, RequestViewSet, EmployeesViewSet, AuditLogViewSet
-from .auth_views import me, profile_update, change_password, check_phone, login_whatsapp, LoginView, LogoutView
+from .auth_views import me, profile_update, change_password, refresh_token, check_phone, login_whatsapp, LoginView, LogoutView
+from .metrics_views import metrics_view, request_metrics_view
+from .upload_views import upload_create, upload_detail
+from .search_views import GlobalSearchView
 from .whatsapp_auth_views import whatsapp_start, whatsapp_status, greenapi_webhook, whatsapp_request_code, whatsapp_verify_code
 
 router = DefaultRouter()
@@ -18,6 +21,7 @@ urlpatterns = [
     path('auth/me/', me, name='me'),
     path('auth/profile/', profile_update, name='profile-update'),
     path('auth/change-password/', change_password, name='change-password'),
+    path('auth/token/refresh/', refresh_token, name='token-refresh'),
     path('auth/check-phone/', check_phone, name='check-phone'),
     path('auth/login-whatsapp/', login_whatsapp, name='login-whatsapp'),  # Старый endpoint (deprecated)
     # Новые endpoints для правильной архитектуры
@@ -26,5 +30,10 @@ urlpatterns = [
     path('auth/whatsapp/request-code/', csrf_exempt(whatsapp_request_code), name='whatsapp-request-code'),
     path('auth/whatsapp/verify-code/', csrf_exempt(whatsapp_verify_code), name='whatsapp-verify-code'),
     path('webhooks/greenapi/incoming/', greenapi_webhook, name='greenapi-webhook'),
+    path('metrics/', metrics_view, name='metrics'),
+    path('metrics/requests/', request_metrics_view, name='request-metrics'),
+    path('search/', GlobalSearchView.as_view(), name='global-search'),
+    path('uploads/', upload_create, name='upload-create'),
+    path('uploads/<uuid:upload_id>/', upload_detail, name='upload-detail'),
     path('', include(router.urls)),
 ]
@@ -6,10 +6,13 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
 from .models import Tenant, ExchangeRate, Request, EMPLOYEE_TYPES, AuditLog
 from .serializers import TenantSerializer, ExchangeRateSerializer, RequestSerializer, RequestListSerializer, AuditLogSerializer
-from .services import ExchangeRateService
+from .conditional import ConditionalGet
 from .mixins import DataScopingMixin
+from .search import IndexedSearchFilter
 from .permissions import ReadOnlyForClients, CanReadResource, CanWriteResource
 from .audit import log_audit
+from jobs.services import JobService
+from jobs.views import job_accepted
 
 
 class TenantViewSet(DataScopingMixin, viewsets.ModelViewSet):
@@ -17,7 +20,7 @@ class TenantViewSet(DataScopingMixin, viewsets.ModelViewSet):
     queryset = Tenant.objects.exclude(type__in=EMPLOYEE_TYPES)
     serializer_class = TenantSerializer
     permission_classes = [IsAuthenticated, CanReadResource, CanWriteResource]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['type', 'phone']
     search_fields = ['name', 'email', 'phone', 'contact_person']
     ordering_fields = ['name', 'created_at']
@@ -186,9 +189,8 @@ class ExchangeRateViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['post'])
     def update_rates(self, request):
-        """Обновить курсы валют с valuta.kg"""
-        rates = ExchangeRateService.update_rates()
-        return Response({'status': 'Курсы обновлены', 'rates': rates})
+        """Обновить курсы валют с valuta.kg (фоновая задача)"""
+        return job_accepted(JobService.enqueue('exchange_rates.update', user=request.user))
     
     @action(detail=False, methods=['get'])
     def current(self, request):
@@ -198,8 +200,8 @@ class ExchangeRateViewSet(viewsets.ReadOnlyModelViewSet):
         today = date.today()
         
         rates = ExchangeRate.objects.filter(date=today, source=source)
-        serializer = self.get_serializer(rates, many=True)
-        return Response(serializer.data)
+        conditional = ConditionalGet(request).add_queryset(rates)
+        return conditional.respond(lambda: Response(self.get_serializer(rates, many=True).data))
 
 
 class RequestViewSet(DataScopingMixin, viewsets.ModelViewSet):
@@ -1,8 +1,13 @@
 """
 Сервис авторизации через WhatsApp OTP и выдача прав по типу контрагента/роли.
 """
+from datetime import timedelta
 from typing import Any, Dict
 
+from django.utils import timezone
+
+from .models import LoginAttempt
+
 # Маппинг типов Tenant и User.role в ключ прав (как в промпте)
 ROLE_TO_PERMISSION_KEY = {
     "admin": "administrator",
@@ -98,3 +103,13 @@ def get_permissions_by_type(tenant_type: str) -> Dict[str, Any]:
             "dashboard": ["overview"],
         },
     )
+
+
+def delete_expired_login_attempts(retention_days: int = 7) -> int:
+    """
+    Удалить попытки входа, истекшие больше retention_days дней назад
+    (свежие остаются для разбора жалоб на вход). Возвращает количество.
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = LoginAttempt.objects.filter(expires_at__lt=cutoff).delete()
+    return deleted
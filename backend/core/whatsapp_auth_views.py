@@ -17,19 +17,16 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from django.views.decorators.csrf import csrf_exempt
+from .metrics import otp_sent_total, otp_verify_total
+from .authentication import issue_token
 from .models import LoginAttempt, Tenant, ADMIN_PHONES, ensure_protected_admin
 from .utils import normalize_phone as normalize_phone_996
 from .permissions import get_user_type, get_user_permissions
 
 User = get_user_model()
+# Логирование настроено в settings.LOGGING (БЕЗ токенов и секретов)
 logger = logging.getLogger(__name__)
 
-# Настройка логирования (БЕЗ токенов и секретов)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
-)
-
 def _green_api_config():
     """Конфиг Green API из Django settings (настраивается через env)."""
     base = getattr(settings, 'GREEN_API_BASE_URL', 'https://7103.api.greenapi.com').rstrip('/')
@@ -587,6 +584,7 @@ def whatsapp_request_code(request):
     # Отправляем код через WhatsApp
     message = f"Ваш код для входа в систему AMT: {otp_code}\n\nКод действителен 5 минут."
     success, error_msg = send_whatsapp_message(normalized_phone, message)
+    otp_sent_total.inc(result='sent' if success else 'failed')
     
     if not success:
         login_attempt.status = 'FAILED'
@@ -636,6 +634,7 @@ def whatsapp_verify_code(request):
     try:
         login_attempt = LoginAttempt.objects.get(attempt_id=attempt_id)
     except LoginAttempt.DoesNotExist:
+        otp_verify_total.inc(result='not_found')
         return Response(
             {'error': 'Попытка входа не найдена'},
             status=status.HTTP_404_NOT_FOUND
@@ -646,6 +645,7 @@ def whatsapp_verify_code(request):
         login_attempt.status = 'FAILED'
         login_attempt.failure_reason = 'ATTEMPT_EXPIRED'
         login_attempt.save()
+        otp_verify_total.inc(result='expired')
         return Response(
             {'error': 'Код истек. Запросите новый код.'},
             status=status.HTTP_400_BAD_REQUEST
@@ -654,6 +654,7 @@ def whatsapp_verify_code(request):
     # Проверяем код
     if login_attempt.otp_code != code:
         logger.warning(f"Invalid OTP code for attemptId={attempt_id}")
+        otp_verify_total.inc(result='invalid_code')
         return Response(
             {'error': 'Неверный код. Проверьте и попробуйте снова.'},
             status=status.HTTP_400_BAD_REQUEST
@@ -672,6 +673,7 @@ def whatsapp_verify_code(request):
         login_attempt.status = 'FAILED'
         login_attempt.failure_reason = error
         login_attempt.save()
+        otp_verify_total.inc(result='user_error')
         return Response(
             {'error': 'Ошибка при поиске пользователя'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -680,8 +682,7 @@ def whatsapp_verify_code(request):
     # Создаем Django сессию (для совместимости)
     login(request, user, backend="django.contrib.auth.backends.ModelBackend")
 
-    from rest_framework.authtoken.models import Token
-    token, _ = Token.objects.get_or_create(user=user)
+    token = issue_token(user)
 
     login_attempt.status = "COMPLETED"
     login_attempt.verified_phone = login_attempt.expected_phone
@@ -711,6 +712,7 @@ def whatsapp_verify_code(request):
         }
 
     logger.info(f"OTP login successful: attemptId={attempt_id}, userId={user.id}, role={user.role}")
+    otp_verify_total.inc(result='success')
 
     return Response({
         "success": True,
@@ -1,8 +1,8 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta, datetime
 from decimal import Decimal
@@ -11,8 +11,10 @@ from contracts.models import Contract
 from payments.models import Payment
 from accounts.models import Account
 from properties.models import Property
-from core.models import Tenant
+from core.currency import ACCRUAL_RATE, PAYMENT_RATE, money_sum, parse_base_currency, round_money
+from core.models import ExchangeRate, Tenant
 from deposits.models import Deposit
+from core.conditional import ConditionalGet
 from core.mixins import DataScopingMixin
 
 
@@ -26,26 +28,56 @@ class DashboardViewSet(DataScopingMixin, viewsets.ViewSet):
     def stats(self, request):
         """
         Получить общую статистику для дашборда с data scoping.
+        С ETag / Last-Modified: пока данные не менялись, отдается 304 без пересчета сумм.
+        
+        Параметры:
+        - base_currency: KGS/USD/RUB/EUR — суммы по договорам в разных валютах пересчитываются
+          в эту валюту в самом агрегатном запросе (курс на дату начисления/платежа, см. core.currency)
         """
+        try:
+            base_currency = parse_base_currency(request.query_params.get('base_currency'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        user = request.user
+        conditional = ConditionalGet(request)
+        conditional.add_queryset(
+            self._scope_for_user(Accrual.objects.all(), user, 'Accrual'), ('updated_at', 'contract__updated_at'),
+        )
+        conditional.add_queryset(self._scope_for_user(Payment.objects.all(), user, 'Payment'))
+        # Общие показатели admin/staff считаются без scoping — как в _build_stats
+        if user.role in ['admin', 'staff']:
+            for model in (Contract, Property, Deposit, Tenant, Account):
+                conditional.add_queryset(model.objects.all())
+        else:
+            conditional.add_queryset(self._scope_for_user(Contract.objects.all(), user, 'Contract'))
+            conditional.add_queryset(self._scope_for_user(Property.objects.all(), user, 'Property'))
+            conditional.add_queryset(self._scope_for_user(Deposit.objects.all(), user, 'Deposit'))
+        if base_currency:
+            # Пересчитанные суммы зависят и от курсов
+            conditional.add_queryset(ExchangeRate.objects.all())
+        return conditional.respond(lambda: self._build_stats(request, base_currency))
+
+    def _build_stats(self, request, base_currency=None):
         today = timezone.now().date()
         user = request.user
+        money = (lambda value: str(round_money(value))) if base_currency else str
+        # Остатки счетов и депозитов пересчитываются по курсу на сегодня
+        account_rate = ('currency', today)
+        deposit_rate = ('contract__currency', today, 'contract__exchange_rate_source')
         
         # Применяем data scoping для начислений
         accruals_queryset = Accrual.objects.filter(contract__status='active')
         accruals_queryset = self._scope_for_user(accruals_queryset, user, 'Accrual')
         
-        # Общая статистика по начислениям
-        total_accruals = accruals_queryset.aggregate(
-            total=Sum('final_amount')
-        )['total'] or Decimal('0')
-        
-        total_paid = accruals_queryset.aggregate(
-            total=Sum('paid_amount')
-        )['total'] or Decimal('0')
-        
-        total_balance = accruals_queryset.aggregate(
-            total=Sum('balance')
-        )['total'] or Decimal('0')
+        # Общая статистика по начислениям (одним запросом)
+        accrual_totals = accruals_queryset.aggregate(
+            total=money_sum('final_amount', *ACCRUAL_RATE, base=base_currency),
+            paid=money_sum('paid_amount', *ACCRUAL_RATE, base=base_currency),
+            balance=money_sum('balance', *ACCRUAL_RATE, base=base_currency),
+        )
+        total_accruals = accrual_totals['total'] or Decimal('0')
+        total_paid = accrual_totals['paid'] or Decimal('0')
+        total_balance = accrual_totals['balance'] or Decimal('0')
         
         # Просроченные начисления
         overdue_accruals = accruals_queryset.filter(
@@ -53,7 +85,9 @@ class DashboardViewSet(DataScopingMixin, viewsets.ViewSet):
             balance__gt=0
         )
         overdue_count = overdue_accruals.count()
-        overdue_amount = overdue_accruals.aggregate(total=Sum('balance'))['total'] or Decimal('0')
+        overdue_amount = overdue_accruals.aggregate(
+            total=money_sum('balance', *ACCRUAL_RATE, base=base_currency)
+        )['total'] or Decimal('0')
         
         # Начисления к оплате в ближайшие 7 дней
         week_from_now = today + timedelta(days=7)
@@ -63,7 +97,9 @@ class DashboardViewSet(DataScopingMixin, viewsets.ViewSet):
             balance__gt=0
         )
         due_soon_count = due_soon.count()
-        due_soon_amount = due_soon.aggregate(total=Sum('balance'))['total'] or Decimal('0')
+        due_soon_amount = due_soon.aggregate(
+            total=money_sum('balance', *ACCRUAL_RATE, base=base_currency)
+        )['total'] or Decimal('0')
         
         # Поступления за текущий месяц (с data scoping)
         current_month_start = today.replace(day=1)
@@ -74,7 +110,9 @@ class DashboardViewSet(DataScopingMixin, viewsets.ViewSet):
         )
         payments_queryset = self._scope_for_user(payments_queryset, user, 'Payment')
         payments_month_count = payments_queryset.count()
-        payments_month_amount = payments_queryset.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        payments_month_amount = payments_queryset.aggregate(
+            total=money_sum('amount', *PAYMENT_RATE, base=base_currency)
+        )['total'] or Decimal('0')
         
         # Поступления за последние 30 дней
         month_ago = today - timedelta(days=30)
@@ -84,7 +122,9 @@ class DashboardViewSet(DataScopingMixin, viewsets.ViewSet):
             is_returned=False
         )
         payments_last_month = self._scope_for_user(payments_last_month, user, 'Payment')
-        payments_last_month_amount = payments_last_month.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        payments_last_month_amount = payments_last_month.aggregate(
+            total=money_sum('amount', *PAYMENT_RATE, base=base_currency)
+        )['total'] or Decimal('0')
         
         # Общая статистика (только для admin/staff)
         if user.role in ['admin', 'staff']:
@@ -92,15 +132,16 @@ class DashboardViewSet(DataScopingMixin, viewsets.ViewSet):
             total_tenants = Tenant.objects.all().count()
             total_contracts = Contract.objects.filter(status='active').count()
             total_account_balance = Account.objects.filter(is_active=True).aggregate(
-                total=Sum('balance')
-            )['total'] or Decimal('0')
-            deposits_total = Deposit.objects.aggregate(
-                total=Sum('amount')
-            )['total'] or Decimal('0')
-            deposits_balance = Deposit.objects.aggregate(
-                total=Sum('balance')
+                total=money_sum('balance', *account_rate, base=base_currency)
             )['total'] or Decimal('0')
-            deposits_count = Deposit.objects.count()
+            deposit_totals = Deposit.objects.aggregate(
+                total=money_sum('amount', *deposit_rate, base=base_currency),
+                balance=money_sum('balance', *deposit_rate, base=base_currency),
+                count=Count('pk'),
+            )
+            deposits_total = deposit_totals['total'] or Decimal('0')
+            deposits_balance = deposit_totals['balance'] or Decimal('0')
+            deposits_count = deposit_totals['count']
         else:
             # Для клиентов - только связанные данные
             properties_queryset = Property.objects.exclude(status='inactive')
@@ -123,38 +164,44 @@ class DashboardViewSet(DataScopingMixin, viewsets.ViewSet):
             # Депозиты - только связанные с договорами клиента
             if user.counterparty:
                 deposits_queryset = Deposit.objects.filter(contract__in=contracts_queryset)
-                deposits_total = deposits_queryset.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-                deposits_balance = deposits_queryset.aggregate(total=Sum('balance'))['total'] or Decimal('0')
-                deposits_count = deposits_queryset.count()
+                deposit_totals = deposits_queryset.aggregate(
+                    total=money_sum('amount', *deposit_rate, base=base_currency),
+                    balance=money_sum('balance', *deposit_rate, base=base_currency),
+                    count=Count('pk'),
+                )
+                deposits_total = deposit_totals['total'] or Decimal('0')
+                deposits_balance = deposit_totals['balance'] or Decimal('0')
+                deposits_count = deposit_totals['count']
             else:
                 deposits_total = Decimal('0')
                 deposits_balance = Decimal('0')
                 deposits_count = 0
         
         return Response({
+            'base_currency': base_currency,
             'accruals': {
-                'total': str(total_accruals),
-                'paid': str(total_paid),
-                'balance': str(total_balance),
+                'total': money(total_accruals),
+                'paid': money(total_paid),
+                'balance': money(total_balance),
                 'overdue_count': overdue_count,
-                'overdue_amount': str(overdue_amount),
+                'overdue_amount': money(overdue_amount),
                 'due_soon_count': due_soon_count,
-                'due_soon_amount': str(due_soon_amount),
+                'due_soon_amount': money(due_soon_amount),
             },
             'payments': {
                 'this_month_count': payments_month_count,
-                'this_month_amount': str(payments_month_amount),
-                'last_30_days_amount': str(payments_last_month_amount),
+                'this_month_amount': money(payments_month_amount),
+                'last_30_days_amount': money(payments_last_month_amount),
             },
             'general': {
                 'properties': total_properties,
                 'tenants': total_tenants,
                 'contracts': total_contracts,
-                'account_balance': str(total_account_balance),
+                'account_balance': money(total_account_balance),
             },
             'deposits': {
-                'total': str(deposits_total),
-                'balance': str(deposits_balance),
+                'total': money(deposits_total),
+                'balance': money(deposits_balance),
                 'count': deposits_count,
             }
         })
@@ -0,0 +1,82 @@
+"""
+Тесты прогноза по договорам: один сгруппированный запрос вместо запросов на каждый договор
+"""
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import Tenant, User
+from properties.models import Property
+
+
+class ForecastByContractTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_forecast', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        today = timezone.now().date()
+        for i in range(5):
+            prop = Property.objects.create(name=f'Объект {i}', address='Адрес', property_type='office', area=Decimal('50'))
+            tenant = Tenant.objects.create(name=f'Арендатор {i}', phone=f'+99655500000{i}')
+            contract = Contract.objects.create(
+                number=f'FC-{i}',
+                signed_at=date(2026, 1, 1),
+                property=prop,
+                tenant=tenant,
+                start_date=date(2026, 1, 1),
+                end_date=date(2027, 1, 1),
+                rent_amount=Decimal('1000.00'),
+                status='active',
+            )
+            for paid, start in ((Decimal('400.00'), today), (Decimal('0'), today + timedelta(days=5))):
+                Accrual.objects.create(
+                    contract=contract,
+                    period_start=start,
+                    period_end=start + timedelta(days=30),
+                    due_date=start,
+                    base_amount=Decimal('1000.00'),
+                    final_amount=Decimal('1000.00'),
+                    paid_amount=paid,
+                    balance=Decimal('1000.00') - paid,
+                )
+            # Начисление за пределами горизонта прогноза не учитывается
+            Accrual.objects.create(
+                contract=contract,
+                period_start=today + timedelta(days=90),
+                period_end=today + timedelta(days=120),
+                due_date=today + timedelta(days=90),
+                base_amount=Decimal('1000.00'),
+                final_amount=Decimal('1000.00'),
+                balance=Decimal('1000.00'),
+            )
+
+    def test_query_count_does_not_grow_with_contracts(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/forecast/by_contract/', {'days': 30})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        # Аутентификация + один запрос по договорам
+        self.assertLessEqual(len(queries), 2)
+        row = response.data[0]
+        self.assertEqual(row['expected'], Decimal('2000.00'))
+        self.assertEqual(row['paid'], Decimal('400.00'))
+        self.assertEqual(row['balance'], Decimal('1600.00'))
+
+    def test_stream_matches_regular_response(self):
+        regular = self.client.get('/api/forecast/by_contract/', {'days': 30})
+        streamed = self.client.get('/api/forecast/by_contract/', {'days': 30, 'stream': 'true'})
+
+        self.assertEqual(streamed.status_code, 200)
+        body = json.loads(b''.join(streamed.streaming_content))
+        self.assertEqual(body, json.loads(regular.content))
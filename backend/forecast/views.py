@@ -1,15 +1,22 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Q, Min, Max
+from django.db.models import Sum, Q, Min, Max, DecimalField, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from datetime import timedelta, datetime
 from decimal import Decimal
 from accruals.models import Accrual
 from contracts.models import Contract
 from payments.models import Payment
+from core.currency import ACCRUAL_RATE, PAYMENT_RATE, money_sum, parse_base_currency, round_money
 from core.mixins import DataScopingMixin
+from core.renderers import dumps
+
+# Размер порции строк при потоковой выдаче прогноза по договорам
+STREAM_CHUNK_SIZE = 500
 
 
 class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
@@ -24,8 +31,14 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
         Расчет прогноза поступлений на будущее.
         Прогноз включает начисления, у которых срок оплаты (due_date) попадает в указанный период.
         Поддерживает параметры: days (количество дней от сегодня) или from/to (конкретные даты).
+        Суммы по месяцам считаются в БД сгруппированными запросами; с base_currency (KGS/USD/RUB/EUR)
+        суммы договоров в разных валютах пересчитываются в нее внутри агрегата (core.currency).
         """
         today = timezone.now().date()
+        try:
+            base_currency = parse_base_currency(request.query_params.get('base_currency'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         # Определяем период: либо через days, либо через from/to, либо all_time
         all_time = request.query_params.get('all_time', '').lower() == 'true'
@@ -59,7 +72,6 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
             )
         # Применяем data scoping
         accruals_query = self._scope_for_user(accruals_query, request.user, 'Accrual')
-        accruals = accruals_query.select_related('contract', 'contract__property', 'contract__tenant', 'contract__landlord')
         
         # Получаем уже созданные платежи (поступления)
         # Это фактические поступления, которые уже были получены
@@ -72,7 +84,6 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
             )
         # Применяем data scoping
         payments_query = self._scope_for_user(payments_query, request.user, 'Payment')
-        payments = payments_query.select_related('contract', 'contract__landlord')
         
         # Группировка по месяцам (по месяцу due_date для начислений, по payment_date для платежей)
         # Инициализируем все месяцы в периоде прогноза (если период указан)
@@ -94,50 +105,40 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
                 else:
                     current_date = current_date.replace(month=current_date.month + 1, day=1)
         
-        total_accrued = Decimal('0')  # Начислено (сумма всех начислений)
-        total_received = Decimal('0')  # Поступления (фактические платежи)
-        total_balance = Decimal('0')  # Остаток к оплате
-        total_overdue = Decimal('0')  # Просрочено в периоде
-        
-        # Обрабатываем начисления
-        for accrual in accruals:
-            # Группируем по месяцу due_date (срок оплаты)
-            month_key = accrual.due_date.strftime('%Y-%m')
-            if month_key not in monthly_forecast:
-                monthly_forecast[month_key] = {
-                    'accrued': Decimal('0'),
-                    'received': Decimal('0'),
-                    'balance': Decimal('0'),
-                    'overdue': Decimal('0')
-                }
-            
-            # Начислено - сумма всех начислений (final_amount)
-            monthly_forecast[month_key]['accrued'] += accrual.final_amount
-            # Остаток - остаток к оплате
-            monthly_forecast[month_key]['balance'] += accrual.balance
-            
-            total_accrued += accrual.final_amount
-            total_balance += accrual.balance
-            
-            # Просрочено - начисления, у которых due_date < today и balance > 0, и они в выбранном периоде
-            if accrual.due_date < today and accrual.balance > 0:
-                monthly_forecast[month_key]['overdue'] += accrual.balance
-                total_overdue += accrual.balance
-        
-        # Обрабатываем платежи (фактические поступления)
-        for payment in payments:
-            month_key = payment.payment_date.strftime('%Y-%m')
-            if month_key not in monthly_forecast:
-                monthly_forecast[month_key] = {
-                    'accrued': Decimal('0'),
-                    'received': Decimal('0'),
-                    'balance': Decimal('0'),
-                    'overdue': Decimal('0')
-                }
-            
-            # Поступления - фактические платежи
-            monthly_forecast[month_key]['received'] += payment.amount
-            total_received += payment.amount
+        def month_row(month):
+            return monthly_forecast.setdefault(month.strftime('%Y-%m'), {
+                'accrued': Decimal('0'),
+                'received': Decimal('0'),
+                'balance': Decimal('0'),
+                'overdue': Decimal('0')
+            })
+        
+        # Начисления по месяцу due_date (срок оплаты): начислено, остаток и просрочено
+        # (due_date < today и balance > 0) — один сгруппированный запрос
+        accrual_months = accruals_query.annotate(month=TruncMonth('due_date')).order_by().values('month').annotate(
+            accrued_total=money_sum('final_amount', *ACCRUAL_RATE, base=base_currency),
+            balance_total=money_sum('balance', *ACCRUAL_RATE, base=base_currency),
+            overdue_total=money_sum(
+                'balance', *ACCRUAL_RATE, base=base_currency, filter=Q(due_date__lt=today, balance__gt=0)
+            ),
+        )
+        for row in accrual_months:
+            data = month_row(row['month'])
+            data['accrued'] += row['accrued_total']
+            data['balance'] += row['balance_total']
+            data['overdue'] += row['overdue_total'] or Decimal('0')
+        
+        # Платежи (фактические поступления) по месяцу payment_date
+        payment_months = payments_query.annotate(month=TruncMonth('payment_date')).order_by().values('month').annotate(
+            received=money_sum('amount', *PAYMENT_RATE, base=base_currency),
+        )
+        for row in payment_months:
+            month_row(row['month'])['received'] += row['received']
+        
+        if base_currency:
+            for data in monthly_forecast.values():
+                for key in data:
+                    data[key] = round_money(data[key])
         
         # Проверяем синхронизацию: сумма monthly должна равняться summary
         monthly_accrued_sum = sum(Decimal(data['accrued']) for data in monthly_forecast.values())
@@ -171,9 +172,9 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
             }
         else:
             # Для "Все время" определяем период на основе данных
-            if accruals.exists():
-                min_date = accruals.aggregate(Min('due_date'))['due_date__min']
-                max_date = accruals.aggregate(Max('due_date'))['due_date__max']
+            if accruals_query.exists():
+                min_date = accruals_query.aggregate(Min('due_date'))['due_date__min']
+                max_date = accruals_query.aggregate(Max('due_date'))['due_date__max']
                 if min_date and max_date:
                     days_in_period = (max_date - min_date).days + 1
                     period_data = {
@@ -196,6 +197,7 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
         
         return Response({
             'period': period_data,
+            'base_currency': base_currency,
             'summary': {
                 'accrued': str(total_accrued),  # Начислено (сумма всех начислений в периоде)
                 'received': str(total_received),  # Поступления (фактические платежи в периоде)
@@ -207,7 +209,11 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def by_contract(self, request):
-        """Прогноз по договорам с data scoping"""
+        """
+        Прогноз по договорам с data scoping.
+        Суммы считаются одним сгруппированным запросом по договорам (без запросов на каждый договор).
+        С параметром stream=true ответ отдается потоком (JSON-массив по частям).
+        """
         today = timezone.now().date()
         days_ahead = int(request.query_params.get('days', 30))
         end_date = today + timedelta(days=days_ahead)
@@ -215,28 +221,33 @@ class ForecastViewSet(DataScopingMixin, viewsets.ViewSet):
         contracts_query = Contract.objects.filter(status='active')
         # Применяем data scoping
         contracts_query = self._scope_for_user(contracts_query, request.user, 'Contract')
-        contracts = contracts_query.select_related('tenant', 'property', 'landlord')
-        result = []
-        
-        for contract in contracts:
-            accruals = Accrual.objects.filter(
-                contract=contract,
-                period_start__lte=end_date,
-                balance__gt=0
-            )
-            
-            expected = accruals.aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
-            paid = accruals.aggregate(total=Sum('paid_amount'))['total'] or Decimal('0')
-            balance = expected - paid
-            
-            result.append({
-                'contract_id': contract.id,
-                'contract_number': contract.number,
-                'tenant': contract.tenant.name,
-                'property': contract.property.name,
-                'expected': expected,
-                'paid': paid,
-                'balance': balance
-            })
         
-        return Response(result)
+        money = DecimalField(max_digits=12, decimal_places=2)
+        accruals_filter = Q(accruals__period_start__lte=end_date, accruals__balance__gt=0)
+        rows = contracts_query.annotate(
+            expected=Coalesce(Sum('accruals__final_amount', filter=accruals_filter), Value(Decimal('0')), output_field=money),
+            paid=Coalesce(Sum('accruals__paid_amount', filter=accruals_filter), Value(Decimal('0')), output_field=money),
+        ).order_by('id').values(
+            'id', 'number', 'tenant__name', 'property__name', 'expected', 'paid'
+        )
+        
+        def serialize(row):
+            return {
+                'contract_id': row['id'],
+                'contract_number': row['number'],
+                'tenant': row['tenant__name'],
+                'property': row['property__name'],
+                'expected': row['expected'],
+                'paid': row['paid'],
+                'balance': row['expected'] - row['paid']
+            }
+        
+        if request.query_params.get('stream', '').lower() == 'true':
+            def stream():
+                yield b'['
+                for index, row in enumerate(rows.iterator(chunk_size=STREAM_CHUNK_SIZE)):
+                    yield (b',' if index else b'') + dumps(serialize(row))
+                yield b']'
+            return StreamingHttpResponse(stream(), content_type='application/json')
+        
+        return Response([serialize(row) for row in rows])
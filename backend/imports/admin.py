@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import ImportRun
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    list_display = ['original_name', 'kind', 'status', 'dry_run', 'strict', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+    raw_id_fields = ['job', 'created_by']
+    readonly_fields = ['stats', 'errors']
@@ -0,0 +1,57 @@
+"""
+Массовый импорт контрагентов, объектов и договоров из CSV/XLSX.
+Сначала проверяются все строки, затем корректные вставляются пакетами; ошибки — в отчет по строкам.
+Договоры ссылаются на контрагентов и объекты, поэтому их импортируют последними.
+
+Использование:
+  python manage.py import_data counterparties tenants.csv
+  python manage.py import_data properties objects.xlsx --dry-run
+  python manage.py import_data contracts contracts.csv --strict --report errors.csv
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from imports.models import ImportRun
+from imports.readers import ImportFileError, write_report_csv
+from imports.services import BATCH_SIZE, ImportService
+
+
+class Command(BaseCommand):
+    help = 'Импортирует контрагентов, объекты или договоры из CSV/XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=[kind for kind, _ in ImportRun.KIND_CHOICES], help='Что импортируется')
+        parser.add_argument('path', help='Путь к файлу CSV или XLSX')
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить файл, ничего не записывать')
+        parser.add_argument('--strict', action='store_true', help='Ничего не загружать, если есть хоть одна ошибка')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Строк в одном INSERT')
+        parser.add_argument('--report', help='Сохранить отчет по строкам в CSV')
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['path']):
+            raise CommandError(f'Файл не найден: {options["path"]}')
+        try:
+            result = ImportService.import_file(
+                options['kind'], options['path'],
+                dry_run=options['dry_run'], strict=options['strict'], batch_size=options['batch_size'],
+            )
+        except ImportFileError as e:
+            raise CommandError(str(e))
+
+        for error in result.errors[:20]:
+            self.stdout.write(f'  строка {error["row"]}: {error["field"] or "—"}: {error["message"]}')
+        if len(result.errors) > 20:
+            self.stdout.write(f'  ... и еще {len(result.errors) - 20}')
+        if options['report'] and result.errors:
+            with open(options['report'], 'w', encoding='utf-8', newline='') as f:
+                f.write(write_report_csv(result.errors))
+            self.stdout.write(f'Отчет по строкам: {options["report"]}')
+
+        summary = ', '.join(f'{key}: {value}' for key, value in result.stats.items())
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'✓ Проверка завершена, данные не записаны ({summary})'))
+        elif options['strict'] and result.has_errors:
+            self.stdout.write(self.style.WARNING(f'⚠ В файле есть ошибки — ничего не загружено ({summary})'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ Импорт завершен ({summary})'))
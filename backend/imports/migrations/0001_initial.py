@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:49
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('jobs', '0002_scheduledrun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('counterparties', 'Контрагенты'), ('properties', 'Объекты недвижимости'), ('contracts', 'Договоры')], max_length=20, verbose_name='Что импортируется')),
+                ('file', models.FileField(upload_to='imports/%Y/%m/', verbose_name='Файл')),
+                ('original_name', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('dry_run', models.BooleanField(default=False, verbose_name='Только проверка')),
+                ('strict', models.BooleanField(default=False, verbose_name='Все или ничего')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('validated', 'Проверен'), ('succeeded', 'Загружен'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('stats', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Итоги')),
+                ('errors', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Ошибки по строкам')),
+                ('message', models.TextField(blank=True, verbose_name='Сообщение')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершен')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_runs', to=settings.AUTH_USER_MODEL, verbose_name='Загрузил')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='jobs.job', verbose_name='Задача')),
+            ],
+            options={
+                'verbose_name': 'Импорт',
+                'verbose_name_plural': 'Импорты',
+                'db_table': 'import_runs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ImportRun(models.Model):
+    """
+    Загрузка файла импорта (CSV/XLSX): контрагенты, объекты или договоры.
+    Обрабатывается в фоне (задача imports.run): сначала проверка всех строк, затем вставка
+    корректных строк пакетами. errors — отчет по строкам: ошибки и пропущенные дубликаты.
+    """
+    KIND_CHOICES = [
+        ('counterparties', 'Контрагенты'),
+        ('properties', 'Объекты недвижимости'),
+        ('contracts', 'Договоры'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('validated', 'Проверен'),
+        ('succeeded', 'Загружен'),
+        ('failed', 'Ошибка'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name='Что импортируется')
+    file = models.FileField(upload_to='imports/%Y/%m/', verbose_name='Файл')
+    original_name = models.CharField(max_length=255, verbose_name='Имя файла')
+    # Только проверка, без записи в БД
+    dry_run = models.BooleanField(default=False, verbose_name='Только проверка')
+    # Не загружать ничего, если есть хоть одна ошибка
+    strict = models.BooleanField(default=False, verbose_name='Все или ничего')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='Статус')
+    stats = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name='Итоги')
+    errors = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder, verbose_name='Ошибки по строкам')
+    message = models.TextField(blank=True, verbose_name='Сообщение')
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Задача'
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='import_runs',
+        verbose_name='Загрузил'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершен')
+
+    class Meta:
+        db_table = 'import_runs'
+        verbose_name = 'Импорт'
+        verbose_name_plural = 'Импорты'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.get_kind_display()}: {self.original_name} ({self.get_status_display()})'
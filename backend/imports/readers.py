@@ -0,0 +1,114 @@
+"""
+Чтение строк импорта из CSV и XLSX.
+
+CSV: кодировка UTF-8 (с BOM или без) или Windows-1251 (выгрузка из Excel), разделитель
+определяется по первой строке — запятая, точка с запятой или табуляция.
+XLSX читается потоково (openpyxl, read_only) — первый лист, первая строка — заголовки.
+Строки не накапливаются в памяти: read_rows — генератор.
+"""
+import csv
+import io
+import os
+
+CSV_SAMPLE_SIZE = 64 * 1024
+CSV_DELIMITERS = ',;\t'
+
+
+class ImportFileError(ValueError):
+    """Файл нельзя прочитать: формат, кодировка, нет заголовков"""
+
+
+def normalize_header(value):
+    return ' '.join(str(value or '').replace('ё', 'е').replace('Ё', 'Е').strip().lower().split())
+
+
+def _detect_encoding(path):
+    with open(path, 'rb') as f:
+        sample = f.read(CSV_SAMPLE_SIZE)
+    try:
+        sample.decode('utf-8')
+        return 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # Выборка могла оборваться посреди многобайтного символа
+        if e.start >= len(sample) - 3:
+            return 'utf-8-sig'
+        return 'cp1251'
+
+
+def _read_csv(path):
+    encoding = _detect_encoding(path)
+    with open(path, newline='', encoding=encoding) as f:
+        first_line = f.readline()
+        f.seek(0)
+        counts = {delimiter: first_line.count(delimiter) for delimiter in CSV_DELIMITERS}
+        delimiter = max(counts, key=counts.get) if any(counts.values()) else ','
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+def _read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('Для импорта XLSX нужен пакет openpyxl (pip install openpyxl)')
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield ['' if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(path, filename=None, columns=None):
+    """
+    Строки файла как (номер строки в файле, {поле: значение}).
+    columns — поле → варианты заголовка (normalize_header); прочие колонки пропускаются.
+    Первой строкой возвращается (1, {поле: заголовок}) — какие колонки распознаны.
+    """
+    extension = os.path.splitext(filename or path)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        rows = _read_xlsx(path)
+    elif extension in ('.csv', '.txt', ''):
+        rows = _read_csv(path)
+    else:
+        raise ImportFileError(f'Неподдерживаемый формат файла: {extension} (нужен CSV или XLSX)')
+
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ImportFileError('Файл пуст')
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f'Не удалось прочитать файл: {e}')
+
+    aliases = {}
+    for field, names in (columns or {}).items():
+        for name in names:
+            aliases[normalize_header(name)] = field
+    positions = {}
+    for index, title in enumerate(header):
+        field = aliases.get(normalize_header(title))
+        if field and field not in positions:
+            positions[field] = index
+    yield 1, {field: header[index] for field, index in positions.items()}
+
+    line_number = 1
+    try:
+        for line_number, row in enumerate(rows, start=2):
+            if not any(str(value).strip() for value in row):
+                continue
+            yield line_number, {
+                field: (row[index] if index < len(row) else '')
+                for field, index in positions.items()
+            }
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f'Не удалось прочитать файл после строки {line_number}: {e}')
+
+
+def write_report_csv(errors):
+    """Отчет об ошибках по строкам в CSV (UTF-8 с BOM — открывается в Excel)"""
+    buffer = io.StringIO()
+    buffer.write('\ufeff')
+    writer = csv.writer(buffer, delimiter=';')
+    writer.writerow(['Строка', 'Статус', 'Поле', 'Сообщение'])
+    for error in errors:
+        writer.writerow([error['row'], error['status'], error.get('field') or '', error['message']])
+    return buffer.getvalue()
@@ -0,0 +1,45 @@
+import os
+
+from rest_framework import serializers
+from .models import ImportRun
+
+IMPORT_EXTENSIONS = ('.csv', '.txt', '.xlsx', '.xlsm')
+
+
+class ImportRunSerializer(serializers.ModelSerializer):
+    kind_display = serializers.CharField(source='get_kind_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    job_status = serializers.CharField(source='job.status', read_only=True, default=None)
+    progress_percent = serializers.IntegerField(source='job.progress_percent', read_only=True, default=None)
+    error_count = serializers.SerializerMethodField()
+    report_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportRun
+        fields = [
+            'id', 'kind', 'kind_display', 'file', 'original_name', 'dry_run', 'strict',
+            'status', 'status_display', 'stats', 'error_count', 'message', 'report_url',
+            'job', 'job_status', 'progress_percent', 'created_at', 'finished_at'
+        ]
+        read_only_fields = [
+            'original_name', 'status', 'stats', 'message', 'job', 'created_at', 'finished_at'
+        ]
+        extra_kwargs = {'file': {'write_only': True}}
+
+    def validate_file(self, value):
+        extension = os.path.splitext(value.name)[1].lower()
+        if extension not in IMPORT_EXTENSIONS:
+            raise serializers.ValidationError('Нужен файл CSV или XLSX')
+        return value
+
+    def create(self, validated_data):
+        validated_data['original_name'] = validated_data['file'].name[:255]
+        return super().create(validated_data)
+
+    def get_error_count(self, obj):
+        return len(obj.errors)
+
+    def get_report_url(self, obj):
+        if not obj.errors:
+            return None
+        return f'/api/imports/{obj.pk}/report/'
@@ -0,0 +1,583 @@
+"""
+Массовый импорт контрагентов, объектов недвижимости и договоров из CSV/XLSX.
+
+Импорт идет в два прохода:
+1. Проверка. Каждая строка разбирается целиком (обязательные поля, даты, суммы, значения из
+   справочников), затем одним запросом на тип проверяются ссылки и дубликаты: контрагенты —
+   по нормализованному телефону, объекты — по адресу и помещению, договоры — по номеру.
+   Ошибка в строке не прерывает импорт — она попадает в отчет по строкам.
+2. Загрузка. Корректные строки вставляются пакетами bulk_create в одной транзакции; номера
+   договоров резервируются одним вызовом, графики начислений строятся сразу для всех договоров
+   (ContractService.bulk_create_contracts).
+
+Строгий режим (strict) ничего не загружает, если в файле есть ошибки; dry_run — только проверка.
+"""
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+
+from contracts.models import Contract
+from contracts.services import ContractService
+from core.models import EMPLOYEE_TYPES, Tenant
+from core.utils import normalize_phone
+from properties.models import Property
+from .readers import ImportFileError, read_rows
+
+BATCH_SIZE = 1000
+PROGRESS_EVERY = 500
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d.%m.%y', '%d/%m/%Y', '%d/%m/%y')
+
+
+class RowError(Exception):
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
+        self.message = message
+
+
+class ImportResult:
+    """Итоги импорта и отчет по строкам: ошибки (status='error') и пропущенные строки ('skipped')"""
+
+    def __init__(self):
+        self.stats = {'rows': 0, 'valid': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+        self.errors = []
+
+    def error(self, row, field, message):
+        self.stats['errors'] += 1
+        self.errors.append({'row': row, 'status': 'error', 'field': field, 'message': message})
+
+    def skip(self, row, field, message):
+        self.stats['skipped'] += 1
+        self.errors.append({'row': row, 'status': 'skipped', 'field': field, 'message': message})
+
+    @property
+    def has_errors(self):
+        return self.stats['errors'] > 0
+
+
+# ——— Разбор значений ячеек ———
+
+def clean_str(value, max_length=None):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = ' '.join(str(value).split())
+    return text[:max_length] if max_length else text
+
+
+def parse_decimal(value, field, required=True, default=None):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        amount = Decimal(str(value))
+    else:
+        text = clean_str(value).replace(' ', '').replace('\xa0', '').replace(',', '.')
+        if not text:
+            if required:
+                raise RowError(field, 'Не заполнено')
+            return default
+        try:
+            amount = Decimal(text)
+        except InvalidOperation:
+            raise RowError(field, f'Не число: {value}')
+    if amount < 0:
+        raise RowError(field, 'Не может быть отрицательным')
+    return amount.quantize(Decimal('0.01'))
+
+
+def parse_date(value, field, required=True):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = clean_str(value)
+    if not text:
+        if required:
+            raise RowError(field, 'Не заполнено')
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise RowError(field, f'Неверная дата: {text} (ожидается ДД.ММ.ГГГГ или ГГГГ-ММ-ДД)')
+
+
+def parse_int(value, field, default, minimum, maximum):
+    text = clean_str(value)
+    if not text:
+        return default
+    try:
+        number = int(float(text.replace(',', '.')))
+    except ValueError:
+        raise RowError(field, f'Не число: {text}')
+    if not minimum <= number <= maximum:
+        raise RowError(field, f'Допустимо от {minimum} до {maximum}')
+    return number
+
+
+def parse_choice(value, field, choices, default, exclude=()):
+    """Значение справочника по коду или подписи (без учета регистра): 'tenant' или 'Арендатор'"""
+    text = clean_str(value).lower()
+    if not text:
+        return default
+    for code, label in choices:
+        if code in exclude:
+            continue
+        if text in (code.lower(), str(label).lower()):
+            return code
+    allowed = ', '.join(code for code, _ in choices if code not in exclude)
+    raise RowError(field, f'Неизвестное значение «{clean_str(value)}» (допустимо: {allowed})')
+
+
+def phone_index(queryset):
+    """
+    Нормализованный телефон → контрагент. Номера, введенные вручную, хранятся как ввели
+    (+996 555 ..., 0555 ...), поэтому сравнение идет по normalize_phone, а не по phone__in.
+    """
+    return {
+        normalize_phone(tenant.phone): tenant
+        for tenant in queryset.exclude(phone__isnull=True).exclude(phone='')
+    }
+
+
+class BaseImporter:
+    """Разбор строки (parse), проверки по базе для всех строк сразу (resolve), вставка (apply)"""
+    # поле → варианты заголовка колонки
+    columns = {}
+    # группы колонок: в файле должна быть хотя бы одна колонка из каждой группы
+    required_columns = []
+
+    def __init__(self, result):
+        self.result = result
+
+    def column_title(self, field):
+        """Заголовок колонки для сообщений: первый русский вариант"""
+        title = next((name for name in self.columns[field] if not name.isascii()), field)
+        return title[:1].upper() + title[1:]
+
+    def missing_columns(self, recognized):
+        return [
+            ' или '.join(self.column_title(field) for field in group)
+            for group in self.required_columns
+            if not any(field in recognized for field in group)
+        ]
+
+    def parse(self, row, values):
+        raise NotImplementedError
+
+    def resolve(self, items):
+        return items
+
+    def apply(self, items, batch_size):
+        raise NotImplementedError
+
+
+class CounterpartyImporter(BaseImporter):
+    """Контрагенты: один телефон — один контрагент; существующему дополняются пустые поля"""
+    columns = {
+        'name': ['name', 'название', 'наименование', 'контрагент', 'фио'],
+        'type': ['type', 'тип'],
+        'phone': ['phone', 'телефон'],
+        'email': ['email', 'e-mail', 'почта'],
+        'contact_person': ['contact_person', 'контактное лицо'],
+        'inn': ['inn', 'инн'],
+        'address': ['address', 'адрес'],
+        'comment': ['comment', 'комментарий'],
+    }
+    required_columns = [('name',)]
+    fill_fields = ('email', 'contact_person', 'inn', 'address', 'comment')
+
+    def parse(self, row, values):
+        name = clean_str(values.get('name'), 255)
+        if not name:
+            raise RowError('name', 'Не заполнено')
+        raw_phone = clean_str(values.get('phone'))
+        phone = normalize_phone(raw_phone)
+        if raw_phone and not phone:
+            raise RowError('phone', f'Неверный номер телефона: {raw_phone}')
+        email = clean_str(values.get('email'), 254)
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                raise RowError('email', f'Неверный email: {email}')
+        return {
+            'row': row,
+            'name': name,
+            'type': parse_choice(values.get('type'), 'type', Tenant.TYPE_CHOICES, 'tenant', exclude=EMPLOYEE_TYPES),
+            'phone': phone or None,
+            'email': email,
+            'contact_person': clean_str(values.get('contact_person'), 255),
+            'inn': clean_str(values.get('inn'), 20),
+            'address': clean_str(values.get('address')),
+            'comment': clean_str(values.get('comment')),
+        }
+
+    def resolve(self, items):
+        seen = {}
+        unique = []
+        for item in items:
+            key = item['phone'] or (item['type'], item['name'].lower())
+            if key in seen:
+                self.result.skip(item['row'], 'phone' if item['phone'] else 'name', f'Дубликат строки {seen[key]}')
+                continue
+            seen[key] = item['row']
+            unique.append(item)
+
+        by_phone = phone_index(Tenant.objects.all()) if any(item['phone'] for item in unique) else {}
+        names = [item['name'] for item in unique if not item['phone']]
+        by_name = {
+            (tenant.type, tenant.name.lower())
+            for tenant in Tenant.objects.filter(name__in=names).only('type', 'name')
+        }
+
+        resolved = []
+        for item in unique:
+            existing = by_phone.get(item['phone']) if item['phone'] else None
+            if existing is not None and existing.type in EMPLOYEE_TYPES:
+                self.result.error(item['row'], 'phone', f'Телефон принадлежит сотруднику «{existing.name}»')
+                continue
+            if not item['phone'] and (item['type'], item['name'].lower()) in by_name:
+                self.result.skip(item['row'], 'name', 'Контрагент с таким названием уже есть')
+                continue
+            item['existing'] = existing
+            resolved.append(item)
+        return resolved
+
+    def apply(self, items, batch_size):
+        new, changed = [], []
+        # bulk_update не выставляет auto_now — updated_at (ETag, версии данных отчетов) пишется явно
+        now = timezone.now()
+        for item in items:
+            existing = item.pop('existing')
+            item.pop('row')
+            if existing is None:
+                new.append(Tenant(**item))
+                continue
+            updated = False
+            for field in self.fill_fields:
+                if item[field] and not getattr(existing, field):
+                    setattr(existing, field, item[field])
+                    updated = True
+            if updated:
+                existing.updated_at = now
+                changed.append(existing)
+        Tenant.objects.bulk_create(new, batch_size=batch_size)
+        Tenant.objects.bulk_update(changed, [*self.fill_fields, 'updated_at'], batch_size=batch_size)
+        self.result.stats['created'] += len(new)
+        self.result.stats['updated'] += len(changed)
+
+
+class PropertyImporter(BaseImporter):
+    """Объекты недвижимости: один адрес + помещение — один объект"""
+    columns = {
+        'name': ['name', 'название', 'название объекта', 'объект'],
+        'address': ['address', 'адрес'],
+        'block_floor_room': ['block_floor_room', 'помещение', 'блок/этаж/№ помещения', 'блок/этаж/помещение'],
+        'property_type': ['property_type', 'тип', 'тип недвижимости'],
+        'area': ['area', 'площадь', 'площадь м²', 'площадь м2'],
+        'status': ['status', 'статус'],
+        'owner': ['owner', 'владелец'],
+        'comment': ['comment', 'комментарий'],
+    }
+    required_columns = [('address',), ('area',)]
+
+    def parse(self, row, values):
+        address = clean_str(values.get('address'), 500)
+        if not address:
+            raise RowError('address', 'Не заполнено')
+        block = clean_str(values.get('block_floor_room'), 100)
+        name = clean_str(values.get('name'), 255) or (f'{address}, {block}' if block else address)[:255]
+        return {
+            'row': row,
+            'name': name,
+            'address': address,
+            'block_floor_room': block,
+            'property_type': parse_choice(
+                values.get('property_type'), 'property_type', Property.PROPERTY_TYPE_CHOICES, 'office',
+            ),
+            'area': parse_decimal(values.get('area'), 'area'),
+            'status': parse_choice(values.get('status'), 'status', Property.STATUS_CHOICES, 'free'),
+            'owner': clean_str(values.get('owner'), 255),
+            'comment': clean_str(values.get('comment')),
+        }
+
+    def resolve(self, items):
+        existing = {
+            (address.lower(), block.lower())
+            for address, block in Property.objects.filter(
+                address__in={item['address'] for item in items}
+            ).values_list('address', 'block_floor_room')
+        }
+        seen = {}
+        resolved = []
+        for item in items:
+            key = (item['address'].lower(), item['block_floor_room'].lower())
+            if key in seen:
+                self.result.skip(item['row'], 'address', f'Дубликат строки {seen[key]}')
+            elif key in existing:
+                self.result.skip(item['row'], 'address', 'Объект с таким адресом и помещением уже есть')
+            else:
+                seen[key] = item['row']
+                resolved.append(item)
+        return resolved
+
+    def apply(self, items, batch_size):
+        objects = []
+        for item in items:
+            item.pop('row')
+            objects.append(Property(**item))
+        Property.objects.bulk_create(objects, batch_size=batch_size)
+        self.result.stats['created'] += len(objects)
+
+
+class ContractImporter(BaseImporter):
+    """
+    Договоры: арендатор — по телефону или названию, объект — по названию или адресу и помещению
+    (контрагенты и объекты импортируются заранее). Без номера — номер выдается автоматически.
+    """
+    columns = {
+        'number': ['number', 'номер', 'номер договора'],
+        'tenant_phone': ['tenant_phone', 'телефон арендатора', 'телефон'],
+        'tenant_name': ['tenant_name', 'арендатор'],
+        'landlord_name': ['landlord_name', 'арендодатель'],
+        'property_name': ['property_name', 'объект', 'название объекта'],
+        'property_address': ['property_address', 'адрес', 'адрес объекта'],
+        'property_room': ['property_room', 'помещение', 'блок/этаж/№ помещения'],
+        'signed_at': ['signed_at', 'дата подписания'],
+        'start_date': ['start_date', 'дата начала', 'начало'],
+        'end_date': ['end_date', 'дата окончания', 'окончание'],
+        'rent_amount': ['rent_amount', 'ставка', 'ставка аренды', 'аренда'],
+        'currency': ['currency', 'валюта'],
+        'due_day': ['due_day', 'день оплаты'],
+        'deposit_amount': ['deposit_amount', 'депозит', 'сумма депозита'],
+        'status': ['status', 'статус'],
+        'comment': ['comment', 'комментарий'],
+    }
+    required_columns = [
+        ('tenant_phone', 'tenant_name'),
+        ('property_name', 'property_address'),
+        ('start_date',),
+        ('end_date',),
+        ('rent_amount',),
+    ]
+
+    def parse(self, row, values):
+        tenant_phone = normalize_phone(clean_str(values.get('tenant_phone')))
+        tenant_name = clean_str(values.get('tenant_name'), 255)
+        if not tenant_phone and not tenant_name:
+            raise RowError('tenant_phone', 'Укажите телефон или название арендатора')
+        property_name = clean_str(values.get('property_name'), 255)
+        property_address = clean_str(values.get('property_address'), 500)
+        if not property_name and not property_address:
+            raise RowError('property_name', 'Укажите объект или его адрес')
+        start_date = parse_date(values.get('start_date'), 'start_date')
+        end_date = parse_date(values.get('end_date'), 'end_date')
+        if end_date <= start_date:
+            raise RowError('end_date', 'Дата окончания должна быть позже даты начала')
+        deposit_amount = parse_decimal(values.get('deposit_amount'), 'deposit_amount', required=False, default=Decimal('0'))
+        return {
+            'row': row,
+            'number': clean_str(values.get('number'), 50),
+            'tenant_phone': tenant_phone,
+            'tenant_name': tenant_name,
+            'landlord_name': clean_str(values.get('landlord_name'), 255),
+            'property_name': property_name,
+            'property_address': property_address,
+            'property_room': clean_str(values.get('property_room'), 100),
+            'signed_at': parse_date(values.get('signed_at'), 'signed_at', required=False) or start_date,
+            'start_date': start_date,
+            'end_date': end_date,
+            'rent_amount': parse_decimal(values.get('rent_amount'), 'rent_amount'),
+            'currency': parse_choice(values.get('currency'), 'currency', Contract.CURRENCY_CHOICES, 'KGS'),
+            'due_day': parse_int(values.get('due_day'), 'due_day', 25, 1, 31),
+            'deposit_enabled': deposit_amount > 0,
+            'deposit_amount': deposit_amount,
+            'status': parse_choice(values.get('status'), 'status', Contract.STATUS_CHOICES, 'active'),
+            'comment': clean_str(values.get('comment')),
+        }
+
+    @staticmethod
+    def _unique_index(rows):
+        """ключ → объект; ключ, встретившийся дважды, → None (неоднозначно)"""
+        index = {}
+        for key, obj in rows:
+            index[key] = None if key in index else obj
+        return index
+
+    def resolve(self, items):
+        counterparties = Tenant.objects.exclude(type__in=EMPLOYEE_TYPES)
+        tenants_by_phone = phone_index(counterparties) if any(i['tenant_phone'] for i in items) else {}
+        tenants_by_name = self._unique_index(
+            (tenant.name.lower(), tenant)
+            for tenant in counterparties.filter(name__in={i['tenant_name'] for i in items if i['tenant_name']})
+        )
+        landlords = self._unique_index(
+            (tenant.name.lower(), tenant)
+            for tenant in Tenant.objects.filter(
+                type='landlord', name__in={i['landlord_name'] for i in items if i['landlord_name']},
+            )
+        )
+        properties_by_name = self._unique_index(
+            (prop.name.lower(), prop)
+            for prop in Property.objects.filter(name__in={i['property_name'] for i in items if i['property_name']})
+        )
+        properties_by_address = self._unique_index(
+            ((prop.address.lower(), prop.block_floor_room.lower()), prop)
+            for prop in Property.objects.filter(
+                address__in={i['property_address'] for i in items if i['property_address']},
+            )
+        )
+        numbers = [item['number'] for item in items if item['number']]
+        existing_numbers = set(Contract.objects.filter(number__in=numbers).values_list('number', flat=True))
+
+        seen_numbers = {}
+        resolved = []
+        for item in items:
+            row = item['row']
+            if item['number']:
+                if item['number'] in existing_numbers:
+                    self.result.skip(row, 'number', f'Договор {item["number"]} уже есть')
+                    continue
+                if item['number'] in seen_numbers:
+                    self.result.error(row, 'number', f'Номер уже использован в строке {seen_numbers[item["number"]]}')
+                    continue
+                seen_numbers[item['number']] = row
+            try:
+                if item['tenant_phone'] in tenants_by_phone:
+                    item['tenant'] = tenants_by_phone[item['tenant_phone']]
+                else:
+                    item['tenant'] = self._lookup(tenants_by_name, item['tenant_name'].lower(), 'tenant_name', 'Арендатор')
+                if item['property_name']:
+                    item['property'] = self._lookup(
+                        properties_by_name, item['property_name'].lower(), 'property_name', 'Объект',
+                    )
+                else:
+                    item['property'] = self._lookup(
+                        properties_by_address, (item['property_address'].lower(), item['property_room'].lower()),
+                        'property_address', 'Объект',
+                    )
+                item['landlord'] = None
+                if item['landlord_name']:
+                    item['landlord'] = self._lookup(
+                        landlords, item['landlord_name'].lower(), 'landlord_name', 'Арендодатель',
+                    )
+            except RowError as e:
+                self.result.error(row, e.field, e.message)
+                continue
+            resolved.append(item)
+        return resolved
+
+    @staticmethod
+    def _lookup(index, key, field, label):
+        if key not in index:
+            raise RowError(field, f'{label} не найден')
+        if index[key] is None:
+            raise RowError(field, f'{label}: найдено несколько, уточните')
+        return index[key]
+
+    def apply(self, items, batch_size):
+        contracts = [
+            Contract(
+                number=item['number'],
+                signed_at=item['signed_at'],
+                property=item['property'],
+                tenant=item['tenant'],
+                landlord=item['landlord'],
+                start_date=item['start_date'],
+                end_date=item['end_date'],
+                rent_amount=item['rent_amount'],
+                currency=item['currency'],
+                due_day=item['due_day'],
+                deposit_enabled=item['deposit_enabled'],
+                deposit_amount=item['deposit_amount'],
+                status=item['status'],
+                comment=item['comment'],
+            )
+            for item in items
+        ]
+        created = ContractService.bulk_create_contracts(contracts, batch_size=batch_size)
+        self.result.stats['created'] += created['contracts']
+        self.result.stats['accruals'] = created['accruals']
+        self.result.stats['deposits'] = created['deposits']
+
+
+IMPORTERS = {
+    'counterparties': CounterpartyImporter,
+    'properties': PropertyImporter,
+    'contracts': ContractImporter,
+}
+
+
+class ImportService:
+    """Импорт файла: проверка всех строк, затем пакетная вставка корректных"""
+
+    @staticmethod
+    def import_file(kind, path, filename=None, dry_run=False, strict=False, batch_size=BATCH_SIZE, progress=None):
+        """
+        Импортировать файл. Возвращает ImportResult; ошибки формата файла — ImportFileError.
+        progress(done, total, message) — отчет о ходе выполнения для фоновой задачи.
+        """
+        if kind not in IMPORTERS:
+            raise ImportFileError(f'Неизвестный тип импорта: {kind}')
+        result = ImportResult()
+        importer = IMPORTERS[kind](result)
+
+        rows = read_rows(path, filename, importer.columns)
+        _, recognized = next(rows)
+        missing = importer.missing_columns(recognized)
+        if missing:
+            raise ImportFileError(f'В файле нет колонок: {", ".join(missing)}')
+
+        items = []
+        for row, values in rows:
+            result.stats['rows'] += 1
+            try:
+                items.append(importer.parse(row, values))
+            except RowError as e:
+                result.error(row, e.field, e.message)
+            if progress and result.stats['rows'] % PROGRESS_EVERY == 0:
+                progress(result.stats['rows'], None, 'Проверка строк')
+
+        items = importer.resolve(items)
+        result.stats['valid'] = len(items)
+        if dry_run or (strict and result.has_errors):
+            return result
+
+        if progress:
+            progress(result.stats['rows'], result.stats['rows'], 'Загрузка')
+        with transaction.atomic():
+            importer.apply(items, batch_size)
+        return result
+
+    @staticmethod
+    def run(import_run, progress=None):
+        """Выполнить ImportRun (фоновая задача imports.run) и сохранить итоги и отчет по строкам"""
+        import_run.status = 'running'
+        import_run.save(update_fields=['status'])
+        try:
+            result = ImportService.import_file(
+                import_run.kind, import_run.file.path, import_run.original_name,
+                dry_run=import_run.dry_run, strict=import_run.strict, progress=progress,
+            )
+        except ImportFileError as e:
+            import_run.status = 'failed'
+            import_run.message = str(e)
+        else:
+            import_run.stats = result.stats
+            import_run.errors = result.errors
+            if import_run.dry_run:
+                import_run.status = 'validated'
+                import_run.message = 'Проверка завершена, данные не загружались'
+            elif import_run.strict and result.has_errors:
+                import_run.status = 'failed'
+                import_run.message = 'В файле есть ошибки — ничего не загружено'
+            else:
+                import_run.status = 'succeeded'
+        import_run.finished_at = timezone.now()
+        import_run.save(update_fields=['status', 'stats', 'errors', 'message', 'finished_at'])
+        return import_run
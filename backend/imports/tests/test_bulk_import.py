@@ -0,0 +1,175 @@
+"""
+Тесты массового импорта: дедупликация контрагентов по телефону, отчет по строкам,
+договоры с автономерами, начислениями и депозитами, dry-run/strict, загрузка через API
+"""
+import os
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import Tenant, User
+from deposits.models import Deposit
+from imports.models import ImportRun
+from imports.readers import ImportFileError
+from imports.services import ImportService
+from jobs.services import JobService
+from properties.models import Property
+
+COUNTERPARTIES_CSV = (
+    'Название;Телефон;Тип;Email\n'
+    'ОсОО Альфа;0555 100 200;Арендатор;alpha@example.com\n'
+    'Альфа дубль;+996555100200;;\n'
+    'Бета;12;;\n'
+    'Гамма;+996 555 300 400;Арендодатель;not-an-email\n'
+    ';+996555500600;;\n'
+    'Существующий;996555700800;;new@example.com\n'
+)
+
+
+class BulkImportTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.tmp)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _file(self, content, name='data.csv', encoding='utf-8'):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            f.write(content)
+        return path
+
+    def test_counterparties_deduplicated_by_phone(self):
+        existing = Tenant.objects.create(name='Существующий', phone='+996 555 700 800')
+        stamp = existing.updated_at
+        result = ImportService.import_file('counterparties', self._file(COUNTERPARTIES_CSV))
+
+        self.assertEqual(result.stats['rows'], 6)
+        self.assertEqual(result.stats['created'], 1)
+        self.assertEqual(result.stats['updated'], 1)
+        self.assertEqual(result.stats['skipped'], 1)
+        self.assertEqual(result.stats['errors'], 3)
+        self.assertEqual(
+            [(e['row'], e['status'], e['field']) for e in result.errors],
+            [(4, 'error', 'phone'), (5, 'error', 'email'), (6, 'error', 'name'), (3, 'skipped', 'phone')],
+        )
+
+        alpha = Tenant.objects.get(name='ОсОО Альфа')
+        self.assertEqual(alpha.phone, '996555100200')
+        self.assertEqual(alpha.email, 'alpha@example.com')
+        existing.refresh_from_db()
+        self.assertEqual(existing.email, 'new@example.com')
+        # Обновление пакетом сдвигает updated_at — ETag и версии данных отчетов меняются
+        self.assertGreater(existing.updated_at, stamp)
+        self.assertEqual(Tenant.objects.count(), 2)
+
+        # Повторный импорт того же файла ничего не создает
+        again = ImportService.import_file('counterparties', self._file(COUNTERPARTIES_CSV))
+        self.assertEqual(again.stats['created'], 0)
+        self.assertEqual(Tenant.objects.count(), 2)
+
+    def test_cp1251_file_and_missing_columns(self):
+        path = self._file('Адрес,Площадь,Помещение\nул. Ленина 1,"45,5",Офис 1\nул. Ленина 1,30,Офис 1\n',
+                          encoding='cp1251')
+        result = ImportService.import_file('properties', path)
+        self.assertEqual(result.stats['created'], 1)
+        self.assertEqual(result.stats['skipped'], 1)
+        prop = Property.objects.get()
+        self.assertEqual((prop.name, prop.area), ('ул. Ленина 1, Офис 1', Decimal('45.50')))
+
+        with self.assertRaisesMessage(ImportFileError, 'Площадь'):
+            ImportService.import_file('properties', self._file('Адрес\nул. Ленина 2\n'))
+
+    def test_contracts_created_with_numbers_accruals_and_deposits(self):
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555900100')
+        Property.objects.create(name='Офис 1', address='пр. Чуй, 1', property_type='office', area=Decimal('40'))
+        Property.objects.create(
+            name='Склад', address='ул. Складская, 5', block_floor_room='Бокс 2',
+            property_type='warehouse', area=Decimal('200'),
+        )
+        Contract.objects.create(
+            number='IMP-1', signed_at=date(2026, 1, 1), property=Property.objects.get(name='Офис 1'), tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), rent_amount=Decimal('100'), status='draft',
+        )
+        path = self._file(
+            'Номер договора;Телефон арендатора;Объект;Адрес объекта;Помещение;Дата начала;Дата окончания;Ставка;Валюта;Депозит\n'
+            ';0555900100;Офис 1;;;01.01.2026;31.12.2026;1000;KGS;2000\n'
+            ';0555900100;;ул. Складская, 5;Бокс 2;2026-01-01;2026-06-30;500,50;USD;\n'
+            'IMP-1;0555900100;Офис 1;;;01.01.2026;31.12.2026;1000;;\n'
+            ';0555000000;Офис 1;;;01.01.2026;31.12.2026;1000;;\n'
+            ';0555900100;Офис 1;;;01.01.2026;01.01.2025;1000;;\n'
+        )
+        result = ImportService.import_file('contracts', path)
+
+        self.assertEqual(result.stats['created'], 2)
+        self.assertEqual(result.stats['skipped'], 1)
+        self.assertEqual(
+            [(e['row'], e['field']) for e in result.errors if e['status'] == 'error'],
+            [(6, 'end_date'), (5, 'tenant_name')],
+        )
+        office, warehouse = Contract.objects.exclude(number='IMP-1').order_by('rent_amount').reverse()
+        self.assertNotEqual(office.number, warehouse.number)
+        self.assertTrue(office.number)
+        self.assertEqual(warehouse.currency, 'USD')
+        self.assertEqual(warehouse.rent_amount, Decimal('500.50'))
+        self.assertEqual(Accrual.objects.filter(contract=office).count(), 12)
+        self.assertEqual(Accrual.objects.filter(contract=warehouse).count(), 6)
+        self.assertEqual(result.stats['accruals'], 18)
+
+        deposit = Deposit.objects.get(contract=office)
+        self.assertEqual(deposit.amount, Decimal('2000.00'))
+        self.assertFalse(Deposit.objects.filter(contract=warehouse).exists())
+        account = Account.objects.get(owner=tenant)
+        self.assertEqual(account.balance, Decimal('2000.00'))
+
+    def test_dry_run_and_strict_write_nothing(self):
+        dry = ImportService.import_file('counterparties', self._file(COUNTERPARTIES_CSV), dry_run=True)
+        self.assertEqual(dry.stats['valid'], 2)
+        strict = ImportService.import_file('counterparties', self._file(COUNTERPARTIES_CSV), strict=True)
+        self.assertTrue(strict.has_errors)
+        self.assertEqual(Tenant.objects.count(), 0)
+
+    def test_api_import_runs_in_background(self):
+        admin = User.objects.create_user(username='admin_import', password='x', role='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        upload = SimpleUploadedFile('tenants.csv', COUNTERPARTIES_CSV.encode('utf-8'), content_type='text/csv')
+
+        response = client.post('/api/imports/', {'kind': 'counterparties', 'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        import_id = response.data['import_id']
+        JobService.run_next('w1')
+
+        run = ImportRun.objects.get(pk=import_id)
+        self.assertEqual(run.status, 'succeeded')
+        self.assertEqual(run.stats['created'], 2)
+        detail = client.get(f'/api/imports/{import_id}/').data
+        self.assertEqual(detail['error_count'], 4)
+
+        report = client.get(f'/api/imports/{import_id}/report/')
+        self.assertEqual(report.status_code, 200)
+        lines = report.content.decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'Строка;Статус;Поле;Сообщение')
+        self.assertEqual(len(lines), 5)
+
+        rejected = client.post(
+            '/api/imports/', {'kind': 'counterparties', 'file': SimpleUploadedFile('a.pdf', b'%PDF')},
+            format='multipart',
+        )
+        self.assertEqual(rejected.status_code, 400)
+
+        staff = User.objects.create_user(username='staff_import', password='x', role='staff')
+        client.force_authenticate(staff)
+        self.assertEqual(client.get('/api/imports/').status_code, 403)
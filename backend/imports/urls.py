@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ImportRunViewSet
+
+router = DefaultRouter()
+router.register(r'', ImportRunViewSet, basename='import')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,46 @@
+"""
+Импорт данных: POST /api/imports/ (multipart: kind, file, dry_run, strict) ставит файл в очередь
+и отвечает 202 с job_id и import_id; итоги — GET /api/imports/<id>/, отчет по строкам —
+GET /api/imports/<id>/report/ (CSV).
+"""
+from django.http import HttpResponse
+from django.utils.http import content_disposition_header
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+
+from core.permissions import IsAdmin
+from jobs.services import JobService
+from jobs.views import job_accepted
+from .models import ImportRun
+from .readers import write_report_csv
+from .serializers import ImportRunSerializer
+
+
+class ImportRunViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """Загрузки файлов импорта (только администратор)"""
+    serializer_class = ImportRunSerializer
+    permission_classes = [IsAdmin]
+    queryset = ImportRun.objects.select_related('job', 'created_by')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        import_run = serializer.save(created_by=request.user)
+        # Файл на десятки тысяч строк разбирает воркер, запрос не ждет
+        import_run.job = JobService.enqueue('imports.run', payload={'import_id': import_run.pk}, user=request.user)
+        import_run.save(update_fields=['job'])
+        response = job_accepted(import_run.job)
+        response.data['import_id'] = import_run.pk
+        return response
+
+    @action(detail=True, methods=['get'])
+    def report(self, request, pk=None):
+        """Ошибки и пропущенные строки в CSV"""
+        import_run = self.get_object()
+        if import_run.status in ('pending', 'running'):
+            return HttpResponse(status=status.HTTP_409_CONFLICT)
+        response = HttpResponse(write_report_csv(import_run.errors), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = content_disposition_header(
+            True, f'import-{import_run.pk}-errors.csv'
+        )
+        return response
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import Job, ScheduledRun
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'progress_done', 'progress_total', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'error']
+    raw_id_fields = ['created_by']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'heartbeat_at', 'locked_by']
+
+
+@admin.register(ScheduledRun)
+class ScheduledRunAdmin(admin.ModelAdmin):
+    list_display = ['schedule', 'due_at', 'job', 'created_at']
+    list_filter = ['schedule']
+    raw_id_fields = ['job']
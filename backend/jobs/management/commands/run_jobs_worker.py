@@ -0,0 +1,67 @@
+"""
+Воркер очереди фоновых задач (jobs.Job).
+
+Забирает задачи через SELECT ... FOR UPDATE SKIP LOCKED, поэтому можно запускать несколько воркеров.
+SIGTERM/SIGINT: текущая задача дорабатывает, затем воркер выходит.
+
+Использование:
+  python manage.py run_jobs_worker
+  python manage.py run_jobs_worker --once
+  python manage.py run_jobs_worker --max-jobs 100 --sleep 5
+"""
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.services import JobService
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Выполнить готовые задачи и выйти')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Выйти после N задач (0 — без ограничения)')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Пауза при пустой очереди, секунды')
+        parser.add_argument('--worker-id', default='', help='Имя воркера (по умолчанию host:pid)')
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f'Воркер {worker_id} запущен')
+        processed = 0
+        while not self.stopping:
+            close_old_connections()
+            stale = JobService.requeue_stale()
+            if stale:
+                self.stdout.write(self.style.WARNING(f'⚠ Возвращено в очередь зависших задач: {stale}'))
+
+            job = JobService.run_next(worker_id)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            processed += 1
+            if job.status == 'succeeded':
+                self.stdout.write(self.style.SUCCESS(f'✓ {job.name} #{job.pk}'))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠ {job.name} #{job.pk}: {job.status} (попытка {job.attempts}/{job.max_attempts})'
+                ))
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f'✓ Воркер {worker_id} остановлен, выполнено задач: {processed}'))
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,73 @@
+"""
+Планировщик периодических задач (jobs.scheduler.SCHEDULE): ставит их в очередь jobs,
+выполняет воркер run_jobs_worker. Второй экземпляр ждет, пока освободится advisory lock.
+
+Использование:
+  python manage.py run_scheduler
+  python manage.py run_scheduler --once
+  python manage.py run_scheduler --list
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import ScheduledRun
+from jobs.scheduler import acquire_scheduler_lock, get_schedule, last_runs, release_scheduler_lock, tick
+
+
+class Command(BaseCommand):
+    help = 'Ставит в очередь задачи обслуживания по расписанию'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Один проход и выход')
+        parser.add_argument('--sleep', type=float, default=30.0, help='Интервал проверки расписания, секунды')
+        parser.add_argument('--list', action='store_true', help='Показать расписание и последние запуски')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            self._print_schedule()
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        standby = False
+        try:
+            while not self.stopping:
+                if acquire_scheduler_lock():
+                    if standby:
+                        self.stdout.write('Блокировка получена, планировщик активен')
+                    standby = False
+                    for run in tick():
+                        self.stdout.write(self.style.SUCCESS(f'✓ {run.schedule}: задача #{run.job_id}'))
+                elif not standby:
+                    standby = True
+                    self.stdout.write(self.style.WARNING('⚠ Работает другой планировщик, ожидание'))
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        finally:
+            release_scheduler_lock()
+
+    def _print_schedule(self):
+        now = timezone.now()
+        last = last_runs()
+        self.stdout.write(f'{"Расписание":<20}{"Задача":<32}{"Когда":<24}{"Последний":<18}{"Статус":<14}{"Следующий":<18}')
+        for entry in get_schedule():
+            last_due = last.get(entry.name)
+            run = ScheduledRun.objects.filter(schedule=entry.name, due_at=last_due).select_related('job').first()
+            status = run.job.get_status_display() if run and run.job else '—'
+            self.stdout.write(
+                f'{entry.name:<20}{entry.task:<32}{entry.describe():<24}'
+                f'{self._format(last_due):<18}{status:<14}{self._format(entry.next_due(last_due, now)):<18}'
+            )
+
+    @staticmethod
+    def _format(value):
+        return timezone.localtime(value).strftime('%d.%m.%Y %H:%M') if value else '—'
+
+    def _stop(self, signum, frame):
+        self.stopping = True
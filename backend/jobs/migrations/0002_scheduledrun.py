@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schedule', models.CharField(max_length=100, verbose_name='Расписание')),
+                ('due_at', models.DateTimeField(verbose_name='Плановое время')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Поставлено в очередь')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scheduled_runs', to='jobs.job', verbose_name='Задача')),
+            ],
+            options={
+                'verbose_name': 'Запуск по расписанию',
+                'verbose_name_plural': 'Запуски по расписанию',
+                'db_table': 'scheduled_runs',
+                'ordering': ['-due_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledrun',
+            constraint=models.UniqueConstraint(fields=('schedule', 'due_at'), name='unique_scheduled_run'),
+        ),
+    ]
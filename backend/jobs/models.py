@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Фоновая задача в очереди (таблица jobs).
+    Воркер (manage.py run_jobs_worker) забирает задачи через SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('succeeded', 'Выполнена'),
+        ('failed', 'Ошибка'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name='Параметры')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', verbose_name='Статус')
+    # Чем меньше — тем раньше
+    priority = models.SmallIntegerField(default=100, verbose_name='Приоритет')
+    run_at = models.DateTimeField(default=timezone.now, verbose_name='Запустить не раньше')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name='Максимум попыток')
+
+    progress_done = models.PositiveIntegerField(default=0, verbose_name='Обработано')
+    progress_total = models.PositiveIntegerField(null=True, blank=True, verbose_name='Всего')
+    progress_message = models.CharField(max_length=255, blank=True, verbose_name='Этап')
+
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name='Результат')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Воркер')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='Последний сигнал воркера')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='Создал'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Начата')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершена')
+
+    class Meta:
+        db_table = 'jobs'
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_at']),
+            models.Index(fields=['name', 'status']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.get_status_display()})'
+
+    @property
+    def progress_percent(self):
+        if not self.progress_total:
+            return 100 if self.status == 'succeeded' else None
+        return min(round(self.progress_done * 100 / self.progress_total), 100)
+
+
+class ScheduledRun(models.Model):
+    """
+    История запусков планировщика (manage.py run_scheduler): одна запись на срабатывание расписания.
+    Уникальность (schedule, due_at) не дает поставить один и тот же запуск дважды.
+    """
+    schedule = models.CharField(max_length=100, verbose_name='Расписание')
+    due_at = models.DateTimeField(verbose_name='Плановое время')
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scheduled_runs',
+        verbose_name='Задача'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Поставлено в очередь')
+
+    class Meta:
+        db_table = 'scheduled_runs'
+        verbose_name = 'Запуск по расписанию'
+        verbose_name_plural = 'Запуски по расписанию'
+        ordering = ['-due_at']
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'due_at'], name='unique_scheduled_run'),
+        ]
+
+    def __str__(self):
+        return f'{self.schedule} @ {self.due_at:%Y-%m-%d %H:%M}'
@@ -0,0 +1,142 @@
+"""
+Периодические задачи обслуживания: расписание и постановка в очередь.
+
+Планировщик (manage.py run_scheduler) сам задачи не выполняет — он ставит их в очередь jobs
+с пониженным приоритетом, выполняет воркер. Время указывается в TIME_ZONE проекта.
+Одновременно работает один планировщик: он держит advisory lock PostgreSQL, остальные ждут.
+Пропущенные запуски (планировщик был остановлен) не догоняются по одному — выполняется один,
+последний по времени.
+"""
+import zlib
+from datetime import datetime, timedelta, time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ScheduledRun
+from .services import JobService
+from .tasks import TASKS
+
+# Ниже приоритета задач, поставленных пользователями (100)
+SCHEDULED_PRIORITY = 200
+SCHEDULER_LOCK_KEY = zlib.crc32(b'amt.scheduler')
+
+
+class Schedule:
+    """Запись расписания: задача из jobs.tasks ежедневно в at или с интервалом every"""
+
+    def __init__(self, name, task, at=None, every=None, payload=None, priority=SCHEDULED_PRIORITY):
+        if (at is None) == (every is None):
+            raise ValueError(f'{name}: нужно указать либо at, либо every')
+        self.name = name
+        self.task = task
+        self.at = at
+        self.every = every
+        self.payload = payload or {}
+        self.priority = priority
+
+    def __repr__(self):
+        return f'Schedule({self.name!r}, {self.task!r}, {self.describe()})'
+
+    def describe(self):
+        if self.at is not None:
+            return f'ежедневно в {self.at:%H:%M}'
+        return f'каждые {int(self.every.total_seconds() // 60)} мин'
+
+    def _daily_slot(self, now):
+        """Последнее плановое время ежедневной задачи, не позже now"""
+        local_now = timezone.localtime(now)
+        slot = timezone.make_aware(datetime.combine(local_now.date(), self.at))
+        if slot > now:
+            slot = timezone.make_aware(datetime.combine(local_now.date() - timedelta(days=1), self.at))
+        return slot
+
+    def due_at(self, last_due, now):
+        """Плановое время запуска, который пора поставить, или None"""
+        if self.every is not None:
+            if last_due is None:
+                return now.replace(microsecond=0)
+            if last_due + self.every > now:
+                return None
+            return last_due + self.every * ((now - last_due) // self.every)
+        slot = self._daily_slot(now)
+        if last_due is not None and slot <= last_due:
+            return None
+        return slot
+
+    def next_due(self, last_due, now):
+        """Ближайший следующий запуск (для вывода расписания)"""
+        due = self.due_at(last_due, now)
+        if due is not None:
+            return due
+        if self.every is not None:
+            return last_due + self.every
+        return self._daily_slot(now) + timedelta(days=1)
+
+
+SCHEDULE = [
+    # После смены даты: planned → due → overdue
+    Schedule('accrual-statuses', 'accruals.update_statuses', at=time(0, 15)),
+    Schedule('exchange-rates', 'exchange_rates.update', every=timedelta(hours=6)),
+    Schedule('login-cleanup', 'auth.cleanup_expired_logins', at=time(3, 30)),
+    Schedule('report-artifacts-cleanup', 'reports.cleanup_artifacts', at=time(4, 0)),
+    Schedule('uploads-cleanup', 'uploads.cleanup_stale', at=time(4, 30)),
+    # Только отчет о расхождениях в результате задачи; исправление — вручную (--fix)
+    Schedule('ledger-integrity', 'ledger.check_integrity', at=time(5, 0)),
+    # Портфели инвесторов за прошлый и текущий месяц — в кэш до начала дня
+    Schedule('investor-portfolio', 'reports.investor_portfolio', at=time(5, 30)),
+    # Напоминания — в рабочее время
+    Schedule('notifications', 'notifications.send_all', at=time(10, 0)),
+]
+
+
+def get_schedule():
+    """Расписание без отключенных в SCHEDULER_DISABLED записей"""
+    disabled = set(getattr(settings, 'SCHEDULER_DISABLED', ()))
+    return [entry for entry in SCHEDULE if entry.name not in disabled]
+
+
+def last_runs():
+    """schedule → плановое время последнего запуска"""
+    return dict(
+        ScheduledRun.objects.values('schedule').annotate(last=Max('due_at')).values_list('schedule', 'last')
+    )
+
+
+def tick(now=None, schedule=None):
+    """Поставить в очередь все задачи, которым пора. Возвращает созданные ScheduledRun"""
+    now = now or timezone.now()
+    last = last_runs()
+    created_runs = []
+    for entry in (schedule if schedule is not None else get_schedule()):
+        if entry.task not in TASKS:
+            raise ValueError(f'{entry.name}: неизвестная задача {entry.task}')
+        due = entry.due_at(last.get(entry.name), now)
+        if due is None:
+            continue
+        with transaction.atomic():
+            run, created = ScheduledRun.objects.get_or_create(schedule=entry.name, due_at=due)
+            if not created:
+                continue
+            run.job = JobService.enqueue(entry.task, payload=entry.payload, priority=entry.priority)
+            run.save(update_fields=['job'])
+        created_runs.append(run)
+    return created_runs
+
+
+def acquire_scheduler_lock():
+    """
+    Сессионный advisory lock планировщика на текущем соединении.
+    Повторный вызов держателем тоже возвращает True, поэтому проверяется на каждом шаге:
+    если соединение с БД переоткрылось, блокировка берется заново (или уходит другому процессу).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [SCHEDULER_LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+def release_scheduler_lock():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_unlock_all()')
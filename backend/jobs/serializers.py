@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress_percent = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'name', 'payload', 'status', 'status_display', 'attempts', 'max_attempts',
+            'progress_done', 'progress_total', 'progress_percent', 'progress_message',
+            'result', 'error', 'run_at', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,212 @@
+"""
+Очередь фоновых задач в PostgreSQL.
+
+Долгие операции (генерация начислений, рассылка, обновление курсов) не выполняются в HTTP-запросе:
+view ставит задачу в очередь и сразу возвращает ее id, воркер (manage.py run_jobs_worker)
+забирает задачи через SELECT ... FOR UPDATE SKIP LOCKED — несколько воркеров не возьмут одну задачу.
+Ошибка задачи — повтор с экспоненциальной задержкой до max_attempts, затем статус failed.
+"""
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Job
+from .tasks import TASKS
+
+logger = logging.getLogger(__name__)
+
+# Как часто писать прогресс в БД (секунды)
+PROGRESS_INTERVAL = 1.0
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobContext:
+    """Передается в функцию задачи: параметры и отчет о прогрессе"""
+
+    def __init__(self, job):
+        self.job = job
+        self.payload = job.payload or {}
+        self._last_write = 0.0
+
+    def progress(self, done, total=None, message=None):
+        """Записать прогресс (не чаще PROGRESS_INTERVAL, последний шаг — всегда); обновляет heartbeat"""
+        now = time.monotonic()
+        finished = total is not None and done >= total
+        if not finished and now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        fields = {'progress_done': done, 'heartbeat_at': timezone.now()}
+        if total is not None:
+            fields['progress_total'] = total
+        if message is not None:
+            fields['progress_message'] = message[:255]
+        Job.objects.filter(pk=self.job.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self.job, name, value)
+
+
+class JobHeartbeat:
+    """
+    Пока задача выполняется, отдельный поток раз в JOB_HEARTBEAT_SECONDS обновляет heartbeat_at —
+    и у задач, которые не вызывают progress(). Иначе долгая задача без прогресса считалась бы
+    зависшей (requeue_stale) и выполнялась бы второй раз параллельно.
+    """
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        self.interval = interval or getattr(settings, 'JOB_HEARTBEAT_SECONDS', 60)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f'job-heartbeat-{job.pk}', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _beat(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(pk=self.job.pk, status='running', locked_by=self.job.locked_by).update(
+                        heartbeat_at=timezone.now(),
+                    )
+                except Exception:
+                    logger.exception('Job %s #%s: heartbeat not written', self.job.name, self.job.pk)
+        finally:
+            # У потока свое соединение с БД
+            connection.close()
+
+
+class JobService:
+    """Постановка, захват и выполнение фоновых задач"""
+
+    @staticmethod
+    def enqueue(name, payload=None, user=None, priority=100, max_attempts=None, unique=True):
+        """
+        Поставить задачу в очередь. При unique=True, если такая же задача (имя и параметры)
+        уже ждет или выполняется, возвращается она — повторные нажатия не плодят задачи.
+        """
+        if name not in TASKS:
+            raise ValueError(f'Неизвестная задача: {name}')
+        payload = payload or {}
+        if unique:
+            existing = Job.objects.filter(name=name, payload=payload, status__in=ACTIVE_STATUSES).order_by('id').first()
+            if existing:
+                return existing
+        return Job.objects.create(
+            name=name,
+            payload=payload,
+            priority=priority,
+            max_attempts=max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 3),
+            created_by=user if user is not None and user.is_authenticated else None,
+        )
+
+    @staticmethod
+    def claim(worker_id):
+        """Взять следующую готовую задачу (FOR UPDATE SKIP LOCKED) и пометить ее running"""
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status='queued', run_at__lte=now)
+                .order_by('priority', 'run_at', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = 'running'
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.started_at = now
+            job.heartbeat_at = now
+            job.finished_at = None
+            job.save(update_fields=['status', 'attempts', 'locked_by', 'started_at', 'heartbeat_at', 'finished_at'])
+        return job
+
+    @staticmethod
+    def retry_delay(attempt):
+        """Задержка перед повтором: base * 2^(attempt-1), не больше часа"""
+        base = getattr(settings, 'JOB_RETRY_BASE_SECONDS', 30)
+        return timedelta(seconds=min(base * 2 ** max(attempt - 1, 0), 3600))
+
+    @staticmethod
+    def run(job):
+        """Выполнить захваченную задачу и записать результат или ошибку"""
+        task = TASKS.get(job.name)
+        try:
+            if task is None:
+                raise LookupError(f'Неизвестная задача: {job.name}')
+            with JobHeartbeat(job):
+                result = task(JobContext(job))
+        except Exception:
+            JobService._record_failure(job, traceback.format_exc(), retry=task is not None)
+            return job
+
+        job.status = 'succeeded'
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+        if job.progress_total is not None:
+            job.progress_done = job.progress_total
+        job.save(update_fields=['status', 'result', 'error', 'finished_at', 'progress_done'])
+        logger.info('Job %s #%s succeeded', job.name, job.pk)
+        return job
+
+    @staticmethod
+    def _record_failure(job, error, retry=True):
+        now = timezone.now()
+        job.error = error
+        job.locked_by = ''
+        if retry and job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_at = now + JobService.retry_delay(job.attempts)
+            logger.warning('Job %s #%s failed (attempt %s/%s), retry at %s',
+                           job.name, job.pk, job.attempts, job.max_attempts, job.run_at)
+        else:
+            job.status = 'failed'
+            job.finished_at = now
+            logger.error('Job %s #%s failed: %s', job.name, job.pk, error.strip().splitlines()[-1])
+        job.save(update_fields=['status', 'error', 'locked_by', 'run_at', 'finished_at'])
+
+    @staticmethod
+    def run_next(worker_id):
+        """Взять и выполнить одну задачу. Возвращает задачу или None, если очередь пуста"""
+        job = JobService.claim(worker_id)
+        if job is None:
+            return None
+        return JobService.run(job)
+
+    @staticmethod
+    def requeue_stale(timeout=None):
+        """
+        Вернуть в очередь задачи, воркер которых перестал подавать сигнал (упал или был убит).
+        Возвращает количество таких задач.
+        """
+        timeout = timeout or getattr(settings, 'JOB_STALE_SECONDS', 600)
+        cutoff = timezone.now() - timedelta(seconds=timeout)
+        stale = 0
+        with transaction.atomic():
+            for job in Job.objects.select_for_update(skip_locked=True).filter(status='running', heartbeat_at__lt=cutoff):
+                JobService._record_failure(job, f'Воркер {job.locked_by} не отвечал больше {timeout} с')
+                stale += 1
+        return stale
+
+    @staticmethod
+    def retry(job):
+        """Перезапустить завершившуюся ошибкой задачу"""
+        job.status = 'queued'
+        job.run_at = timezone.now()
+        job.attempts = 0
+        job.error = ''
+        job.finished_at = None
+        job.save(update_fields=['status', 'run_at', 'attempts', 'error', 'finished_at'])
+        return job
@@ -0,0 +1,129 @@
+"""
+Реестр задач очереди: имя задачи → функция(ctx).
+ctx.payload — параметры задачи, ctx.progress(done, total) — отчет о ходе выполнения.
+Возвращаемый словарь сохраняется в Job.result.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from accruals.services import AccrualService
+from contracts.models import ContractFile
+from contracts.previews import render_preview
+from contracts.services import ContractService, ContractFileService
+from core.authentication import delete_expired_tokens
+from core.integrity import LedgerIntegrityService
+from core.services import ExchangeRateService
+from core.whatsapp_auth_services import delete_expired_login_attempts
+from imports.models import ImportRun
+from imports.services import ImportService
+from notifications.services import NotificationService
+from reports.models import ReportArtifact
+from reports.portfolio import InvestorPortfolioService
+from reports.services import ReportArtifactService
+
+TASKS = {}
+
+
+def register(name):
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+@register('contracts.generate_all_accruals')
+def generate_all_accruals(ctx):
+    generated = ContractService.generate_missing_accruals(progress=ctx.progress)
+    return {'status': f'Начисления сгенерированы для {generated} договоров', 'generated': generated}
+
+
+@register('contracts.fix_all_accruals')
+def fix_all_accruals(ctx):
+    fixed = AccrualService.fix_all_planned_accruals(progress=ctx.progress)
+    return {'status': f'Исправлено {fixed} начислений для всех договоров', 'fixed': fixed}
+
+
+@register('contracts.render_preview')
+def render_contract_preview(ctx):
+    contract_file = ContractFile.objects.filter(pk=ctx.payload['file_id']).first()
+    if contract_file is None:
+        return {'status': 'Файл уже удален'}
+    render_preview(contract_file)
+    return {
+        'status': contract_file.get_preview_status_display(),
+        'preview_status': contract_file.preview_status,
+        'page_count': contract_file.page_count,
+    }
+
+
+@register('accruals.update_statuses')
+def update_statuses(ctx):
+    updated = AccrualService.update_all_accrual_statuses(progress=ctx.progress)
+    return {'status': 'Статусы всех начислений обновлены', 'updated': updated}
+
+
+@register('ledger.check_integrity')
+def check_ledger_integrity(ctx):
+    drift = LedgerIntegrityService.check(ctx.payload.get('checks'))
+    counts = {name: len({row['id'] for row in rows}) for name, rows in drift.items()}
+    status = 'Расхождений нет' if not any(counts.values()) else 'Найдены расхождения (manage.py check_ledger_integrity)'
+    return {'status': status, **counts}
+
+
+@register('notifications.send_all')
+def send_all_notifications(ctx):
+    sent_count = NotificationService.send_pending_notifications(progress=ctx.progress)
+    return {'status': 'Рассылка выполнена', 'sent_count': sent_count}
+
+
+@register('exchange_rates.update')
+def update_exchange_rates(ctx):
+    rates = ExchangeRateService.update_rates()
+    if not rates:
+        # valuta.kg недоступен — пусть очередь повторит попытку позже
+        raise RuntimeError('Не удалось получить курсы с valuta.kg')
+    return {'status': 'Курсы обновлены', 'rates': rates}
+
+
+@register('auth.cleanup_expired_logins')
+def cleanup_expired_logins(ctx):
+    tokens = delete_expired_tokens()
+    attempts = delete_expired_login_attempts(getattr(settings, 'LOGIN_ATTEMPT_RETENTION_DAYS', 7))
+    return {'status': 'Истекшие входы удалены', 'tokens': tokens, 'login_attempts': attempts}
+
+
+@register('reports.build')
+def build_report(ctx):
+    artifact = ReportArtifact.objects.select_related('created_by').get(pk=ctx.payload['artifact_id'])
+    if artifact.status != 'ready':
+        ReportArtifactService.build(artifact, progress=ctx.progress)
+    return {'status': 'Отчет сформирован', 'artifact_id': artifact.pk, 'size': artifact.size}
+
+
+@register('reports.cleanup_artifacts')
+def cleanup_report_artifacts(ctx):
+    deleted = ReportArtifactService.cleanup()
+    return {'status': 'Старые отчеты удалены', 'deleted': deleted}
+
+
+@register('reports.investor_portfolio')
+def warm_investor_portfolio(ctx):
+    current = timezone.localdate().replace(day=1)
+    previous = (current - timedelta(days=1)).replace(day=1)
+    cached = InvestorPortfolioService.warm([previous, current])
+    return {'status': 'Портфели инвесторов посчитаны', 'cached': cached}
+
+
+@register('imports.run')
+def run_import(ctx):
+    import_run = ImportRun.objects.get(pk=ctx.payload['import_id'])
+    ImportService.run(import_run, progress=ctx.progress)
+    return {'status': import_run.get_status_display(), 'import_id': import_run.pk, **import_run.stats}
+
+
+@register('uploads.cleanup_stale')
+def cleanup_stale_uploads(ctx):
+    deleted = ContractFileService.cleanup_upload_sessions()
+    return {'status': 'Незавершенные загрузки удалены', 'deleted': deleted}
@@ -0,0 +1,164 @@
+"""
+Тесты очереди фоновых задач: постановка из API, выполнение воркером, повторы, SKIP LOCKED
+"""
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import Tenant, User
+from jobs.models import Job
+from jobs.services import JobService
+from jobs.tasks import TASKS
+from properties.models import Property
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_jobs', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.property = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('30'))
+        self.tenant = Tenant.objects.create(name='Арендатор', phone='+996555200400')
+        self.contract = Contract.objects.create(
+            number='JB-1', signed_at=date(2026, 1, 1), property=self.property, tenant=self.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2026, 6, 30), rent_amount=Decimal('1000.00'), status='active',
+        )
+
+    def test_action_returns_job_id_and_worker_runs_it(self):
+        response = self.client.post('/api/contracts/generate_all_accruals/')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job_id']
+        self.assertFalse(Accrual.objects.filter(contract=self.contract).exists())
+
+        # Повторное нажатие не создает вторую задачу
+        self.assertEqual(self.client.post('/api/contracts/generate_all_accruals/').data['job_id'], job_id)
+
+        # close_old_connections закрыл бы соединение внутри транзакции теста
+        with mock.patch('jobs.management.commands.run_jobs_worker.close_old_connections'):
+            call_command('run_jobs_worker', once=True, stdout=mock.MagicMock())
+
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.result['generated'], 1)
+        self.assertEqual((job.progress_done, job.progress_total), (1, 1))
+        self.assertTrue(Accrual.objects.filter(contract=self.contract).exists())
+
+        detail = self.client.get(f'/api/jobs/{job_id}/')
+        self.assertEqual(detail.data['progress_percent'], 100)
+        self.assertEqual(detail.data['result']['generated'], 1)
+
+    def test_non_admin_sees_only_own_jobs(self):
+        JobService.enqueue('accruals.update_statuses', user=self.admin)
+        staff = User.objects.create_user(username='staff_jobs', password='x', role='staff')
+        client = APIClient()
+        client.force_authenticate(staff)
+        self.assertEqual(client.get('/api/jobs/').data['count'], 0)
+
+    @override_settings(JOB_RETRY_BASE_SECONDS=10)
+    def test_retry_with_backoff_then_failed(self):
+        job = JobService.enqueue('exchange_rates.update', max_attempts=2)
+
+        with mock.patch('jobs.tasks.ExchangeRateService.update_rates', return_value={}):
+            JobService.run_next('w1')
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('queued', 1))
+            self.assertIn('valuta.kg', job.error)
+            self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+            # Время повтора еще не пришло
+            self.assertIsNone(JobService.run_next('w1'))
+
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            JobService.run_next('w1')
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNotNone(job.finished_at)
+
+        response = self.client.post(f'/api/jobs/{job.pk}/retry/')
+        self.assertEqual(response.status_code, 202)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 0))
+
+    def test_unknown_task_fails_without_retry(self):
+        job = Job.objects.create(name='missing.task')
+        JobService.run_next('w1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+        with self.assertRaises(ValueError):
+            JobService.enqueue('missing.task')
+
+    def test_stale_running_job_requeued(self):
+        job = JobService.enqueue('accruals.update_statuses')
+        JobService.claim('dead-worker')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(JobService.requeue_stale(timeout=60), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('dead-worker', job.error)
+
+    def test_priority_order(self):
+        low = JobService.enqueue('accruals.update_statuses', priority=200)
+        high = JobService.enqueue('notifications.send_all', priority=10)
+        self.assertEqual(JobService.claim('w1').pk, high.pk)
+        self.assertEqual(JobService.claim('w1').pk, low.pk)
+
+
+class SkipLockedClaimTests(TransactionTestCase):
+
+    def test_locked_job_skipped(self):
+        first = JobService.enqueue('accruals.update_statuses')
+        second = JobService.enqueue('notifications.send_all')
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            # Другой воркер держит блокировку первой задачи
+            try:
+                with transaction.atomic():
+                    list(Job.objects.select_for_update().filter(pk=first.pk))
+                    locked.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(5))
+            claimed = JobService.claim('w2')
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(claimed.pk, second.pk)
+        self.assertIn('accruals.update_statuses', TASKS)
+        self.assertEqual(Job.objects.get(pk=first.pk).status, 'queued')
+
+
+class HeartbeatTests(TransactionTestCase):
+
+    @override_settings(JOB_HEARTBEAT_SECONDS=0.05)
+    def test_long_task_without_progress_not_requeued(self):
+        def silent_task(ctx):
+            # Долгая задача без progress(): сигнал пишет поток воркера
+            time.sleep(0.5)
+            return {'stale': JobService.requeue_stale(timeout=0.3)}
+
+        with mock.patch.dict(TASKS, {'tests.silent': silent_task}):
+            job = JobService.enqueue('tests.silent')
+            JobService.run_next('w1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), ('succeeded', 1, {'stale': 0}))
@@ -0,0 +1,122 @@
+"""
+Тесты планировщика: расчет времени запуска, постановка в очередь, advisory lock, очистка входов
+"""
+from datetime import datetime, timedelta, time
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.models import LoginAttempt, User
+from jobs.models import Job, ScheduledRun
+from jobs.scheduler import (
+    SCHEDULED_PRIORITY, SCHEDULER_LOCK_KEY, Schedule, acquire_scheduler_lock, get_schedule,
+    release_scheduler_lock, tick,
+)
+from jobs.services import JobService
+
+
+def local(year, month, day, hour, minute=0):
+    return timezone.make_aware(datetime(year, month, day, hour, minute))
+
+
+class ScheduleTests(TestCase):
+
+    def test_daily_slot(self):
+        entry = Schedule('daily', 'accruals.update_statuses', at=time(10, 0))
+        self.assertEqual(entry.due_at(None, local(2026, 3, 5, 10, 30)), local(2026, 3, 5, 10))
+        self.assertEqual(entry.due_at(None, local(2026, 3, 5, 9)), local(2026, 3, 4, 10))
+        self.assertIsNone(entry.due_at(local(2026, 3, 5, 10), local(2026, 3, 5, 23)))
+        self.assertEqual(entry.next_due(local(2026, 3, 5, 10), local(2026, 3, 5, 23)), local(2026, 3, 6, 10))
+        # Планировщик стоял три дня — один запуск, последний
+        self.assertEqual(entry.due_at(local(2026, 3, 1, 10), local(2026, 3, 5, 11)), local(2026, 3, 5, 10))
+
+    def test_interval(self):
+        entry = Schedule('rates', 'exchange_rates.update', every=timedelta(hours=6))
+        last = local(2026, 3, 5, 0)
+        self.assertIsNone(entry.due_at(last, local(2026, 3, 5, 5)))
+        self.assertEqual(entry.due_at(last, local(2026, 3, 5, 6, 1)), local(2026, 3, 5, 6))
+        self.assertEqual(entry.due_at(last, local(2026, 3, 6, 1)), local(2026, 3, 6, 0))
+
+    def test_requires_at_or_every(self):
+        with self.assertRaises(ValueError):
+            Schedule('bad', 'accruals.update_statuses')
+
+    @override_settings(SCHEDULER_DISABLED=['notifications'])
+    def test_disabled_entries(self):
+        self.assertNotIn('notifications', [entry.name for entry in get_schedule()])
+
+
+class TickTests(TestCase):
+
+    def test_tick_enqueues_once_per_slot(self):
+        schedule = [
+            Schedule('statuses', 'accruals.update_statuses', at=time(0, 15)),
+            Schedule('rates', 'exchange_rates.update', every=timedelta(hours=6)),
+        ]
+        now = local(2026, 3, 5, 1)
+
+        runs = tick(now, schedule)
+        self.assertEqual(sorted(run.schedule for run in runs), ['rates', 'statuses'])
+        self.assertEqual(set(Job.objects.values_list('priority', flat=True)), {SCHEDULED_PRIORITY})
+
+        self.assertEqual(tick(now + timedelta(minutes=30), schedule), [])
+        runs = tick(now + timedelta(hours=6), schedule)
+        self.assertEqual([run.schedule for run in runs], ['rates'])
+        self.assertEqual(ScheduledRun.objects.count(), 3)
+
+    def test_user_jobs_run_before_scheduled(self):
+        tick(local(2026, 3, 5, 1), [Schedule('statuses', 'accruals.update_statuses', at=time(0, 15))])
+        user_job = JobService.enqueue('notifications.send_all')
+        self.assertEqual(JobService.claim('w1').pk, user_job.pk)
+
+    def test_command_once(self):
+        with mock.patch('jobs.management.commands.run_scheduler.tick', return_value=[]) as tick_mock:
+            call_command('run_scheduler', once=True, stdout=mock.MagicMock())
+        tick_mock.assert_called_once()
+
+
+class SchedulerLockTests(TestCase):
+
+    def test_second_instance_cannot_take_lock(self):
+        other = connections.create_connection('default')
+        try:
+            with other.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_lock(%s)', [SCHEDULER_LOCK_KEY])
+            self.assertFalse(acquire_scheduler_lock())
+            with mock.patch('jobs.management.commands.run_scheduler.tick') as tick_mock:
+                call_command('run_scheduler', once=True, stdout=mock.MagicMock())
+            tick_mock.assert_not_called()
+
+            with other.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [SCHEDULER_LOCK_KEY])
+            self.assertTrue(acquire_scheduler_lock())
+        finally:
+            release_scheduler_lock()
+            other.close()
+
+
+@override_settings(AUTH_TOKEN_TTL_DAYS=30, LOGIN_ATTEMPT_RETENTION_DAYS=7)
+class LoginCleanupTests(TestCase):
+
+    def test_cleanup_expired_logins(self):
+        fresh_user = User.objects.create_user(username='fresh_cleanup', password='x', role='staff')
+        old_user = User.objects.create_user(username='old_cleanup', password='x', role='staff')
+        fresh = Token.objects.create(user=fresh_user)
+        old = Token.objects.create(user=old_user)
+        Token.objects.filter(pk=old.pk).update(created=timezone.now() - timedelta(days=31))
+
+        now = timezone.now()
+        LoginAttempt.objects.create(attempt_id='recent', expires_at=now - timedelta(days=1))
+        LoginAttempt.objects.create(attempt_id='stale', expires_at=now - timedelta(days=8))
+
+        JobService.enqueue('auth.cleanup_expired_logins')
+        job = JobService.run_next('w1')
+
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual((job.result['tokens'], job.result['login_attempts']), (1, 1))
+        self.assertEqual(list(Token.objects.values_list('key', flat=True)), [fresh.key])
+        self.assertEqual(list(LoginAttempt.objects.values_list('attempt_id', flat=True)), ['recent'])
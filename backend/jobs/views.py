@@ -0,0 +1,44 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import viewsets, status, filters
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .models import Job
+from .serializers import JobSerializer
+from .services import JobService
+
+
+def job_accepted(job):
+    """Ответ 202 на действие, поставленное в очередь: клиент опрашивает /api/jobs/<id>/"""
+    return Response(
+        {'job_id': job.pk, 'name': job.name, 'status': job.status},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Статус фоновых задач: прогресс, результат, ошибка.
+    Админ видит все задачи, остальные — только поставленные ими.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['name', 'status']
+    ordering_fields = ['created_at']
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        queryset = Job.objects.all()
+        if self.request.user.role != 'admin':
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        """Перезапустить задачу, завершившуюся ошибкой"""
+        job = self.get_object()
+        if job.status != 'failed':
+            return Response({'error': 'Перезапустить можно только задачу с ошибкой'}, status=status.HTTP_400_BAD_REQUEST)
+        return job_accepted(JobService.retry(job))
@@ -1,9 +1,13 @@
+import logging
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 from .models import NotificationSettings, NotificationLog
 from accruals.models import Accrual
 from core.models import Tenant
+from core.metrics import track_job
+
+logger = logging.getLogger(__name__)
 
 
 class NotificationService:
@@ -59,9 +63,7 @@ class NotificationService:
         #     return False, str(e)
         
         # Временная заглушка
-        print(f"[EMAIL] To: {recipient}")
-        print(f"[EMAIL] Subject: {subject}")
-        print(f"[EMAIL] Message: {message}")
+        logger.info("[EMAIL] To: %s; Subject: %s; Message: %s", recipient, subject, message)
         return True, ''
     
     @staticmethod
@@ -71,8 +73,7 @@ class NotificationService:
         # Например, через sms.ru, twilio и т.д.
         
         # Временная заглушка
-        print(f"[SMS] To: {recipient}")
-        print(f"[SMS] Message: {message}")
+        logger.info("[SMS] To: %s; Message: %s", recipient, message)
         return True, ''
     
     @staticmethod
@@ -141,8 +142,11 @@ class NotificationService:
         return success
     
     @staticmethod
-    def send_pending_notifications():
-        """Отправить все ожидающие уведомления"""
+    def send_pending_notifications(progress=None):
+        """
+        Отправить все ожидающие уведомления.
+        progress(done, total) — отчет о ходе выполнения для фоновой задачи.
+        """
         settings = NotificationSettings.get_settings()
         
         if not settings.is_enabled:
@@ -158,9 +162,14 @@ class NotificationService:
             status__in=['planned', 'due', 'overdue', 'partial']
         ).select_related('contract', 'contract__tenant', 'contract__property')
         
+        total = accruals.count() if progress else None
         sent_count = 0
-        for accrual in accruals:
-            if NotificationService.send_notification(accrual):
-                sent_count += 1
+        with track_job('send_pending_notifications') as job:
+            for index, accrual in enumerate(accruals, start=1):
+                if NotificationService.send_notification(accrual):
+                    sent_count += 1
+                if progress:
+                    progress(index, total)
+            job.rows = sent_count
         
         return sent_count
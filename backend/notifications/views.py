@@ -8,6 +8,8 @@ from .models import NotificationSettings, NotificationLog
 from .serializers import NotificationSettingsSerializer, NotificationLogSerializer
 from .services import NotificationService
 from accruals.models import Accrual
+from jobs.services import JobService
+from jobs.views import job_accepted
 
 
 class NotificationSettingsViewSet(viewsets.ModelViewSet):
@@ -87,12 +89,8 @@ class NotificationSettingsViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def send_all(self, request):
-        """Отправить все ожидающие уведомления"""
-        sent_count = NotificationService.send_pending_notifications()
-        return Response({
-            'status': 'Рассылка выполнена',
-            'sent_count': sent_count
-        })
+        """Отправить все ожидающие уведомления (фоновая задача)"""
+        return job_accepted(JobService.enqueue('notifications.send_all', user=request.user))
 
 
 class NotificationLogViewSet(viewsets.ReadOnlyModelViewSet):
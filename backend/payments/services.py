@@ -2,6 +2,7 @@ from decimal import Decimal
 from django.db import transaction
 from .models import Payment, PaymentAllocation
 from accruals.models import Accrual
+from accruals.journal import LedgerJournalService
 from accruals.services import AccrualService
 
 
@@ -71,11 +72,15 @@ class PaymentAllocationService:
         Перераспределение платежа (отмена старых распределений и создание новых)
         """
         # Удаляем старые распределения и возвращаем суммы в начисления
+        released = []
         for allocation in payment.allocations.all():
             accrual = allocation.accrual
             accrual.paid_amount -= allocation.amount
             AccrualService.recalculate_accrual(accrual)
             allocation.delete()
+            released.append(accrual.pk)
+        # Сторно снятых распределений датой платежа: перераспределение исправляет, а не возвращает
+        LedgerJournalService.sync(released)
         
         # Создаем новые распределения
         return PaymentAllocationService.allocate_payment_fifo(payment)
@@ -6,30 +6,45 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from .models import Payment, PaymentAllocation
 from .serializers import PaymentSerializer, PaymentListSerializer
 from .services import PaymentAllocationService
 from accruals.models import Accrual
+from accruals.journal import LedgerJournalService
 from accruals.services import AccrualService
 from accounts.models import AccountTransaction
 from accounts.services import AccountService
-from core.mixins import DataScopingMixin
+from core.mixins import DataScopingMixin, ValuesListMixin
+from core.search import IndexedSearchFilter
 from core.permissions import ReadOnlyForClients
 
 
-class PaymentViewSet(DataScopingMixin, viewsets.ModelViewSet):
+class PaymentViewSet(DataScopingMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления поступлениями с RBAC и data scoping.
     При создании автоматически распределяет платеж по начислениям (FIFO).
+    Список отдается через .values() в формате PaymentListSerializer.
     """
     queryset = Payment.objects.select_related('contract', 'contract__property', 'contract__tenant', 'contract__landlord').all()
     permission_classes = [IsAuthenticated, ReadOnlyForClients]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['contract', 'contract__property', 'contract__tenant']
     search_fields = ['contract__number', 'contract__property__name', 'contract__tenant__name']
+    search_contract_lookup = 'contract_id'
     ordering_fields = ['payment_date', 'created_at', 'amount']
     ordering = ['-payment_date', '-created_at']
     
+    list_values = ('id', 'account', 'amount', 'payment_date', 'allocated_amount', 'comment', 'is_returned')
+    list_value_expressions = {
+        'contract_number': F('contract__number'),
+        'tenant_name': F('contract__tenant__name'),
+        'property_name': F('contract__property__name'),
+        'currency': F('contract__currency'),
+        'account_name': F('account__name'),
+    }
+
     def get_serializer_class(self):
         if self.action == 'list':
             return PaymentListSerializer
@@ -107,18 +122,16 @@ class PaymentViewSet(DataScopingMixin, viewsets.ModelViewSet):
                 ).select_related('account')
                 
                 for acc_transaction in account_transactions:
-                    account = acc_transaction.account
-                    # Откатываем транзакцию: если это поступление (income), уменьшаем баланс
-                    if acc_transaction.transaction_type == 'income':
-                        new_balance = account.balance - acc_transaction.amount
-                        account.balance = max(Decimal('0'), new_balance)
-                        account.save()
-                    # Удаляем транзакцию
-                    acc_transaction.delete()
+                    # Откатываем транзакцию (баланс меняется атомарно) и удаляем её
+                    AccountService.revert_transaction(acc_transaction)
                 
                 # Удаляем распределения
                 for allocation in allocations:
                     allocation.delete()
+                # Сторно в журнале датой возврата: до нее начисления числятся оплаченными
+                LedgerJournalService.sync(
+                    [allocation.accrual_id for allocation in allocations], reversal_date=timezone.localdate()
+                )
                 
                 # Помечаем платеж как возвращенный
                 payment.is_returned = True
@@ -170,13 +183,10 @@ class PaymentViewSet(DataScopingMixin, viewsets.ModelViewSet):
             ).select_related('account')
             
             for acc_transaction in account_transactions:
-                account = acc_transaction.account
-                # Откатываем транзакцию: если это поступление (income), уменьшаем баланс
-                if acc_transaction.transaction_type == 'income':
-                    account.balance -= acc_transaction.amount
-                    account.save()
-                # Удаляем транзакцию
-                acc_transaction.delete()
+                # Откатываем транзакцию (баланс меняется атомарно) и удаляем её
+                AccountService.revert_transaction(acc_transaction)
             
-            # Удаляем платеж (это автоматически удалит все PaymentAllocation через CASCADE)
+            # Удаляем распределения до платежа: сторно в журнале датой платежа (платеж ошибочный)
+            instance.allocations.all().delete()
+            LedgerJournalService.sync([allocation.accrual_id for allocation in allocations])
             instance.delete()
\ No newline at end of file
@@ -6,19 +6,20 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models.deletion import ProtectedError
 from .models import Property
 from .serializers import PropertySerializer, PropertyListSerializer
-from core.mixins import DataScopingMixin
+from core.mixins import ConditionalListMixin, DataScopingMixin
+from core.search import IndexedSearchFilter
 from core.permissions import ReadOnlyForClients, CanReadResource, CanWriteResource
 
 
-class PropertyViewSet(DataScopingMixin, viewsets.ModelViewSet):
+class PropertyViewSet(DataScopingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления объектами недвижимости с RBAC и data scoping.
-    Без пагинации — отображаются все объекты в списке.
+    Без пагинации — отображаются все объекты в списке; список с ETag / Last-Modified.
     """
     queryset = Property.objects.all()
     permission_classes = [IsAuthenticated, CanReadResource, ReadOnlyForClients]
     pagination_class = None  # Показывать все недвижимости
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['property_type', 'status']
     search_fields = ['name', 'address', 'block_floor_room']
     ordering_fields = ['name', 'created_at', 'area']
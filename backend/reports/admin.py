@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ReportArtifact
+
+
+@admin.register(ReportArtifact)
+class ReportArtifactAdmin(admin.ModelAdmin):
+    list_display = ['report', 'scope', 'status', 'size', 'created_by', 'created_at', 'finished_at', 'last_accessed_at']
+    list_filter = ['report', 'status']
+    raw_id_fields = ['job', 'created_by']
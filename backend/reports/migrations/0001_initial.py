@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:26
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('jobs', '0002_scheduledrun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report', models.CharField(max_length=50, verbose_name='Отчет')),
+                ('params', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Параметры')),
+                ('scope', models.CharField(max_length=50, verbose_name='Область видимости')),
+                ('data_version', models.CharField(max_length=64, verbose_name='Версия данных')),
+                ('cache_key', models.CharField(max_length=64, unique=True, verbose_name='Ключ кэша')),
+                ('status', models.CharField(choices=[('pending', 'Формируется'), ('ready', 'Готов')], default='pending', max_length=20, verbose_name='Статус')),
+                ('file', models.FileField(blank=True, upload_to='reports/%Y/%m/', verbose_name='Файл')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Размер, байт')),
+                ('raw_size', models.PositiveIntegerField(default=0, verbose_name='Размер без сжатия, байт')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Сформирован')),
+                ('last_accessed_at', models.DateTimeField(blank=True, null=True, verbose_name='Последний запрос')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_artifacts', to=settings.AUTH_USER_MODEL, verbose_name='Запросил')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_artifacts', to='jobs.job', verbose_name='Задача')),
+            ],
+            options={
+                'verbose_name': 'Готовый отчет',
+                'verbose_name_plural': 'Готовые отчеты',
+                'db_table': 'report_artifacts',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['scope', 'report'], name='report_arti_scope_4b638d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ReportArtifact(models.Model):
+    """
+    Готовый отчет, посчитанный в фоне: JSON, сжатый gzip, в MEDIA_ROOT/reports/.
+    cache_key — хэш (отчет, параметры, область видимости, версия данных): одинаковый запрос
+    при неизменных данных отдает уже посчитанный файл.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Формируется'),
+        ('ready', 'Готов'),
+    ]
+
+    report = models.CharField(max_length=50, verbose_name='Отчет')
+    params = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name='Параметры')
+    # 'admin' — общий для администраторов, иначе '<роль>:<id пользователя>'
+    scope = models.CharField(max_length=50, verbose_name='Область видимости')
+    data_version = models.CharField(max_length=64, verbose_name='Версия данных')
+    cache_key = models.CharField(max_length=64, unique=True, verbose_name='Ключ кэша')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='Статус')
+    file = models.FileField(upload_to='reports/%Y/%m/', blank=True, verbose_name='Файл')
+    size = models.PositiveIntegerField(default=0, verbose_name='Размер, байт')
+    raw_size = models.PositiveIntegerField(default=0, verbose_name='Размер без сжатия, байт')
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_artifacts',
+        verbose_name='Задача'
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_artifacts',
+        verbose_name='Запросил'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Сформирован')
+    last_accessed_at = models.DateTimeField(null=True, blank=True, verbose_name='Последний запрос')
+
+    class Meta:
+        db_table = 'report_artifacts'
+        verbose_name = 'Готовый отчет'
+        verbose_name_plural = 'Готовые отчеты'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['scope', 'report']),
+        ]
+
+    def __str__(self):
+        return f'{self.report} ({self.scope}, {self.get_status_display()})'
@@ -0,0 +1,236 @@
+"""
+Портфель инвестора: доля инвестора (InvestorLink.share) в поступлениях, расходах и чистом доходе
+по объектам и месяцам. Суммы в сомах.
+
+Доля применяется в SQL: одна выборка UNION ALL из четырех сгруппированных частей — поступления
+и расходы по связям с договорами и по связям с объектами, в каждой
+SUM(сумма × share / 100) GROUP BY инвестор, объект, месяц. Связь с договором точнее связи
+с объектом: договоры, на которые у инвестора есть своя связь, из части «по объекту» исключаются.
+
+- поступления — платежи без возвратов, пересчитанные в сомы по курсу на дату платежа (core.currency);
+- расходы — Expense по договору (связь с договором) или по объекту (связь с объектом), кроме выплат
+  инвесторам и учредителю (PAYOUT_CATEGORIES): это распределение дохода, а не расход.
+
+Результат кэшируется по (инвестор, месяц, версия данных): warm() одним запросом считает месяцы
+для всех инвесторов сразу (задача reports.investor_portfolio), get() досчитывает только недостающие.
+"""
+import hashlib
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Exists, F, Max, OuterRef, Q, Sum, Value
+from django.db.models.functions import TruncMonth
+
+from account.models import Expense
+from core.currency import converted, round_money
+from core.metrics import record_cache_lookup
+from core.models import ExchangeRate, InvestorLink
+from payments.models import Payment
+from properties.models import Property
+
+CACHE_NAME = 'investor_portfolio'
+# Наибольший период отчета в месяцах: каждый месяц — ключ кэша и строка отчета
+MAX_MONTHS = 36
+PAYOUT_CATEGORIES = ('dividends', 'founder')
+SHARE_FIELD = DecimalField(max_digits=24, decimal_places=8)
+
+
+def parse_month(value) -> date:
+    """Первое число месяца из 'YYYY-MM'; ValueError при неверном формате"""
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
+
+
+def month_range(first: date, last: date) -> list:
+    months = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _month_end(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def _weighted(amount):
+    return Sum(amount * F('share') / Value(Decimal('100')), output_field=SHARE_FIELD)
+
+
+def _grouped(links, kind, property_path, date_path, amount):
+    return links.values(
+        investor_ref=F('investor_id'), property_ref=F(property_path), month=TruncMonth(date_path),
+    ).annotate(kind=Value(kind), total=_weighted(amount)).order_by()
+
+
+def _own_contract_link(contract_path):
+    """Есть связь инвестора с этим договором — он учитывается в части «по договору»"""
+    return Exists(InvestorLink.objects.filter(
+        status='active', investor=OuterRef('investor'), contract=OuterRef(contract_path),
+    ))
+
+
+class InvestorPortfolioService:
+    """Доля инвестора в доходах и расходах по объектам и месяцам; кэш по инвестору и месяцу"""
+
+    @staticmethod
+    def compute(first: date, last: date, investor_ids=None) -> dict:
+        """
+        {(investor_id, month): {property_id: {'received': Decimal, 'expenses': Decimal}}}
+        за месяцы first..last — один запрос для всех инвесторов (или только investor_ids)
+        """
+        start, end = first, _month_end(last)
+        links = InvestorLink.objects.filter(status='active')
+        if investor_ids is not None:
+            links = links.filter(investor_id__in=investor_ids)
+        by_contract = links.filter(contract__isnull=False)
+        by_property = links.filter(contract__isnull=True, property__isnull=False)
+
+        parts = [
+            _grouped(
+                by_contract.filter(
+                    contract__payments__is_returned=False,
+                    contract__payments__payment_date__range=(start, end),
+                ),
+                'received', 'contract__property_id', 'contract__payments__payment_date',
+                converted(
+                    'contract__payments__amount', 'contract__currency',
+                    'contract__payments__payment_date', 'contract__exchange_rate_source',
+                ),
+            ),
+            _grouped(
+                by_property.filter(
+                    property__contracts__payments__is_returned=False,
+                    property__contracts__payments__payment_date__range=(start, end),
+                ).filter(~_own_contract_link('property__contracts')),
+                'received', 'property_id', 'property__contracts__payments__payment_date',
+                converted(
+                    'property__contracts__payments__amount', 'property__contracts__currency',
+                    'property__contracts__payments__payment_date', 'property__contracts__exchange_rate_source',
+                ),
+            ),
+            _grouped(
+                by_contract.filter(
+                    Q(contract__expenses__date__range=(start, end))
+                    & ~Q(contract__expenses__category__in=PAYOUT_CATEGORIES)
+                ),
+                'expenses', 'contract__property_id', 'contract__expenses__date', F('contract__expenses__amount'),
+            ),
+            _grouped(
+                by_property.filter(
+                    Q(property__expenses__date__range=(start, end))
+                    & ~Q(property__expenses__category__in=PAYOUT_CATEGORIES)
+                ).filter(~_own_contract_link('property__expenses__contract')),
+                'expenses', 'property_id', 'property__expenses__date', F('property__expenses__amount'),
+            ),
+        ]
+
+        result = {}
+        for row in parts[0].union(*parts[1:], all=True):
+            cell = result.setdefault((row['investor_ref'], row['month']), {})
+            totals = cell.setdefault(row['property_ref'], {'received': Decimal('0'), 'expenses': Decimal('0')})
+            totals[row['kind']] += row['total']
+        return result
+
+    @staticmethod
+    def data_version() -> str:
+        """Версия данных портфеля: платежи, расходы, связи инвесторов и курсы"""
+        parts = [
+            Payment.objects.aggregate(count=Count('pk'), stamp=Max('updated_at'), amount=Sum('amount')),
+            Expense.objects.aggregate(count=Count('pk'), stamp=Max('updated_at'), amount=Sum('amount')),
+            InvestorLink.objects.aggregate(
+                count=Count('pk', filter=Q(status='active')), stamp=Max('created_at'), share=Sum('share'),
+            ),
+            ExchangeRate.objects.aggregate(count=Count('pk'), stamp=Max('updated_at')),
+        ]
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    @staticmethod
+    def _key(version, investor_id, month) -> str:
+        return f'{CACHE_NAME}:{version[:16]}:{investor_id}:{month:%Y-%m}'
+
+    @staticmethod
+    def warm(months) -> int:
+        """Посчитать и положить в кэш месяцы months для всех инвесторов (один запрос). Возвращает число записей"""
+        if not months:
+            return 0
+        version = InvestorPortfolioService.data_version()
+        computed = InvestorPortfolioService.compute(min(months), max(months))
+        investor_ids = InvestorLink.objects.filter(status='active').values_list('investor_id', flat=True).distinct()
+        entries = {
+            InvestorPortfolioService._key(version, investor_id, month): computed.get((investor_id, month), {})
+            for investor_id in investor_ids
+            for month in months
+        }
+        cache.set_many(entries, settings.PORTFOLIO_CACHE_SECONDS)
+        return len(entries)
+
+    @staticmethod
+    def get(investor, months) -> dict:
+        """Портфель инвестора за месяцы months: из кэша, недостающие месяцы — одним запросом"""
+        version = InvestorPortfolioService.data_version()
+        keys = {month: InvestorPortfolioService._key(version, investor.pk, month) for month in months}
+        cached = cache.get_many(list(keys.values()))
+        cells = {}
+        for month, key in keys.items():
+            record_cache_lookup(CACHE_NAME, key in cached)
+            if key in cached:
+                cells[month] = cached[key]
+        missing = [month for month in months if month not in cells]
+        if missing:
+            computed = InvestorPortfolioService.compute(min(missing), max(missing), [investor.pk])
+            fresh = {month: computed.get((investor.pk, month), {}) for month in missing}
+            cache.set_many({keys[month]: cell for month, cell in fresh.items()}, settings.PORTFOLIO_CACHE_SECONDS)
+            cells.update(fresh)
+        return InvestorPortfolioService._report(investor, months, cells)
+
+    @staticmethod
+    def _report(investor, months, cells) -> dict:
+        property_ids = {property_id for cell in cells.values() for property_id in cell}
+        names = dict(Property.objects.filter(pk__in=property_ids).values_list('pk', 'name'))
+
+        def amounts(received, expenses):
+            return {
+                'received': str(round_money(received)),
+                'expenses': str(round_money(expenses)),
+                'net_income': str(round_money(received) - round_money(expenses)),
+            }
+
+        by_property = {}
+        monthly = []
+        for month in months:
+            cell = cells.get(month, {})
+            rows = []
+            for property_id, totals in sorted(cell.items(), key=lambda item: names.get(item[0], '')):
+                total = by_property.setdefault(property_id, {'received': Decimal('0'), 'expenses': Decimal('0')})
+                total['received'] += totals['received']
+                total['expenses'] += totals['expenses']
+                rows.append({
+                    'property_id': property_id,
+                    'property_name': names.get(property_id, ''),
+                    **amounts(totals['received'], totals['expenses']),
+                })
+            monthly.append({
+                'month': f'{month:%Y-%m}',
+                **amounts(sum(t['received'] for t in cell.values()), sum(t['expenses'] for t in cell.values())),
+                'properties': rows,
+            })
+
+        received = sum(total['received'] for total in by_property.values())
+        expenses = sum(total['expenses'] for total in by_property.values())
+        return {
+            'investor_id': investor.pk,
+            'investor_name': investor.name,
+            'currency': 'KGS',
+            'from': f'{months[0]:%Y-%m}',
+            'to': f'{months[-1]:%Y-%m}',
+            'summary': amounts(received, expenses),
+            'monthly': monthly,
+            'by_property': [
+                {'property_id': property_id, 'property_name': names.get(property_id, ''), **amounts(**total)}
+                for property_id, total in sorted(by_property.items(), key=lambda item: names.get(item[0], ''))
+            ],
+        }
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+from .models import ReportArtifact
+
+
+class ReportArtifactSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    job_status = serializers.CharField(source='job.status', read_only=True, default=None)
+    progress_percent = serializers.IntegerField(source='job.progress_percent', read_only=True, default=None)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportArtifact
+        fields = [
+            'id', 'report', 'params', 'status', 'status_display', 'size', 'raw_size',
+            'job', 'job_status', 'progress_percent', 'download_url', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'ready':
+            return None
+        return f'/api/reports/artifacts/{obj.pk}/download/'
@@ -0,0 +1,240 @@
+import gzip
+import hashlib
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Case, Count, DecimalField, Max, Min, Q, Sum, Value, When
+from django.utils import timezone
+
+from accounts.models import Account, AccountTransaction
+from account.models import Expense
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import InvestorLink, StaffAssignment, Tenant
+from core.renderers import dumps
+from payments.models import Payment
+from properties.models import Property
+from .models import ReportArtifact
+
+# Границы корзин просрочки по умолчанию (в днях): 0–30, 31–60, 61–90, 90+
+DEFAULT_AGING_BOUNDARIES = (30, 60, 90)
+
+MONEY_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+# Поля группировки для сводки по контрагентам и по объектам
+AGING_GROUPINGS = {
+    'tenant': ('contract__tenant_id', 'contract__tenant__name'),
+    'property': ('contract__property_id', 'contract__property__name', 'contract__property__address'),
+}
+
+
+class ReceivablesAgingService:
+    """Анализ дебиторской задолженности по срокам просрочки (aging)"""
+
+    @staticmethod
+    def parse_buckets(value: str = None) -> list:
+        """
+        Корзины просрочки из строки границ, например '30,60,90'.
+        Возвращает список (label, min_days, max_days); у последней корзины max_days = None.
+        """
+        if value:
+            try:
+                boundaries = [int(part) for part in value.split(',') if part.strip()]
+            except ValueError:
+                raise ValueError('Границы корзин должны быть целыми числами, например 30,60,90')
+        else:
+            boundaries = list(DEFAULT_AGING_BOUNDARIES)
+
+        if not boundaries or boundaries[0] <= 0 or any(b <= a for a, b in zip(boundaries, boundaries[1:])):
+            raise ValueError('Границы корзин должны быть положительными и возрастать')
+
+        buckets = []
+        lower = 0
+        for upper in boundaries:
+            buckets.append((f'{lower}-{upper}', lower, upper))
+            lower = upper + 1
+        buckets.append((f'{boundaries[-1]}+', lower, None))
+        return buckets
+
+    @staticmethod
+    def _bucket_sum(as_of_date, min_days: int, max_days: int = None):
+        """
+        Сумма остатков, попадающих в корзину. Дни просрочки переводятся в диапазон due_date,
+        чтобы условие сравнивало колонку напрямую.
+        """
+        condition = Q(due_date__lte=as_of_date - timedelta(days=min_days))
+        if max_days is not None:
+            condition &= Q(due_date__gte=as_of_date - timedelta(days=max_days))
+        return Sum(
+            Case(When(condition, then='balance_as_of'), default=Value(Decimal('0')), output_field=MONEY_FIELD)
+        )
+
+    @staticmethod
+    def summary(accruals, as_of_date, buckets: list, group_by: str = 'tenant') -> list:
+        """
+        Остатки просроченных начислений по корзинам одним запросом с GROUP BY
+        (по контрагентам или объектам). accruals — queryset просроченных начислений
+        с остатком на дату balance_as_of (LedgerJournalService.accruals_as_of).
+        """
+        key_fields = AGING_GROUPINGS[group_by]
+        annotations = {
+            'total_overdue': Sum('balance_as_of'),
+            'accruals_count': Count('id'),
+            'oldest_due_date': Min('due_date'),
+        }
+        for index, (_, min_days, max_days) in enumerate(buckets):
+            annotations[f'bucket_{index}'] = ReceivablesAgingService._bucket_sum(as_of_date, min_days, max_days)
+
+        rows = accruals.order_by().values(*key_fields).annotate(**annotations).order_by('-total_overdue', key_fields[0])
+
+        result = []
+        for row in rows:
+            result.append({
+                'key': row,
+                'total_overdue': row['total_overdue'],
+                'accruals_count': row['accruals_count'],
+                'oldest_overdue_days': (as_of_date - row['oldest_due_date']).days,
+                'buckets': {
+                    label: row[f'bucket_{index}'] for index, (label, _, _) in enumerate(buckets)
+                },
+            })
+        return result
+
+    @staticmethod
+    def detail(accruals, as_of_date) -> list:
+        """Начисления, из которых складывается просрочка (для раскрытия одного контрагента)."""
+        rows = accruals.order_by('due_date', 'id').values(
+            'id', 'due_date', 'balance_as_of',
+            'contract__number', 'contract__currency',
+            'contract__property__name', 'contract__property__address',
+        )
+        return [
+            {
+                'id': row['id'],
+                'property_name': row['contract__property__name'],
+                'property_address': row['contract__property__address'],
+                'contract_number': row['contract__number'],
+                'due_date': row['due_date'].isoformat(),
+                'overdue_days': (as_of_date - row['due_date']).days,
+                'amount': str(row['balance_as_of']),
+                'currency': row['contract__currency'],
+            }
+            for row in rows
+        ]
+
+
+# Таблицы, от которых зависят отчеты: (модель, поле времени изменения, поле суммы)
+REPORT_DATA_SOURCES = (
+    (Accrual, 'updated_at', 'final_amount'),
+    (Payment, 'updated_at', 'amount'),
+    (AccountTransaction, 'created_at', 'amount'),
+    (Expense, 'updated_at', 'amount'),
+    (Contract, 'updated_at', None),
+    (Property, 'updated_at', None),
+    (Tenant, 'updated_at', None),
+    (Account, 'updated_at', None),
+    # Назначения сотрудников и доли инвесторов меняют область видимости
+    (StaffAssignment, 'created_at', None),
+    (InvestorLink, 'created_at', None),
+)
+
+
+class ReportArtifactService:
+    """Фоновые отчеты: ключ кэша, запись сжатого результата, очистка"""
+
+    @staticmethod
+    def scope_for(user) -> str:
+        """Область видимости: администраторы видят одно и то же, остальные — свое"""
+        if user.role == 'admin':
+            return 'admin'
+        return f'{user.role}:{user.pk}'
+
+    @staticmethod
+    def data_version() -> str:
+        """
+        Версия данных отчетов: число строк, последнее изменение и сумма по каждой таблице.
+        Любое изменение (в том числе удаление и правка суммы проводки без updated_at) дает новую версию.
+        """
+        parts = []
+        for model, stamp_field, amount_field in REPORT_DATA_SOURCES:
+            aggregates = {'count': Count('pk'), 'stamp': Max(stamp_field)}
+            if amount_field:
+                aggregates['amount'] = Sum(amount_field)
+            row = model.objects.order_by().aggregate(**aggregates)
+            parts.append(f"{model._meta.db_table}:{row['count']}:{row['stamp']}:{row.get('amount')}")
+        return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+    @staticmethod
+    def cache_key(report: str, params: dict, scope: str, version: str) -> str:
+        raw = json.dumps([report, params, scope, version], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def get_or_create(report: str, params: dict, user):
+        """
+        Артефакт для запроса. Возвращает (artifact, needs_build): needs_build = True,
+        если отчет нужно посчитать (новый запрос или прошлая задача завершилась ошибкой).
+        """
+        scope = ReportArtifactService.scope_for(user)
+        version = ReportArtifactService.data_version()
+        key = ReportArtifactService.cache_key(report, params, scope, version)
+        artifact, created = ReportArtifact.objects.get_or_create(
+            cache_key=key,
+            defaults={
+                'report': report,
+                'params': params,
+                'scope': scope,
+                'data_version': version,
+                'created_by': user,
+            },
+        )
+        ReportArtifact.objects.filter(pk=artifact.pk).update(last_accessed_at=timezone.now())
+        if created:
+            return artifact, True
+        if artifact.status == 'ready':
+            if artifact.file and artifact.file.storage.exists(artifact.file.name):
+                return artifact, False
+            # Файл удален с диска — считаем заново
+            artifact.status = 'pending'
+            artifact.save(update_fields=['status'])
+            return artifact, True
+        job = artifact.job
+        return artifact, job is None or job.status == 'failed'
+
+    @staticmethod
+    def build(artifact, progress=None):
+        """Посчитать отчет от имени запросившего пользователя и записать JSON.gz"""
+        from .views import REPORT_BUILDERS
+
+        if progress:
+            progress(0, 2, 'Расчет отчета')
+        content = dumps(REPORT_BUILDERS[artifact.report](artifact.params, artifact.created_by))
+        compressed = gzip.compress(content, compresslevel=6)
+        if progress:
+            progress(1, 2, 'Запись файла')
+
+        artifact.file.save(f'{artifact.report}-{artifact.cache_key[:16]}.json.gz', ContentFile(compressed), save=False)
+        artifact.status = 'ready'
+        artifact.size = len(compressed)
+        artifact.raw_size = len(content)
+        artifact.finished_at = timezone.now()
+        artifact.save(update_fields=['file', 'status', 'size', 'raw_size', 'finished_at'])
+        if progress:
+            progress(2, 2, 'Готово')
+        return artifact
+
+    @staticmethod
+    def cleanup(ttl_days: int = None) -> int:
+        """Удалить артефакты, которые не запрашивались ttl_days дней, вместе с файлами"""
+        ttl_days = ttl_days if ttl_days is not None else getattr(settings, 'REPORT_ARTIFACT_TTL_DAYS', 7)
+        cutoff = timezone.now() - timedelta(days=ttl_days)
+        stale = ReportArtifact.objects.filter(Q(last_accessed_at__lt=cutoff) | Q(last_accessed_at__isnull=True, created_at__lt=cutoff))
+        deleted = 0
+        for artifact in stale.iterator():
+            if artifact.file:
+                artifact.file.delete(save=False)
+            artifact.delete()
+            deleted += 1
+        return deleted
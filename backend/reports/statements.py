@@ -0,0 +1,273 @@
+"""
+Акт сверки с контрагентом: сальдо на начало, движения за период с остатком после каждой строки,
+сальдо на конец. Положительное сальдо — долг контрагента.
+
+Источник — журнал расчетов (LedgerEntry): записи не меняются задним числом, поэтому акт
+за прошлый период совпадает с выданным ранее. Сальдо на начало — сумма записей до from_date
+(диапазон по индексу contract, effective_date); остаток после строки — оконная сумма
+SUM(amount) OVER (PARTITION BY валюта ORDER BY дата, тип, id) плюс сальдо на начало.
+Суммы в разных валютах не складываются — у каждой валюты свой раздел.
+
+Нераспределенные остатки платежей (аванс) в журнал не попадают и показываются в разделе отдельно.
+
+Готовый акт кэшируется по (контрагент, договоры, период, версия данных). Версия — агрегат
+по журналу и платежам договоров контрагента: любое изменение дает новый ключ, старые записи
+кэша просто истекают.
+"""
+import csv
+import hashlib
+import io
+import json
+from datetime import date
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Sum, Window
+
+from accruals.models import LedgerEntry
+from contracts.models import Contract
+from core.metrics import record_cache_lookup
+from payments.models import Payment
+
+CACHE_NAME = 'statement'
+CENT = Decimal('0.01')
+LINE_ORDER = ('effective_date', 'entry_type', 'pk')
+CSV_HEADER = ['Дата', 'Документ', 'Договор', 'Дебет', 'Кредит', 'Сальдо']
+
+
+class StatementExportError(Exception):
+    """Выгрузку в запрошенном формате сформировать нельзя (нет пакета или шрифта)"""
+
+
+def _money(value) -> str:
+    return str(Decimal(value or 0).quantize(CENT))
+
+
+def _document(entry_type, amount, period_start) -> str:
+    period = f'{period_start:%m.%Y}'
+    if entry_type == 'charge':
+        return f'Начисление за {period}' if amount > 0 else f'Уменьшение начисления за {period}'
+    if entry_type == 'payment':
+        return f'Оплата за {period}'
+    return f'Возврат оплаты за {period}'
+
+
+def _section() -> dict:
+    return {'lines': [], 'debit': Decimal('0'), 'credit': Decimal('0')}
+
+
+def _display_date(value: str) -> str:
+    return f'{date.fromisoformat(value):%d.%m.%Y}'
+
+
+class ReconciliationStatementService:
+    """Акт сверки по журналу расчетов: расчет, кэш, выгрузка в CSV и PDF"""
+
+    @staticmethod
+    def data_version(tenant, contract_ids) -> str:
+        """Версия данных акта: журнал только дополняется — хватает числа записей и последнего id"""
+        journal = LedgerEntry.objects.filter(contract_id__in=contract_ids).aggregate(
+            count=Count('pk'), last=Max('pk'),
+        )
+        payments = Payment.objects.filter(contract_id__in=contract_ids).aggregate(
+            count=Count('pk'), stamp=Max('updated_at'), allocated=Sum('allocated_amount'),
+        )
+        contracts = Contract.objects.filter(pk__in=contract_ids).aggregate(stamp=Max('updated_at'))
+        parts = [
+            journal['count'], journal['last'],
+            payments['count'], payments['stamp'], payments['allocated'],
+            contracts['stamp'], tenant.updated_at,
+        ]
+        return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+    @staticmethod
+    def build(tenant, contract_ids, from_date, to_date) -> dict:
+        """Акт сверки за период по договорам contract_ids контрагента tenant"""
+        entries = LedgerEntry.objects.filter(contract_id__in=contract_ids)
+
+        opening = {
+            row['contract__currency']: row['total']
+            for row in entries.filter(effective_date__lt=from_date)
+            .order_by().values('contract__currency').annotate(total=Sum('amount'))
+        }
+        unallocated = {
+            row['contract__currency']: row['total']
+            for row in Payment.objects.filter(
+                contract_id__in=contract_ids, is_returned=False, payment_date__lte=to_date,
+            ).order_by().values('contract__currency').annotate(total=Sum(F('amount') - F('allocated_amount')))
+            if row['total']
+        }
+        lines = (
+            entries.filter(effective_date__gte=from_date, effective_date__lte=to_date)
+            .annotate(running=Window(
+                expression=Sum('amount'),
+                partition_by=[F('contract__currency')],
+                order_by=[F(field).asc() for field in LINE_ORDER],
+            ))
+            .order_by('contract__currency', *LINE_ORDER)
+            .values(
+                'effective_date', 'entry_type', 'amount', 'running',
+                'contract__number', 'contract__currency', 'accrual__period_start',
+            )
+        )
+
+        sections = {currency: _section() for currency in set(opening) | set(unallocated)}
+        for row in lines:
+            currency = row['contract__currency']
+            section = sections.setdefault(currency, _section())
+            amount = row['amount']
+            debit, credit = (amount, Decimal('0')) if amount > 0 else (Decimal('0'), -amount)
+            section['debit'] += debit
+            section['credit'] += credit
+            section['lines'].append({
+                'date': row['effective_date'].isoformat(),
+                'entry_type': row['entry_type'],
+                'document': _document(row['entry_type'], amount, row['accrual__period_start']),
+                'contract_number': row['contract__number'],
+                'debit': _money(debit),
+                'credit': _money(credit),
+                'balance': _money(opening.get(currency, 0) + row['running']),
+            })
+
+        currencies = []
+        for currency in sorted(sections):
+            section = sections[currency]
+            opening_balance = opening.get(currency) or Decimal('0')
+            currencies.append({
+                'currency': currency,
+                'opening_balance': _money(opening_balance),
+                'debit': _money(section['debit']),
+                'credit': _money(section['credit']),
+                'closing_balance': _money(opening_balance + section['debit'] - section['credit']),
+                'unallocated_payments': _money(unallocated.get(currency)),
+                'lines': section['lines'],
+            })
+        return {
+            'tenant_id': tenant.pk,
+            'tenant_name': tenant.name,
+            'from_date': from_date.isoformat(),
+            'to_date': to_date.isoformat(),
+            'currencies': currencies,
+        }
+
+    @staticmethod
+    def get(tenant, contract_ids, from_date, to_date) -> dict:
+        """Акт из кэша или посчитанный заново; ключ включает версию данных"""
+        contract_ids = sorted(contract_ids)
+        version = ReconciliationStatementService.data_version(tenant, contract_ids)
+        raw = json.dumps([tenant.pk, contract_ids, from_date.isoformat(), to_date.isoformat(), version])
+        key = f'{CACHE_NAME}:{hashlib.sha256(raw.encode()).hexdigest()}'
+        statement = cache.get(key)
+        record_cache_lookup(CACHE_NAME, statement is not None)
+        if statement is None:
+            statement = ReconciliationStatementService.build(tenant, contract_ids, from_date, to_date)
+            cache.set(key, statement, settings.STATEMENT_CACHE_SECONDS)
+        return statement
+
+    @staticmethod
+    def pdf(statement) -> bytes:
+        """PDF акта из кэша: ключ — хэш содержимого акта, повторная выдача не рендерит заново"""
+        digest = hashlib.sha256(json.dumps(statement, sort_keys=True).encode()).hexdigest()
+        key = f'{CACHE_NAME}:pdf:{digest}'
+        content = cache.get(key)
+        record_cache_lookup(f'{CACHE_NAME}_pdf', content is not None)
+        if content is None:
+            content = ReconciliationStatementService.render_pdf(statement)
+            cache.set(key, content, settings.STATEMENT_CACHE_SECONDS)
+        return content
+
+    @staticmethod
+    def section_rows(section):
+        """Раздел одной валюты: сальдо на начало, движения, обороты и сальдо на конец"""
+        yield ['', 'Сальдо на начало', '', '', '', section['opening_balance']]
+        for line in section['lines']:
+            yield [
+                _display_date(line['date']), line['document'], line['contract_number'],
+                line['debit'], line['credit'], line['balance'],
+            ]
+        yield ['', 'Обороты за период', '', section['debit'], section['credit'], '']
+        yield ['', 'Сальдо на конец', '', '', '', section['closing_balance']]
+        if Decimal(section['unallocated_payments']):
+            yield ['', 'Нераспределенные оплаты (аванс)', '', '', '', section['unallocated_payments']]
+
+    @staticmethod
+    def title(statement) -> str:
+        period = f'{_display_date(statement["from_date"])} — {_display_date(statement["to_date"])}'
+        return f'Акт сверки: {statement["tenant_name"]}, {period}'
+
+    @staticmethod
+    def rows(statement):
+        """Строки выгрузки: заголовок и разделы по валютам"""
+        yield [ReconciliationStatementService.title(statement)]
+        for section in statement['currencies']:
+            yield []
+            yield ['Валюта', section['currency']]
+            yield CSV_HEADER
+            yield from ReconciliationStatementService.section_rows(section)
+
+    @staticmethod
+    def iter_csv(statement):
+        """CSV построчно для StreamingHttpResponse (UTF-8 с BOM, разделитель ';' — открывается в Excel)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';')
+        yield '\ufeff'
+        for row in ReconciliationStatementService.rows(statement):
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    @staticmethod
+    def render_pdf(statement) -> bytes:
+        """PDF акта (reportlab); шрифт с кириллицей — settings.STATEMENT_PDF_FONT"""
+        try:
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import A4
+            from reportlab.lib.styles import getSampleStyleSheet
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+            from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+        except ImportError:
+            raise StatementExportError('Для выгрузки в PDF нужен пакет reportlab (pip install reportlab)')
+
+        font = 'StatementFont'
+        if font not in pdfmetrics.getRegisteredFontNames():
+            try:
+                pdfmetrics.registerFont(TTFont(font, settings.STATEMENT_PDF_FONT))
+            except Exception:
+                raise StatementExportError(f'Не найден шрифт для PDF: {settings.STATEMENT_PDF_FONT}')
+
+        style = getSampleStyleSheet()['Normal'].clone('statement', fontName=font, fontSize=8, leading=10)
+        table_style = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        story = [
+            Paragraph(escape(ReconciliationStatementService.title(statement)), style.clone('title', fontSize=12, leading=15)),
+            Spacer(0, 12),
+        ]
+        # Таблица на каждую валюту; шапка повторяется на следующих страницах.
+        # Paragraph разбирает разметку — название контрагента и тексты строк экранируются
+        for section in statement['currencies']:
+            data = [CSV_HEADER] + [
+                [cell, Paragraph(escape(document), style), *rest]
+                for cell, document, *rest in ReconciliationStatementService.section_rows(section)
+            ]
+            story += [
+                Paragraph(escape(f'Валюта: {section["currency"]}'), style),
+                Spacer(0, 4),
+                Table(data, repeatRows=1, colWidths=[55, 205, 70, 65, 65, 70], style=table_style),
+                Spacer(0, 12),
+            ]
+        if not statement['currencies']:
+            story.append(Paragraph('Движений за период нет', style))
+
+        buffer = io.BytesIO()
+        SimpleDocTemplate(buffer, pagesize=A4, leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=30).build(story)
+        return buffer.getvalue()
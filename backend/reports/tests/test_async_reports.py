@@ -0,0 +1,132 @@
+"""
+Тесты фоновых отчетов: постановка в очередь, сжатый файл в MEDIA_ROOT, повторное использование
+"""
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import Tenant, User
+from jobs.models import Job
+from jobs.services import JobService
+from properties.models import Property
+from reports.models import ReportArtifact
+from reports.services import ReportArtifactService
+
+PNL_PARAMS = {'from': '2026-01-01', 'to': '2026-12-31'}
+
+
+class AsyncReportTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        self.admin = User.objects.create_user(username='admin_async', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        prop = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('30'))
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555200500')
+        self.contract = Contract.objects.create(
+            number='AR-1', signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'), status='active',
+        )
+        self._accrual(date(2026, 3, 1))
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _accrual(self, period_start):
+        return Accrual.objects.create(
+            contract=self.contract, period_start=period_start, period_end=period_start + timedelta(days=30),
+            due_date=period_start + timedelta(days=4), base_amount=Decimal('1000.00'),
+            final_amount=Decimal('1000.00'), balance=Decimal('1000.00'),
+        )
+
+    def _request_async(self, url='/api/reports/profit_and_loss/', params=PNL_PARAMS):
+        return self.client.get(url, {**params, 'async': 'true'})
+
+    def test_async_report_written_and_downloaded(self):
+        response = self._request_async()
+        self.assertEqual(response.status_code, 202)
+        artifact_id = response.data['artifact_id']
+        self.assertEqual(Job.objects.get(pk=response.data['job_id']).name, 'reports.build')
+
+        job = JobService.run_next('w1')
+        self.assertEqual(job.status, 'succeeded')
+        artifact = ReportArtifact.objects.get(pk=artifact_id)
+        self.assertEqual(artifact.status, 'ready')
+        self.assertTrue(artifact.file.name.startswith('reports/'))
+        self.assertTrue(artifact.file.name.endswith('.json.gz'))
+        self.assertLess(artifact.size, artifact.raw_size)
+
+        expected = self.client.get('/api/reports/profit_and_loss/', PNL_PARAMS).json()
+
+        plain = self.client.get(f'/api/reports/artifacts/{artifact_id}/download/')
+        self.assertEqual(plain.status_code, 200)
+        self.assertEqual(json.loads(b''.join(plain.streaming_content)), expected)
+
+        compressed = self.client.get(f'/api/reports/artifacts/{artifact_id}/download/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(b''.join(compressed.streaming_content))), expected)
+
+    def test_identical_request_reuses_artifact(self):
+        first = self._request_async()
+        # Пока считается — та же задача
+        self.assertEqual(self._request_async().data['job_id'], first.data['job_id'])
+        JobService.run_next('w1')
+
+        ready = self._request_async()
+        self.assertEqual(ready.status_code, 200)
+        self.assertEqual(ready.data['id'], first.data['artifact_id'])
+        self.assertIsNotNone(ready.data['download_url'])
+        self.assertEqual(Job.objects.count(), 1)
+
+        # Другой администратор получает тот же файл
+        other = User.objects.create_user(username='admin_async_2', password='x', role='admin')
+        client = APIClient()
+        client.force_authenticate(other)
+        self.assertEqual(client.get('/api/reports/profit_and_loss/', {**PNL_PARAMS, 'async': 'true'}).status_code, 200)
+
+    def test_data_change_invalidates(self):
+        first = self._request_async()
+        JobService.run_next('w1')
+        self._accrual(date(2026, 4, 1))
+
+        second = self._request_async()
+        self.assertEqual(second.status_code, 202)
+        self.assertNotEqual(second.data['artifact_id'], first.data['artifact_id'])
+
+    def test_cash_flow_and_scope(self):
+        response = self._request_async('/api/reports/cash_flow/', {'from_date': '2026-01-01', 'to_date': '2026-12-31'})
+        self.assertEqual(response.status_code, 202)
+        artifact = ReportArtifact.objects.get(pk=response.data['artifact_id'])
+        self.assertEqual(artifact.params['group_by'], 'month')
+
+        staff = User.objects.create_user(username='staff_async', password='x', role='staff')
+        client = APIClient()
+        client.force_authenticate(staff)
+        self.assertEqual(client.get(f'/api/reports/artifacts/{artifact.pk}/').status_code, 404)
+        self.assertEqual(client.get('/api/reports/artifacts/').data['count'], 0)
+
+    def test_download_before_ready_and_cleanup(self):
+        artifact_id = self._request_async().data['artifact_id']
+        self.assertEqual(self.client.get(f'/api/reports/artifacts/{artifact_id}/download/').status_code, 409)
+
+        JobService.run_next('w1')
+        artifact = ReportArtifact.objects.get(pk=artifact_id)
+        ReportArtifact.objects.filter(pk=artifact_id).update(last_accessed_at=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(ReportArtifactService.cleanup(ttl_days=7), 1)
+        self.assertFalse(artifact.file.storage.exists(artifact.file.name))
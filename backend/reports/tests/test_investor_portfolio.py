@@ -0,0 +1,160 @@
+"""
+Тесты портфеля инвестора: доля по связям с договорами и объектами, приоритет связи с договором,
+исключение выплат инвесторам, пересчет в сомы, один запрос на расчет, кэш по месяцам, область видимости
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from account.models import Expense
+from accounts.models import Account
+from contracts.models import Contract
+from core.models import ExchangeRate, InvestorLink, Tenant, User
+from payments.models import Payment
+from properties.models import Property
+from reports.portfolio import InvestorPortfolioService
+
+URL = '/api/reports/investor_portfolio/'
+PERIOD = {'from': '2026-03', 'to': '2026-04'}
+
+
+class InvestorPortfolioTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin_portfolio', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.office = Property.objects.create(name='Офис', address='Адрес', property_type='office', area=Decimal('30'))
+        self.store = Property.objects.create(name='Склад', address='Адрес', property_type='office', area=Decimal('90'))
+        tenant = Tenant.objects.create(name='Арендатор', phone='+996555900300')
+        self.first = Tenant.objects.create(name='Инвестор 1', phone='+996555900301', type='investor')
+        self.second = Tenant.objects.create(name='Инвестор 2', phone='+996555900302', type='investor')
+        ExchangeRate.objects.create(currency='USD', rate=Decimal('87'), source='nbkr', date=date(2026, 3, 1))
+
+        office_kgs = self._contract('IP-1', self.office, tenant, 'KGS')
+        store_usd = self._contract('IP-2', self.store, tenant, 'USD')
+        store_kgs = self._contract('IP-3', self.store, tenant, 'KGS')
+
+        # Инвестор 1: договор в офисе 50%, склад 40%, но по договору IP-3 — своя связь 10%
+        InvestorLink.objects.create(investor=self.first, contract=office_kgs, share=Decimal('50'))
+        InvestorLink.objects.create(investor=self.first, property=self.store, share=Decimal('40'))
+        InvestorLink.objects.create(investor=self.first, contract=store_kgs, share=Decimal('10'))
+        # Инвестор 2: весь офис
+        InvestorLink.objects.create(investor=self.second, property=self.office, share=Decimal('100'))
+
+        account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+        for contract, amount, paid_at, returned in (
+            (office_kgs, '1000.00', date(2026, 3, 10), False),
+            (office_kgs, '500.00', date(2026, 3, 20), True),
+            (store_usd, '100.00', date(2026, 3, 15), False),
+            (store_kgs, '2000.00', date(2026, 4, 5), False),
+            (store_kgs, '3000.00', date(2026, 5, 5), False),
+        ):
+            Payment.objects.create(
+                contract=contract, account=account, amount=Decimal(amount), payment_date=paid_at, is_returned=returned,
+            )
+        for prop, contract, category, amount, spent_at in (
+            (self.office, office_kgs, 'repair', '200.00', date(2026, 3, 5)),
+            (self.store, None, 'utilities', '300.00', date(2026, 3, 7)),
+            (self.store, None, 'dividends', '1000.00', date(2026, 3, 8)),
+            (self.store, store_kgs, 'salary', '500.00', date(2026, 4, 10)),
+        ):
+            Expense.objects.create(property=prop, contract=contract, category=category, amount=Decimal(amount), date=spent_at)
+
+    def _contract(self, number, prop, tenant, currency):
+        return Contract.objects.create(
+            number=number, signed_at=date(2026, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'),
+            currency=currency, status='active',
+        )
+
+    def test_weighted_by_share(self):
+        response = self.client.get(URL, {'investor_id': self.first.pk, **PERIOD})
+        self.assertEqual(response.status_code, 200)
+        march, april = response.data['monthly']
+        self.assertEqual(
+            [(row['property_name'], row['received'], row['expenses'], row['net_income']) for row in march['properties']],
+            # Офис: 50% от 1000 и 200; склад: 40% от 100 USD × 87 и от коммуналки, дивиденды не расход
+            [('Офис', '500.00', '100.00', '400.00'), ('Склад', '3480.00', '120.00', '3360.00')],
+        )
+        # Договор IP-3 — по своей связи 10%, а не по связи со складом
+        self.assertEqual(
+            [(row['property_name'], row['received'], row['expenses']) for row in april['properties']],
+            [('Склад', '200.00', '50.00')],
+        )
+        self.assertEqual(
+            response.data['summary'],
+            {'received': '4180.00', 'expenses': '270.00', 'net_income': '3910.00'},
+        )
+        self.assertEqual(
+            [(row['property_name'], row['net_income']) for row in response.data['by_property']],
+            [('Офис', '400.00'), ('Склад', '3510.00')],
+        )
+
+        second = self.client.get(URL, {'investor_id': self.second.pk, **PERIOD}).data
+        self.assertEqual(second['summary'], {'received': '1000.00', 'expenses': '200.00', 'net_income': '800.00'})
+
+    def test_contract_payout_does_not_drop_link(self):
+        # Выплата по договору за другой месяц не убирает остальные расходы договора
+        Expense.objects.create(
+            property=self.office, contract=Contract.objects.get(number='IP-1'), category='dividends',
+            amount=Decimal('700.00'), date=date(2025, 12, 20),
+        )
+        Expense.objects.create(
+            property=self.office, contract=Contract.objects.get(number='IP-1'), category='founder',
+            amount=Decimal('900.00'), date=date(2026, 3, 25),
+        )
+        march = self.client.get(URL, {'investor_id': self.first.pk, **PERIOD}).data['monthly'][0]
+        self.assertEqual(
+            [(row['property_name'], row['expenses']) for row in march['properties']],
+            [('Офис', '100.00'), ('Склад', '120.00')],
+        )
+
+    def test_one_query_for_all_investors(self):
+        with CaptureQueriesContext(connection) as queries:
+            computed = InvestorPortfolioService.compute(date(2026, 3, 1), date(2026, 4, 1))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('UNION ALL', queries[0]['sql'])
+        self.assertEqual(
+            {key: {pid: {k: round(v, 2) for k, v in totals.items()} for pid, totals in cell.items()}
+             for key, cell in computed.items() if key[0] == self.second.pk},
+            {(self.second.pk, date(2026, 3, 1)): {self.office.pk: {'received': Decimal('1000.00'),
+                                                                   'expenses': Decimal('200.00')}}},
+        )
+
+    def test_cached_per_month(self):
+        months = [date(2026, 3, 1), date(2026, 4, 1)]
+        self.assertEqual(InvestorPortfolioService.warm(months), 4)
+        first = InvestorPortfolioService.get(self.first, months)
+        # Все месяцы из кэша: версия данных (4 агрегата) и названия объектов — без расчета
+        with self.assertNumQueries(5):
+            again = InvestorPortfolioService.get(self.first, months)
+        self.assertEqual(again, first)
+
+        InvestorLink.objects.filter(investor=self.first, contract__number='IP-1').update(share=Decimal('100'))
+        changed = InvestorPortfolioService.get(self.first, months)
+        self.assertEqual(changed['monthly'][0]['properties'][0]['received'], '1000.00')
+
+    def test_scope(self):
+        investor = User.objects.create_user(
+            username='investor_portfolio', password='x', role='investor', counterparty=self.second,
+        )
+        self.client.force_authenticate(investor)
+        own = self.client.get(URL, PERIOD)
+        self.assertEqual(own.status_code, 200)
+        self.assertEqual(own.data['investor_id'], self.second.pk)
+        self.assertEqual(self.client.get(URL, {'investor_id': self.first.pk}).status_code, 404)
+        self.assertEqual(self.client.get(URL, {'from': '2026-13'}).status_code, 400)
+        self.assertEqual(self.client.get(URL, {'from': '0001-01', 'to': '2026-04'}).status_code, 400)
+        self.assertEqual(self.client.get(URL, {'from': '2023-05', 'to': '2026-04'}).status_code, 200)
+
+        tenant = User.objects.create_user(username='tenant_portfolio', password='x', role='tenant')
+        self.client.force_authenticate(tenant)
+        self.assertEqual(self.client.get(URL, {'investor_id': self.second.pk}).status_code, 403)
@@ -0,0 +1,85 @@
+"""
+Тесты отчета о просрочке (aging) по корзинам
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import Tenant, User
+from properties.models import Property
+from reports.services import ReceivablesAgingService
+
+AS_OF = date(2026, 6, 30)
+
+
+class ReceivablesAgingTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin_aging', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.tenant = Tenant.objects.create(name='Арендатор А', phone='+996555100001')
+        other_tenant = Tenant.objects.create(name='Арендатор Б', phone='+996555100002')
+        prop = Property.objects.create(name='Объект', address='Адрес', property_type='office', area=Decimal('40'))
+        contract = self._contract('AG-1', prop, self.tenant)
+        other_contract = self._contract('AG-2', prop, other_tenant)
+
+        # Дни просрочки: 10, 45, 75, 120 и непросроченное начисление
+        for days, amount in ((10, '100.00'), (45, '200.00'), (75, '300.00'), (120, '400.00'), (-5, '999.00')):
+            self._accrual(contract, AS_OF - timedelta(days=days), Decimal(amount))
+        self._accrual(other_contract, AS_OF - timedelta(days=30), Decimal('50.00'))
+        self._accrual(other_contract, AS_OF - timedelta(days=31), Decimal('70.00'))
+
+    def _contract(self, number, prop, tenant):
+        return Contract.objects.create(
+            number=number, signed_at=date(2025, 1, 1), property=prop, tenant=tenant,
+            start_date=date(2025, 1, 1), end_date=date(2027, 1, 1),
+            rent_amount=Decimal('1000.00'), status='active',
+        )
+
+    def _accrual(self, contract, due_date, amount):
+        return Accrual.objects.create(
+            contract=contract, period_start=due_date, period_end=due_date + timedelta(days=30),
+            due_date=due_date, base_amount=amount, final_amount=amount, balance=amount,
+        )
+
+    def test_parse_buckets(self):
+        labels = [label for label, _, _ in ReceivablesAgingService.parse_buckets('15,45')]
+        self.assertEqual(labels, ['0-15', '16-45', '45+'])
+        with self.assertRaises(ValueError):
+            ReceivablesAgingService.parse_buckets('60,30')
+
+    def test_summary_by_buckets(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/reports/overdue_payments/', {'as_of_date': AS_OF.isoformat()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), 3)
+        self.assertEqual(response.data['buckets'], ['0-30', '31-60', '61-90', '90+'])
+        self.assertEqual(
+            response.data['summary']['buckets'],
+            {'0-30': '150.00', '31-60': '270.00', '61-90': '300.00', '90+': '400.00'},
+        )
+        self.assertEqual(response.data['summary']['total_overdue'], '1120.00')
+        self.assertEqual(response.data['summary']['accruals_count'], 6)
+
+        first = response.data['data'][0]
+        self.assertEqual(first['tenant_id'], self.tenant.id)
+        self.assertEqual(first['oldest_overdue_days'], 120)
+        self.assertNotIn('accruals', first)
+        self.assertEqual(response.data['by_property'][0]['total_overdue'], '1120.00')
+
+    def test_tenant_detail_on_demand(self):
+        response = self.client.get(
+            '/api/reports/overdue_accruals/', {'tenant_id': self.tenant.id, 'as_of_date': AS_OF.isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a['overdue_days'] for a in response.data['accruals']], [120, 75, 45, 10])
@@ -0,0 +1,134 @@
+"""
+Тесты акта сверки: сальдо и нарастающий остаток по журналу, разделы по валютам,
+кэш по версии данных, выгрузка в CSV и PDF, область видимости
+"""
+import importlib.util
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from accruals.models import Accrual
+from contracts.models import Contract
+from core.models import Tenant, User
+from payments.models import Payment
+from payments.services import PaymentAllocationService
+from properties.models import Property
+from reports.statements import ReconciliationStatementService
+
+URL = '/api/reports/reconciliation_statement/'
+PERIOD = {'from_date': '2026-02-01', 'to_date': '2026-03-31'}
+
+
+class ReconciliationStatementTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin_statement', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        prop = Property.objects.create(name='Офис', address='Адрес', property_type='office', area=Decimal('30'))
+        self.tenant = Tenant.objects.create(name='Арендатор', phone='+996555800900')
+        self.contract = self._contract('ST-1', prop, 'KGS')
+        usd_contract = self._contract('ST-2', prop, 'USD')
+        for month in (1, 2, 3):
+            self._accrual(self.contract, month, Decimal('1000.00'))
+        self._accrual(usd_contract, 2, Decimal('100.00'))
+
+        self.account = Account.objects.create(name='Касса', account_type='cash', currency='KGS')
+        self._pay(Decimal('1500.00'), date(2026, 2, 10))
+        self._pay(Decimal('700.00'), date(2026, 3, 20))
+        # Аванс: платеж не распределен
+        Payment.objects.create(
+            contract=self.contract, account=self.account, amount=Decimal('300.00'), payment_date=date(2026, 3, 25),
+        )
+
+    def _contract(self, number, prop, currency):
+        return Contract.objects.create(
+            number=number, signed_at=date(2026, 1, 1), property=prop, tenant=self.tenant,
+            start_date=date(2026, 1, 1), end_date=date(2027, 1, 1), rent_amount=Decimal('1000.00'),
+            currency=currency, status='active',
+        )
+
+    def _accrual(self, contract, month, amount):
+        return Accrual.objects.create(
+            contract=contract, period_start=date(2026, month, 1), period_end=date(2026, month, 28),
+            due_date=date(2026, month, 5), base_amount=amount, final_amount=amount, balance=amount,
+        )
+
+    def _pay(self, amount, payment_date):
+        payment = Payment.objects.create(
+            contract=self.contract, account=self.account, amount=amount, payment_date=payment_date,
+        )
+        PaymentAllocationService.allocate_payment_fifo(payment)
+        return payment
+
+    def test_statement_balances_and_running_total(self):
+        response = self.client.get(URL, {'tenant_id': self.tenant.pk, **PERIOD})
+        self.assertEqual(response.status_code, 200)
+        kgs, usd = response.data['currencies']
+
+        self.assertEqual(
+            (kgs['currency'], kgs['opening_balance'], kgs['debit'], kgs['credit'], kgs['closing_balance']),
+            ('KGS', '1000.00', '2000.00', '2200.00', '800.00'),
+        )
+        self.assertEqual(kgs['unallocated_payments'], '300.00')
+        self.assertEqual(
+            [(line['date'], line['document'], line['debit'], line['credit'], line['balance']) for line in kgs['lines']],
+            [
+                ('2026-02-01', 'Начисление за 02.2026', '1000.00', '0.00', '2000.00'),
+                ('2026-02-10', 'Оплата за 01.2026', '0.00', '1000.00', '1000.00'),
+                ('2026-02-10', 'Оплата за 02.2026', '0.00', '500.00', '500.00'),
+                ('2026-03-01', 'Начисление за 03.2026', '1000.00', '0.00', '1500.00'),
+                ('2026-03-20', 'Оплата за 02.2026', '0.00', '500.00', '1000.00'),
+                ('2026-03-20', 'Оплата за 03.2026', '0.00', '200.00', '800.00'),
+            ],
+        )
+        self.assertEqual((usd['opening_balance'], usd['closing_balance']), ('0.00', '100.00'))
+
+    def test_cached_until_data_changes(self):
+        ids = [self.contract.pk]
+        first = ReconciliationStatementService.get(self.tenant, ids, date(2026, 2, 1), date(2026, 3, 31))
+        # Повторный запрос — только версия данных, без расчета
+        with self.assertNumQueries(3):
+            again = ReconciliationStatementService.get(self.tenant, ids, date(2026, 2, 1), date(2026, 3, 31))
+        self.assertEqual(again, first)
+
+        self._pay(Decimal('100.00'), date(2026, 3, 30))
+        changed = ReconciliationStatementService.get(self.tenant, ids, date(2026, 2, 1), date(2026, 3, 31))
+        self.assertEqual(changed['currencies'][0]['closing_balance'], '700.00')
+
+    def test_csv_export_and_scope(self):
+        response = self.client.get(URL, {'tenant_id': self.tenant.pk, 'contract_id': self.contract.pk,
+                                         'export': 'csv', **PERIOD})
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'Акт сверки: Арендатор, 01.02.2026 — 31.03.2026')
+        self.assertIn(';Сальдо на начало;;;;1000.00', lines)
+        self.assertIn('20.03.2026;Оплата за 03.2026;ST-1;0.00;200.00;800.00', lines)
+        self.assertEqual(lines[-2:], [';Сальдо на конец;;;;800.00', ';Нераспределенные оплаты (аванс);;;;300.00'])
+
+        other = Tenant.objects.create(name='Другой', phone='+996555800901')
+        outsider = User.objects.create_user(username='tenant_statement', password='x', role='tenant', counterparty=other)
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(URL, {'tenant_id': self.tenant.pk}).status_code, 404)
+        self.assertEqual(self.client.get(URL, {'tenant_id': self.tenant.pk, 'export': 'xml'}).status_code, 400)
+
+    @unittest.skipUnless(importlib.util.find_spec('reportlab'), 'reportlab не установлен')
+    def test_pdf_export(self):
+        response = self.client.get(URL, {'tenant_id': self.tenant.pk, 'export': 'pdf', **PERIOD})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    @unittest.skipUnless(importlib.util.find_spec('reportlab'), 'reportlab не установлен')
+    def test_pdf_escapes_markup_in_names(self):
+        Tenant.objects.filter(pk=self.tenant.pk).update(name='ОсОО A&B <b>Офис')
+        response = self.client.get(URL, {'tenant_id': self.tenant.pk, 'export': 'pdf', **PERIOD})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
@@ -1,8 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ReportsViewSet
+from .views import ReportArtifactViewSet, ReportsViewSet
 
 router = DefaultRouter()
+router.register(r'artifacts', ReportArtifactViewSet, basename='report-artifacts')
 router.register(r'', ReportsViewSet, basename='reports')
 
 urlpatterns = [
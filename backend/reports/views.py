@@ -1,19 +1,39 @@
-from rest_framework import viewsets
+import gzip
+import io
+
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Sum, Q, Count
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import content_disposition_header
 from datetime import datetime, timedelta
 from decimal import Decimal
+from accruals.journal import LedgerJournalService
 from accruals.models import Accrual
 from contracts.models import Contract
 from payments.models import Payment
 from account.models import Expense
 from accounts.models import Account, AccountTransaction
 from properties.models import Property
+from core.currency import ACCRUAL_RATE, PAYMENT_RATE, money_sum, parse_base_currency, round_money
 from core.models import Tenant
+from core.downloads import protected_file_response
 from core.mixins import DataScopingMixin
+from jobs.services import JobService
+from jobs.views import job_accepted
+from .models import ReportArtifact
+from .portfolio import MAX_MONTHS, InvestorPortfolioService, month_range, parse_month
+from .serializers import ReportArtifactSerializer
+from .services import ReceivablesAgingService, ReportArtifactService
+from .statements import ReconciliationStatementService, StatementExportError
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
 
 
 class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
@@ -33,13 +53,26 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
         - all_time: true/false - для периода "Все время"
         - property_id: ID недвижимости (опционально)
         - tenant_id: ID контрагента (опционально)
+        - base_currency: KGS/USD/RUB/EUR — итоги в одной валюте: суммы пересчитываются
+          в агрегатном запросе по курсу на дату начисления/платежа/операции (core.currency)
+        - async: true — посчитать в фоне (ответ 202 с job_id, результат — файлом)
         """
+        try:
+            params = self._profit_and_loss_params(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if request.query_params.get('async', '').lower() == 'true':
+            return self._async_report('profit_and_loss', params, request.user)
+        return Response(self.build_profit_and_loss(params, request.user))
+
+    def _profit_and_loss_params(self, query_params):
+        """Параметры P&L с подставленным периодом по умолчанию (даты — ISO-строки)"""
         # Получаем параметры фильтрации
-        from_date = request.query_params.get('from')
-        to_date = request.query_params.get('to')
-        all_time = request.query_params.get('all_time', '').lower() == 'true'
-        property_id = request.query_params.get('property_id')
-        tenant_id = request.query_params.get('tenant_id')
+        from_date = query_params.get('from')
+        to_date = query_params.get('to')
+        all_time = query_params.get('all_time', '').lower() == 'true'
+        property_id = query_params.get('property_id')
+        tenant_id = query_params.get('tenant_id')
         
         # Парсим даты
         if all_time:
@@ -62,6 +95,24 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
             else:
                 to_date = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
         
+        return {
+            'from': from_date.isoformat() if from_date else None,
+            'to': to_date.isoformat() if to_date else None,
+            'all_time': all_time,
+            'property_id': property_id,
+            'tenant_id': tenant_id,
+            'base_currency': parse_base_currency(query_params.get('base_currency')),
+        }
+
+    def build_profit_and_loss(self, params, user):
+        """Данные отчета P&L для пользователя (общие для синхронного ответа и фоновой задачи)"""
+        from_date = _parse_date(params['from'])
+        to_date = _parse_date(params['to'])
+        all_time = params['all_time']
+        property_id = params['property_id']
+        tenant_id = params['tenant_id']
+        base_currency = params.get('base_currency')
+
         # Базовые фильтры
         accruals_filter = Q(contract__status='active')
         payments_filter = Q(contract__status='active', is_returned=False)
@@ -79,7 +130,7 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
         
         # Доходы: начисления за период (с data scoping)
         accruals_query = Accrual.objects.filter(accruals_filter)
-        accruals_query = self._scope_for_user(accruals_query, request.user, 'Accrual')
+        accruals_query = self._scope_for_user(accruals_query, user, 'Accrual')
         if not all_time and from_date and to_date:
             accruals_query = accruals_query.filter(
                 period_start__lte=to_date,
@@ -89,7 +140,7 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
         
         # Фактические поступления за период (с data scoping)
         payments_query = Payment.objects.filter(payments_filter)
-        payments_query = self._scope_for_user(payments_query, request.user, 'Payment')
+        payments_query = self._scope_for_user(payments_query, user, 'Payment')
         if not all_time and from_date and to_date:
             payments_query = payments_query.filter(
                 payment_date__gte=from_date,
@@ -109,10 +160,20 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
             )
         expenses = expenses_query.select_related('account', 'related_expense')
         
-        # Подсчитываем итоги
-        total_revenue = accruals.aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
-        total_received = payments.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        # Подсчитываем итоги (с base_currency — в одной валюте, пересчет внутри агрегата)
+        total_revenue = accruals.aggregate(
+            total=money_sum('final_amount', *ACCRUAL_RATE, base=base_currency)
+        )['total'] or Decimal('0')
+        total_received = payments.aggregate(
+            total=money_sum('amount', *PAYMENT_RATE, base=base_currency)
+        )['total'] or Decimal('0')
+        total_expenses = expenses.aggregate(
+            total=money_sum('amount', 'account__currency', 'transaction_date', base=base_currency)
+        )['total'] or Decimal('0')
+        if base_currency:
+            total_revenue, total_received, total_expenses = (
+                round_money(total_revenue), round_money(total_received), round_money(total_expenses)
+            )
         profit = total_received - total_expenses
         
         # Детализация доходов (начисления)
@@ -160,7 +221,7 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
                 'currency': expense.account.currency if expense.account else 'KGS'
             })
         
-        return Response({
+        return {
             'period': {
                 'from': from_date.isoformat() if from_date else None,
                 'to': to_date.isoformat() if to_date else None,
@@ -171,6 +232,7 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
                 'tenant_id': tenant_id
             },
             'summary': {
+                'base_currency': base_currency,
                 'revenue': str(total_revenue),
                 'received': str(total_received),
                 'expenses': str(total_expenses),
@@ -181,7 +243,7 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
                 'received': received_details,
                 'expenses': expenses_details
             }
-        })
+        }
     
     def _group_by_month(self, accruals, payments, expenses, from_date, to_date):
         """Группировка по месяцам"""
@@ -336,15 +398,23 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
         - tenant_id: ID контрагента (опционально)
         - account_id: ID счета (опционально)
         - group_by: группировка ('month' или 'account')
+        - async: true — посчитать в фоне (ответ 202 с job_id, результат — файлом)
         """
+        params = self._cash_flow_params(request.query_params)
+        if request.query_params.get('async', '').lower() == 'true':
+            return self._async_report('cash_flow', params, request.user)
+        return Response(self.build_cash_flow(params, request.user))
+
+    def _cash_flow_params(self, query_params):
+        """Параметры отчета о движении денег с подставленным периодом по умолчанию"""
         # Получаем параметры фильтрации
-        from_date = request.query_params.get('from_date') or request.query_params.get('from')
-        to_date = request.query_params.get('to_date') or request.query_params.get('to')
-        all_time = request.query_params.get('all_time', '').lower() == 'true'
-        property_id = request.query_params.get('property_id')
-        tenant_id = request.query_params.get('tenant_id')
-        account_id = request.query_params.get('account_id')
-        group_by = request.query_params.get('group_by', 'month')
+        from_date = query_params.get('from_date') or query_params.get('from')
+        to_date = query_params.get('to_date') or query_params.get('to')
+        all_time = query_params.get('all_time', '').lower() == 'true'
+        property_id = query_params.get('property_id')
+        tenant_id = query_params.get('tenant_id')
+        account_id = query_params.get('account_id')
+        group_by = query_params.get('group_by', 'month')
         
         # Парсим даты
         if all_time:
@@ -370,6 +440,26 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
             else:
                 to_date = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
         
+        return {
+            'from': from_date.isoformat() if from_date else None,
+            'to': to_date.isoformat() if to_date else None,
+            'all_time': all_time,
+            'property_id': property_id,
+            'tenant_id': tenant_id,
+            'account_id': account_id,
+            'group_by': group_by,
+        }
+
+    def build_cash_flow(self, params, user):
+        """Данные отчета о движении денежных средств"""
+        from_date = _parse_date(params['from'])
+        to_date = _parse_date(params['to'])
+        all_time = params['all_time']
+        property_id = params['property_id']
+        tenant_id = params['tenant_id']
+        account_id = params['account_id']
+        group_by = params['group_by']
+
         # Фильтры для транзакций по счетам
         transactions_filter = Q()
         if not all_time and from_date and to_date:
@@ -438,7 +528,7 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
         elif group_by == 'account':
             accounts_result = self._group_cash_flow_by_account(transactions, payments, expenses)
 
-        return Response({
+        return {
             'period': {
                 'from': from_date.isoformat() if from_date else None,
                 'to': to_date.isoformat() if to_date else None,
@@ -458,7 +548,7 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
             },
             'monthly': monthly_result,
             'accounts': accounts_result
-        })
+        }
     
     def _group_cash_flow_by_month(self, transactions, payments, expenses, from_date, to_date, all_time=False):
         """Группировка движения денежных средств по месяцам"""
@@ -554,36 +644,38 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
         
         return result
     
-    @action(detail=False, methods=['get'])
-    def overdue_payments(self, request):
-        """
-        Отчет о просроченных платежах.
-        
-        Параметры:
-        - property_id: ID недвижимости (опционально)
-        - tenant_id: ID контрагента (опционально)
-        - as_of_date: дата на которую считать просрочку (YYYY-MM-DD, по умолчанию сегодня)
-        """
-        property_id = request.query_params.get('property_id')
-        tenant_id = request.query_params.get('tenant_id')
+    def _async_report(self, report, params, user):
+        """Фоновый режим: готовый файл из кэша (200) или задача на расчет (202 с job_id)"""
+        artifact, needs_build = ReportArtifactService.get_or_create(report, params, user)
+        if needs_build:
+            artifact.job = JobService.enqueue('reports.build', payload={'artifact_id': artifact.pk}, user=user)
+            ReportArtifact.objects.filter(pk=artifact.pk).update(job=artifact.job)
+        if artifact.status == 'ready':
+            return Response(ReportArtifactSerializer(artifact).data)
+        response = job_accepted(artifact.job)
+        response.data['artifact_id'] = artifact.pk
+        return response
+
+    def _get_as_of_date(self, request):
+        """Дата, на которую считается просрочка (as_of_date, по умолчанию сегодня)"""
         as_of_date = request.query_params.get('as_of_date')
-        
-        # Парсим дату
         if as_of_date:
             try:
-                as_of_date = datetime.strptime(as_of_date, '%Y-%m-%d').date()
+                return datetime.strptime(as_of_date, '%Y-%m-%d').date()
             except ValueError:
-                as_of_date = timezone.now().date()
-        else:
-            as_of_date = timezone.now().date()
-        
-        # Фильтры для просроченных начислений
+                pass
+        return timezone.now().date()
+    
+    def _overdue_accruals(self, request, as_of_date, property_id=None, tenant_id=None):
+        """
+        Просроченные начисления по активным договорам с учетом фильтров и data scoping.
+        Остаток — на as_of_date по журналу расчетов (balance_as_of), а не текущий balance:
+        оплаты после этой даты не уменьшают просрочку на нее.
+        """
         overdue_filter = Q(
             contract__status='active',
             due_date__lt=as_of_date,
-            balance__gt=0
         )
-        
         if property_id:
             overdue_filter &= Q(contract__property_id=property_id)
         if tenant_id:
@@ -592,53 +684,59 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
         overdue_accruals = Accrual.objects.filter(overdue_filter)
         # Применяем data scoping
         overdue_accruals = self._scope_for_user(overdue_accruals, request.user, 'Accrual')
-        overdue_accruals = overdue_accruals.select_related(
-            'contract', 'contract__property', 'contract__tenant'
-        ).order_by('due_date')
+        return LedgerJournalService.accruals_as_of(overdue_accruals, as_of_date)
+    
+    @action(detail=False, methods=['get'])
+    def overdue_payments(self, request):
+        """
+        Отчет о просроченных платежах (aging) по контрагентам и объектам.
+        Суммы по корзинам просрочки считаются в БД одним сгруппированным запросом.
+        Детализация по начислениям — через overdue_accruals (для одного контрагента).
         
-        # Группируем по контрагентам
-        tenants_data = {}
-        total_overdue = Decimal('0')
+        Параметры:
+        - property_id: ID недвижимости (опционально)
+        - tenant_id: ID контрагента (опционально)
+        - as_of_date: дата на которую считать просрочку (YYYY-MM-DD, по умолчанию сегодня)
+        - buckets: границы корзин в днях (по умолчанию 30,60,90 → 0-30, 31-60, 61-90, 90+)
+        - include_accruals: true — вложить начисления в каждого контрагента (как раньше)
+        """
+        property_id = request.query_params.get('property_id')
+        tenant_id = request.query_params.get('tenant_id')
+        as_of_date = self._get_as_of_date(request)
+        include_accruals = request.query_params.get('include_accruals', '').lower() == 'true'
         
-        for accrual in overdue_accruals:
-            tenant = accrual.contract.tenant
-            if tenant.id not in tenants_data:
-                tenants_data[tenant.id] = {
-                    'tenant_id': tenant.id,
-                    'tenant_name': tenant.name,
-                    'accruals': [],
-                    'total_overdue': Decimal('0'),
-                    'oldest_overdue_days': 0
-                }
-            
-            overdue_days = (as_of_date - accrual.due_date).days
-            tenants_data[tenant.id]['accruals'].append({
-                'id': accrual.id,
-                'property_name': accrual.contract.property.name,
-                'property_address': accrual.contract.property.address,
-                'contract_number': accrual.contract.number,
-                'due_date': accrual.due_date.isoformat(),
-                'overdue_days': overdue_days,
-                'amount': str(accrual.balance),
-                'currency': accrual.contract.currency
-            })
-            tenants_data[tenant.id]['total_overdue'] += accrual.balance
-            if overdue_days > tenants_data[tenant.id]['oldest_overdue_days']:
-                tenants_data[tenant.id]['oldest_overdue_days'] = overdue_days
-            
-            total_overdue += accrual.balance
+        try:
+            buckets = ReceivablesAgingService.parse_buckets(request.query_params.get('buckets'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        bucket_labels = [label for label, _, _ in buckets]
         
-        # Формируем результат
+        overdue_accruals = self._overdue_accruals(request, as_of_date, property_id, tenant_id)
+        by_tenant = ReceivablesAgingService.summary(overdue_accruals, as_of_date, buckets, group_by='tenant')
+        by_property = ReceivablesAgingService.summary(overdue_accruals, as_of_date, buckets, group_by='property')
+        
+        total_overdue = Decimal('0')
+        accruals_count = 0
+        bucket_totals = {label: Decimal('0') for label in bucket_labels}
         result = []
-        for tenant_id, data in tenants_data.items():
-            result.append({
-                'tenant_id': data['tenant_id'],
-                'tenant_name': data['tenant_name'],
-                'total_overdue': str(data['total_overdue']),
-                'oldest_overdue_days': data['oldest_overdue_days'],
-                'accruals_count': len(data['accruals']),
-                'accruals': data['accruals']
-            })
+        for row in by_tenant:
+            total_overdue += row['total_overdue']
+            accruals_count += row['accruals_count']
+            for label in bucket_labels:
+                bucket_totals[label] += row['buckets'][label]
+            tenant_data = {
+                'tenant_id': row['key']['contract__tenant_id'],
+                'tenant_name': row['key']['contract__tenant__name'],
+                'total_overdue': str(row['total_overdue']),
+                'oldest_overdue_days': row['oldest_overdue_days'],
+                'accruals_count': row['accruals_count'],
+                'buckets': {label: str(amount) for label, amount in row['buckets'].items()},
+            }
+            if include_accruals:
+                tenant_data['accruals'] = ReceivablesAgingService.detail(
+                    overdue_accruals.filter(contract__tenant_id=tenant_data['tenant_id']), as_of_date
+                )
+            result.append(tenant_data)
         
         return Response({
             'as_of_date': as_of_date.isoformat(),
@@ -646,13 +744,186 @@ class ReportsViewSet(DataScopingMixin, viewsets.ViewSet):
                 'property_id': property_id,
                 'tenant_id': tenant_id
             },
+            'buckets': bucket_labels,
             'summary': {
                 'total_overdue': str(total_overdue),
                 'tenants_count': len(result),
-                'accruals_count': overdue_accruals.count()
+                'accruals_count': accruals_count,
+                'buckets': {label: str(amount) for label, amount in bucket_totals.items()},
             },
-            'data': result
+            'data': result,
+            'by_property': [
+                {
+                    'property_id': row['key']['contract__property_id'],
+                    'property_name': row['key']['contract__property__name'],
+                    'property_address': row['key']['contract__property__address'],
+                    'total_overdue': str(row['total_overdue']),
+                    'oldest_overdue_days': row['oldest_overdue_days'],
+                    'accruals_count': row['accruals_count'],
+                    'buckets': {label: str(amount) for label, amount in row['buckets'].items()},
+                }
+                for row in by_property
+            ],
+        })
+    
+    @action(detail=False, methods=['get'])
+    def overdue_accruals(self, request):
+        """
+        Просроченные начисления одного контрагента (детализация отчета о просрочке).
+        
+        Параметры:
+        - tenant_id: ID контрагента (обязательно)
+        - property_id: ID недвижимости (опционально)
+        - as_of_date: дата на которую считать просрочку (YYYY-MM-DD, по умолчанию сегодня)
+        """
+        try:
+            tenant_id = int(request.query_params.get('tenant_id', ''))
+        except ValueError:
+            return Response({'error': 'Не указан tenant_id'}, status=status.HTTP_400_BAD_REQUEST)
+
+        property_id = request.query_params.get('property_id')
+        as_of_date = self._get_as_of_date(request)
+        overdue_accruals = self._overdue_accruals(request, as_of_date, property_id, tenant_id)
+        
+        return Response({
+            'as_of_date': as_of_date.isoformat(),
+            'tenant_id': tenant_id,
+            'accruals': ReceivablesAgingService.detail(overdue_accruals, as_of_date),
         })
 
+    @action(detail=False, methods=['get'])
+    def reconciliation_statement(self, request):
+        """
+        Акт сверки с контрагентом: сальдо на начало, движения с нарастающим остатком, сальдо на конец.
+        Считается по журналу расчетов и кэшируется до изменения данных контрагента.
+        
+        Параметры:
+        - tenant_id: ID контрагента (обязательно)
+        - contract_id: ID договора (опционально, по умолчанию все договоры контрагента)
+        - from_date, to_date: период (YYYY-MM-DD, по умолчанию прошлый месяц)
+        - export: csv или pdf — выгрузка файлом вместо JSON
+        """
+        try:
+            tenant = Tenant.objects.get(pk=int(request.query_params.get('tenant_id', '')))
+        except (ValueError, Tenant.DoesNotExist):
+            return Response({'error': 'Контрагент не найден'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            from_date = _parse_date(request.query_params.get('from_date'))
+            to_date = _parse_date(request.query_params.get('to_date'))
+        except ValueError:
+            return Response({'error': 'Даты в формате YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        previous_month_end = timezone.localdate().replace(day=1) - timedelta(days=1)
+        to_date = to_date or previous_month_end
+        from_date = from_date or to_date.replace(day=1)
+        if from_date > to_date:
+            return Response({'error': 'Начало периода позже окончания'}, status=status.HTTP_400_BAD_REQUEST)
+
+        export = request.query_params.get('export', '').lower()
+        if export not in ('', 'csv', 'pdf'):
+            return Response({'error': 'export: csv или pdf'}, status=status.HTTP_400_BAD_REQUEST)
+
+        contracts = self._scope_for_user(Contract.objects.filter(tenant=tenant), request.user, 'Contract')
+        contract_id = request.query_params.get('contract_id')
+        if contract_id:
+            contracts = contracts.filter(pk=contract_id) if contract_id.isdigit() else contracts.none()
+        contract_ids = list(contracts.values_list('pk', flat=True))
+        if not contract_ids and (contract_id or request.user.role != 'admin'):
+            return Response({'error': 'Контрагент не найден'}, status=status.HTTP_404_NOT_FOUND)
+
+        statement = ReconciliationStatementService.get(tenant, contract_ids, from_date, to_date)
+        if not export:
+            return Response(statement)
+
+        filename = f'statement-{tenant.pk}-{from_date:%Y%m%d}-{to_date:%Y%m%d}.{export}'
+        if export == 'csv':
+            response = StreamingHttpResponse(
+                ReconciliationStatementService.iter_csv(statement), content_type='text/csv; charset=utf-8'
+            )
+            response['Content-Disposition'] = content_disposition_header(True, filename)
+            return response
+        try:
+            content = ReconciliationStatementService.pdf(statement)
+        except StatementExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        return FileResponse(io.BytesIO(content), as_attachment=True, filename=filename, content_type='application/pdf')
+
+    @action(detail=False, methods=['get'])
+    def investor_portfolio(self, request):
+        """
+        Портфель инвестора: его доля (InvestorLink.share) в поступлениях, расходах и чистом доходе
+        по объектам и месяцам, в сомах. Считается одним запросом и кэшируется по месяцам.
+
+        Параметры:
+        - investor_id: ID инвестора (администратору — обязательно, инвестору — по умолчанию он сам)
+        - from, to: месяцы YYYY-MM (по умолчанию последние 12 месяцев, не больше 36)
+        """
+        user = request.user
+        if user.role not in ('admin', 'investor'):
+            return Response({'error': 'Доступ запрещен.'}, status=status.HTTP_403_FORBIDDEN)
+        investor_id = request.query_params.get('investor_id') or getattr(user, 'counterparty_id', None)
+        investors = self._scope_for_user(Tenant.objects.all(), user, 'Tenant')
+        investor = investors.filter(pk=investor_id).first() if str(investor_id or '').isdigit() else None
+        if investor is None:
+            return Response({'error': 'Инвестор не найден'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            to_month, from_month = request.query_params.get('to'), request.query_params.get('from')
+            last = parse_month(to_month) if to_month else timezone.localdate().replace(day=1)
+            # По умолчанию — 12 месяцев, включая последний
+            year, month = divmod(last.year * 12 + last.month - 12, 12)
+            first = parse_month(from_month) if from_month else last.replace(year=year, month=month + 1)
+        except ValueError:
+            return Response({'error': 'Месяцы в формате YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+        if first > last:
+            return Response({'error': 'Начало периода позже окончания'}, status=status.HTTP_400_BAD_REQUEST)
+        if (last.year - first.year) * 12 + last.month - first.month >= MAX_MONTHS:
+            return Response({'error': f'Период не больше {MAX_MONTHS} месяцев'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(InvestorPortfolioService.get(investor, month_range(first, last)))
+
 # Backward compatibility: keep old name for imports if any
 ReportViewSet = ReportsViewSet
+
+# Отчеты, которые можно посчитать в фоне (задача reports.build): имя → функция(params, user)
+REPORT_BUILDERS = {
+    'profit_and_loss': lambda params, user: ReportsViewSet().build_profit_and_loss(params, user),
+    'cash_flow': lambda params, user: ReportsViewSet().build_cash_flow(params, user),
+}
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class ReportArtifactViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Отчеты, посчитанные в фоне: статус и скачивание.
+    Доступны в той же области видимости, в которой запрошены (администраторам — общие).
+    """
+    serializer_class = ReportArtifactSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        scope = ReportArtifactService.scope_for(self.request.user)
+        return ReportArtifact.objects.filter(scope=scope).select_related('job')
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """JSON отчета; клиентам с Accept-Encoding: gzip файл отдается как есть, без распаковки"""
+        artifact = self.get_object()
+        if artifact.status != 'ready' or not artifact.file:
+            return Response({'error': 'Отчет еще формируется'}, status=status.HTTP_409_CONFLICT)
+
+        filename = f'{artifact.report}-{timezone.localtime(artifact.finished_at):%Y%m%d-%H%M}.json'
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = protected_file_response(
+                request, artifact.file, filename=filename, content_type='application/json', content_encoding='gzip'
+            )
+        else:
+            stream = gzip.open(artifact.file.open('rb'))
+            response = StreamingHttpResponse(
+                iter(lambda: stream.read(DOWNLOAD_CHUNK_SIZE), b''), content_type='application/json'
+            )
+            response['Content-Length'] = artifact.raw_size
+            response['Content-Disposition'] = content_disposition_header(True, filename)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -41,7 +41,7 @@ echo ""
 # Шаг 1: Установка системных зависимостей
 echo -e "${YELLOW}1️⃣  Установка системных зависимостей...${NC}"
 apt-get update -qq
-apt-get install -y curl wget git > /dev/null 2>&1 || true
+apt-get install -y curl wget git poppler-utils > /dev/null 2>&1 || true
 
 # Проверка Node.js
 if ! command -v node &> /dev/null; then